@@ -9,12 +9,17 @@ const coreAuthRouter = require('./routes/coreRoutes/coreAuth');
 const coreApiRouter = require('./routes/coreRoutes/coreApi');
 const coreDownloadRouter = require('./routes/coreRoutes/coreDownloadRouter');
 const corePublicRouter = require('./routes/coreRoutes/corePublicRouter');
+const coreBatchRouter = require('./routes/coreRoutes/coreBatch');
+const coreProfilerRouter = require('./routes/coreRoutes/coreProfiler');
+const coreQueryTraceRouter = require('./routes/coreRoutes/coreQueryTrace');
+const coreRecurringRouter = require('./routes/coreRoutes/coreRecurring');
 const adminAuth = require('./controllers/coreControllers/adminAuth');
+const readiness = require('./handlers/readinessHandler');
+const admission = require('./middlewares/admission');
 
 const errorHandlers = require('./handlers/errorHandlers');
 const erpApiRouter = require('./routes/appRoutes/appApi');
 
-const fileUpload = require('express-fileupload');
 // create our Express app
 const app = express();
 
@@ -25,23 +30,44 @@ app.use(
   })
 );
 
+// Health check endpoint for Kubernetes, answered ahead of the admission queues
+app.get('/api/health', (req, res) => {
+  res.status(200).json({
+    status: 'ok',
+    timestamp: new Date().toISOString(),
+    admission: admission.stats(),
+  });
+});
+// Readiness: 503 until the database, auto-setup and indexes are done
+app.get('/api/ready', readiness.status);
+
+// Overload protection: the other requests wait for a slot of their route class or are shed
+app.use(admission.admission);
+
 app.use(cookieParser());
 app.use(express.json());
 app.use(express.urlencoded({ extended: true }));
 
 app.use(compression());
 
-// Health check endpoint for Kubernetes
-app.get('/api/health', (req, res) => {
-  res.status(200).json({ status: 'ok', timestamp: new Date().toISOString() });
-});
-
 // // default options
-// app.use(fileUpload());
+// app.use(require('express-fileupload')());
 
 // Here our API Routes
 
 app.use('/api', coreAuthRouter);
+// Opt-in CPU profile / heap sampling control for the load harness
+if (process.env.PROFILER === 'true') {
+  app.use('/api/profiler', adminAuth.isValidAuthToken, coreProfilerRouter);
+}
+// Opt-in per query shape statistics for the load harness
+if (process.env.QUERY_TRACE === 'true') {
+  app.use('/api/querytrace', adminAuth.isValidAuthToken, coreQueryTraceRouter);
+}
+// Recurring invoice scheduler: run a pass now, last pass report
+app.use('/api/recurring', adminAuth.isValidAuthToken, coreRecurringRouter);
+// Read-only request batching over the core and ERP routers
+app.use('/api/batch', adminAuth.isValidAuthToken, coreBatchRouter);
 app.use('/api', adminAuth.isValidAuthToken, coreApiRouter);
 app.use('/api', adminAuth.isValidAuthToken, erpApiRouter);
 app.use('/download', coreDownloadRouter);
@@ -2,12 +2,15 @@ const mongoose = require('mongoose');
 const createCRUDController = require('@/controllers/middlewaresControllers/createCRUDController');
 
 const summary = require('./summary');
+const { importRows, importProgress } = require('@/middlewares/bulkImport');
 
 function modelController() {
   const Model = mongoose.model('Client');
   const methods = createCRUDController('Client');
 
   methods.summary = (req, res) => summary(Model, req, res);
+  methods.import = importRows('client');
+  methods.importProgress = importProgress('client');
   return methods;
 }
 
@@ -1,13 +1,9 @@
 const createCRUDController = require('@/controllers/middlewaresControllers/createCRUDController');
 const { routesList } = require('@/models/utils');
 
-const { globSync } = require('glob');
-const path = require('path');
+const { loadManifest } = require('@/setup/manifest');
 
-const pattern = './src/controllers/appControllers/*/**/';
-const controllerDirectories = globSync(pattern).map((filePath) => {
-  return path.basename(filePath);
-});
+const controllerDirectories = loadManifest().appControllers;
 
 const appControllers = () => {
   const controllers = {};
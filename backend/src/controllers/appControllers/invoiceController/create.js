@@ -4,6 +4,8 @@ const Model = mongoose.model('Invoice');
 
 const { calculate } = require('@/helpers');
 const { increaseBySettingKey } = require('@/middlewares/settings');
+const rollups = require('@/middlewares/rollups');
+const { firstRun } = require('@/middlewares/recurring/schedule');
 const schema = require('./schemaValidate');
 
 const create = async (req, res) => {
@@ -47,6 +49,13 @@ const create = async (req, res) => {
   body['paymentStatus'] = paymentStatus;
   body['createdBy'] = req.admin._id;
 
+  // picked up by the recurring invoice scheduler once due
+  if (body.recurring) {
+    body['nextRun'] = firstRun(body.date, body.recurring);
+  } else {
+    delete body.recurring;
+  }
+
   // Creating a new document in the collection
   const result = await new Model(body).save();
   const fileId = 'invoice-' + result._id + '.pdf';
@@ -57,6 +66,7 @@ const create = async (req, res) => {
       new: true,
     }
   ).exec();
+  await rollups.applyInvoice(null, updateResult);
   // Returning successfull response
 
   increaseBySettingKey({
@@ -4,17 +4,22 @@ const methods = createCRUDController('Invoice');
 const sendMail = require('./sendMail');
 const create = require('./create');
 const summary = require('./summary');
+const revenue = require('./revenue');
 const update = require('./update');
 const remove = require('./remove');
 const paginatedList = require('./paginatedList');
 const read = require('./read');
+const { importRows, importProgress } = require('@/middlewares/bulkImport');
 
 methods.mail = sendMail;
 methods.create = create;
 methods.update = update;
 methods.delete = remove;
 methods.summary = summary;
+methods.revenue = revenue;
 methods.list = paginatedList;
 methods.read = read;
+methods.import = importRows('invoice');
+methods.importProgress = importProgress('invoice');
 
 module.exports = methods;
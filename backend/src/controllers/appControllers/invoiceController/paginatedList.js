@@ -1,5 +1,7 @@
 const mongoose = require('mongoose');
 
+const { leanQuery } = require('@/middlewares/projection');
+
 const Model = mongoose.model('Invoice');
 
 const paginatedList = async (req, res) => {
@@ -20,17 +22,19 @@ const paginatedList = async (req, res) => {
   }
 
   //  Query the database for a list of all results
-  const resultsPromise = Model.find({
-    removed: false,
+  const resultsPromise = leanQuery(
+    Model.find({
+      removed: false,
 
-    [filter]: equal,
-    ...fields,
-  })
-    .skip(skip)
-    .limit(limit)
-    .sort({ [sortBy]: sortValue })
-    .populate('createdBy', 'name')
-    .exec();
+      [filter]: equal,
+      ...fields,
+    })
+      .skip(skip)
+      .limit(limit)
+      .sort({ [sortBy]: sortValue }),
+    req.projection,
+    { path: 'createdBy', select: 'name' }
+  );
 
   // Counting the total documents
   const countPromise = Model.countDocuments({
@@ -2,6 +2,7 @@ const mongoose = require('mongoose');
 
 const Model = mongoose.model('Invoice');
 const ModelPayment = mongoose.model('Payment');
+const rollups = require('@/middlewares/rollups');
 
 const remove = async (req, res) => {
   const deletedInvoice = await Model.findOneAndUpdate(
@@ -23,10 +24,17 @@ const remove = async (req, res) => {
       message: 'Invoice not found',
     });
   }
+  const payments = await ModelPayment.find({ invoice: deletedInvoice._id, removed: false })
+    .select('date amount currency')
+    .lean();
   const paymentsInvoices = await ModelPayment.updateMany(
     { invoice: deletedInvoice._id },
     { $set: { removed: true } }
   );
+  await Promise.all([
+    rollups.applyInvoice(deletedInvoice, null),
+    rollups.removePayments(payments),
+  ]);
   return res.status(200).json({
     success: true,
     result: deletedInvoice,
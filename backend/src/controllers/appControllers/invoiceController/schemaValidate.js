@@ -20,6 +20,9 @@ const schema = Joi.object({
       }).required()
     )
     .required(),
+  recurring: Joi.string()
+    .valid('daily', 'weekly', 'monthly', 'annually', 'quarter')
+    .allow('', null),
   taxRate: Joi.alternatives().try(Joi.number(), Joi.string()).required(),
 });
 
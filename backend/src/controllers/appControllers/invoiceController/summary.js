@@ -1,16 +1,14 @@
-const mongoose = require('mongoose');
 const moment = require('moment');
 
-const Model = mongoose.model('Invoice');
-
 const { loadSettings } = require('@/middlewares/settings');
+const rollups = require('@/middlewares/rollups');
 
 const summary = async (req, res) => {
   let defaultType = 'month';
 
   const { type } = req.query;
 
-  const settings = await loadSettings();
+  const settings = req.settings || (await loadSettings());
 
   if (type) {
     if (['week', 'month', 'year'].includes(type)) {
@@ -30,173 +28,30 @@ const summary = async (req, res) => {
 
   const statuses = ['draft', 'pending', 'overdue', 'paid', 'unpaid', 'partially'];
 
-  const response = await Model.aggregate([
-    {
-      $match: {
-        removed: false,
-        // date: {
-        //   $gte: startDate.toDate(),
-        //   $lte: endDate.toDate(),
-        // },
-      },
-    },
-    {
-      $facet: {
-        totalInvoice: [
-          {
-            $group: {
-              _id: null,
-              total: {
-                $sum: '$total',
-              },
-              count: {
-                $sum: 1,
-              },
-            },
-          },
-          {
-            $project: {
-              _id: 0,
-              total: '$total',
-              count: '$count',
-            },
-          },
-        ],
-        statusCounts: [
-          {
-            $group: {
-              _id: '$status',
-              count: {
-                $sum: 1,
-              },
-            },
-          },
-          {
-            $project: {
-              _id: 0,
-              status: '$_id',
-              count: '$count',
-            },
-          },
-        ],
-        paymentStatusCounts: [
-          {
-            $group: {
-              _id: '$paymentStatus',
-              count: {
-                $sum: 1,
-              },
-            },
-          },
-          {
-            $project: {
-              _id: 0,
-              status: '$_id',
-              count: '$count',
-            },
-          },
-        ],
-        overdueCounts: [
-          {
-            $match: {
-              expiredDate: {
-                $lt: new Date(),
-              },
-            },
-          },
-          {
-            $group: {
-              _id: '$status',
-              count: {
-                $sum: 1,
-              },
-            },
-          },
-          {
-            $project: {
-              _id: 0,
-              status: '$_id',
-              count: '$count',
-            },
-          },
-        ],
-      },
-    },
-  ]);
-
-  let result = [];
-
-  const totalInvoices = response[0].totalInvoice ? response[0].totalInvoice[0] : 0;
-  const statusResult = response[0].statusCounts || [];
-  const paymentStatusResult = response[0].paymentStatusCounts || [];
-  const overdueResult = response[0].overdueCounts || [];
-
-  const statusResultMap = statusResult.map((item) => {
-    return {
-      ...item,
-      percentage: Math.round((item.count / totalInvoices.count) * 100),
-    };
-  });
+  // Daily rollup buckets of the period instead of a scan of the invoices
+  const { total, count, undue, overdue, statusCounts, paymentStatusCounts } =
+    await rollups.invoiceSummary(startDate.toDate(), endDate.toDate());
 
-  const paymentStatusResultMap = paymentStatusResult.map((item) => {
-    return {
-      ...item,
-      percentage: Math.round((item.count / totalInvoices.count) * 100),
-    };
+  const withPercentage = (item) => ({
+    ...item,
+    percentage: count ? Math.round((item.count / count) * 100) : 0,
   });
+  const overdueCounts = overdue > 0 ? [{ status: 'overdue', count: overdue }] : [];
 
-  const overdueResultMap = overdueResult.map((item) => {
-    return {
-      ...item,
-      status: 'overdue',
-      percentage: Math.round((item.count / totalInvoices.count) * 100),
-    };
-  });
+  let result = [];
 
   statuses.forEach((status) => {
-    const found = [...paymentStatusResultMap, ...statusResultMap, ...overdueResultMap].find(
+    const found = [...paymentStatusCounts, ...statusCounts, ...overdueCounts].find(
       (item) => item.status === status
     );
     if (found) {
-      result.push(found);
+      result.push(withPercentage(found));
     }
   });
 
-  const unpaid = await Model.aggregate([
-    {
-      $match: {
-        removed: false,
-
-        // date: {
-        //   $gte: startDate.toDate(),
-        //   $lte: endDate.toDate(),
-        // },
-        paymentStatus: {
-          $in: ['unpaid', 'partially'],
-        },
-      },
-    },
-    {
-      $group: {
-        _id: null,
-        total_amount: {
-          $sum: {
-            $subtract: ['$total', '$credit'],
-          },
-        },
-      },
-    },
-    {
-      $project: {
-        _id: 0,
-        total_amount: '$total_amount',
-      },
-    },
-  ]);
-
   const finalResult = {
-    total: totalInvoices?.total,
-    total_undue: unpaid.length > 0 ? unpaid[0].total_amount : 0,
+    total,
+    total_undue: undue,
     type,
     performance: result,
   };
@@ -5,6 +5,8 @@ const Model = mongoose.model('Invoice');
 const custom = require('@/controllers/pdfController');
 
 const { calculate } = require('@/helpers');
+const rollups = require('@/middlewares/rollups');
+const { firstRun } = require('@/middlewares/recurring/schedule');
 const schema = require('./schemaValidate');
 
 const update = async (req, res) => {
@@ -67,9 +69,26 @@ const update = async (req, res) => {
     calculate.sub(total, discount) === credit ? 'paid' : credit > 0 ? 'partially' : 'unpaid';
   body['paymentStatus'] = paymentStatus;
 
-  const result = await Model.findOneAndUpdate({ _id: req.params.id, removed: false }, body, {
-    new: true, // return the new result instead of the old one
-  }).exec();
+  // a new recurrence restarts the schedule, none stops it
+  if (body.hasOwnProperty('recurring') && body.recurring !== previousInvoice.recurring) {
+    if (body.recurring) {
+      body['nextRun'] = firstRun(body.date, body.recurring);
+    } else {
+      delete body.recurring;
+      body['$unset'] = { recurring: 1, nextRun: 1 };
+    }
+  }
+
+  // the rollups take the invoice as this write found it, not as read above
+  const writtenInvoice = await Model.findOneAndUpdate(
+    { _id: req.params.id, removed: false },
+    body,
+    {
+      new: false,
+    }
+  ).exec();
+  await rollups.applyInvoice(writtenInvoice, rollups.afterUpdate(writtenInvoice, body));
+  const result = await Model.findOne({ _id: req.params.id, removed: false });
 
   // Returning successfull response
 
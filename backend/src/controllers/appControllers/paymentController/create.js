@@ -5,6 +5,7 @@ const Invoice = mongoose.model('Invoice');
 const custom = require('@/controllers/pdfController');
 
 const { calculate } = require('@/helpers');
+const rollups = require('@/middlewares/rollups');
 
 const create = async (req, res) => {
   // Creating a new document in the collection
@@ -63,18 +64,19 @@ const create = async (req, res) => {
       ? 'partially'
       : 'unpaid';
 
-  const invoiceUpdate = await Invoice.findOneAndUpdate(
-    { _id: req.body.invoice },
-    {
-      $push: { payment: paymentId.toString() },
-      $inc: { credit: amount },
-      $set: { paymentStatus: paymentStatus },
-    },
-    {
-      new: true, // return the new result instead of the old one
-      runValidators: true,
-    }
-  ).exec();
+  const invoiceUpdate = {
+    $push: { payment: paymentId.toString() },
+    $inc: { credit: amount },
+    $set: { paymentStatus: paymentStatus },
+  };
+  const previousInvoice = await Invoice.findOneAndUpdate({ _id: req.body.invoice }, invoiceUpdate, {
+    new: false, // the invoice as this write found it, not as currentInvoice read it
+    runValidators: true,
+  }).exec();
+  await Promise.all([
+    rollups.applyPayment(null, updatePath),
+    rollups.applyInvoice(previousInvoice, rollups.afterUpdate(previousInvoice, invoiceUpdate)),
+  ]);
 
   return res.status(200).json({
     success: true,
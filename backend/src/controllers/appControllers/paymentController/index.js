@@ -3,6 +3,7 @@ const methods = createCRUDController('Payment');
 
 const create = require('./create');
 const summary = require('./summary');
+const revenue = require('./revenue');
 const update = require('./update');
 const remove = require('./remove');
 const sendMail = require('./sendMail');
@@ -12,5 +13,6 @@ methods.create = create;
 methods.update = update;
 methods.delete = remove;
 methods.summary = summary;
+methods.revenue = revenue;
 
 module.exports = methods;
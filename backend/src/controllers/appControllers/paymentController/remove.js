@@ -2,13 +2,21 @@ const mongoose = require('mongoose');
 
 const Model = mongoose.model('Payment');
 const Invoice = mongoose.model('Invoice');
+const rollups = require('@/middlewares/rollups');
 
 const remove = async (req, res) => {
-  // Find document by id and updates with the required fields
-  const previousPayment = await Model.findOne({
-    _id: req.params.id,
-    removed: false,
-  });
+  let updates = {
+    removed: true,
+  };
+  // Find the document by id and delete it, keeping it as this write found it:
+  // a concurrent removal of the same payment finds nothing
+  const previousPayment = await Model.findOneAndUpdate(
+    { _id: req.params.id, removed: false },
+    { $set: updates },
+    {
+      new: false,
+    }
+  ).exec();
 
   if (!previousPayment) {
     return res.status(404).json({
@@ -21,19 +29,7 @@ const remove = async (req, res) => {
   const { _id: paymentId, amount: previousAmount } = previousPayment;
   const { id: invoiceId, total, discount, credit: previousCredit } = previousPayment.invoice;
 
-  // Find the document by id and delete it
-  let updates = {
-    removed: true,
-  };
-  // Find the document by id and delete it
-  const result = await Model.findOneAndUpdate(
-    { _id: req.params.id, removed: false },
-    { $set: updates },
-    {
-      new: true, // return the new result instead of the old one
-    }
-  ).exec();
-  // If no results found, return document not found
+  const result = rollups.afterUpdate(previousPayment, { $set: updates });
 
   let paymentStatus =
     total - discount === previousCredit - previousAmount
@@ -42,21 +38,23 @@ const remove = async (req, res) => {
       ? 'partially'
       : 'unpaid';
 
-  const updateInvoice = await Invoice.findOneAndUpdate(
-    { _id: invoiceId },
-    {
-      $pull: {
-        payment: paymentId,
-      },
-      $inc: { credit: -previousAmount },
-      $set: {
-        paymentStatus: paymentStatus,
-      },
+  const invoiceUpdate = {
+    $pull: {
+      payment: paymentId,
     },
-    {
-      new: true, // return the new result instead of the old one
-    }
-  ).exec();
+    $inc: { credit: -previousAmount },
+    $set: {
+      paymentStatus: paymentStatus,
+    },
+  };
+  // the invoice as this write found it, not as populated in the payment
+  const previousInvoice = await Invoice.findOneAndUpdate({ _id: invoiceId }, invoiceUpdate, {
+    new: false,
+  }).exec();
+  await Promise.all([
+    rollups.applyPayment(previousPayment, null),
+    rollups.applyInvoice(previousInvoice, rollups.afterUpdate(previousInvoice, invoiceUpdate)),
+  ]);
 
   return res.status(200).json({
     success: true,
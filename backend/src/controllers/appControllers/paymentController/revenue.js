@@ -0,0 +1,24 @@
+const rollups = require('@/middlewares/rollups');
+
+// Payment count and totals per day, week or month, from the daily rollup buckets
+const revenue = async (req, res) => {
+  const { from, to, interval, error } = rollups.parseRange(req.query);
+  if (error) {
+    return res.status(400).json({
+      success: false,
+      result: null,
+      message: error,
+    });
+  }
+
+  const { currency } = req.query;
+  const result = await rollups.revenue('payment', { from, to, interval, currency });
+
+  return res.status(200).json({
+    success: true,
+    result,
+    message: `Successfully fetched the payment totals per ${interval}`,
+  });
+};
+
+module.exports = revenue;
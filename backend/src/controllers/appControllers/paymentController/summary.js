@@ -1,15 +1,14 @@
-const mongoose = require('mongoose');
 const moment = require('moment');
 
-const Model = mongoose.model('Payment');
 const { loadSettings } = require('@/middlewares/settings');
+const rollups = require('@/middlewares/rollups');
 
 const summary = async (req, res) => {
   let defaultType = 'month';
 
   const { type } = req.query;
 
-  const settings = await loadSettings();
+  const settings = req.settings || (await loadSettings());
 
   if (type) {
     if (['week', 'month', 'year'].includes(type)) {
@@ -27,41 +26,12 @@ const summary = async (req, res) => {
   let startDate = currentDate.clone().startOf(defaultType);
   let endDate = currentDate.clone().endOf(defaultType);
 
-  // get total amount of invoices
-  const result = await Model.aggregate([
-    {
-      $match: {
-        removed: false,
-
-        // date: {
-        //   $gte: startDate.toDate(),
-        //   $lte: endDate.toDate(),
-        // },
-      },
-    },
-    {
-      $group: {
-        _id: null, // Group all documents into a single group
-        count: {
-          $sum: 1,
-        },
-        total: {
-          $sum: '$amount',
-        },
-      },
-    },
-    {
-      $project: {
-        _id: 0, // Exclude _id from the result
-        count: 1,
-        total: 1,
-      },
-    },
-  ]);
+  // daily rollup buckets of the period instead of a scan of the payments
+  const result = await rollups.paymentSummary(startDate.toDate(), endDate.toDate());
 
   return res.status(200).json({
     success: true,
-    result: result.length > 0 ? result[0] : { count: 0, total: 0 },
+    result,
     message: `Successfully fetched the summary of payment invoices for the last ${defaultType}`,
   });
 };
@@ -5,6 +5,7 @@ const Invoice = mongoose.model('Invoice');
 const custom = require('@/controllers/pdfController');
 
 const { calculate } = require('@/helpers');
+const rollups = require('@/middlewares/rollups');
 
 const update = async (req, res) => {
   if (req.body.amount === 0) {
@@ -55,26 +56,42 @@ const update = async (req, res) => {
     updated: updatedDate,
   };
 
-  const result = await Model.findOneAndUpdate(
+  // the rollups take the documents as these writes found them, not as read above
+  const paymentUpdate = { $set: updates };
+  const writtenPayment = await Model.findOneAndUpdate(
     { _id: req.params.id, removed: false },
-    { $set: updates },
+    paymentUpdate,
     {
-      new: true, // return the new result instead of the old one
+      new: false,
     }
   ).exec();
+  if (!writtenPayment) {
+    return res.status(404).json({
+      success: false,
+      result: null,
+      message: 'No document found ',
+    });
+  }
 
-  const updateInvoice = await Invoice.findOneAndUpdate(
-    { _id: result.invoice._id.toString() },
-    {
-      $inc: { credit: changedAmount },
-      $set: {
-        paymentStatus: paymentStatus,
-      },
+  const invoiceUpdate = {
+    $inc: { credit: calculate.sub(currentAmount, writtenPayment.amount) },
+    $set: {
+      paymentStatus: paymentStatus,
     },
+  };
+  const previousInvoice = await Invoice.findOneAndUpdate(
+    { _id: writtenPayment.invoice._id.toString() },
+    invoiceUpdate,
     {
-      new: true, // return the new result instead of the old one
+      new: false,
     }
   ).exec();
+  await Promise.all([
+    rollups.applyPayment(writtenPayment, rollups.afterUpdate(writtenPayment, paymentUpdate)),
+    rollups.applyInvoice(previousInvoice, rollups.afterUpdate(previousInvoice, invoiceUpdate)),
+  ]);
+
+  const result = await Model.findOne({ _id: req.params.id, removed: false });
 
   return res.status(200).json({
     success: true,
@@ -1,15 +1,19 @@
 const mongoose = require('mongoose');
 
+const { leanQuery } = require('@/middlewares/projection');
+
 const Model = mongoose.model('Quote');
 
 const read = async (req, res) => {
   // Find document by id
-  const result = await Model.findOne({
-    _id: req.params.id,
-    removed: false,
-  })
-    .populate('createdBy', 'name')
-    .exec();
+  const result = await leanQuery(
+    Model.findOne({
+      _id: req.params.id,
+      removed: false,
+    }),
+    req.projection,
+    { path: 'createdBy', select: 'name' }
+  );
   // If no results found, return document not found
   if (!result) {
     return res.status(404).json({
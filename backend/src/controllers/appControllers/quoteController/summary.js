@@ -9,7 +9,7 @@ const summary = async (req, res) => {
 
   const { type } = req.query;
 
-  const settings = await loadSettings();
+  const settings = req.settings || (await loadSettings());
 
   if (type) {
     if (['week', 'month', 'year'].includes(type)) {
@@ -1,7 +1,5 @@
 const { passwordVerfication } = require('@/emailTemplate/emailVerfication');
 
-const { Resend } = require('resend');
-
 const sendMail = async ({
   email,
   name,
@@ -11,6 +9,8 @@ const sendMail = async ({
   type = 'emailVerfication',
   emailToken,
 }) => {
+  // loaded on the first mail rather than at server start
+  const { Resend } = require('resend');
   const resend = new Resend(process.env.RESEND_API);
 
   const { data } = await resend.emails.send({
@@ -1,3 +1,5 @@
+const { leanQuery } = require('@/middlewares/projection');
+
 const filter = async (Model, req, res) => {
   if (req.query.filter === undefined || req.query.equal === undefined) {
     return res.status(403).json({
@@ -6,12 +8,14 @@ const filter = async (Model, req, res) => {
       message: 'filter not provided correctly',
     });
   }
-  const result = await Model.find({
-    removed: false,
-  })
-    .where(req.query.filter)
-    .equals(req.query.equal)
-    .exec();
+  const result = await leanQuery(
+    Model.find({
+      removed: false,
+    })
+      .where(req.query.filter)
+      .equals(req.query.equal),
+    req.projection
+  );
   if (!result) {
     return res.status(404).json({
       success: false,
@@ -1,3 +1,5 @@
+const { leanQuery } = require('@/middlewares/projection');
+
 const listAll = async (Model, req, res) => {
   const sort = req.query.sort || 'desc';
   const enabled = req.query.enabled || undefined;
@@ -6,20 +8,20 @@ const listAll = async (Model, req, res) => {
 
   let result;
   if (enabled === undefined) {
-    result = await Model.find({
-      removed: false,
-    })
-      .sort({ created: sort })
-      .populate()
-      .exec();
+    result = await leanQuery(
+      Model.find({
+        removed: false,
+      }).sort({ created: sort }),
+      req.projection
+    );
   } else {
-    result = await Model.find({
-      removed: false,
-      enabled: enabled,
-    })
-      .sort({ created: sort })
-      .populate()
-      .exec();
+    result = await leanQuery(
+      Model.find({
+        removed: false,
+        enabled: enabled,
+      }).sort({ created: sort }),
+      req.projection
+    );
   }
 
   if (result.length > 0) {
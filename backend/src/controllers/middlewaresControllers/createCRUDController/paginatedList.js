@@ -1,3 +1,5 @@
+const { leanQuery } = require('@/middlewares/projection');
+
 const paginatedList = async (Model, req, res) => {
   const page = req.query.page || 1;
   const limit = parseInt(req.query.items) || 10;
@@ -16,17 +18,18 @@ const paginatedList = async (Model, req, res) => {
   }
 
   //  Query the database for a list of all results
-  const resultsPromise = Model.find({
-    removed: false,
+  const resultsPromise = leanQuery(
+    Model.find({
+      removed: false,
 
-    [filter]: equal,
-    ...fields,
-  })
-    .skip(skip)
-    .limit(limit)
-    .sort({ [sortBy]: sortValue })
-    .populate()
-    .exec();
+      [filter]: equal,
+      ...fields,
+    })
+      .skip(skip)
+      .limit(limit)
+      .sort({ [sortBy]: sortValue }),
+    req.projection
+  );
 
   // Counting the total documents
   const countPromise = Model.countDocuments({
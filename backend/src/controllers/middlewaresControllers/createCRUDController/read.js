@@ -1,9 +1,14 @@
+const { leanQuery } = require('@/middlewares/projection');
+
 const read = async (Model, req, res) => {
   // Find document by id
-  const result = await Model.findOne({
-    _id: req.params.id,
-    removed: false,
-  }).exec();
+  const result = await leanQuery(
+    Model.findOne({
+      _id: req.params.id,
+      removed: false,
+    }),
+    req.projection
+  );
   // If no results found, return document not found
   if (!result) {
     return res.status(404).json({
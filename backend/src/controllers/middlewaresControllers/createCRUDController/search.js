@@ -1,3 +1,5 @@
+const { leanQuery } = require('@/middlewares/projection');
+
 const search = async (Model, req, res) => {
   // console.log(req.query.fields)
   // if (req.query.q === undefined || req.query.q.trim() === '') {
@@ -19,13 +21,14 @@ const search = async (Model, req, res) => {
   }
   // console.log(fields)
 
-  let results = await Model.find({
-    ...fields,
-  })
-
-    .where('removed', false)
-    .limit(20)
-    .exec();
+  let results = await leanQuery(
+    Model.find({
+      ...fields,
+    })
+      .where('removed', false)
+      .limit(20),
+    req.projection
+  );
 
   if (results.length >= 1) {
     return res.status(200).json({
@@ -1,7 +1,5 @@
-const pug = require('pug');
 const fs = require('fs');
 const moment = require('moment');
-let pdf = require('html-pdf');
 const { listAllSettings, loadSettings } = require('@/middlewares/settings');
 const { getData } = require('@/middlewares/serverData');
 const useLanguage = require('@/locale/useLanguage');
@@ -12,6 +10,16 @@ const pugFiles = ['invoice', 'offer', 'quote', 'payment'];
 require('dotenv').config({ path: '.env' });
 require('dotenv').config({ path: '.env.local' });
 
+// pug and html-pdf are only loaded by the first PDF, not at server start
+let pug;
+let pdf;
+const loadRenderers = () => {
+  if (!pdf) {
+    pug = require('pug');
+    pdf = require('html-pdf');
+  }
+};
+
 exports.generatePdf = async (
   modelName,
   info = { filename: 'pdf_file', format: 'A5', targetLocation: '' },
@@ -29,6 +37,8 @@ exports.generatePdf = async (
     // render pdf html
 
     if (pugFiles.includes(modelName.toLowerCase())) {
+      loadRenderers();
+
       // Compile Pug template
 
       const settings = await loadSettings();
@@ -0,0 +1,149 @@
+const { EventEmitter } = require('events');
+
+const { loadSettings } = require('@/middlewares/settings');
+
+const MAX_REQUESTS = 20;
+// the read routes a batch may reach: some GET routes write (quote/convert/:id)
+const READ_ROUTES = /^[^/]+\/(read\/[^/]+|list|listAll|filter|search|summary|revenue)$/;
+const TIMEOUT = parseInt(process.env.BATCH_TIMEOUT_MS) || 30000;
+
+/*
+  Minimal stand-in for the express response: controllers only use
+  status/json/set/end, so the sub-response collects them into a plain result
+*/
+const createSubResponse = (resolve) => {
+  const headers = {};
+  const res = new EventEmitter();
+  const finish = (body) => {
+    res.headersSent = true;
+    resolve({ status: res.statusCode, headers, body });
+    res.emit('finish');
+    return res;
+  };
+
+  res.statusCode = 200;
+  res.headersSent = false;
+  res.status = (code) => {
+    res.statusCode = code;
+    return res;
+  };
+  res.set = res.header = (field, value) => {
+    if (typeof field === 'object') {
+      Object.entries(field).forEach(([key, val]) => res.set(key, val));
+    } else {
+      headers[field.toLowerCase()] = String(value);
+    }
+    return res;
+  };
+  res.setHeader = res.set;
+  res.get = res.getHeader = (field) => headers[field.toLowerCase()];
+  res.removeHeader = (field) => delete headers[field.toLowerCase()];
+  res.json = (body) => finish(body);
+  res.send = (body) => finish(body);
+  res.end = (chunk) => {
+    if (!chunk) return finish(null);
+    try {
+      return finish(JSON.parse(chunk.toString()));
+    } catch {
+      return finish(chunk.toString());
+    }
+  };
+  return res;
+};
+
+const dispatch = (routers, req, { url }) => {
+  const [pathname, search = ''] = url.replace(/^\/+/, '').split('?');
+  // mounted on /api/batch: sub-requests resolve against /api like the routers expect
+  const baseUrl = req.baseUrl.replace(/\/batch$/, '');
+  const subRequest = Object.create(req, {
+    method: { value: 'GET', writable: true },
+    url: { value: '/' + pathname + (search ? '?' + search : ''), writable: true },
+    baseUrl: { value: baseUrl, writable: true },
+    originalUrl: { value: baseUrl + '/' + pathname + (search ? '?' + search : ''), writable: true },
+    query: { value: Object.fromEntries(new URLSearchParams(search)), writable: true },
+    params: { value: {}, writable: true },
+    body: { value: {}, writable: true },
+    // sub-responses are returned inside JSON, never revalidated or gzipped
+    headers: {
+      value: { ...req.headers, 'if-none-match': undefined, 'accept-encoding': 'identity' },
+      writable: true,
+    },
+  });
+
+  return new Promise((resolve) => {
+    const timer = setTimeout(
+      () => resolve({ status: 504, body: { success: false, result: null, message: 'Timeout' } }),
+      TIMEOUT
+    );
+    const done = (result) => {
+      clearTimeout(timer);
+      resolve(result);
+    };
+    const res = createSubResponse(done);
+
+    const next = (index) => (error) => {
+      if (error) {
+        return done({ status: 500, body: { success: false, result: null, message: error.message } });
+      }
+      if (index >= routers.length) {
+        return done({ status: 404, body: { success: false, message: "Api url doesn't exist " } });
+      }
+      routers[index](subRequest, res, next(index + 1));
+    };
+    next(0)();
+  });
+};
+
+/*
+  POST /api/batch { requests: [{ id, url }] }
+
+  Runs read-only sub-requests against the given routers concurrently, inside the
+  already authenticated request and with settings loaded once for all of them
+*/
+const createBatchHandler = (routers) => async (req, res) => {
+  const { requests } = req.body;
+
+  if (!Array.isArray(requests) || requests.length === 0) {
+    return res.status(400).json({
+      success: false,
+      result: null,
+      message: 'requests must be a non empty array',
+    });
+  }
+  if (requests.length > MAX_REQUESTS) {
+    return res.status(400).json({
+      success: false,
+      result: null,
+      message: `A batch can contain at most ${MAX_REQUESTS} requests`,
+    });
+  }
+  const invalid = requests.find(
+    ({ url, method = 'GET' } = {}) =>
+      typeof url !== 'string' ||
+      method.toUpperCase() !== 'GET' ||
+      !READ_ROUTES.test(url.replace(/^\/+/, '').split('?')[0])
+  );
+  if (invalid) {
+    return res.status(400).json({
+      success: false,
+      result: null,
+      message: 'Only GET sub-requests to read, list, listAll, filter, search, summary or revenue are supported',
+    });
+  }
+
+  req.settings = await loadSettings();
+
+  const responses = await Promise.all(requests.map((item) => dispatch(routers, req, item)));
+
+  return res.status(200).json({
+    success: true,
+    result: requests.map((item, index) => ({
+      id: item.id ?? index,
+      status: responses[index].status,
+      body: responses[index].body,
+    })),
+    message: 'Successfully ran batch requests',
+  });
+};
+
+module.exports = createBatchHandler;
@@ -0,0 +1,137 @@
+const inspector = require('inspector');
+
+/*
+  Opt-in CPU profile and heap sampling of this process (PROFILER=true).
+  The load harness starts a profile around a scenario window and stops it to
+  receive the V8 profiles, instead of restarting the server with node --prof.
+  One profile at a time; a forgotten one is discarded after PROFILER_MAX_MS.
+*/
+const MAX_DURATION = parseInt(process.env.PROFILER_MAX_MS) || 10 * 60 * 1000;
+const DEFAULT_CPU_INTERVAL = 1000; // microseconds between CPU samples
+const DEFAULT_HEAP_INTERVAL = 32 * 1024; // bytes allocated between heap samples
+
+let session = null;
+let running = null;
+
+const post = (method, params = {}) =>
+  new Promise((resolve, reject) => {
+    session.post(method, params, (error, result) => (error ? reject(error) : resolve(result)));
+  });
+
+const connect = () => {
+  if (!session) {
+    session = new inspector.Session();
+    session.connect();
+  }
+};
+
+const stopProfilers = async ({ cpu, heap }) => {
+  const result = {};
+  if (cpu) {
+    result.cpuProfile = (await post('Profiler.stop')).profile;
+    await post('Profiler.disable');
+  }
+  if (heap) {
+    result.heapProfile = (await post('HeapProfiler.stopSampling')).profile;
+    await post('HeapProfiler.disable');
+  }
+  return result;
+};
+
+const describe = () =>
+  running && {
+    label: running.label,
+    cpu: running.cpu,
+    heap: running.heap,
+    startedAt: new Date(running.startedAt).toISOString(),
+    elapsedMs: Date.now() - running.startedAt,
+  };
+
+const start = async (req, res) => {
+  if (running) {
+    return res.status(409).json({
+      success: false,
+      result: describe(),
+      message: 'A profile is already running',
+    });
+  }
+  const {
+    cpu = true,
+    heap = true,
+    label = '',
+    samplingInterval = DEFAULT_CPU_INTERVAL,
+    heapSamplingInterval = DEFAULT_HEAP_INTERVAL,
+  } = req.body || {};
+
+  connect();
+  running = { cpu: !!cpu, heap: !!heap, label: String(label), startedAt: Date.now() };
+  const started = { cpu: false, heap: false };
+  try {
+    if (running.cpu) {
+      await post('Profiler.enable');
+      await post('Profiler.setSamplingInterval', { interval: parseInt(samplingInterval) });
+      await post('Profiler.start');
+      started.cpu = true;
+    }
+    if (running.heap) {
+      await post('HeapProfiler.enable');
+      // per-request garbage is most of what a load window allocates: keep the
+      // samples of objects collected before the profile stops
+      await post('HeapProfiler.startSampling', {
+        samplingInterval: parseInt(heapSamplingInterval),
+        includeObjectsCollectedByMajorGC: true,
+        includeObjectsCollectedByMinorGC: true,
+      });
+      started.heap = true;
+    }
+  } catch (error) {
+    running = null;
+    await stopProfilers(started).catch(() => {});
+    throw error;
+  }
+  const profile = running;
+  running.timer = setTimeout(() => {
+    if (running === profile) {
+      running = null;
+      stopProfilers(profile).catch(() => {});
+    }
+  }, MAX_DURATION);
+  running.timer.unref();
+
+  return res.status(200).json({
+    success: true,
+    result: describe(),
+    message: 'Profiling started',
+  });
+};
+
+const stop = async (req, res) => {
+  if (!running) {
+    return res.status(409).json({
+      success: false,
+      result: null,
+      message: 'No profile is running',
+    });
+  }
+  const profile = running;
+  const summary = describe();
+  running = null;
+  clearTimeout(profile.timer);
+  const profiles = await stopProfilers(profile);
+
+  return res.status(200).json({
+    success: true,
+    result: { ...summary, ...profiles },
+    message: 'Profiling stopped',
+  });
+};
+
+const status = async (req, res) => {
+  return res.status(200).json({
+    success: true,
+    result: { running: !!running, profile: describe() },
+    message: running ? 'A profile is running' : 'No profile is running',
+  });
+};
+
+module.exports = { start, stop, status };
@@ -0,0 +1,21 @@
+const queryTrace = require('@/middlewares/queryTrace');
+
+const read = async (req, res) => {
+  const { sort, limit } = req.query;
+  return res.status(200).json({
+    success: true,
+    result: queryTrace.snapshot({ sort, limit }),
+    message: 'Query shapes since the last reset',
+  });
+};
+
+const reset = async (req, res) => {
+  queryTrace.reset();
+  return res.status(200).json({
+    success: true,
+    result: null,
+    message: 'Query trace reset',
+  });
+};
+
+module.exports = { read, reset };
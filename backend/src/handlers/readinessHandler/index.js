@@ -0,0 +1,41 @@
+const { performance } = require('perf_hooks');
+
+/*
+  Startup phases the server goes through before it takes traffic.
+  /api/health only says the process is alive; /api/ready answers 503 until
+  every phase is done, so a restarted or scaled-out pod gets no requests
+  while it is still connecting, setting up or building indexes and rollups.
+*/
+const PHASES = ['models', 'database', 'setup', 'indexes', 'rollups', 'listening'];
+
+let phases = {};
+
+// Milliseconds since process start at which a phase finished
+const mark = (phase) => {
+  if (!(phase in phases)) {
+    phases[phase] = Math.round(performance.now());
+    if (isReady()) {
+      console.log(`🚀 Ready in ${phases[phase]}ms`);
+    }
+  }
+};
+
+const pending = () => PHASES.filter((phase) => !(phase in phases));
+
+const isReady = () => pending().length === 0;
+
+const status = (req, res) => {
+  const ready = isReady();
+  return res.status(ready ? 200 : 503).json({
+    status: ready ? 'ready' : 'starting',
+    startupMs: ready ? Math.max(...Object.values(phases)) : null,
+    phases,
+    pending: pending(),
+  });
+};
+
+const reset = () => {
+  phases = {};
+};
+
+module.exports = { PHASES, mark, pending, isReady, status, reset };
@@ -0,0 +1,21 @@
+const recurring = require('@/middlewares/recurring');
+
+// Run a pass now instead of waiting for the next tick; answers with its report
+const run = async (req, res) => {
+  const result = await recurring.run();
+  return res.status(200).json({
+    success: true,
+    result,
+    message: `Recurring invoices: ${result.generated} generated (${result.status})`,
+  });
+};
+
+const status = async (req, res) => {
+  return res.status(200).json({
+    success: true,
+    result: recurring.status(),
+    message: 'Recurring invoice scheduler status',
+  });
+};
+
+module.exports = { run, status };
@@ -0,0 +1,153 @@
+/*
+  Admission control: every request outside /api/health and /api/ready takes a
+  slot of its route class before it runs. A class runs at most `concurrency`
+  requests at once; the next ones wait in a FIFO queue of at most `queue`
+  requests for at most `queueMs`. Past that the request is shed: 429 when the
+  queue is full on arrival, 503 when it waited its whole budget. Both carry a
+  Retry-After estimated from the queue and the recent service time, so a burst
+  is answered with fast refusals instead of timing out all together.
+
+  ADMISSION=false lets everything through. The limits of a class are set with
+  ADMISSION_<CLASS>_CONCURRENCY, ADMISSION_<CLASS>_QUEUE and
+  ADMISSION_<CLASS>_QUEUE_MS (CLASS one of API, HEAVY, PDF, AUTH).
+*/
+const DEFAULTS = {
+  // cheap reads and writes: lists, reads, creates, updates
+  api: { concurrency: 64, queue: 256, queueMs: 1000 },
+  // aggregations and long runs: summaries, revenue, batches, imports, recurring passes
+  heavy: { concurrency: 8, queue: 32, queueMs: 2000 },
+  // PDF rendering: downloads and mails
+  pdf: { concurrency: 4, queue: 16, queueMs: 5000 },
+  // bcrypt on login and password resets
+  auth: { concurrency: 8, queue: 32, queueMs: 1000 },
+};
+
+// [path, class, method]: the first match wins, anything else is an api request
+const ROUTES = [
+  [/^\/api\/(profiler|querytrace)(\/|$)/, null],
+  [/^\/download\//, 'pdf'],
+  [/^\/api\/[^/]+\/mail$/, 'pdf'],
+  [/^\/api\/(login|logout|forgetpassword|resetpassword)$/, 'auth'],
+  [/^\/api\/[^/]+\/(summary|revenue)$/, 'heavy'],
+  [/^\/api\/[^/]+\/import$/, 'heavy', 'POST'],
+  [/^\/api\/(batch|recurring)(\/|$)/, 'heavy'],
+];
+
+const isEnabled = () => process.env.ADMISSION !== 'false';
+
+const limit = (name, key, setting) =>
+  parseInt(process.env[`ADMISSION_${name.toUpperCase()}_${setting}`]) || DEFAULTS[name][key];
+
+// null for the harness control routes, which must answer during an overload
+const classOf = (method, path) => {
+  const route = ROUTES.find(
+    ([pattern, , only]) => (!only || only === method) && pattern.test(path)
+  );
+  return route ? route[1] : 'api';
+};
+
+const classes = new Map();
+
+const createClass = (name) => ({
+  name,
+  concurrency: limit(name, 'concurrency', 'CONCURRENCY'),
+  queueSize: limit(name, 'queue', 'QUEUE'),
+  queueMs: limit(name, 'queueMs', 'QUEUE_MS'),
+  running: 0,
+  queue: [],
+  // moving average of the time a request holds its slot
+  serviceMs: 50,
+  admitted: 0,
+  rejected: 0,
+  shed: 0,
+  maxWaitMs: 0,
+});
+
+const classFor = (name) => {
+  if (!classes.has(name)) classes.set(name, createClass(name));
+  return classes.get(name);
+};
+
+// seconds until the requests ahead of a new one are likely done
+const retryAfter = (state) => {
+  const waves = Math.ceil((state.queue.length + 1) / state.concurrency);
+  return Math.max(1, Math.ceil((waves * state.serviceMs) / 1000));
+};
+
+const refuse = (res, status, state) => {
+  const seconds = retryAfter(state);
+  res.set('Retry-After', String(seconds));
+  return res.status(status).json({
+    success: false,
+    result: null,
+    message: `Server busy (${state.name}), retry in ${seconds}s`,
+  });
+};
+
+const start = (state, req, res, next) => {
+  state.running += 1;
+  state.admitted += 1;
+  const started = Date.now();
+  let done = false;
+  const release = () => {
+    if (done) return;
+    done = true;
+    state.running -= 1;
+    state.serviceMs = state.serviceMs * 0.9 + (Date.now() - started) * 0.1;
+    // hand the slot to the oldest request still waiting
+    const waiting = state.queue.shift();
+    if (waiting) waiting.admit();
+  };
+  res.on('finish', release);
+  res.on('close', release);
+  next();
+};
+
+const admission = (req, res, next) => {
+  if (!isEnabled()) return next();
+  const name = classOf(req.method, req.path);
+  if (!name) return next();
+  const state = classFor(name);
+
+  if (state.running < state.concurrency) return start(state, req, res, next);
+  if (state.queue.length >= state.queueSize) {
+    state.rejected += 1;
+    return refuse(res, 429, state);
+  }
+
+  const queued = Date.now();
+  const leave = () => {
+    clearTimeout(timer);
+    const index = state.queue.indexOf(entry);
+    if (index !== -1) state.queue.splice(index, 1);
+  };
+  const entry = {
+    admit: () => {
+      leave();
+      res.removeListener('close', leave);
+      state.maxWaitMs = Math.max(state.maxWaitMs, Date.now() - queued);
+      start(state, req, res, next);
+    },
+  };
+  const timer = setTimeout(() => {
+    leave();
+    res.removeListener('close', leave);
+    state.shed += 1;
+    refuse(res, 503, state);
+  }, state.queueMs);
+  // a client that gave up no longer holds a place in the queue
+  res.on('close', leave);
+  state.queue.push(entry);
+};
+
+const stats = () =>
+  Object.fromEntries(
+    [...classes.values()].map(({ name, queue, serviceMs, ...state }) => [
+      name,
+      { ...state, queued: queue.length, serviceMs: Math.round(serviceMs) },
+    ])
+  );
+
+const reset = () => classes.clear();
+
+module.exports = { admission, classOf, stats, reset };
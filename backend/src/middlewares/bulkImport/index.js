@@ -0,0 +1,218 @@
+const crypto = require('crypto');
+const { performance } = require('perf_hooks');
+
+const mongoose = require('mongoose');
+
+const { bumpVersion } = require('@/middlewares/httpCache');
+const { writeSideEffects } = require('@/middlewares/httpCache/dependencies');
+const rollups = require('@/middlewares/rollups');
+const { formatOf, rowsOf } = require('./parse');
+const prepare = require('./prepare');
+
+/*
+  Bulk import of clients and invoices (POST /{entity}/import, CSV or NDJSON
+  request body). Rows are parsed as the upload streams in, checked like
+  /create and written with bulkWrite every IMPORT_BATCH_SIZE rows; the next
+  rows are only read once a batch is written, so memory stays bounded.
+  ?ordered=true stops at the first rejected row, otherwise every valid row is
+  written and the rejected ones reported. Jobs live in the process that runs
+  them: GET /{entity}/import[/:id] on that replica reports their progress.
+  The upload names its job with ?id= to follow it while it runs; the job id
+  otherwise only comes back in the response. Every written batch bumps the
+  ETag versions, so a failure later on leaves no stale list behind.
+*/
+const BATCH_SIZE = parseInt(process.env.IMPORT_BATCH_SIZE) || 1000;
+const MAX_ERRORS = 1000;
+const MAX_JOBS = 20;
+const MODELS = { client: 'Client', invoice: 'Invoice' };
+const JOB_ID = /^[\w-]{1,64}$/;
+
+const jobs = new Map();
+
+const createJob = (entity, format, ordered, id = crypto.randomBytes(8).toString('hex')) => {
+  const job = {
+    id,
+    entity,
+    format,
+    ordered,
+    status: 'running',
+    rows: 0,
+    inserted: 0,
+    failed: 0,
+    errors: [],
+    started: new Date(),
+    ms: 0,
+    rowsPerSecond: 0,
+    peakRss: process.memoryUsage.rss(),
+  };
+  jobs.set(job.id, job);
+  // forget the oldest finished jobs
+  for (const [id, { status }] of jobs) {
+    if (jobs.size <= MAX_JOBS) break;
+    if (status !== 'running') jobs.delete(id);
+  }
+  return job;
+};
+
+const reject = (job, row, message) => {
+  job.failed += 1;
+  if (job.errors.length < MAX_ERRORS) job.errors.push({ row, message });
+  if (job.ordered) job.status = 'stopped';
+};
+
+// Invoices whose client does not exist are rejected before the write
+const withClients = async (job, batch) => {
+  if (job.entity !== 'invoice') return batch;
+  const ids = [...new Set(batch.map(({ doc }) => String(doc.client)))];
+  const found = await mongoose
+    .model('Client')
+    .find({ _id: { $in: ids }, removed: false })
+    .select('_id')
+    .lean();
+  const known = new Set(found.map(({ _id }) => String(_id)));
+  const kept = [];
+  for (const entry of batch) {
+    if (known.has(String(entry.doc.client))) {
+      kept.push(entry);
+    } else {
+      reject(job, entry.row, 'Client not found');
+      if (job.ordered) break;
+    }
+  }
+  return kept;
+};
+
+const afterWrite = async (job, docs) => {
+  if (job.entity !== 'invoice' || docs.length === 0) return;
+  await rollups.addInvoices(docs);
+  // numbers of /create continue after the imported ones
+  await mongoose
+    .model('Setting')
+    .updateOne(
+      { settingKey: 'last_invoice_number' },
+      { $max: { settingValue: Math.max(...docs.map(({ number }) => number)) } }
+    );
+};
+
+const write = async (job, batch) => {
+  if (batch.length === 0) return;
+  const entries = await withClients(job, batch);
+  if (entries.length === 0) return;
+  const Model = mongoose.model(MODELS[job.entity]);
+  const failed = new Map();
+  try {
+    // the documents are cast and validated already
+    await Model.collection.bulkWrite(
+      entries.map(({ doc }) => ({ insertOne: { document: doc } })),
+      { ordered: job.ordered }
+    );
+  } catch (error) {
+    const writeErrors = [].concat(error.writeErrors || []);
+    if (!writeErrors.length) throw error;
+    writeErrors.forEach(({ index, errmsg, code }) => failed.set(index, errmsg || `code ${code}`));
+  }
+  const written = [];
+  for (const [index, { row, doc }] of entries.entries()) {
+    if (failed.has(index)) {
+      reject(job, row, failed.get(index));
+      // an ordered write stops at its first error
+      if (job.ordered) break;
+    } else {
+      written.push(doc);
+    }
+  }
+  job.inserted += written.length;
+  await afterWrite(job, written);
+  if (written.length) {
+    const modelName = MODELS[job.entity];
+    [modelName, ...(writeSideEffects[modelName] || [])].forEach((name) => bumpVersion(name));
+  }
+};
+
+const progress = (job, start) => {
+  job.ms = Math.round(performance.now() - start);
+  job.rowsPerSecond = job.ms ? Math.round((job.rows * 1000) / job.ms) : 0;
+  job.peakRss = Math.max(job.peakRss, process.memoryUsage.rss());
+};
+
+const run = async (job, stream, admin) => {
+  const start = performance.now();
+  let batch = [];
+  for await (const { row, data, error } of rowsOf(job.format, stream)) {
+    // after an ordered stop the rest of the upload is only drained
+    if (job.status !== 'running') continue;
+    job.rows = row;
+    const prepared = error ? { error } : prepare[job.entity](data, admin);
+    if (prepared.error) {
+      reject(job, row, prepared.error);
+      if (job.ordered) {
+        // the rows before the first rejected one are still written
+        await write(job, batch);
+        batch = [];
+      }
+      continue;
+    }
+    batch.push({ row, doc: prepared.doc });
+    if (batch.length >= BATCH_SIZE) {
+      await write(job, batch);
+      batch = [];
+      progress(job, start);
+    }
+  }
+  if (batch.length && job.status === 'running') await write(job, batch);
+  if (job.status === 'running') job.status = 'done';
+  progress(job, start);
+  return job;
+};
+
+const importRows = (entity) => async (req, res) => {
+  const format = formatOf(req.query, req.headers['content-type']);
+  if (!format) {
+    return res.status(400).json({
+      success: false,
+      result: null,
+      message: 'Upload a CSV (text/csv) or NDJSON (application/x-ndjson) body',
+    });
+  }
+  const { id } = req.query;
+  if (id !== undefined && !JOB_ID.test(id)) {
+    return res.status(400).json({
+      success: false,
+      result: null,
+      message: 'id must be 1 to 64 letters, digits, _ or -',
+    });
+  }
+  if (id !== undefined && jobs.has(id)) {
+    return res.status(409).json({ success: false, result: null, message: 'Import id in use' });
+  }
+  const job = createJob(entity, format, req.query.ordered === 'true', id);
+  try {
+    await run(job, req, req.admin._id);
+  } catch (error) {
+    job.status = 'failed';
+    job.message = error.message;
+    throw error;
+  }
+  return res.status(200).json({
+    success: true,
+    result: job,
+    message: `Imported ${job.inserted} of ${job.rows} rows (${job.status})`,
+  });
+};
+
+// One job with its errors, or every job of the entity without them
+const importProgress = (entity) => async (req, res) => {
+  if (req.params.id) {
+    const job = jobs.get(req.params.id);
+    if (!job || job.entity !== entity) {
+      return res.status(404).json({ success: false, result: null, message: 'No such import' });
+    }
+    return res.status(200).json({ success: true, result: job, message: `Import ${job.status}` });
+  }
+  const result = [...jobs.values()]
+    .filter((job) => job.entity === entity)
+    .map(({ errors, ...job }) => job);
+  return res.status(200).json({ success: true, result, message: 'Imports of this process' });
+};
+
+module.exports = { importRows, importProgress };
@@ -0,0 +1,108 @@
+const set = require('lodash/set');
+
+// Streaming row readers: one parsed row at a time from the request body, so an
+// import holds a single chunk and batch in memory whatever the file size.
+
+// RFC 4180 records; quoted fields may hold commas, line breaks and "" quotes
+async function* csvRecords(stream) {
+  let record = [];
+  let field = '';
+  let quoted = false;
+  // a quote inside a quoted field: escaped if the next character is one too
+  let quote = false;
+  for await (const chunk of stream) {
+    for (let index = 0; index < chunk.length; index++) {
+      const char = chunk[index];
+      if (quote) {
+        quote = false;
+        if (char === '"') {
+          field += char;
+          continue;
+        }
+        quoted = false;
+      }
+      if (quoted) {
+        if (char === '"') quote = true;
+        else field += char;
+      } else if (char === '"') {
+        quoted = true;
+      } else if (char === ',') {
+        record.push(field);
+        field = '';
+      } else if (char === '\n') {
+        record.push(field);
+        yield record;
+        record = [];
+        field = '';
+      } else if (char !== '\r') {
+        field += char;
+      }
+    }
+  }
+  if (field || record.length) {
+    record.push(field);
+    yield record;
+  }
+}
+
+// Objects from the CSV rows: dotted headers nest (items.0.itemName), empty cells are left out
+async function* csvRows(stream) {
+  let header = null;
+  let row = 0;
+  for await (const record of csvRecords(stream)) {
+    if (record.length === 1 && record[0] === '') continue;
+    if (!header) {
+      header = record.map((name) => name.trim());
+      continue;
+    }
+    row += 1;
+    if (record.length !== header.length) {
+      yield { row, error: `Expected ${header.length} fields, found ${record.length}` };
+      continue;
+    }
+    const data = {};
+    header.forEach((name, index) => {
+      if (record[index] !== '') set(data, name, record[index]);
+    });
+    yield { row, data };
+  }
+}
+
+// One JSON object per line
+async function* ndjsonRows(stream) {
+  let rest = '';
+  let row = 0;
+  const parse = (line) => {
+    row += 1;
+    try {
+      return { row, data: JSON.parse(line) };
+    } catch (error) {
+      return { row, error: `Invalid JSON: ${error.message}` };
+    }
+  };
+  for await (const chunk of stream) {
+    const lines = (rest + chunk).split('\n');
+    rest = lines.pop();
+    for (const line of lines) {
+      if (line.trim()) yield parse(line);
+    }
+  }
+  if (rest.trim()) yield parse(rest);
+}
+
+const FORMATS = { csv: csvRows, ndjson: ndjsonRows };
+
+// format from ?format= or the Content-Type of the upload
+const formatOf = (query, contentType = '') => {
+  if (query.format) return FORMATS[query.format] ? query.format : null;
+  if (contentType.includes('csv')) return 'csv';
+  if (contentType.includes('ndjson') || contentType.includes('jsonl')) return 'ndjson';
+  return null;
+};
+
+const rowsOf = (format, stream) => {
+  stream.setEncoding('utf8');
+  return FORMATS[format](stream);
+};
+
+module.exports = { csvRecords, csvRows, ndjsonRows, formatOf, rowsOf };
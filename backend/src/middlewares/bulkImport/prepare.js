@@ -0,0 +1,69 @@
+const Joi = require('joi');
+const mongoose = require('mongoose');
+
+const { calculate } = require('@/helpers');
+const schema = require('@/controllers/appControllers/invoiceController/schemaValidate');
+const { firstRun } = require('@/middlewares/recurring/schedule');
+
+// The document an imported row becomes, or the reason it is rejected. Rows go
+// through the same checks as /create: the Joi schema of the invoice controller
+// and the Mongoose schema (casting, required fields, enums).
+
+// historic invoices also carry their currency and discount, and may keep an _id
+const invoiceRow = schema.keys({
+  _id: Joi.string().hex().length(24),
+  currency: Joi.string(),
+  discount: Joi.number(),
+  content: Joi.string().allow(''),
+});
+
+const validated = (modelName, data) => {
+  const document = new (mongoose.model(modelName))(data);
+  const error = document.validateSync();
+  if (error) {
+    return {
+      error: Object.values(error.errors)
+        .map(({ message }) => message)
+        .join(', '),
+    };
+  }
+  return { doc: document.toObject({ depopulate: true }) };
+};
+
+const client = (data, admin) => validated('Client', { ...data, removed: false, createdBy: admin });
+
+// Totals computed the way invoiceController/create.js does
+const invoice = (data, admin) => {
+  const { error, value } = invoiceRow.validate(data);
+  if (error) return { error: error.details[0].message };
+
+  const { items, taxRate = 0, discount = 0 } = value;
+  let subTotal = 0;
+  items.forEach((item) => {
+    item.total = calculate.multiply(item.quantity, item.price);
+    subTotal = calculate.add(subTotal, item.total);
+  });
+  const taxTotal = calculate.multiply(subTotal, taxRate / 100);
+  const total = calculate.add(subTotal, taxTotal);
+
+  const body = {
+    ...value,
+    removed: false,
+    createdBy: admin,
+    subTotal,
+    taxTotal,
+    total,
+    paymentStatus: calculate.sub(total, discount) === 0 ? 'paid' : 'unpaid',
+  };
+  if (body.recurring) {
+    body.nextRun = firstRun(body.date, body.recurring);
+  } else {
+    delete body.recurring;
+  }
+
+  const result = validated('Invoice', body);
+  if (result.doc) result.doc.pdf = 'invoice-' + result.doc._id + '.pdf';
+  return result;
+};
+
+module.exports = { client, invoice };
@@ -0,0 +1,76 @@
+const mongoose = require('mongoose');
+
+// Per-collection write counters. Mongo is the source of truth so that every
+// replica hands out the same ETag for the same data; each process keeps a local
+// copy that takes the counter mongo returns for its own writes and is refreshed
+// every CACHE_VERSION_SYNC_MS. That interval bounds how long another replica
+// may still answer 304 (or a cached body) for data a write has changed.
+const COLLECTION = 'cacheversions';
+const SYNC_INTERVAL = parseInt(process.env.CACHE_VERSION_SYNC_MS) || 250;
+
+const versions = new Map();
+// writes whose increment mongo has not confirmed yet: no ETags meanwhile
+const unsettled = new Map();
+let ready = false;
+let timer = null;
+
+const collection = () => mongoose.connection.collection(COLLECTION);
+
+const adopt = (modelName, version) => {
+  if (version > (versions.get(modelName) || 0)) versions.set(modelName, version);
+};
+
+const increment = async (modelName) => {
+  const result = await collection().findOneAndUpdate(
+    { _id: modelName },
+    { $inc: { version: 1 } },
+    { upsert: true, returnDocument: 'after' }
+  );
+  const doc = result && result.value !== undefined ? result.value : result;
+  if (doc) adopt(modelName, doc.version);
+};
+
+const syncVersions = async () => {
+  try {
+    // one increment covers every write whose own increment failed
+    for (const modelName of [...unsettled.keys()]) {
+      await increment(modelName);
+      unsettled.delete(modelName);
+    }
+    const docs = await collection().find({}).toArray();
+    docs.forEach(({ _id, version }) => adopt(_id, version));
+    ready = true;
+  } catch {
+    // keep serving without ETags until mongo answers again
+    ready = false;
+  }
+};
+
+const startVersionSync = () => {
+  if (timer) return;
+  const start = () => {
+    syncVersions();
+    timer = setInterval(syncVersions, SYNC_INTERVAL);
+    timer.unref();
+  };
+  if (mongoose.connection.readyState === 1) start();
+  else mongoose.connection.once('open', start);
+};
+
+const bumpVersion = async (modelName) => {
+  unsettled.set(modelName, (unsettled.get(modelName) || 0) + 1);
+  try {
+    await increment(modelName);
+    const left = (unsettled.get(modelName) || 1) - 1;
+    if (left > 0) unsettled.set(modelName, left);
+    else unsettled.delete(modelName);
+  } catch {
+    // left unsettled: the periodic sync retries the increment
+  }
+};
+
+const getVersion = (modelName) => versions.get(modelName) || 0;
+
+const isReady = () => ready && unsettled.size === 0;
+
+module.exports = { bumpVersion, getVersion, isReady, startVersionSync, syncVersions };
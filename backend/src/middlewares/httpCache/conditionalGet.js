@@ -0,0 +1,61 @@
+const crypto = require('crypto');
+
+const { getVersion, isReady } = require('./collectionVersion');
+const responseCache = require('./responseCache');
+const { readDependencies } = require('./dependencies');
+
+const computeEtag = (modelName, url) => {
+  const models = [modelName, ...(readDependencies[modelName] || [])];
+  const versions = models.map((name) => `${name}:${getVersion(name)}`).join(',');
+  const hash = crypto.createHash('sha1').update(`${url}|${versions}`).digest('base64url');
+  return `W/"${hash}"`;
+};
+
+const sendCached = (req, res, entry) => {
+  res.set('Content-Type', 'application/json; charset=utf-8');
+  res.set('Vary', 'Accept-Encoding');
+  if (req.acceptsEncodings('gzip') === 'gzip') {
+    // compression() skips bodies that already carry a Content-Encoding
+    res.set('Content-Encoding', 'gzip');
+    return res.status(200).end(entry.gzip);
+  }
+  return res.status(200).end(entry.raw);
+};
+
+const conditionalGet = (modelName) => (req, res, next) => {
+  if (req.method !== 'GET' || !isReady()) return next();
+
+  // computed before the query runs, so a concurrent write can only make it older
+  const etag = computeEtag(modelName, req.originalUrl);
+  res.set('ETag', etag);
+  res.set('Cache-Control', 'private, no-cache');
+
+  const ifNoneMatch = req.headers['if-none-match'];
+  if (ifNoneMatch && ifNoneMatch.split(/\s*,\s*/).includes(etag)) {
+    return res.status(304).end();
+  }
+
+  const key = `${req.originalUrl}|${etag}`;
+  if (responseCache.isEnabled()) {
+    const entry = responseCache.get(key);
+    if (entry) return sendCached(req, res, entry);
+  }
+
+  const json = res.json.bind(res);
+  res.json = (body) => {
+    if (res.statusCode !== 200) {
+      // errors and empty collections are never revalidated against this ETag
+      res.removeHeader('ETag');
+      res.removeHeader('Cache-Control');
+      return json(body);
+    }
+    if (responseCache.isEnabled()) {
+      const cached = responseCache.set(key, JSON.stringify(body));
+      if (cached) return sendCached(req, res, cached);
+    }
+    return json(body);
+  };
+  return next();
+};
+
+module.exports = { conditionalGet, computeEtag };
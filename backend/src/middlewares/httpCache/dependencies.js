@@ -0,0 +1,16 @@
+// Collections whose documents are embedded (autopopulate/populate) in the
+// responses of another collection, and collections a write touches as a side
+// effect. Both feed the ETag so a client rename invalidates invoice lists.
+const readDependencies = {
+  Invoice: ['Client', 'Payment', 'Admin'],
+  Quote: ['Client', 'Admin'],
+  Payment: ['Client', 'Invoice', 'PaymentMode', 'Admin'],
+};
+
+const writeSideEffects = {
+  Invoice: ['Payment', 'Setting'],
+  Quote: ['Invoice', 'Setting'],
+  Payment: ['Invoice', 'Setting'],
+};
+
+module.exports = { readDependencies, writeSideEffects };
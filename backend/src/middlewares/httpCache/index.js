@@ -0,0 +1,14 @@
+const { bumpVersion, getVersion, startVersionSync } = require('./collectionVersion');
+const { conditionalGet, computeEtag } = require('./conditionalGet');
+const trackWrites = require('./trackWrites');
+const responseCache = require('./responseCache');
+
+module.exports = {
+  bumpVersion,
+  getVersion,
+  startVersionSync,
+  conditionalGet,
+  computeEtag,
+  trackWrites,
+  responseCache,
+};
@@ -0,0 +1,51 @@
+const zlib = require('zlib');
+
+// Optional in-memory cache of serialized (and gzipped) JSON bodies, keyed by
+// url + ETag so an entry is never served once its collections have changed.
+const MAX_BYTES = parseInt(process.env.RESPONSE_CACHE_MAX_BYTES) || 32 * 1024 * 1024;
+
+const entries = new Map();
+let totalBytes = 0;
+
+const isEnabled = () => process.env.RESPONSE_CACHE === 'true';
+
+const evict = (key) => {
+  const entry = entries.get(key);
+  if (!entry) return;
+  totalBytes -= entry.size;
+  entries.delete(key);
+};
+
+const get = (key) => {
+  const entry = entries.get(key);
+  if (!entry) return null;
+  // refresh recency: Map keeps insertion order, oldest entries are evicted first
+  entries.delete(key);
+  entries.set(key, entry);
+  return entry;
+};
+
+const set = (key, body) => {
+  const raw = Buffer.from(body);
+  const gzip = zlib.gzipSync(raw);
+  const size = raw.length + gzip.length;
+  if (size > MAX_BYTES) return null;
+
+  evict(key);
+  while (totalBytes + size > MAX_BYTES && entries.size > 0) {
+    evict(entries.keys().next().value);
+  }
+  const entry = { raw, gzip, size };
+  entries.set(key, entry);
+  totalBytes += size;
+  return entry;
+};
+
+const clear = () => {
+  entries.clear();
+  totalBytes = 0;
+};
+
+const stats = () => ({ entries: entries.size, bytes: totalBytes, maxBytes: MAX_BYTES });
+
+module.exports = { isEnabled, get, set, clear, stats };
@@ -0,0 +1,13 @@
+const { bumpVersion } = require('./collectionVersion');
+const { writeSideEffects } = require('./dependencies');
+
+// Bumps the collection versions once a write has been answered successfully.
+const trackWrites = (modelName) => (req, res, next) => {
+  res.on('finish', () => {
+    if (res.statusCode >= 400) return;
+    [modelName, ...(writeSideEffects[modelName] || [])].forEach((name) => bumpVersion(name));
+  });
+  next();
+};
+
+module.exports = trackWrites;
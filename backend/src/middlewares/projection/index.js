@@ -0,0 +1,63 @@
+const { selectable } = require('./selectable');
+
+/*
+  Sparse fieldsets for the list and read routes: ?select=number,client.name,total
+  answers only those fields (and _id) of each document, populating just the
+  selected fields of a reference instead of the whole autopopulated document.
+  Every query behind these routes runs lean(), so documents are never hydrated
+  and serialize without virtuals, selected or not.
+*/
+const parseSelect = (modelName, select) => {
+  const allowed = selectable[modelName] || {};
+  const fields = new Set();
+  const populate = new Map();
+  const paths = String(select)
+    .split(',')
+    .map((path) => path.trim())
+    .filter(Boolean);
+
+  for (const path of paths) {
+    const [field, ...rest] = path.split('.');
+    const subfield = rest.join('.');
+    const reference = Array.isArray(allowed[field]) ? allowed[field] : null;
+    if (!Object.hasOwn(allowed, field) || (subfield && !reference?.includes(subfield))) {
+      return { error: `${path} cannot be selected` };
+    }
+    fields.add(field);
+    if (reference) {
+      const picked = populate.get(field) || new Set();
+      (subfield ? [subfield] : reference).forEach((name) => picked.add(name));
+      populate.set(field, picked);
+    }
+  }
+  if (fields.size === 0) return { error: 'select names no field' };
+
+  return {
+    select: [...fields].join(' '),
+    populate: [...populate].map(([path, picked]) => ({ path, select: [...picked].join(' ') })),
+  };
+};
+
+// Checks ?select= against the model's fields and leaves it on req.projection
+const selectFields = (modelName) => (req, res, next) => {
+  if (req.query.select === undefined) return next();
+  const projection = parseSelect(modelName, req.query.select);
+  if (projection.error) {
+    return res.status(400).json({ success: false, result: null, message: projection.error });
+  }
+  req.projection = projection;
+  return next();
+};
+
+// Runs a find/findOne lean: the whole documents with their autopopulated
+// references and `populate`, or only the fields of the projection
+const leanQuery = (query, projection, populate) => {
+  if (!projection) {
+    if (populate) query.populate(populate);
+    return query.lean({ autopopulate: true }).exec();
+  }
+  if (projection.populate.length) query.populate(projection.populate);
+  return query.select(projection.select).setOptions({ autopopulate: false }).lean().exec();
+};
+
+module.exports = { parseSelect, selectFields, leanQuery };
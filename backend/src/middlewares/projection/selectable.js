@@ -0,0 +1,101 @@
+// Fields a list or read of each model can be narrowed to with ?select=. A
+// reference lists the fields of the document it populates: `client.name`
+// picks one of them, `client` alone all of them. Anything else is refused, so
+// no query can reach fields (or populate documents) a model does not expose.
+const CLIENT = ['name', 'email', 'phone', 'country', 'address'];
+const ADMIN = ['name', 'surname', 'email'];
+
+const selectable = {
+  Client: {
+    name: true,
+    email: true,
+    phone: true,
+    country: true,
+    address: true,
+    enabled: true,
+    created: true,
+    updated: true,
+  },
+  Invoice: {
+    number: true,
+    year: true,
+    date: true,
+    expiredDate: true,
+    client: CLIENT,
+    items: true,
+    taxRate: true,
+    subTotal: true,
+    taxTotal: true,
+    total: true,
+    currency: true,
+    credit: true,
+    discount: true,
+    paymentStatus: true,
+    isOverdue: true,
+    approved: true,
+    status: true,
+    notes: true,
+    recurring: true,
+    nextRun: true,
+    pdf: true,
+    files: true,
+    createdBy: ADMIN,
+    created: true,
+    updated: true,
+  },
+  Quote: {
+    number: true,
+    year: true,
+    date: true,
+    expiredDate: true,
+    client: CLIENT,
+    items: true,
+    taxRate: true,
+    subTotal: true,
+    taxTotal: true,
+    total: true,
+    currency: true,
+    credit: true,
+    discount: true,
+    approved: true,
+    isExpired: true,
+    status: true,
+    notes: true,
+    pdf: true,
+    files: true,
+    createdBy: ADMIN,
+    created: true,
+    updated: true,
+  },
+  Payment: {
+    number: true,
+    date: true,
+    amount: true,
+    currency: true,
+    ref: true,
+    description: true,
+    client: CLIENT,
+    invoice: ['number', 'year', 'date', 'total', 'credit', 'currency', 'paymentStatus'],
+    paymentMode: ['name', 'description'],
+    createdBy: ADMIN,
+    created: true,
+    updated: true,
+  },
+  PaymentMode: {
+    name: true,
+    description: true,
+    ref: true,
+    isDefault: true,
+    enabled: true,
+    created: true,
+  },
+  Taxes: {
+    taxName: true,
+    taxValue: true,
+    isDefault: true,
+    enabled: true,
+    created: true,
+  },
+};
+
+module.exports = { selectable };
@@ -0,0 +1,179 @@
+const { shapeOf, redact } = require('./shape');
+const { createTable } = require('./table');
+
+/*
+  Query tracing (QUERY_TRACE=true): every command of the Mongo client is
+  reduced to its shape and timed through the driver's command monitoring,
+  autopopulate fan-out and aggregation lookups included. Slow commands
+  (QUERY_TRACE_SLOW_MS) are sampled into a bounded log and explained, at most
+  once per shape every EXPLAIN_INTERVAL, for the documents they examine.
+*/
+const isEnabled = () => process.env.QUERY_TRACE === 'true';
+const SLOW_MS = parseInt(process.env.QUERY_TRACE_SLOW_MS) || 100;
+const SAMPLE_RATE = process.env.QUERY_TRACE_SAMPLE
+  ? parseFloat(process.env.QUERY_TRACE_SAMPLE)
+  : 0.2;
+const MAX_SHAPES = parseInt(process.env.QUERY_TRACE_MAX_SHAPES) || 500;
+const SLOW_LOG_SIZE = 100;
+const EXPLAIN_INTERVAL = 10000;
+// a command whose reply never arrives (closed connection) must not pile up
+const MAX_PENDING = 10000;
+
+const EXPLAINABLE = {
+  find: ['find', 'filter', 'sort', 'projection', 'skip', 'limit', 'collation', 'hint'],
+  aggregate: ['aggregate', 'pipeline', 'collation', 'hint'],
+  count: ['count', 'query', 'skip', 'limit', 'collation', 'hint'],
+};
+const DRIVER_FIELDS = ['$db', 'lsid', '$clusterTime', 'txnNumber', '$readPreference'];
+
+const table = createTable({ maxShapes: MAX_SHAPES });
+const pending = new Map();
+const cursors = new Map();
+const lastExplained = new Map();
+let slowLog = [];
+let client = null;
+
+const connectOptions = () => (isEnabled() ? { monitorCommands: true } : {});
+
+const returnedOf = (operation, reply = {}) => {
+  if (reply.cursor) return (reply.cursor.firstBatch || reply.cursor.nextBatch || []).length;
+  if (operation === 'count' || operation === 'distinct') return 1;
+  return typeof reply.n === 'number' ? reply.n : 0;
+};
+
+const walk = (node, visit) => {
+  if (Array.isArray(node)) node.forEach((item) => walk(item, visit));
+  else if (node && typeof node === 'object') {
+    Object.entries(node).forEach(([key, value]) => {
+      visit(key, value);
+      walk(value, visit);
+    });
+  }
+};
+
+const summarizeExplain = (explained) => {
+  let examined = 0;
+  let keys = 0;
+  const stages = new Set();
+  walk(explained, (key, value) => {
+    if (key === 'totalDocsExamined' || key === 'docsExamined') examined += Number(value) || 0;
+    if (key === 'totalKeysExamined' || key === 'keysExamined') keys += Number(value) || 0;
+    if (key === 'stage' && (value === 'COLLSCAN' || value === 'IXSCAN')) stages.add(value);
+  });
+  const planSummary = stages.has('COLLSCAN') ? 'COLLSCAN' : stages.has('IXSCAN') ? 'IXSCAN' : null;
+  return { examined, keys, planSummary };
+};
+
+const explain = async (started, returned, logEntry) => {
+  const fields = EXPLAINABLE[started.shape.operation];
+  const now = Date.now();
+  if (!fields || !client || now - (lastExplained.get(started.shape.key) || 0) < EXPLAIN_INTERVAL) {
+    return;
+  }
+  lastExplained.set(started.shape.key, now);
+  const command = {};
+  fields.forEach((field) => {
+    if (started.command[field] !== undefined) command[field] = started.command[field];
+  });
+  if (command.aggregate) command.cursor = {};
+  try {
+    const explained = await client
+      .db(started.databaseName)
+      .command({ explain: command, verbosity: 'executionStats' });
+    const stats = summarizeExplain(explained);
+    table.recordExplain(started.shape.key, { ...stats, returned });
+    Object.assign(logEntry, { docsExamined: stats.examined, planSummary: stats.planSummary });
+  } catch (error) {
+    logEntry.explainError = error.message;
+  }
+};
+
+const logSlow = (started, ms, returned) => {
+  const command = { ...started.command };
+  DRIVER_FIELDS.forEach((field) => delete command[field]);
+  const entry = {
+    at: new Date().toISOString(),
+    key: started.shape.key,
+    ms,
+    returned,
+    command: redact(command),
+  };
+  slowLog.push(entry);
+  if (slowLog.length > SLOW_LOG_SIZE) slowLog = slowLog.slice(-SLOW_LOG_SIZE);
+  explain(started, returned, entry);
+};
+
+const onStarted = (event) => {
+  if (pending.size >= MAX_PENDING) pending.clear();
+  if (event.commandName === 'getMore') {
+    const cursorId = String(event.command.getMore);
+    const key = cursors.get(cursorId);
+    if (key) pending.set(event.requestId, { cursorOf: key, cursorId });
+    return;
+  }
+  const shape = shapeOf(event.commandName, event.command);
+  if (shape) {
+    const { command, databaseName } = event;
+    pending.set(event.requestId, { shape, command, databaseName });
+  }
+};
+
+const onFinished = (failed) => (event) => {
+  const started = pending.get(event.requestId);
+  if (!started) return;
+  pending.delete(event.requestId);
+  const reply = event.reply || {};
+  const cursorId = reply.cursor && reply.cursor.id !== undefined ? String(reply.cursor.id) : '0';
+
+  if (started.cursorOf) {
+    table.recordReturned(started.cursorOf, returnedOf('getMore', reply));
+    if (cursorId === '0') cursors.delete(started.cursorId);
+    return;
+  }
+  const returned = failed ? 0 : returnedOf(started.shape.operation, reply);
+  table.record(started.shape, { ms: event.duration, returned, failed });
+  if (cursorId !== '0' && cursors.size < MAX_PENDING) cursors.set(cursorId, started.shape.key);
+  if (event.duration >= SLOW_MS && Math.random() < SAMPLE_RATE) {
+    logSlow(started, event.duration, returned);
+  }
+};
+
+const attach = (connection) => {
+  if (!isEnabled()) return;
+  const start = () => {
+    client = connection.getClient();
+    client.on('commandStarted', onStarted);
+    client.on('commandSucceeded', onFinished(false));
+    client.on('commandFailed', onFinished(true));
+  };
+  if (connection.readyState === 1) start();
+  else connection.once('open', start);
+};
+
+const snapshot = ({ sort, limit } = {}) => ({
+  enabled: isEnabled(),
+  slowMs: SLOW_MS,
+  sampleRate: SAMPLE_RATE,
+  shapes: table.size(),
+  evicted: table.evicted(),
+  rows: table.rows({ sort: sort || 'totalMs', limit: parseInt(limit) || 50 }),
+  slowLog: [...slowLog].reverse(),
+});
+
+const reset = () => {
+  table.reset();
+  cursors.clear();
+  lastExplained.clear();
+  slowLog = [];
+};
+
+module.exports = {
+  isEnabled,
+  connectOptions,
+  attach,
+  snapshot,
+  reset,
+  summarizeExplain,
+  onStarted,
+  onFinished,
+};
@@ -0,0 +1,115 @@
+// Normalizes a driver command into its query shape: the values are dropped,
+// the collection, operation, filter keys, sort and pipeline stages are kept.
+
+const FILTERS = {
+  find: (command) => command.filter,
+  count: (command) => command.query,
+  distinct: (command) => command.query,
+  findAndModify: (command) => command.query,
+  update: (command) => command.updates && command.updates[0] && command.updates[0].q,
+  delete: (command) => command.deletes && command.deletes[0] && command.deletes[0].q,
+};
+
+const isPlainObject = (value) =>
+  value !== null &&
+  typeof value === 'object' &&
+  !Array.isArray(value) &&
+  Object.getPrototypeOf(value) === Object.prototype;
+
+const isOperatorObject = (value) =>
+  isPlainObject(value) &&
+  Object.keys(value).length > 0 &&
+  Object.keys(value).every((key) => key.startsWith('$'));
+
+const filterShape = (filter) => {
+  if (!isPlainObject(filter)) return '';
+  return Object.keys(filter)
+    .sort()
+    .map((key) => {
+      const value = filter[key];
+      if (['$and', '$or', '$nor'].includes(key) && Array.isArray(value)) {
+        return `${key}[${value.map(filterShape).join('|')}]`;
+      }
+      if (isOperatorObject(value)) {
+        return Object.keys(value)
+          .sort()
+          .map((operator) => `${key}.${operator}`)
+          .join(',');
+      }
+      return key;
+    })
+    .join(',');
+};
+
+const sortShape = (sort) =>
+  isPlainObject(sort)
+    ? Object.entries(sort)
+        .map(([key, direction]) => `${key}:${direction}`)
+        .join(',')
+    : '';
+
+const pipelineShape = (pipeline = []) =>
+  pipeline
+    .map((stage) => {
+      const [name] = Object.keys(stage);
+      const body = stage[name];
+      if (name === '$match') return `$match{${filterShape(body)}}`;
+      if (name === '$sort') return `$sort{${sortShape(body)}}`;
+      if (name === '$lookup') {
+        const inner = body.pipeline ? `:${pipelineShape(body.pipeline)}` : '';
+        return `$lookup(${body.from}${inner})`;
+      }
+      if (name === '$facet') {
+        const facets = Object.keys(body).map((facet) => `${facet}:[${pipelineShape(body[facet])}]`);
+        return `$facet{${facets.join(',')}}`;
+      }
+      return name;
+    })
+    .join('|');
+
+/*
+  Returns { key, collection, operation, filter, sort, pipeline } or null for
+  commands that are not queries (handshakes, explain, sessions, ...)
+*/
+const shapeOf = (commandName, command) => {
+  if (!command) return null;
+  if (commandName === 'aggregate' && typeof command.aggregate === 'string') {
+    const pipeline = pipelineShape(command.pipeline);
+    return {
+      key: `${command.aggregate}.aggregate ${pipeline}`,
+      collection: command.aggregate,
+      operation: 'aggregate',
+      filter: '',
+      sort: '',
+      pipeline,
+    };
+  }
+  if (!FILTERS[commandName] && commandName !== 'insert') return null;
+  const collection = command[commandName];
+  if (typeof collection !== 'string') return null;
+  const filter = commandName === 'insert' ? '' : filterShape(FILTERS[commandName](command));
+  const sort = sortShape(command.sort);
+  return {
+    key: `${collection}.${commandName} {${filter}}${sort ? ` sort(${sort})` : ''}`,
+    collection,
+    operation: commandName,
+    filter,
+    sort,
+    pipeline: '',
+  };
+};
+
+// Literal values replaced by their type, for the slow-query log
+const redact = (value) => {
+  if (Array.isArray(value)) return value.map(redact);
+  if (isPlainObject(value)) {
+    return Object.fromEntries(Object.entries(value).map(([key, item]) => [key, redact(item)]));
+  }
+  if (value === null || value === undefined) return value;
+  if (value._bsontype) return `<${value._bsontype}>`;
+  if (value instanceof Date) return '<Date>';
+  if (value instanceof RegExp) return '<RegExp>';
+  return `<${typeof value}>`;
+};
+
+module.exports = { shapeOf, filterShape, pipelineShape, redact };
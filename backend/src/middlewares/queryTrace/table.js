@@ -0,0 +1,125 @@
+// Bounded per-shape statistics: latency histogram, documents returned and,
+// for the explained slow samples, documents examined.
+
+const BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, Infinity];
+
+const createEntry = (shape) => ({
+  ...shape,
+  count: 0,
+  errors: 0,
+  totalMs: 0,
+  maxMs: 0,
+  histogram: new Array(BUCKETS.length).fill(0),
+  docsReturned: 0,
+  explained: 0,
+  explainedReturned: 0,
+  docsExamined: 0,
+  keysExamined: 0,
+  planSummary: null,
+});
+
+const percentile = (entry, share) => {
+  const rank = Math.ceil(entry.count * share);
+  let seen = 0;
+  for (let index = 0; index < BUCKETS.length; index++) {
+    seen += entry.histogram[index];
+    if (seen >= rank) return Math.min(BUCKETS[index], entry.maxMs);
+  }
+  return entry.maxMs;
+};
+
+const createTable = ({ maxShapes = 500 } = {}) => {
+  // insertion order doubles as recency: a touched shape is moved to the end
+  const entries = new Map();
+  let evicted = 0;
+
+  const touch = (shape) => {
+    let entry = entries.get(shape.key);
+    if (entry) {
+      entries.delete(shape.key);
+    } else {
+      entry = createEntry(shape);
+      if (entries.size >= maxShapes) {
+        entries.delete(entries.keys().next().value);
+        evicted++;
+      }
+    }
+    entries.set(shape.key, entry);
+    return entry;
+  };
+
+  const record = (shape, { ms, returned = 0, failed = false }) => {
+    const entry = touch(shape);
+    entry.count++;
+    if (failed) entry.errors++;
+    entry.totalMs += ms;
+    entry.maxMs = Math.max(entry.maxMs, ms);
+    entry.histogram[BUCKETS.findIndex((bound) => ms <= bound)]++;
+    entry.docsReturned += returned;
+  };
+
+  const recordReturned = (key, returned) => {
+    const entry = entries.get(key);
+    if (entry) entry.docsReturned += returned;
+  };
+
+  const recordExplain = (key, { examined, keys, returned, planSummary }) => {
+    const entry = entries.get(key);
+    if (!entry) return;
+    entry.explained++;
+    entry.docsExamined += examined;
+    entry.keysExamined += keys;
+    entry.explainedReturned += returned;
+    entry.planSummary = planSummary || entry.planSummary;
+  };
+
+  const rows = ({ sort = 'totalMs', limit = 50 } = {}) =>
+    [...entries.values()]
+      .map((entry) => ({
+        key: entry.key,
+        collection: entry.collection,
+        operation: entry.operation,
+        filter: entry.filter,
+        sort: entry.sort,
+        pipeline: entry.pipeline,
+        count: entry.count,
+        errors: entry.errors,
+        totalMs: Math.round(entry.totalMs * 10) / 10,
+        meanMs: Math.round((entry.totalMs / entry.count) * 10) / 10,
+        p50Ms: percentile(entry, 0.5),
+        p95Ms: percentile(entry, 0.95),
+        p99Ms: percentile(entry, 0.99),
+        maxMs: entry.maxMs,
+        docsReturned: entry.docsReturned,
+        explained: entry.explained,
+        docsExamined: entry.docsExamined,
+        keysExamined: entry.keysExamined,
+        // examined per returned document, from the explained samples only
+        examinedRatio: entry.explained
+          ? Math.round((entry.docsExamined / Math.max(entry.explainedReturned, 1)) * 10) / 10
+          : null,
+        planSummary: entry.planSummary,
+        histogram: Object.fromEntries(
+          BUCKETS.map((bound, index) => [bound === Infinity ? 'inf' : bound, entry.histogram[index]])
+        ),
+      }))
+      .sort((a, b) => (b[sort] || 0) - (a[sort] || 0))
+      .slice(0, limit);
+
+  const reset = () => {
+    entries.clear();
+    evicted = 0;
+  };
+
+  return {
+    record,
+    recordReturned,
+    recordExplain,
+    rows,
+    reset,
+    size: () => entries.size,
+    evicted: () => evicted,
+  };
+};
+
+module.exports = { createTable, BUCKETS };
@@ -0,0 +1,166 @@
+const { performance } = require('perf_hooks');
+
+const mongoose = require('mongoose');
+
+const { bumpVersion } = require('@/middlewares/httpCache');
+const rollups = require('@/middlewares/rollups');
+const lease = require('./lease');
+const { dueRuns, occurrence } = require('./schedule');
+
+/*
+  Recurring invoices (Invoice.recurring). Every RECURRING_INTERVAL_MS the
+  replica holding the lease reads the due ones through the nextRun index,
+  a batch at a time, reserves one block of invoice numbers per batch, inserts
+  the generated invoices with insertMany and then moves nextRun on. A pass
+  that dies in between is repeated by the next one: the unique
+  (recurrenceOf, recurrenceRun) index drops the invoices already generated,
+  at the cost of a gap in the numbers. RECURRING_INVOICES=false turns it off.
+*/
+const isEnabled = () => process.env.RECURRING_INVOICES !== 'false';
+const INTERVAL = parseInt(process.env.RECURRING_INTERVAL_MS) || 60 * 1000;
+const BATCH_SIZE = parseInt(process.env.RECURRING_BATCH_SIZE) || 1000;
+const LEASE = 'recurring-invoices';
+// renewed after every batch
+const LEASE_MS = 60 * 1000;
+const DUPLICATE_KEY = 11000;
+
+let running = null;
+let lastRun = null;
+let timer = null;
+
+const due = (now) => ({ removed: false, nextRun: { $lte: now } });
+
+// First of `count` consecutive invoice numbers taken from last_invoice_number
+const reserveNumbers = async (count) => {
+  const setting = await mongoose
+    .model('Setting')
+    .findOneAndUpdate(
+      { settingKey: 'last_invoice_number' },
+      { $inc: { settingValue: count } },
+      { new: true }
+    )
+    .lean();
+  return (setting ? setting.settingValue : count) - count + 1;
+};
+
+// Insert the invoices, return those that were not generated by an earlier pass already
+const insertNew = async (invoices) => {
+  try {
+    await mongoose.model('Invoice').insertMany(invoices, { ordered: false, lean: true });
+    return invoices;
+  } catch (error) {
+    const writeErrors = error.writeErrors || [];
+    if (!writeErrors.length || writeErrors.some(({ code }) => code !== DUPLICATE_KEY)) {
+      throw error;
+    }
+    const duplicates = new Set(writeErrors.map(({ index }) => index));
+    return invoices.filter((invoice, index) => !duplicates.has(index));
+  }
+};
+
+const generateBatch = async (sources, now) => {
+  const plans = sources.map((source) => ({ source, ...dueRuns(source, now) }));
+  const count = plans.reduce((sum, { runs }) => sum + runs.length, 0);
+  let inserted = [];
+  if (count > 0) {
+    let number = await reserveNumbers(count);
+    const invoices = plans.flatMap(({ source, runs }) =>
+      runs.map((run) => occurrence(source, run, number++, now))
+    );
+    inserted = await insertNew(invoices);
+  }
+  await mongoose.model('Invoice').bulkWrite(
+    plans.map(({ source, nextRun }) => ({
+      updateOne: {
+        filter: { _id: source._id, nextRun: source.nextRun },
+        update: nextRun ? { $set: { nextRun } } : { $unset: { nextRun: 1 } },
+      },
+    }))
+  );
+  await rollups.addInvoices(inserted);
+  return { count, inserted: inserted.length };
+};
+
+// One pass over the invoices due by `now`; status is idle (none due), busy
+// (another replica holds the lease), lost (the lease expired meanwhile) or done
+const generate = async (now, batchSize) => {
+  const Invoice = mongoose.model('Invoice');
+  const start = performance.now();
+  const report = {
+    status: 'idle',
+    now,
+    batches: 0,
+    sources: 0,
+    generated: 0,
+    skipped: 0,
+    ms: 0,
+    perSecond: 0,
+  };
+
+  if (await Invoice.exists(due(now))) {
+    let held = await lease.acquire(LEASE, LEASE_MS);
+    report.status = held ? 'done' : 'busy';
+    while (held) {
+      const sources = await Invoice.find(due(now)).sort({ nextRun: 1 }).limit(batchSize).lean();
+      if (sources.length === 0) {
+        await lease.release(LEASE);
+        break;
+      }
+      const { count, inserted } = await generateBatch(sources, now);
+      report.batches += 1;
+      report.sources += sources.length;
+      report.generated += inserted;
+      report.skipped += count - inserted;
+      held = await lease.acquire(LEASE, LEASE_MS);
+      if (!held) report.status = 'lost';
+    }
+  }
+
+  report.ms = Math.round(performance.now() - start);
+  report.perSecond = report.ms ? Math.round((report.generated * 1000) / report.ms) : 0;
+  if (report.generated) {
+    ['Invoice', 'Setting'].forEach((name) => bumpVersion(name));
+    const { generated, ms, perSecond } = report;
+    console.log(`🧾 Generated ${generated} recurring invoices in ${ms}ms (${perSecond}/s)`);
+  }
+  return report;
+};
+
+// One pass at a time per process; a caller during a pass gets its report
+const run = ({ now = new Date(), batchSize = BATCH_SIZE } = {}) => {
+  if (!running) {
+    running = generate(now, batchSize)
+      .then((report) => {
+        lastRun = report;
+        return report;
+      })
+      .finally(() => {
+        running = null;
+      });
+  }
+  return running;
+};
+
+const tick = () =>
+  run().catch((error) => console.error(`🚫 Recurring invoices error → : ${error.message}`));
+
+const startScheduler = () => {
+  if (timer || !isEnabled()) return;
+  const start = () => {
+    timer = setInterval(tick, INTERVAL);
+    timer.unref();
+  };
+  if (mongoose.connection.readyState === 1) start();
+  else mongoose.connection.once('open', start);
+};
+
+const status = () => ({
+  enabled: isEnabled(),
+  intervalMs: INTERVAL,
+  batchSize: BATCH_SIZE,
+  owner: lease.owner,
+  running: Boolean(running),
+  lastRun,
+});
+
+module.exports = { run, startScheduler, status };
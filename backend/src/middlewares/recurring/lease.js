@@ -0,0 +1,35 @@
+const crypto = require('crypto');
+const os = require('os');
+
+const mongoose = require('mongoose');
+
+// Named leases shared by the replicas: whoever holds an unexpired lease does
+// the work, the others skip it. A holder that dies lets it expire.
+const COLLECTION = 'leases';
+const DUPLICATE_KEY = 11000;
+
+const owner = `${os.hostname()}:${process.pid}:${crypto.randomBytes(4).toString('hex')}`;
+
+const collection = () => mongoose.connection.collection(COLLECTION);
+
+// Take or renew the lease for `ms`; false while another process holds it
+const acquire = async (name, ms) => {
+  const now = new Date();
+  try {
+    await collection().updateOne(
+      { _id: name, $or: [{ owner }, { expires: { $lte: now } }] },
+      { $set: { owner, expires: new Date(now.getTime() + ms) } },
+      { upsert: true }
+    );
+    return true;
+  } catch (error) {
+    // the lease exists, held by someone else: the upsert tried to insert it again
+    if (error.code === DUPLICATE_KEY) return false;
+    throw error;
+  }
+};
+
+const release = (name) =>
+  collection().updateOne({ _id: name, owner }, { $set: { expires: new Date(0) } });
+
+module.exports = { owner, acquire, release };
@@ -0,0 +1,105 @@
+const moment = require('moment');
+const mongoose = require('mongoose');
+
+const { calculate } = require('@/helpers');
+
+// Recurrence arithmetic, without the database: when a recurring invoice is
+// next due, which runs a pass owes it, and the invoice generated for a run.
+
+const PERIODS = {
+  daily: [1, 'days'],
+  weekly: [1, 'weeks'],
+  monthly: [1, 'months'],
+  quarter: [3, 'months'],
+  annually: [1, 'years'],
+};
+
+const advance = (date, recurring, steps) => {
+  const [amount, unit] = PERIODS[recurring];
+  return moment(date)
+    .add(amount * steps, unit)
+    .toDate();
+};
+
+// The first run of an invoice dated `date` that is not before `from`; runs are
+// counted from the date so months keep its day where they can (Jan 31, Feb 29, Mar 31)
+const runFrom = (date, recurring, from) => {
+  if (!PERIODS[recurring]) return null;
+  const [amount, unit] = PERIODS[recurring];
+  let steps = Math.max(1, Math.floor(moment(from).diff(date, unit) / amount) - 1);
+  let run = advance(date, recurring, steps);
+  while (run < from) {
+    run = advance(date, recurring, ++steps);
+  }
+  return run;
+};
+
+// First run of a new recurring invoice: the first one after its date that is not before today
+const firstRun = (date, recurring, now = new Date()) =>
+  runFrom(date, recurring, moment(now).startOf('day').toDate());
+
+// Runs of a recurring invoice due by `now` from its nextRun on, at most `max`
+// (missed runs are caught up over several passes), and the nextRun that follows
+const dueRuns = ({ date, nextRun, recurring }, now = new Date(), max = 12) => {
+  const runs = [];
+  if (!PERIODS[recurring]) return { runs, nextRun: null };
+  let run = nextRun;
+  while (run <= now && runs.length < max) {
+    runs.push(run);
+    run = runFrom(date, recurring, new Date(run.getTime() + 1));
+  }
+  return { runs, nextRun: run };
+};
+
+// Items, subTotal, taxTotal and total computed the way invoiceController/create.js does
+const totals = (items = [], taxRate = 0) => {
+  let subTotal = 0;
+  const computed = items.map(({ itemName, description, quantity, price }) => {
+    const total = calculate.multiply(quantity, price);
+    subTotal = calculate.add(subTotal, total);
+    return { _id: new mongoose.Types.ObjectId(), itemName, description, quantity, price, total };
+  });
+  const taxTotal = calculate.multiply(subTotal, taxRate / 100);
+  return { items: computed, subTotal, taxTotal, total: calculate.add(subTotal, taxTotal) };
+};
+
+// The invoice a recurring invoice generates for one run, numbered `number`
+const occurrence = (source, run, number, now = new Date()) => {
+  const _id = new mongoose.Types.ObjectId();
+  const { items, subTotal, taxTotal, total } = totals(source.items, source.taxRate);
+  const discount = source.discount || 0;
+  return {
+    _id,
+    removed: false,
+    createdBy: source.createdBy,
+    number,
+    year: run.getFullYear(),
+    content: source.content,
+    date: run,
+    // same payment term as the source invoice
+    expiredDate: new Date(run.getTime() + (source.expiredDate - source.date)),
+    client: source.client,
+    items,
+    taxRate: source.taxRate || 0,
+    subTotal,
+    taxTotal,
+    total,
+    currency: source.currency,
+    credit: 0,
+    discount,
+    payment: [],
+    paymentStatus: calculate.sub(total, discount) === 0 ? 'paid' : 'unpaid',
+    isOverdue: false,
+    approved: false,
+    notes: source.notes,
+    status: 'draft',
+    pdf: 'invoice-' + _id + '.pdf',
+    files: [],
+    recurrenceOf: source._id,
+    recurrenceRun: run,
+    updated: now,
+    created: now,
+  };
+};
+
+module.exports = { PERIODS, runFrom, firstRun, dueRuns, totals, occurrence };
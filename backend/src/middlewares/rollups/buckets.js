@@ -0,0 +1,171 @@
+const moment = require('moment');
+
+// Bucket arithmetic, without the database: what a document adds to the daily
+// rollups, the increments a write applies, and summaries of read buckets.
+
+const dayOf = (date) => moment(date).startOf('day').toDate();
+
+const dayKey = (date) => (date ? moment(date).format('YYYY-MM-DD') : 'none');
+
+// The bucket key and increments of one live invoice or payment
+const contribution = (kind, doc) => {
+  if (!doc || doc.removed) return null;
+  if (kind === 'invoice') {
+    return {
+      key: {
+        kind,
+        day: dayOf(doc.date),
+        status: doc.status,
+        paymentStatus: doc.paymentStatus,
+        currency: doc.currency,
+      },
+      inc: {
+        count: 1,
+        total: doc.total || 0,
+        credit: doc.credit || 0,
+        discount: doc.discount || 0,
+        [`expiring.${dayKey(doc.expiredDate)}`]: 1,
+      },
+    };
+  }
+  return {
+    key: { kind, day: dayOf(doc.date), status: null, paymentStatus: null, currency: doc.currency },
+    inc: { count: 1, total: doc.amount || 0 },
+  };
+};
+
+// $inc per bucket that turns the contributions of before into those of after;
+// pairs is a list of [before, after] documents (null when created or removed)
+const changes = (kind, pairs) => {
+  const merged = new Map();
+  pairs.forEach(([before, after]) => {
+    [
+      [before, -1],
+      [after, 1],
+    ].forEach(([doc, sign]) => {
+      const part = contribution(kind, doc);
+      if (!part) return;
+      const id = JSON.stringify(part.key);
+      const entry = merged.get(id) || { key: part.key, inc: {} };
+      Object.entries(part.inc).forEach(([field, value]) => {
+        entry.inc[field] = (entry.inc[field] || 0) + sign * value;
+      });
+      merged.set(id, entry);
+    });
+  });
+  return [...merged.values()]
+    .map(({ key, inc }) => ({
+      key,
+      inc: Object.fromEntries(Object.entries(inc).filter(([, value]) => value !== 0)),
+    }))
+    .filter(({ inc }) => Object.keys(inc).length > 0);
+};
+
+// The document a findOneAndUpdate turned `before` into: before is the image the
+// write itself returned ({ new: false }), so concurrent writes never share one
+// stale read; update holds plain fields, $set, $inc and $unset (undefined
+// values are left out, as mongoose leaves them out of the write)
+const afterUpdate = (before, update) => {
+  if (!before) return null;
+  const after = { ...(before.toObject ? before.toObject() : before) };
+  const set = (field, value) => {
+    if (value !== undefined) after[field] = value;
+  };
+  Object.entries(update).forEach(([field, value]) => {
+    if (!field.startsWith('$')) set(field, value);
+  });
+  Object.entries(update.$set || {}).forEach(([field, value]) => set(field, value));
+  Object.entries(update.$inc || {}).forEach(([field, value]) => {
+    after[field] = (after[field] || 0) + value;
+  });
+  Object.keys(update.$unset || {}).forEach((field) => delete after[field]);
+  return after;
+};
+
+const entriesOf = (map) => Object.entries(map instanceof Map ? Object.fromEntries(map) : map || {});
+
+const countBy = (buckets, field) => {
+  const counts = {};
+  buckets.forEach((bucket) => {
+    counts[bucket[field]] = (counts[bucket[field]] || 0) + bucket.count;
+  });
+  return Object.entries(counts)
+    .filter(([, count]) => count > 0)
+    .map(([status, count]) => ({ status, count }));
+};
+
+// Totals, counts per status and paymentStatus, the overdue count (expired
+// before today) and the amount still due, over invoice buckets
+const summarizeInvoices = (buckets, today = new Date()) => {
+  const todayKey = dayKey(today);
+  let total = 0;
+  let count = 0;
+  let undue = 0;
+  let overdue = 0;
+  buckets.forEach((bucket) => {
+    total += bucket.total;
+    count += bucket.count;
+    if (['unpaid', 'partially'].includes(bucket.paymentStatus)) {
+      undue += bucket.total - bucket.credit;
+    }
+    entriesOf(bucket.expiring).forEach(([day, invoices]) => {
+      if (day !== 'none' && day < todayKey) overdue += invoices;
+    });
+  });
+  return {
+    total,
+    count,
+    undue,
+    overdue,
+    statusCounts: countBy(buckets, 'status'),
+    paymentStatusCounts: countBy(buckets, 'paymentStatus'),
+  };
+};
+
+// One point per day, week or month from `from` to `to`, empty periods included
+const series = (buckets, from, to, interval = 'day') => {
+  const points = new Map();
+  for (
+    let period = moment(from).startOf(interval);
+    !period.isAfter(to);
+    period = period.clone().add(1, interval)
+  ) {
+    points.set(period.valueOf(), { date: period.toDate(), count: 0, total: 0, credit: 0 });
+  }
+  buckets.forEach((bucket) => {
+    const point = points.get(moment(bucket.day).startOf(interval).valueOf());
+    if (!point) return;
+    point.count += bucket.count;
+    point.total += bucket.total;
+    point.credit += bucket.credit || 0;
+  });
+  return [...points.values()];
+};
+
+const INTERVALS = ['day', 'week', 'month'];
+const MAX_POINTS = 1000;
+
+// from / to (YYYY-MM-DD, default: the last 30 days) and interval of a revenue request
+const parseRange = ({ from, to, interval = 'day' }, now = new Date()) => {
+  if (!INTERVALS.includes(interval)) return { error: 'Invalid interval' };
+  const end = to ? moment(to, 'YYYY-MM-DD', true) : moment(now);
+  const start = from ? moment(from, 'YYYY-MM-DD', true) : end.clone().subtract(29, 'days');
+  if (!start.isValid() || !end.isValid() || start.isAfter(end)) {
+    return { error: 'Invalid date range' };
+  }
+  if (end.diff(start, interval) + 1 > MAX_POINTS) {
+    return { error: `At most ${MAX_POINTS} points per request` };
+  }
+  return { from: start.startOf('day').toDate(), to: end.endOf('day').toDate(), interval };
+};
+
+module.exports = {
+  dayOf,
+  dayKey,
+  contribution,
+  changes,
+  afterUpdate,
+  summarizeInvoices,
+  series,
+  parseRange,
+};
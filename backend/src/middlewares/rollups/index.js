@@ -0,0 +1,213 @@
+const mongoose = require('mongoose');
+
+const lease = require('../recurring/lease');
+const { changes, afterUpdate, summarizeInvoices, series, parseRange } = require('./buckets');
+
+/*
+  Daily invoice and payment buckets (models/coreModels/Rollup.js).
+  The invoice and payment controllers pass the documents before and after
+  each write (the image the write itself returned, and afterUpdate of it);
+  the difference of their contributions is applied with $inc, so a summary
+  over any period reads at most one bucket per day and combination instead
+  of scanning the invoices. rebuild() recomputes every
+  bucket from the collections (npm run rollups), and runs once on the first
+  start against a database that has none.
+*/
+const KINDS = ['invoice', 'payment'];
+const DUPLICATE_KEY = 11000;
+const BUILD_LEASE = 'rollups-build';
+const BUILD_LEASE_MS = 60 * 1000;
+const BUILD_RETRY_MS = 5000;
+
+const Rollup = () => mongoose.model('Rollup');
+
+const timezone = () => Intl.DateTimeFormat().resolvedOptions().timeZone;
+
+const increment = async ({ key, inc }) => {
+  try {
+    await Rollup().updateOne(key, { $inc: inc }, { upsert: true });
+  } catch (error) {
+    // two first writes of the same bucket: the other upsert created it
+    if (error.code !== DUPLICATE_KEY) throw error;
+    await Rollup().updateOne(key, { $inc: inc });
+  }
+};
+
+const apply = (kind, pairs) => Promise.all(changes(kind, pairs).map(increment));
+
+// before / after: the invoice as it was and as it is now, null when created or removed
+const applyInvoice = (before, after) => apply('invoice', [[before, after]]);
+
+// invoices inserted in bulk (recurring invoices)
+const addInvoices = (invoices) => apply('invoice', invoices.map((invoice) => [null, invoice]));
+
+const applyPayment = (before, after) => apply('payment', [[before, after]]);
+
+// payments soft-deleted together with their invoice
+const removePayments = (payments) => apply('payment', payments.map((payment) => [payment, null]));
+
+const read = (kind, from, to, currency) =>
+  Rollup()
+    .find({ kind, day: { $gte: from, $lte: to }, ...(currency && { currency }) })
+    .lean();
+
+const invoiceSummary = async (from, to) => summarizeInvoices(await read('invoice', from, to));
+
+const paymentSummary = async (from, to) => {
+  const buckets = await read('payment', from, to);
+  return {
+    count: buckets.reduce((sum, bucket) => sum + bucket.count, 0),
+    total: buckets.reduce((sum, bucket) => sum + bucket.total, 0),
+  };
+};
+
+const revenue = async (kind, { from, to, interval, currency }) =>
+  series(await read(kind, from, to, currency && currency.toUpperCase()), from, to, interval);
+
+const rebuildInvoices = (into) =>
+  mongoose.model('Invoice').aggregate([
+    { $match: { removed: false } },
+    {
+      $group: {
+        _id: {
+          day: { $dateTrunc: { date: '$date', unit: 'day', timezone: timezone() } },
+          status: '$status',
+          paymentStatus: '$paymentStatus',
+          currency: '$currency',
+          expiry: {
+            $ifNull: [
+              { $dateToString: { date: '$expiredDate', format: '%Y-%m-%d', timezone: timezone() } },
+              'none',
+            ],
+          },
+        },
+        count: { $sum: 1 },
+        total: { $sum: '$total' },
+        credit: { $sum: '$credit' },
+        discount: { $sum: '$discount' },
+      },
+    },
+    {
+      $group: {
+        _id: {
+          day: '$_id.day',
+          status: '$_id.status',
+          paymentStatus: '$_id.paymentStatus',
+          currency: '$_id.currency',
+        },
+        count: { $sum: '$count' },
+        total: { $sum: '$total' },
+        credit: { $sum: '$credit' },
+        discount: { $sum: '$discount' },
+        expiring: { $push: { k: '$_id.expiry', v: '$count' } },
+      },
+    },
+    {
+      $project: {
+        _id: 0,
+        kind: { $literal: 'invoice' },
+        day: '$_id.day',
+        status: '$_id.status',
+        paymentStatus: '$_id.paymentStatus',
+        currency: '$_id.currency',
+        count: 1,
+        total: 1,
+        credit: 1,
+        discount: 1,
+        expiring: { $arrayToObject: '$expiring' },
+      },
+    },
+    { $merge: { into } },
+  ]);
+
+const rebuildPayments = (into) =>
+  mongoose.model('Payment').aggregate([
+    { $match: { removed: false } },
+    {
+      $group: {
+        _id: {
+          day: { $dateTrunc: { date: '$date', unit: 'day', timezone: timezone() } },
+          currency: '$currency',
+        },
+        count: { $sum: 1 },
+        total: { $sum: '$amount' },
+      },
+    },
+    {
+      $project: {
+        _id: 0,
+        kind: { $literal: 'payment' },
+        day: '$_id.day',
+        status: { $literal: null },
+        paymentStatus: { $literal: null },
+        currency: '$_id.currency',
+        count: 1,
+        total: 1,
+      },
+    },
+    { $merge: { into } },
+  ]);
+
+// Recompute every bucket from the invoices and payments (writes meanwhile may be lost)
+const rebuild = async () => {
+  const into = Rollup().collection.collectionName;
+  await Rollup().deleteMany({ kind: { $in: KINDS } });
+  await rebuildInvoices(into);
+  await rebuildPayments(into);
+  await Rollup().updateOne({ kind: 'state' }, { $set: { built: new Date() } }, { upsert: true });
+};
+
+const isBuilt = async () => Boolean((await Rollup().findOne({ kind: 'state' }).lean())?.built);
+
+const build = async () => {
+  // renewed while building, expires if this server dies mid-build
+  const renew = setInterval(
+    () => lease.acquire(BUILD_LEASE, BUILD_LEASE_MS).catch(() => {}),
+    BUILD_LEASE_MS / 3
+  );
+  try {
+    console.log('📦 Building the invoice and payment rollups...');
+    await rebuild();
+  } finally {
+    clearInterval(renew);
+    await lease.release(BUILD_LEASE);
+  }
+};
+
+// Build the buckets once for a database that has none. The server holding the
+// build lease does it; every server (the others, and this one after a failed
+// build) returns only once they are built, so none is ready with empty summaries.
+// A failed build or database error is retried after BUILD_RETRY_MS
+const ensureBuilt = async () => {
+  let waiting = false;
+  for (;;) {
+    try {
+      if (await isBuilt()) return;
+      if (await lease.acquire(BUILD_LEASE, BUILD_LEASE_MS)) {
+        await build();
+        continue;
+      }
+      if (!waiting) {
+        console.log('⏳ Waiting for another server to build the rollups...');
+        waiting = true;
+      }
+    } catch (error) {
+      console.error(`🚫 Rollup build error → : ${error.message}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, BUILD_RETRY_MS));
+  }
+};
+
+module.exports = {
+  applyInvoice,
+  addInvoices,
+  applyPayment,
+  removePayments,
+  afterUpdate,
+  invoiceSummary,
+  paymentSummary,
+  revenue,
+  parseRange,
+  rebuild,
+  ensureBuilt,
+};
@@ -1,5 +1,16 @@
-const singleStorageUpload = require('./singleStorageUpload');
-const LocalSingleStorage = require('./LocalSingleStorage');
+// multer and its storage engines are loaded by the first upload, not at server start
+const lazyUpload = (modulePath) => (options) => {
+  let upload;
+  return (req, res, next) => {
+    if (!upload) {
+      upload = require(modulePath)(options);
+    }
+    return upload(req, res, next);
+  };
+};
+
+const singleStorageUpload = lazyUpload('./singleStorageUpload');
+const LocalSingleStorage = lazyUpload('./LocalSingleStorage');
 
 module.exports = {
   singleStorageUpload,
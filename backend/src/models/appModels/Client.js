@@ -30,6 +30,10 @@ const schema = new mongoose.Schema({
   },
 });
 
+// serves listAll?enabled=, the default list sort and the new-clients summary range
+schema.index({ enabled: 1, created: -1 }, { partialFilterExpression: { removed: false } });
+schema.index({ created: -1 }, { partialFilterExpression: { removed: false } });
+
 schema.plugin(require('mongoose-autopopulate'));
 
 module.exports = mongoose.model('Client', schema);
@@ -20,6 +20,14 @@ const invoiceSchema = new mongoose.Schema({
     type: String,
     enum: ['daily', 'weekly', 'monthly', 'annually', 'quarter'],
   },
+  // date of the next invoice generated from this one (middlewares/recurring)
+  nextRun: Date,
+  // set on invoices generated from a recurring one: the source and the date it was due
+  recurrenceOf: {
+    type: mongoose.Schema.ObjectId,
+    ref: 'Invoice',
+  },
+  recurrenceRun: Date,
   date: {
     type: Date,
     required: true,
@@ -175,5 +183,21 @@ const invoiceSchema = new mongoose.Schema({
   },
 });
 
+// list/listAll sorts, the unpaid summary and the client $lookup in clientController/summary.js
+invoiceSchema.index({ enabled: -1 }, { partialFilterExpression: { removed: false } });
+invoiceSchema.index({ created: -1 }, { partialFilterExpression: { removed: false } });
+invoiceSchema.index({ paymentStatus: 1, enabled: -1 }, { partialFilterExpression: { removed: false } });
+invoiceSchema.index({ expiredDate: 1 }, { partialFilterExpression: { removed: false } });
+invoiceSchema.index({ client: 1 });
+// due recurring invoices, and one generated invoice per source and run across replicas
+invoiceSchema.index(
+  { nextRun: 1 },
+  { partialFilterExpression: { removed: false, nextRun: { $exists: true } } }
+);
+invoiceSchema.index(
+  { recurrenceOf: 1, recurrenceRun: 1 },
+  { unique: true, partialFilterExpression: { recurrenceOf: { $exists: true } } }
+);
+
 invoiceSchema.plugin(require('mongoose-autopopulate'));
 module.exports = mongoose.model('Invoice', invoiceSchema);
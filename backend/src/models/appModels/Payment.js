@@ -58,5 +58,10 @@ const paymentSchema = new mongoose.Schema({
     default: Date.now,
   },
 });
+// invoice removal soft-deletes payments by invoice
+paymentSchema.index({ invoice: 1 });
+paymentSchema.index({ enabled: -1 }, { partialFilterExpression: { removed: false } });
+paymentSchema.index({ created: -1 }, { partialFilterExpression: { removed: false } });
+
 paymentSchema.plugin(require('mongoose-autopopulate'));
 module.exports = mongoose.model('Payment', paymentSchema);
@@ -137,5 +137,9 @@ const quoteSchema = new mongoose.Schema({
   },
 });
 
+quoteSchema.index({ enabled: -1 }, { partialFilterExpression: { removed: false } });
+quoteSchema.index({ created: -1 }, { partialFilterExpression: { removed: false } });
+quoteSchema.index({ client: 1 });
+
 quoteSchema.plugin(require('mongoose-autopopulate'));
 module.exports = mongoose.model('Quote', quoteSchema);
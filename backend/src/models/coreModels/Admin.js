@@ -34,4 +34,6 @@ const adminSchema = new Schema({
   },
 });
 
+adminSchema.index({ email: 1 }, { partialFilterExpression: { removed: false } });
+
 module.exports = mongoose.model('Admin', adminSchema);
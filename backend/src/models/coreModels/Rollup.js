@@ -0,0 +1,46 @@
+const mongoose = require('mongoose');
+
+// Daily totals of invoices (per status, paymentStatus and currency) and of
+// payments (per currency), kept up to date by the invoice and payment
+// controllers through middlewares/rollups. Summaries and revenue charts read
+// these buckets instead of scanning the invoices.
+const rollupSchema = new mongoose.Schema({
+  kind: {
+    type: String,
+    enum: ['invoice', 'payment', 'state'],
+    required: true,
+  },
+  // start of the day of the invoice or payment date, server time zone
+  day: Date,
+  status: String,
+  paymentStatus: String,
+  currency: String,
+  count: {
+    type: Number,
+    default: 0,
+  },
+  total: {
+    type: Number,
+    default: 0,
+  },
+  credit: {
+    type: Number,
+    default: 0,
+  },
+  discount: {
+    type: Number,
+    default: 0,
+  },
+  // invoices of the bucket per expiry day (YYYY-MM-DD), for the overdue count
+  expiring: {
+    type: Map,
+    of: Number,
+    default: undefined,
+  },
+  // kind 'state': when the buckets were last rebuilt from the invoices
+  built: Date,
+});
+
+rollupSchema.index({ kind: 1, day: 1, status: 1, paymentStatus: 1, currency: 1 }, { unique: true });
+
+module.exports = mongoose.model('Rollup', rollupSchema);
@@ -1,11 +1,9 @@
 const { basename, extname } = require('path');
-const { globSync } = require('glob');
+const { loadManifest } = require('@/setup/manifest');
 
-const appModelsFiles = globSync('./src/models/appModels/**/*.js');
+const { models, appModels: appModelsFiles } = loadManifest();
 
-const pattern = './src/models/**/*.js';
-
-const modelsFiles = globSync(pattern).map((filePath) => {
+const modelsFiles = models.map((filePath) => {
   const fileNameWithExtension = basename(filePath);
   const fileNameWithoutExtension = fileNameWithExtension.replace(
     extname(fileNameWithExtension),
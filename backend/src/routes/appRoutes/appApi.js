@@ -1,33 +1,48 @@
 const express = require('express');
 const { catchErrors } = require('@/handlers/errorHandlers');
+const { conditionalGet, trackWrites } = require('@/middlewares/httpCache');
+const { selectFields } = require('@/middlewares/projection');
 const router = express.Router();
 
 const appControllers = require('@/controllers/appControllers');
 const { routesList } = require('@/models/utils');
 
-const routerApp = (entity, controller) => {
-  router.route(`/${entity}/create`).post(catchErrors(controller['create']));
-  router.route(`/${entity}/read/:id`).get(catchErrors(controller['read']));
-  router.route(`/${entity}/update/:id`).patch(catchErrors(controller['update']));
-  router.route(`/${entity}/delete/:id`).delete(catchErrors(controller['delete']));
-  router.route(`/${entity}/search`).get(catchErrors(controller['search']));
-  router.route(`/${entity}/list`).get(catchErrors(controller['list']));
-  router.route(`/${entity}/listAll`).get(catchErrors(controller['listAll']));
-  router.route(`/${entity}/filter`).get(catchErrors(controller['filter']));
+const routerApp = (entity, controller, modelName) => {
+  const cached = conditionalGet(modelName);
+  const writes = trackWrites(modelName);
+  const selected = selectFields(modelName);
+
+  router.route(`/${entity}/create`).post(writes, catchErrors(controller['create']));
+  router.route(`/${entity}/read/:id`).get(selected, cached, catchErrors(controller['read']));
+  router.route(`/${entity}/update/:id`).patch(writes, catchErrors(controller['update']));
+  router.route(`/${entity}/delete/:id`).delete(writes, catchErrors(controller['delete']));
+  router.route(`/${entity}/search`).get(selected, catchErrors(controller['search']));
+  router.route(`/${entity}/list`).get(selected, cached, catchErrors(controller['list']));
+  router.route(`/${entity}/listAll`).get(selected, cached, catchErrors(controller['listAll']));
+  router.route(`/${entity}/filter`).get(selected, cached, catchErrors(controller['filter']));
   router.route(`/${entity}/summary`).get(catchErrors(controller['summary']));
 
   if (entity === 'invoice' || entity === 'quote' || entity === 'payment') {
     router.route(`/${entity}/mail`).post(catchErrors(controller['mail']));
   }
 
+  if (entity === 'invoice' || entity === 'payment') {
+    router.route(`/${entity}/revenue`).get(catchErrors(controller['revenue']));
+  }
+
+  if (entity === 'client' || entity === 'invoice') {
+    router.route(`/${entity}/import`).post(writes, catchErrors(controller['import']));
+    router.route(`/${entity}/import/:id?`).get(catchErrors(controller['importProgress']));
+  }
+
   if (entity === 'quote') {
-    router.route(`/${entity}/convert/:id`).get(catchErrors(controller['convert']));
+    router.route(`/${entity}/convert/:id`).get(writes, catchErrors(controller['convert']));
   }
 };
 
-routesList.forEach(({ entity, controllerName }) => {
+routesList.forEach(({ entity, modelName, controllerName }) => {
   const controller = appControllers[controllerName];
-  routerApp(entity, controller);
+  routerApp(entity, controller, modelName);
 });
 
 module.exports = router;
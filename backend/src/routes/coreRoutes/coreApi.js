@@ -8,10 +8,14 @@ const adminController = require('@/controllers/coreControllers/adminController')
 const settingController = require('@/controllers/coreControllers/settingController');
 
 const { singleStorageUpload } = require('@/middlewares/uploadMiddleware');
+const { conditionalGet, trackWrites } = require('@/middlewares/httpCache');
+
+const settingCache = conditionalGet('Setting');
+const settingWrites = trackWrites('Setting');
 
 // //_______________________________ Admin management_______________________________
 
-router.route('/admin/read/:id').get(catchErrors(adminController.read));
+router.route('/admin/read/:id').get(conditionalGet('Admin'), catchErrors(adminController.read));
 
 router.route('/admin/password-update/:id').patch(catchErrors(adminController.updatePassword));
 
@@ -21,34 +25,40 @@ router.route('/admin/profile/password').patch(catchErrors(adminController.update
 router
   .route('/admin/profile/update')
   .patch(
+    trackWrites('Admin'),
     singleStorageUpload({ entity: 'admin', fieldName: 'photo', fileType: 'image' }),
     catchErrors(adminController.updateProfile)
   );
 
 // //____________________________________________ API for Global Setting _________________
 
-router.route('/setting/create').post(catchErrors(settingController.create));
-router.route('/setting/read/:id').get(catchErrors(settingController.read));
-router.route('/setting/update/:id').patch(catchErrors(settingController.update));
+router.route('/setting/create').post(settingWrites, catchErrors(settingController.create));
+router.route('/setting/read/:id').get(settingCache, catchErrors(settingController.read));
+router.route('/setting/update/:id').patch(settingWrites, catchErrors(settingController.update));
 //router.route('/setting/delete/:id).delete(catchErrors(settingController.delete));
 router.route('/setting/search').get(catchErrors(settingController.search));
-router.route('/setting/list').get(catchErrors(settingController.list));
-router.route('/setting/listAll').get(catchErrors(settingController.listAll));
-router.route('/setting/filter').get(catchErrors(settingController.filter));
+router.route('/setting/list').get(settingCache, catchErrors(settingController.list));
+router.route('/setting/listAll').get(settingCache, catchErrors(settingController.listAll));
+router.route('/setting/filter').get(settingCache, catchErrors(settingController.filter));
 router
   .route('/setting/readBySettingKey/:settingKey')
-  .get(catchErrors(settingController.readBySettingKey));
-router.route('/setting/listBySettingKey').get(catchErrors(settingController.listBySettingKey));
+  .get(settingCache, catchErrors(settingController.readBySettingKey));
+router
+  .route('/setting/listBySettingKey')
+  .get(settingCache, catchErrors(settingController.listBySettingKey));
 router
   .route('/setting/updateBySettingKey/:settingKey?')
-  .patch(catchErrors(settingController.updateBySettingKey));
+  .patch(settingWrites, catchErrors(settingController.updateBySettingKey));
 router
   .route('/setting/upload/:settingKey?')
   .patch(
+    settingWrites,
     catchErrors(
       singleStorageUpload({ entity: 'setting', fieldName: 'settingValue', fileType: 'image' })
     ),
     catchErrors(settingController.updateBySettingKey)
   );
-router.route('/setting/updateManySetting').patch(catchErrors(settingController.updateManySetting));
+router
+  .route('/setting/updateManySetting')
+  .patch(settingWrites, catchErrors(settingController.updateManySetting));
 module.exports = router;
@@ -0,0 +1,13 @@
+const express = require('express');
+
+const router = express.Router();
+
+const { catchErrors } = require('@/handlers/errorHandlers');
+const createBatchHandler = require('@/handlers/batchHandler');
+
+const coreApiRouter = require('./coreApi');
+const erpApiRouter = require('../appRoutes/appApi');
+
+router.route('/').post(catchErrors(createBatchHandler([erpApiRouter, coreApiRouter])));
+
+module.exports = router;
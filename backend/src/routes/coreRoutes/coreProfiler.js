@@ -0,0 +1,12 @@
+const express = require('express');
+
+const router = express.Router();
+
+const { catchErrors } = require('@/handlers/errorHandlers');
+const profiler = require('@/handlers/profilerHandler');
+
+router.route('/start').post(catchErrors(profiler.start));
+router.route('/stop').post(catchErrors(profiler.stop));
+router.route('/status').get(catchErrors(profiler.status));
+
+module.exports = router;
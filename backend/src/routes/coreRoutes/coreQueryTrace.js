@@ -0,0 +1,11 @@
+const express = require('express');
+
+const router = express.Router();
+
+const { catchErrors } = require('@/handlers/errorHandlers');
+const queryTraceHandler = require('@/handlers/queryTraceHandler');
+
+router.route('/').get(catchErrors(queryTraceHandler.read));
+router.route('/reset').post(catchErrors(queryTraceHandler.reset));
+
+module.exports = router;
@@ -0,0 +1,11 @@
+const express = require('express');
+
+const router = express.Router();
+
+const { catchErrors } = require('@/handlers/errorHandlers');
+const recurringHandler = require('@/handlers/recurringHandler');
+
+router.route('/run').post(catchErrors(recurringHandler.run));
+router.route('/status').get(catchErrors(recurringHandler.status));
+
+module.exports = router;
@@ -1,7 +1,5 @@
 require('module-alias/register');
 const mongoose = require('mongoose');
-const { globSync } = require('glob');
-const path = require('path');
 
 // Make sure we are running node 7.6+
 const [major, minor] = process.versions.node.split('.').map(parseFloat);
@@ -14,7 +12,13 @@ if (major < 20) {
 require('dotenv').config({ path: '.env' });
 require('dotenv').config({ path: '.env.local' });
 
-mongoose.connect(process.env.DATABASE);
+const queryTrace = require('./middlewares/queryTrace');
+const readiness = require('./handlers/readinessHandler');
+const { loadManifest, resolve } = require('./setup/manifest');
+
+mongoose.connect(process.env.DATABASE, queryTrace.connectOptions());
+// Per query shape timings of every driver command (QUERY_TRACE=true)
+queryTrace.attach(mongoose.connection);
 
 const OPENAI_API_KEY = process.env.OPENAI_API_KEY;
 
@@ -25,25 +29,54 @@ mongoose.connection.on('error', (error) => {
   console.error(`2. 🚫 Error → : ${error.message}`);
 });
 
-// Load models first (needed for auto-setup)
-const modelsFiles = globSync('./src/models/**/*.js');
-
-for (const filePath of modelsFiles) {
-  require(path.resolve(filePath));
+// Load models first (needed for auto-setup), from the manifest rather than a glob
+for (const filePath of loadManifest().models) {
+  require(resolve(filePath));
 }
+readiness.mark('models');
 
 // Auto-setup on first run
 mongoose.connection.once('open', async () => {
   console.log('✅ MongoDB connected successfully');
-  
+  readiness.mark('database');
+
   // Run auto-setup (creates admin if database is empty)
   const autoSetup = require('./setup/autoSetup');
   await autoSetup();
+  readiness.mark('setup');
+
+  // Take traffic only once the indexes exist, not while queries would scan
+  try {
+    await Promise.all(mongoose.modelNames().map((name) => mongoose.model(name).init()));
+  } catch (error) {
+    console.error(`🚫 Index build error → : ${error.message}`);
+  }
+  readiness.mark('indexes');
+
+  // Daily invoice and payment buckets of the summaries, built once per database;
+  // not ready until they are, whichever server builds them
+  try {
+    await require('./middlewares/rollups').ensureBuilt();
+    readiness.mark('rollups');
+  } catch (error) {
+    console.error(`🚫 Rollup build error → : ${error.message}`);
+  }
 });
 
+// Keep the ETag collection versions in sync across replicas
+require('./middlewares/httpCache').startVersionSync();
+
+// Generate the due recurring invoices, on the replica holding the lease
+require('./middlewares/recurring').startScheduler();
+
 // Start our app!
 const app = require('./app');
 app.set('port', process.env.PORT || 8888);
 const server = app.listen(app.get('port'), () => {
   console.log(`Express running → On PORT : ${server.address().port}`);
+  readiness.mark('listening');
 });
+// Streamed bulk imports of millions of rows can outlast Node's 5 minute default
+if (process.env.REQUEST_TIMEOUT_MS) {
+  server.requestTimeout = parseInt(process.env.REQUEST_TIMEOUT_MS);
+}
@@ -3,12 +3,17 @@
 
 require('dotenv').config({ path: '.env' });
 require('dotenv').config({ path: '.env.local' });
-const { globSync } = require('glob');
 const fs = require('fs');
 const { generate: uniqueId } = require('shortid');
 const mongoose = require('mongoose');
+const { loadManifest, resolve } = require('./manifest');
 
 async function autoSetup() {
+  // Databases that are known to be set up skip the check entirely
+  if (process.env.AUTO_SETUP === 'false') {
+    return;
+  }
+
   try {
     const Admin = require('../models/coreModels/Admin');
     const AdminPassword = require('../models/coreModels/AdminPassword');
@@ -16,10 +21,10 @@ async function autoSetup() {
     const PaymentMode = require('../models/appModels/PaymentMode');
     const Taxes = require('../models/appModels/Taxes');
 
-    // Check if admin exists
-    const adminCount = await Admin.countDocuments();
-    
-    if (adminCount > 0) {
+    // Check if admin exists: a single _id index lookup, not a count of the collection
+    const adminExists = await Admin.exists({});
+
+    if (adminExists) {
       console.log('✅ Admin user already exists. Skipping auto-setup.');
       return;
     }
@@ -51,10 +56,10 @@ async function autoSetup() {
 
     // Create settings
     const settingFiles = [];
-    const settingsFiles = globSync('./src/setup/defaultSettings/**/*.json');
+    const settingsFiles = loadManifest().defaultSettings;
 
     for (const filePath of settingsFiles) {
-      const file = JSON.parse(fs.readFileSync(filePath, 'utf-8'));
+      const file = JSON.parse(fs.readFileSync(resolve(filePath), 'utf-8'));
       settingFiles.push(...file);
     }
 
@@ -0,0 +1,64 @@
+// Module manifest: the models, app controllers and default settings files
+// the server loads at startup, listed once at build time (npm run manifest)
+// instead of globbing the source tree on every start.
+
+const fs = require('fs');
+const path = require('path');
+
+const SRC = path.join(__dirname, '..');
+const MANIFEST_PATH = path.join(__dirname, 'manifest.json');
+
+const walk = (directory, extension) => {
+  const found = [];
+  for (const entry of fs.readdirSync(path.join(SRC, directory), { withFileTypes: true })) {
+    const relative = path.posix.join(directory, entry.name);
+    if (entry.isDirectory()) {
+      found.push(...walk(relative, extension));
+    } else if (entry.name.endsWith(extension)) {
+      found.push(relative);
+    }
+  }
+  return found.sort();
+};
+
+const buildManifest = () => ({
+  models: walk('models', '.js'),
+  appModels: walk('models/appModels', '.js'),
+  appControllers: fs
+    .readdirSync(path.join(SRC, 'controllers/appControllers'), { withFileTypes: true })
+    .filter((entry) => entry.isDirectory())
+    .map((entry) => entry.name)
+    .sort(),
+  defaultSettings: walk('setup/defaultSettings', '.json'),
+});
+
+let manifest;
+
+// The written manifest, or a scan of the tree when there is none (development)
+const loadManifest = () => {
+  if (!manifest) {
+    manifest = fs.existsSync(MANIFEST_PATH)
+      ? JSON.parse(fs.readFileSync(MANIFEST_PATH, 'utf-8'))
+      : buildManifest();
+  }
+  return manifest;
+};
+
+// Absolute path of a manifest entry
+const resolve = (relative) => path.join(SRC, relative);
+
+const writeManifest = () => {
+  const built = buildManifest();
+  fs.writeFileSync(MANIFEST_PATH, JSON.stringify(built, null, 2) + '\n');
+  return built;
+};
+
+if (require.main === module) {
+  const built = writeManifest();
+  console.log(
+    `👍 Manifest written: ${built.models.length} models, ` +
+      `${built.appControllers.length} controllers, ${built.defaultSettings.length} settings files`
+  );
+}
+
+module.exports = { buildManifest, loadManifest, writeManifest, resolve, MANIFEST_PATH };
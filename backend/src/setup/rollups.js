@@ -0,0 +1,25 @@
+require('dotenv').config({ path: '.env' });
+require('dotenv').config({ path: '.env.local' });
+
+const mongoose = require('mongoose');
+mongoose.connect(process.env.DATABASE);
+
+// Recompute the daily invoice and payment buckets, e.g. after importing data
+// straight into the collections
+async function rebuildRollups() {
+  require('../models/appModels/Invoice');
+  require('../models/appModels/Payment');
+  require('../models/coreModels/Rollup');
+  const rollups = require('../middlewares/rollups');
+
+  try {
+    await rollups.rebuild();
+    console.log('👍 Invoice and payment rollups rebuilt');
+  } catch (error) {
+    console.error('❌ Rollup rebuild error:', error.message);
+  }
+
+  process.exit();
+}
+
+rebuildRollups();
@@ -0,0 +1,141 @@
+/**
+ * Admission Control Tests
+ * Tests the per route class concurrency limits, queue budgets and load shedding
+ */
+
+const assert = require('assert');
+const path = require('path');
+const { EventEmitter } = require('events');
+
+process.env.ADMISSION_API_CONCURRENCY = '1';
+process.env.ADMISSION_API_QUEUE = '1';
+process.env.ADMISSION_API_QUEUE_MS = '50';
+
+const { admission, classOf, stats, reset } = require(
+  path.join(__dirname, '../src/middlewares/admission')
+);
+
+const request = (method = 'GET', url = '/api/invoice/list') => {
+  const res = new EventEmitter();
+  res.headers = {};
+  res.set = (field, value) => (res.headers[field] = value);
+  res.status = (code) => {
+    res.statusCode = code;
+    return res;
+  };
+  res.json = (body) => {
+    res.body = body;
+    res.emit('finish');
+    res.emit('close');
+  };
+  const call = { req: { method, path: url }, res, admitted: false };
+  admission(call.req, res, () => (call.admitted = true));
+  return call;
+};
+
+const finish = ({ res }) => {
+  res.emit('finish');
+  res.emit('close');
+};
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Test 1: routes fall into their class, harness control routes into none
+function testClassOf() {
+  try {
+    assert.strictEqual(classOf('GET', '/api/invoice/list'), 'api');
+    assert.strictEqual(classOf('PATCH', '/api/client/update/1'), 'api');
+    assert.strictEqual(classOf('GET', '/api/invoice/summary'), 'heavy');
+    assert.strictEqual(classOf('GET', '/api/payment/revenue'), 'heavy');
+    assert.strictEqual(classOf('POST', '/api/batch'), 'heavy');
+    assert.strictEqual(classOf('POST', '/api/client/import'), 'heavy');
+    assert.strictEqual(classOf('GET', '/api/client/import'), 'api', 'progress polls are cheap');
+    assert.strictEqual(classOf('GET', '/download/invoice/invoice-1.pdf'), 'pdf');
+    assert.strictEqual(classOf('POST', '/api/quote/mail'), 'pdf');
+    assert.strictEqual(classOf('POST', '/api/login'), 'auth');
+    assert.strictEqual(classOf('POST', '/api/profiler/start'), null);
+    console.log('✅ Test 1: Route classes passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 1: Route classes failed:', error.message);
+    return false;
+  }
+}
+
+// Test 2: past the concurrency limit requests queue, past the queue they get a 429
+function testQueueAndReject() {
+  try {
+    reset();
+    const first = request();
+    const second = request();
+    const third = request();
+    assert.strictEqual(first.admitted, true);
+    assert.strictEqual(second.admitted, false, 'waits for the slot');
+    assert.strictEqual(third.res.statusCode, 429);
+    assert.ok(Number(third.res.headers['Retry-After']) >= 1);
+    assert.strictEqual(request('GET', '/api/invoice/summary').admitted, true, 'own class');
+
+    finish(first);
+    assert.strictEqual(second.admitted, true, 'the freed slot goes to the queue');
+    finish(second);
+    assert.deepStrictEqual(
+      [stats().api.admitted, stats().api.rejected, stats().api.running],
+      [2, 1, 0]
+    );
+    console.log('✅ Test 2: Queue and reject passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 2: Queue and reject failed:', error.message);
+    return false;
+  }
+}
+
+// Test 3: a request waiting past its budget is shed with a 503, a gone client leaves the queue
+async function testQueueBudget() {
+  try {
+    reset();
+    const running = request();
+    const waiting = request();
+    await sleep(80);
+    assert.strictEqual(waiting.admitted, false);
+    assert.strictEqual(waiting.res.statusCode, 503);
+    assert.ok(waiting.res.headers['Retry-After']);
+    assert.strictEqual(stats().api.shed, 1);
+
+    const gone = request();
+    gone.res.emit('close');
+    assert.strictEqual(stats().api.queued, 0);
+    const next = request();
+    finish(running);
+    assert.strictEqual(gone.admitted, false);
+    assert.strictEqual(next.admitted, true);
+    finish(next);
+    console.log('✅ Test 3: Queue budget passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 3: Queue budget failed:', error.message);
+    return false;
+  }
+}
+
+// Run all tests
+async function runTests() {
+  console.log('🧪 Running Admission Control Tests...\n');
+
+  const results = [testClassOf(), testQueueAndReject(), await testQueueBudget()];
+
+  const passed = results.filter((r) => r).length;
+  const total = results.length;
+
+  console.log(`\n📊 Test Results: ${passed}/${total} tests passed`);
+
+  if (passed === total) {
+    console.log('✅ All admission control tests passed!');
+    process.exit(0);
+  } else {
+    console.log('❌ Some admission control tests failed!');
+    process.exit(1);
+  }
+}
+
+runTests();
@@ -0,0 +1,100 @@
+/**
+ * Profiler Control Tests
+ * Tests the start/stop handlers of the opt-in profiler without a server
+ */
+
+const assert = require('assert');
+const path = require('path');
+
+const profiler = require(path.join(__dirname, '../src/handlers/profilerHandler'));
+
+function call(handler, body) {
+  return new Promise((resolve, reject) => {
+    const res = {
+      statusCode: 200,
+      status(code) {
+        this.statusCode = code;
+        return this;
+      },
+      json(payload) {
+        resolve({ status: this.statusCode, body: payload });
+        return this;
+      },
+    };
+    handler({ body }, res).catch(reject);
+  });
+}
+
+function busyProfilerWork(ms) {
+  const end = Date.now() + ms;
+  const chunks = [];
+  while (Date.now() < end) {
+    chunks.push(new Array(64).fill(Math.random()).join(','));
+  }
+  return chunks.length;
+}
+
+// Test 1: A profile records the functions that ran and the allocations
+async function testStartStop() {
+  try {
+    const started = await call(profiler.start, { label: 'test', samplingInterval: 100 });
+    assert.strictEqual(started.status, 200, 'start should return 200');
+    assert.strictEqual(started.body.result.label, 'test', 'start should echo the label');
+    busyProfilerWork(200);
+    const stopped = await call(profiler.stop);
+    assert.strictEqual(stopped.status, 200, 'stop should return 200');
+    const { cpuProfile, heapProfile } = stopped.body.result;
+    assert(cpuProfile.samples.length > 0, 'CPU profile should have samples');
+    assert(
+      cpuProfile.nodes.some((node) => node.callFrame.functionName === 'busyProfilerWork'),
+      'CPU profile should contain the busy function'
+    );
+    assert(heapProfile.head.children.length > 0, 'heap profile should have allocation sites');
+    console.log('✅ Test 1: Profile start/stop passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 1: Profile start/stop failed:', error.message);
+    return false;
+  }
+}
+
+// Test 2: Only one profile runs at a time
+async function testSingleProfile() {
+  try {
+    assert.strictEqual((await call(profiler.stop)).status, 409, 'idle stop should return 409');
+    await call(profiler.start, { heap: false });
+    const again = await call(profiler.start, {});
+    assert.strictEqual(again.status, 409, 'second start should return 409');
+    const status = await call(profiler.status);
+    assert.strictEqual(status.body.result.running, true, 'status should report the profile');
+    const stopped = await call(profiler.stop);
+    assert(!('heapProfile' in stopped.body.result), 'heap sampling was not requested');
+    console.log('✅ Test 2: Single profile passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 2: Single profile failed:', error.message);
+    return false;
+  }
+}
+
+// Run all tests
+async function runTests() {
+  console.log('🧪 Running Profiler Control Tests...\n');
+
+  const results = [await testStartStop(), await testSingleProfile()];
+
+  const passed = results.filter((r) => r).length;
+  const total = results.length;
+
+  console.log(`\n📊 Test Results: ${passed}/${total} tests passed`);
+
+  if (passed === total) {
+    console.log('✅ All profiler tests passed!');
+    process.exit(0);
+  } else {
+    console.log('❌ Some profiler tests failed!');
+    process.exit(1);
+  }
+}
+
+runTests();
@@ -0,0 +1,134 @@
+/**
+ * Projection Tests
+ * Tests the ?select= sparse fieldsets of the list and read routes
+ */
+
+const assert = require('assert');
+const path = require('path');
+
+const { parseSelect, selectFields, leanQuery } = require(
+  path.join(__dirname, '../src/middlewares/projection')
+);
+
+// Test 1: selected fields and the fields of populated references
+function testParseSelect() {
+  try {
+    assert.deepStrictEqual(parseSelect('Invoice', 'number, client.name,total,client.email'), {
+      select: 'number client total',
+      populate: [{ path: 'client', select: 'name email' }],
+    });
+    assert.deepStrictEqual(parseSelect('Payment', 'paymentMode').populate, [
+      { path: 'paymentMode', select: 'name description' },
+    ]);
+    assert.deepStrictEqual(parseSelect('Taxes', ['taxName', 'taxValue']), {
+      select: 'taxName taxValue',
+      populate: [],
+    });
+    console.log('✅ Test 1: Parse select passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 1: Parse select failed:', error.message);
+    return false;
+  }
+}
+
+// Test 2: fields outside the model whitelist are refused with a 400
+function testWhitelist() {
+  try {
+    assert.ok(parseSelect('Invoice', 'removed').error, 'removed is not selectable');
+    assert.ok(parseSelect('Invoice', 'total.value').error, 'total is not a reference');
+    assert.ok(parseSelect('Invoice', 'createdBy.password').error, 'admin fields are listed');
+    assert.ok(parseSelect('Setting', 'settingKey').error, 'models without a whitelist');
+    assert.ok(parseSelect('Client', ' , ').error, 'select names no field');
+
+    let status;
+    let body;
+    let called = false;
+    const res = {
+      status: (code) => {
+        status = code;
+        return res;
+      },
+      json: (payload) => {
+        body = payload;
+        return res;
+      },
+    };
+    selectFields('Client')({ query: { select: 'name,__v' } }, res, () => (called = true));
+    assert.strictEqual(status, 400);
+    assert.strictEqual(body.success, false);
+    assert.strictEqual(called, false);
+
+    const req = { query: { select: 'name,email' } };
+    selectFields('Client')(req, res, () => (called = true));
+    assert.strictEqual(called, true);
+    assert.strictEqual(req.projection.select, 'name email');
+    console.log('✅ Test 2: Select whitelist passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 2: Select whitelist failed:', error.message);
+    return false;
+  }
+}
+
+// Test 3: queries run lean, autopopulated only when they return whole documents
+async function testLeanQuery() {
+  try {
+    const query = () => {
+      const calls = [];
+      const chain = {
+        calls,
+        populate: (...args) => calls.push(['populate', ...args]) && chain,
+        select: (...args) => calls.push(['select', ...args]) && chain,
+        setOptions: (...args) => calls.push(['setOptions', ...args]) && chain,
+        lean: (...args) => calls.push(['lean', ...args]) && chain,
+        exec: async () => calls,
+      };
+      return chain;
+    };
+
+    const whole = await leanQuery(query(), undefined, { path: 'createdBy', select: 'name' });
+    assert.deepStrictEqual(whole, [
+      ['populate', { path: 'createdBy', select: 'name' }],
+      ['lean', { autopopulate: true }],
+    ]);
+
+    const sparse = await leanQuery(query(), parseSelect('Invoice', 'number,client.name'), {
+      path: 'createdBy',
+      select: 'name',
+    });
+    assert.deepStrictEqual(sparse, [
+      ['populate', [{ path: 'client', select: 'name' }]],
+      ['select', 'number client'],
+      ['setOptions', { autopopulate: false }],
+      ['lean'],
+    ]);
+    console.log('✅ Test 3: Lean query passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 3: Lean query failed:', error.message);
+    return false;
+  }
+}
+
+// Run all tests
+async function runTests() {
+  console.log('🧪 Running Projection Tests...\n');
+
+  const results = [testParseSelect(), testWhitelist(), await testLeanQuery()];
+
+  const passed = results.filter((r) => r).length;
+  const total = results.length;
+
+  console.log(`\n📊 Test Results: ${passed}/${total} tests passed`);
+
+  if (passed === total) {
+    console.log('✅ All projection tests passed!');
+    process.exit(0);
+  } else {
+    console.log('❌ Some projection tests failed!');
+    process.exit(1);
+  }
+}
+
+runTests();
@@ -0,0 +1,142 @@
+/**
+ * Query Trace Tests
+ * Tests query shape normalization and the per-shape table without a database
+ */
+
+const assert = require('assert');
+const path = require('path');
+
+const { shapeOf } = require(path.join(__dirname, '../src/middlewares/queryTrace/shape'));
+const { createTable } = require(path.join(__dirname, '../src/middlewares/queryTrace/table'));
+const queryTrace = require(path.join(__dirname, '../src/middlewares/queryTrace'));
+
+// Test 1: Values are dropped, keys, operators, sort and stages are kept
+function testShapes() {
+  try {
+    const list = shapeOf('find', {
+      find: 'invoices',
+      filter: { removed: false, client: { $in: ['a', 'b'] }, created: { $lte: new Date() } },
+      sort: { enabled: -1 },
+      limit: 10,
+    });
+    assert.strictEqual(
+      list.key,
+      'invoices.find {client.$in,created.$lte,removed} sort(enabled:-1)',
+      'find shape should keep keys and operators'
+    );
+    const other = shapeOf('find', {
+      find: 'invoices',
+      filter: { created: { $lte: new Date(0) }, client: { $in: ['c'] }, removed: true },
+      sort: { enabled: -1 },
+    });
+    assert.strictEqual(other.key, list.key, 'values and key order should not matter');
+    const summary = shapeOf('aggregate', {
+      aggregate: 'clients',
+      pipeline: [
+        {
+          $facet: {
+            totalClients: [{ $match: { removed: false, enabled: true } }, { $count: 'count' }],
+            activeClients: [
+              { $lookup: { from: 'invoices', localField: '_id', foreignField: 'client', as: 'i' } },
+              { $match: { 'i.status': 'paid' } },
+            ],
+          },
+        },
+      ],
+    });
+    assert.strictEqual(
+      summary.key,
+      'clients.aggregate $facet{totalClients:[$match{enabled,removed}|$count],' +
+        'activeClients:[$lookup(invoices)|$match{i.status}]}',
+      'aggregate shape should show the lookup inside the facet'
+    );
+    assert.strictEqual(shapeOf('hello', { hello: 1 }), null, 'handshakes are not queries');
+    console.log('✅ Test 1: Query shapes passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 1: Query shapes failed:', error.message);
+    return false;
+  }
+}
+
+// Test 2: The table is bounded and keeps a latency histogram per shape
+function testTable() {
+  try {
+    const table = createTable({ maxShapes: 2 });
+    const shape = (key) => ({ key, collection: 'c', operation: 'find' });
+    [1, 3, 3, 40, 900].forEach((ms) => table.record(shape('a'), { ms, returned: 10 }));
+    table.record(shape('b'), { ms: 5 });
+    table.record(shape('a'), { ms: 2 });
+    table.record(shape('c'), { ms: 1 });
+    assert.deepStrictEqual(
+      table.rows().map((row) => row.key),
+      ['a', 'c'],
+      'the least recently used shape should be evicted'
+    );
+    assert.strictEqual(table.evicted(), 1, 'evictions should be counted');
+    const [a] = table.rows();
+    assert.strictEqual(a.count, 6, 'count should include every call');
+    assert.strictEqual(a.p50Ms, 5, 'p50 should be the bucket bound');
+    assert.strictEqual(a.p99Ms, 900, 'p99 should not exceed the slowest call');
+    table.recordExplain('a', { examined: 5000, keys: 0, returned: 10, planSummary: 'COLLSCAN' });
+    assert.strictEqual(table.rows()[0].examinedRatio, 500, 'examined per returned document');
+    console.log('✅ Test 2: Bounded table passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 2: Bounded table failed:', error.message);
+    return false;
+  }
+}
+
+// Test 3: Command events are paired and cursor batches counted for their shape
+function testEvents() {
+  try {
+    queryTrace.reset();
+    const command = { find: 'clients', filter: { _id: { $in: [1, 2, 3] } }, $db: 'idurar' };
+    queryTrace.onStarted({ requestId: 1, commandName: 'find', command, databaseName: 'idurar' });
+    queryTrace.onFinished(false)({
+      requestId: 1,
+      duration: 4,
+      reply: { cursor: { id: 77, firstBatch: [{}, {}] } },
+    });
+    queryTrace.onStarted({ requestId: 2, commandName: 'getMore', command: { getMore: 77 } });
+    queryTrace.onFinished(false)({
+      requestId: 2,
+      duration: 1,
+      reply: { cursor: { id: 0, nextBatch: [{}] } },
+    });
+    queryTrace.onStarted({ requestId: 3, commandName: 'endSessions', command: {} });
+    queryTrace.onFinished(false)({ requestId: 3, duration: 1, reply: {} });
+    const { rows } = queryTrace.snapshot();
+    assert.strictEqual(rows.length, 1, 'only the query should be recorded');
+    assert.strictEqual(rows[0].key, 'clients.find {_id.$in}', 'autopopulate fan-out shape');
+    assert.strictEqual(rows[0].docsReturned, 3, 'getMore batches count for the find');
+    console.log('✅ Test 3: Command events passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 3: Command events failed:', error.message);
+    return false;
+  }
+}
+
+// Run all tests
+function runTests() {
+  console.log('🧪 Running Query Trace Tests...\n');
+
+  const results = [testShapes(), testTable(), testEvents()];
+
+  const passed = results.filter((r) => r).length;
+  const total = results.length;
+
+  console.log(`\n📊 Test Results: ${passed}/${total} tests passed`);
+
+  if (passed === total) {
+    console.log('✅ All query trace tests passed!');
+    process.exit(0);
+  } else {
+    console.log('❌ Some query trace tests failed!');
+    process.exit(1);
+  }
+}
+
+runTests();
@@ -0,0 +1,126 @@
+/**
+ * Recurring Invoice Tests
+ * Tests the recurrence schedule and the generated invoices without a database
+ */
+
+require('module-alias/register');
+const assert = require('assert');
+const path = require('path');
+
+const { runFrom, firstRun, dueRuns, occurrence } = require(
+  path.join(__dirname, '../src/middlewares/recurring/schedule')
+);
+
+const day = (month, date) => new Date(2024, month, date);
+
+// Test 1: Runs are counted from the invoice date and start today at the earliest
+function testRunFrom() {
+  try {
+    assert.deepStrictEqual(runFrom(day(0, 31), 'monthly', day(1, 10)), day(1, 29), 'month end');
+    assert.deepStrictEqual(runFrom(day(0, 31), 'monthly', day(2, 1)), day(2, 31), 'not Mar 29');
+    assert.deepStrictEqual(runFrom(day(0, 15), 'quarter', day(0, 16)), day(3, 15), 'quarter');
+    assert.deepStrictEqual(runFrom(day(0, 1), 'weekly', day(0, 1)), day(0, 8), 'after the date');
+    assert.strictEqual(runFrom(day(0, 1), 'hourly', day(0, 1)), null, 'unknown recurrence');
+    assert.deepStrictEqual(
+      firstRun(day(0, 10), 'monthly', new Date(2024, 3, 10, 15)),
+      day(3, 10),
+      'a run due today is not skipped'
+    );
+    assert.deepStrictEqual(firstRun(day(0, 10), 'annually', day(0, 10)), new Date(2025, 0, 10));
+    console.log('✅ Test 1: Recurrence schedule passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 1: Recurrence schedule failed:', error.message);
+    return false;
+  }
+}
+
+// Test 2: A pass owes every missed run, up to a limit, and moves nextRun past them
+function testDueRuns() {
+  try {
+    const source = { date: day(0, 31), nextRun: day(1, 29), recurring: 'monthly' };
+    const { runs, nextRun } = dueRuns(source, day(4, 1));
+    assert.deepStrictEqual(runs, [day(1, 29), day(2, 31), day(3, 30)], 'missed runs');
+    assert.deepStrictEqual(nextRun, day(4, 31), 'next run after now');
+
+    const limited = dueRuns(source, day(4, 1), 2);
+    assert.strictEqual(limited.runs.length, 2, 'at most max runs per pass');
+    assert.deepStrictEqual(limited.nextRun, day(3, 30), 'the rest is still due');
+
+    assert.deepStrictEqual(dueRuns(source, day(1, 28)).runs, [], 'not due yet');
+    assert.deepStrictEqual(dueRuns({ ...source, recurring: 'hourly' }, day(4, 1)), {
+      runs: [],
+      nextRun: null,
+    });
+    console.log('✅ Test 2: Due runs passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 2: Due runs failed:', error.message);
+    return false;
+  }
+}
+
+// Test 3: Generated invoices copy the source with recomputed totals and the same term
+function testOccurrence() {
+  try {
+    const source = {
+      _id: 'source',
+      createdBy: 'admin',
+      client: 'client',
+      date: day(0, 10),
+      expiredDate: day(0, 24),
+      recurring: 'monthly',
+      items: [
+        { itemName: 'Retainer', quantity: 3, price: 10.5, total: 0 },
+        { itemName: 'Hosting', quantity: 1, price: 20, total: 20 },
+      ],
+      taxRate: 10,
+      currency: 'USD',
+      credit: 30,
+      paymentStatus: 'partially',
+      status: 'sent',
+    };
+    const invoice = occurrence(source, day(1, 10), 42);
+    assert.strictEqual(invoice.number, 42);
+    assert.strictEqual(invoice.year, 2024);
+    assert.deepStrictEqual(invoice.expiredDate, day(1, 24), 'same payment term');
+    assert.deepStrictEqual(
+      [invoice.items[0].total, invoice.subTotal, invoice.taxTotal, invoice.total],
+      [31.5, 51.5, 5.15, 56.65]
+    );
+    assert.strictEqual(invoice.credit, 0, 'nothing paid yet');
+    assert.strictEqual(invoice.paymentStatus, 'unpaid');
+    assert.strictEqual(invoice.status, 'draft');
+    assert.strictEqual(invoice.recurring, undefined, 'generated invoices do not recur');
+    assert.strictEqual(invoice.recurrenceOf, 'source');
+    assert.deepStrictEqual(invoice.recurrenceRun, day(1, 10));
+    assert.strictEqual(invoice.pdf, `invoice-${invoice._id}.pdf`);
+    console.log('✅ Test 3: Generated invoice passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 3: Generated invoice failed:', error.message);
+    return false;
+  }
+}
+
+// Run all tests
+function runTests() {
+  console.log('🧪 Running Recurring Invoice Tests...\n');
+
+  const results = [testRunFrom(), testDueRuns(), testOccurrence()];
+
+  const passed = results.filter((r) => r).length;
+  const total = results.length;
+
+  console.log(`\n📊 Test Results: ${passed}/${total} tests passed`);
+
+  if (passed === total) {
+    console.log('✅ All recurring invoice tests passed!');
+    process.exit(0);
+  } else {
+    console.log('❌ Some recurring invoice tests failed!');
+    process.exit(1);
+  }
+}
+
+runTests();
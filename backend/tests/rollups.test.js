@@ -0,0 +1,269 @@
+/**
+ * Rollup Tests
+ * Tests the daily bucket arithmetic of the invoice and payment rollups without a database
+ */
+
+const assert = require('assert');
+const path = require('path');
+
+const {
+  dayOf,
+  changes,
+  afterUpdate,
+  summarizeInvoices,
+  series,
+  parseRange,
+} = require(path.join(__dirname, '../src/middlewares/rollups/buckets'));
+
+const invoice = (fields) => ({
+  removed: false,
+  date: new Date(2024, 2, 10, 15, 30),
+  expiredDate: new Date(2024, 3, 9),
+  status: 'sent',
+  paymentStatus: 'unpaid',
+  currency: 'USD',
+  total: 100,
+  credit: 0,
+  discount: 0,
+  ...fields,
+});
+
+// Test 1: A write moves an invoice between buckets by its difference only
+function testChanges() {
+  try {
+    const created = changes('invoice', [[null, invoice()]]);
+    assert.strictEqual(created.length, 1, 'a new invoice adds to one bucket');
+    assert.deepStrictEqual(created[0].key.day, new Date(2024, 2, 10), 'bucketed by day');
+    assert.deepStrictEqual(
+      created[0].inc,
+      { count: 1, total: 100, 'expiring.2024-04-09': 1 },
+      'zero increments are left out'
+    );
+
+    const paid = changes('invoice', [
+      [invoice(), invoice({ credit: 40, paymentStatus: 'partially' })],
+    ]);
+    assert.strictEqual(paid.length, 2, 'a paymentStatus change moves the invoice');
+    const [from, to] = paid;
+    assert.strictEqual(from.key.paymentStatus, 'unpaid', 'taken out of the unpaid bucket');
+    assert.deepStrictEqual(from.inc, { count: -1, total: -100, 'expiring.2024-04-09': -1 });
+    assert.deepStrictEqual(to.inc, { count: 1, total: 100, credit: 40, 'expiring.2024-04-09': 1 });
+
+    const more = changes('invoice', [
+      [
+        invoice({ credit: 40, paymentStatus: 'partially' }),
+        invoice({ credit: 60, paymentStatus: 'partially' }),
+      ],
+    ]);
+    assert.deepStrictEqual(more.map(({ inc }) => inc), [{ credit: 20 }], 'same bucket: credit');
+
+    assert.deepStrictEqual(changes('invoice', [[invoice(), invoice()]]), [], 'no-op write');
+    assert.deepStrictEqual(
+      changes('invoice', [[invoice(), null]])[0].inc.count,
+      -1,
+      'a removed invoice leaves its bucket'
+    );
+    assert.deepStrictEqual(changes('invoice', [[null, invoice({ removed: true })]]), []);
+
+    const payments = changes('payment', [
+      [{ date: new Date(2024, 2, 1), amount: 30, currency: 'USD' }, null],
+      [{ date: new Date(2024, 2, 1, 18), amount: 20, currency: 'USD' }, null],
+    ]);
+    assert.strictEqual(payments.length, 1, 'payments of one day share a bucket');
+    assert.deepStrictEqual(payments[0].inc, { count: -2, total: -50 });
+    assert.strictEqual(payments[0].key.status, null, 'payments have no status');
+    console.log('✅ Test 1: Bucket changes passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 1: Bucket changes failed:', error.message);
+    return false;
+  }
+}
+
+// Test 2: Summaries add up buckets, overdue from the expiry days before today
+function testSummary() {
+  try {
+    const buckets = [
+      {
+        day: dayOf(new Date(2024, 2, 1)),
+        status: 'sent',
+        paymentStatus: 'unpaid',
+        count: 3,
+        total: 300,
+        credit: 0,
+        expiring: new Map([
+          ['2024-03-31', 2],
+          ['2024-04-20', 1],
+        ]),
+      },
+      {
+        day: dayOf(new Date(2024, 2, 2)),
+        status: 'sent',
+        paymentStatus: 'partially',
+        count: 1,
+        total: 200,
+        credit: 50,
+        expiring: { '2024-04-01': 1 },
+      },
+      {
+        day: dayOf(new Date(2024, 2, 3)),
+        status: 'draft',
+        paymentStatus: 'paid',
+        count: 1,
+        total: 80,
+        credit: 80,
+        expiring: { '2024-03-01': 1 },
+      },
+      { status: 'draft', paymentStatus: 'unpaid', count: 0, total: 0, credit: 0 },
+    ];
+    const summary = summarizeInvoices(buckets, new Date(2024, 3, 1, 12));
+    assert.strictEqual(summary.total, 580, 'total');
+    assert.strictEqual(summary.count, 5, 'count');
+    assert.strictEqual(summary.undue, 450, 'unpaid and partially minus credit');
+    assert.strictEqual(summary.overdue, 3, 'expired before today, not today');
+    assert.deepStrictEqual(summary.statusCounts, [
+      { status: 'sent', count: 4 },
+      { status: 'draft', count: 1 },
+    ]);
+    assert.deepStrictEqual(
+      summary.paymentStatusCounts.map(({ status }) => status),
+      ['unpaid', 'partially', 'paid'],
+      'counts per paymentStatus'
+    );
+    console.log('✅ Test 2: Invoice summary passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 2: Invoice summary failed:', error.message);
+    return false;
+  }
+}
+
+// Test 3: Revenue series have one point per period, empty periods included
+function testSeries() {
+  try {
+    const buckets = [
+      { day: dayOf(new Date(2024, 0, 5)), count: 2, total: 100, credit: 10 },
+      { day: dayOf(new Date(2024, 0, 20)), count: 1, total: 50, credit: 0 },
+      { day: dayOf(new Date(2024, 2, 1)), count: 1, total: 70, credit: 70 },
+    ];
+    const points = series(buckets, new Date(2024, 0, 1), new Date(2024, 2, 31, 23), 'month');
+    assert.deepStrictEqual(
+      points.map(({ count, total, credit }) => [count, total, credit]),
+      [
+        [3, 150, 10],
+        [0, 0, 0],
+        [1, 70, 70],
+      ]
+    );
+    assert.deepStrictEqual(points[1].date, new Date(2024, 1, 1), 'periods start on their day');
+    assert.strictEqual(
+      series(buckets, new Date(2024, 0, 1), new Date(2024, 0, 31), 'day').length,
+      31,
+      'one point per day'
+    );
+    console.log('✅ Test 3: Revenue series passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 3: Revenue series failed:', error.message);
+    return false;
+  }
+}
+
+// Test 4: Revenue ranges default to the last 30 days and are bounded
+function testRange() {
+  try {
+    const now = new Date(2024, 5, 30, 10);
+    const range = parseRange({}, now);
+    assert.strictEqual(range.interval, 'day', 'daily by default');
+    assert.deepStrictEqual(range.from, new Date(2024, 5, 1), 'last 30 days');
+    assert.deepStrictEqual(range.to, new Date(2024, 5, 30, 23, 59, 59, 999), 'until today');
+    const months = parseRange({ from: '2023-01-01', to: '2023-12-31', interval: 'month' });
+    assert.deepStrictEqual(months.from, new Date(2023, 0, 1), 'from the given day');
+    assert(parseRange({ interval: 'hour' }).error, 'unknown interval');
+    assert(parseRange({ from: '2024-02-30' }).error, 'invalid date');
+    assert(parseRange({ from: '2024-03-01', to: '2024-02-01' }).error, 'reversed range');
+    assert(parseRange({ from: '2000-01-01', to: '2024-01-01' }).error, 'too many points');
+    console.log('✅ Test 4: Revenue ranges passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 4: Revenue ranges failed:', error.message);
+    return false;
+  }
+}
+
+// Test 5: The document after a write is derived from the image the write returned
+function testAfterUpdate() {
+  try {
+    const before = invoice({ credit: 40, paymentStatus: 'partially', recurring: 'monthly' });
+    const after = afterUpdate(before, {
+      $push: { payment: 'p2' },
+      $inc: { credit: 60 },
+      $set: { paymentStatus: 'paid' },
+    });
+    assert.strictEqual(after.credit, 100, '$inc applies to the pre-image');
+    assert.strictEqual(after.paymentStatus, 'paid', '$set applies');
+    assert.strictEqual(before.credit, 40, 'the pre-image is left as it was');
+    const edited = afterUpdate(before, { total: 120, $unset: { recurring: 1 } });
+    assert.strictEqual(edited.total, 120, 'plain fields are set');
+    assert.strictEqual(edited.recurring, undefined, '$unset removes');
+    const skipped = afterUpdate(before, { $set: { total: undefined } });
+    assert.strictEqual(skipped.total, 100, 'undefined is not written');
+    assert.strictEqual(afterUpdate(null, { $set: { total: 1 } }), null, 'nothing matched');
+
+    // two concurrent payments: each diff starts from what its own write found
+    const first = invoice();
+    const second = afterUpdate(first, {
+      $inc: { credit: 30 },
+      $set: { paymentStatus: 'partially' },
+    });
+    const last = afterUpdate(second, { $inc: { credit: 70 }, $set: { paymentStatus: 'paid' } });
+    const buckets = {};
+    changes('invoice', [
+      [first, second],
+      [second, last],
+    ]).forEach(({ key, inc }) => {
+      buckets[key.paymentStatus] = inc;
+    });
+    assert.deepStrictEqual(buckets.unpaid.count, -1, 'left unpaid once');
+    assert.deepStrictEqual(buckets.paid, {
+      count: 1,
+      total: 100,
+      credit: 100,
+      'expiring.2024-04-09': 1,
+    });
+    assert.strictEqual(buckets.partially, undefined, 'passed through partially');
+    console.log('✅ Test 5: After update passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 5: After update failed:', error.message);
+    return false;
+  }
+}
+
+// Run all tests
+function runTests() {
+  console.log('🧪 Running Rollup Tests...\n');
+
+  const results = [
+    testChanges(),
+    testSummary(),
+    testSeries(),
+    testRange(),
+    testAfterUpdate(),
+  ];
+
+  const passed = results.filter((r) => r).length;
+  const total = results.length;
+
+  console.log(`\n📊 Test Results: ${passed}/${total} tests passed`);
+
+  if (passed === total) {
+    console.log('✅ All rollup tests passed!');
+    process.exit(0);
+  } else {
+    console.log('❌ Some rollup tests failed!');
+    process.exit(1);
+  }
+}
+
+runTests();
@@ -8,7 +8,15 @@ const path = require('path');
 
 const tests = [
   path.join(__dirname, 'validation.test.js'),
-  path.join(__dirname, 'health.test.js')
+  path.join(__dirname, 'health.test.js'),
+  path.join(__dirname, 'profiler.test.js'),
+  path.join(__dirname, 'queryTrace.test.js'),
+  path.join(__dirname, 'startup.test.js'),
+  path.join(__dirname, 'rollups.test.js'),
+  path.join(__dirname, 'recurring.test.js'),
+  path.join(__dirname, 'bulkImport.test.js'),
+  path.join(__dirname, 'projection.test.js'),
+  path.join(__dirname, 'admission.test.js')
 ];
 
 let passed = 0;
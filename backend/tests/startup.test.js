@@ -0,0 +1,148 @@
+/**
+ * Startup Tests
+ * Tests the module manifest, readiness phases and lazily loaded upload middleware
+ */
+
+const assert = require('assert');
+const fs = require('fs');
+const path = require('path');
+
+const manifestModule = path.join(__dirname, '../src/setup/manifest');
+const manifest = require(manifestModule);
+const readiness = require(path.join(__dirname, '../src/handlers/readinessHandler'));
+
+const listDirectory = (relative) => fs.readdirSync(path.join(__dirname, '../src', relative));
+
+// Test 1: The manifest lists what the globs used to find
+function testBuildManifest() {
+  try {
+    const built = manifest.buildManifest();
+    const appModels = listDirectory('models/appModels').map((file) => `models/appModels/${file}`);
+    assert.deepStrictEqual(built.appModels, appModels.sort(), 'every app model should be listed');
+    assert(built.models.includes('models/coreModels/Admin.js'), 'core models should be listed');
+    assert(built.models.includes('models/utils/index.js'), 'nested files should be listed');
+    const controllers = listDirectory('controllers/appControllers').filter((name) =>
+      name.endsWith('Controller')
+    );
+    assert.deepStrictEqual(built.appControllers, controllers.sort(), 'controller directories');
+    assert.strictEqual(
+      built.defaultSettings.length,
+      listDirectory('setup/defaultSettings').length,
+      'every default settings file should be listed'
+    );
+    assert(fs.existsSync(manifest.resolve(built.models[0])), 'entries should resolve to files');
+    console.log('✅ Test 1: Manifest build passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 1: Manifest build failed:', error.message);
+    return false;
+  }
+}
+
+// Test 2: A written manifest is what the server loads, and it is not stale
+function testLoadManifest() {
+  const existed = fs.existsSync(manifest.MANIFEST_PATH);
+  try {
+    if (!existed) {
+      manifest.writeManifest();
+    }
+    delete require.cache[require.resolve(manifestModule)];
+    const fresh = require(manifestModule);
+    const written = JSON.parse(fs.readFileSync(manifest.MANIFEST_PATH, 'utf-8'));
+    assert.deepStrictEqual(fresh.loadManifest(), written, 'the written manifest should be used');
+    assert.deepStrictEqual(
+      written,
+      fresh.buildManifest(),
+      'manifest.json is stale, run npm run manifest'
+    );
+    console.log('✅ Test 2: Manifest load passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 2: Manifest load failed:', error.message);
+    return false;
+  } finally {
+    if (!existed && fs.existsSync(manifest.MANIFEST_PATH)) {
+      fs.unlinkSync(manifest.MANIFEST_PATH);
+    }
+  }
+}
+
+// Test 3: Not ready until every phase is done
+function testReadiness() {
+  const answer = () => {
+    const res = {
+      status(code) {
+        this.code = code;
+        return this;
+      },
+      json(body) {
+        this.body = body;
+        return this;
+      },
+    };
+    return readiness.status({}, res);
+  };
+  try {
+    readiness.reset();
+    readiness.PHASES.slice(0, -1).forEach((phase) => readiness.mark(phase));
+    let res = answer();
+    assert.strictEqual(res.code, 503, 'should not be ready with a phase pending');
+    assert.deepStrictEqual(res.body.pending, readiness.PHASES.slice(-1), 'pending phases');
+    assert.strictEqual(res.body.startupMs, null, 'no startup time before ready');
+    readiness.mark(readiness.PHASES[readiness.PHASES.length - 1]);
+    res = answer();
+    assert.strictEqual(res.code, 200, 'should be ready once every phase is done');
+    assert.strictEqual(res.body.status, 'ready', 'status should be ready');
+    assert(res.body.startupMs > 0, 'startup time should be reported');
+    console.log('✅ Test 3: Readiness passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 3: Readiness failed:', error.message);
+    return false;
+  } finally {
+    readiness.reset();
+  }
+}
+
+// Test 4: Upload routes are built without loading multer
+function testLazyUpload() {
+  try {
+    const { singleStorageUpload } = require(path.join(
+      __dirname,
+      '../src/middlewares/uploadMiddleware'
+    ));
+    const middleware = singleStorageUpload({ entity: 'setting', fileType: 'image' });
+    assert.strictEqual(typeof middleware, 'function', 'should return a middleware');
+    const loaded = Object.keys(require.cache).filter((file) =>
+      file.includes(`${path.sep}node_modules${path.sep}multer${path.sep}`)
+    );
+    assert.deepStrictEqual(loaded, [], 'multer should wait for the first upload');
+    console.log('✅ Test 4: Lazy upload middleware passed');
+    return true;
+  } catch (error) {
+    console.error('❌ Test 4: Lazy upload middleware failed:', error.message);
+    return false;
+  }
+}
+
+// Run all tests
+function runTests() {
+  console.log('🧪 Running Startup Tests...\n');
+
+  const results = [testBuildManifest(), testLoadManifest(), testReadiness(), testLazyUpload()];
+
+  const passed = results.filter((r) => r).length;
+  const total = results.length;
+
+  console.log(`\n📊 Test Results: ${passed}/${total} tests passed`);
+
+  if (passed === total) {
+    console.log('✅ All startup tests passed!');
+    process.exit(0);
+  } else {
+    console.log('❌ Some startup tests failed!');
+    process.exit(1);
+  }
+}
+
+runTests();
@@ -16,7 +16,7 @@ import { useSelector, useDispatch } from 'react-redux';
 import { crud } from '@/redux/crud/actions';
 import { selectListItems } from '@/redux/crud/selectors';
 import useLanguage from '@/locale/useLanguage';
-import { dataForTable } from '@/utils/dataStructure';
+import { dataForTable, selectForTable } from '@/utils/dataStructure';
 import { useMoney, useDate } from '@/settings';
 
 import { generate as uniqueId } from 'shortid';
@@ -41,6 +41,7 @@ function AddNewItem({ config }) {
 }
 export default function DataTable({ config, extra = [] }) {
   let { entity, dataTableColumns, DATATABLE_TITLE, fields, searchConfig } = config;
+  const { readColumns = [], dataTableSelect = [] } = config;
   const { crudContextAction } = useCrudContext();
   const { panel, collapsedBox, modal, readBox, editBox, advancedBox } = crudContextAction;
   const translate = useLanguage();
@@ -103,6 +104,12 @@ export default function DataTable({ config, extra = [] }) {
     dispatchColumns = [...dataTableColumns];
   }
 
+  // rows are only shown, read and edited through these columns: load just their fields
+  const select = selectForTable({
+    columns: [...dispatchColumns, ...readColumns],
+    extra: dataTableSelect,
+  });
+
   dataTableColumns = [
     ...dispatchColumns,
     {
@@ -153,18 +160,18 @@ export default function DataTable({ config, extra = [] }) {
   const dispatch = useDispatch();
 
   const handelDataTableLoad = useCallback((pagination) => {
-    const options = { page: pagination.current || 1, items: pagination.pageSize || 10 };
+    const options = { page: pagination.current || 1, items: pagination.pageSize || 10, select };
     dispatch(crud.list({ entity, options }));
   }, []);
 
   const filterTable = (e) => {
     const value = e.target.value;
-    const options = { q: value, fields: searchConfig?.searchFields || '' };
+    const options = { q: value, fields: searchConfig?.searchFields || '', select };
     dispatch(crud.list({ entity, options }));
   };
 
   const dispatcher = () => {
-    dispatch(crud.list({ entity }));
+    dispatch(crud.list({ entity, options: { page: 1, items: 10, select } }));
   };
 
   useEffect(() => {
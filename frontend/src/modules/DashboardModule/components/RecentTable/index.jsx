@@ -1,8 +1,5 @@
 import { Dropdown, Table } from 'antd';
 
-import { request } from '@/request';
-import useFetch from '@/hooks/useFetch';
-
 import { EllipsisOutlined, EyeOutlined, EditOutlined, FilePdfOutlined } from '@ant-design/icons';
 import { useDispatch } from 'react-redux';
 import { erp } from '@/redux/erp/actions';
@@ -12,7 +9,7 @@ import { DOWNLOAD_BASE_URL } from '@/config/serverApiConfig';
 
 export default function RecentTable({ ...props }) {
   const translate = useLanguage();
-  let { entity, dataTableColumns } = props;
+  let { entity, dataTableColumns, result, isLoading } = props;
 
   const items = [
     {
@@ -84,12 +81,8 @@ export default function RecentTable({ ...props }) {
     },
   ];
 
-  const asyncList = () => {
-    return request.list({ entity });
-  };
-  const { result, isLoading, isSuccess } = useFetch(asyncList);
   const firstFiveItems = () => {
-    if (isSuccess && result) return result.slice(0, 5);
+    if (Array.isArray(result)) return result.slice(0, 5);
     return [];
   };
 
@@ -97,7 +90,7 @@ export default function RecentTable({ ...props }) {
     <Table
       columns={dataTableColumns}
       rowKey={(item) => item._id}
-      dataSource={isSuccess && firstFiveItems()}
+      dataSource={firstFiveItems()}
       pagination={false}
       loading={isLoading}
       scroll={{ x: true }}
@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react';
+import { useEffect } from 'react';
 
 import { Tag, Row, Col } from 'antd';
 import useLanguage from '@/locale/useLanguage';
@@ -6,7 +6,6 @@ import useLanguage from '@/locale/useLanguage';
 import { useMoney } from '@/settings';
 
 import { request } from '@/request';
-import useFetch from '@/hooks/useFetch';
 import useOnFetch from '@/hooks/useOnFetch';
 
 import RecentTable from './components/RecentTable';
@@ -23,41 +22,40 @@ export default function DashboardModule() {
   const { moneyFormatter } = useMoney();
   const money_format_settings = useSelector(selectMoneyFormat);
 
-  const getStatsData = async ({ entity, currency }) => {
-    return await request.summary({
-      entity,
-      options: { currency },
-    });
-  };
-
-  const {
-    result: invoiceResult,
-    isLoading: invoiceLoading,
-    onFetch: fetchInvoicesStats,
-  } = useOnFetch();
-
-  const { result: quoteResult, isLoading: quoteLoading, onFetch: fetchQuotesStats } = useOnFetch();
-
-  const {
-    result: paymentResult,
-    isLoading: paymentLoading,
-    onFetch: fetchPayemntsStats,
-  } = useOnFetch();
-
-  const { result: clientResult, isLoading: clientLoading } = useFetch(() =>
-    request.summary({ entity: 'client' })
-  );
+  // every dashboard widget is loaded through a single /batch round trip
+  const { result: batchResult, isLoading, onFetch: fetchDashboard } = useOnFetch();
 
   useEffect(() => {
     const currency = money_format_settings.default_currency_code || null;
 
     if (currency) {
-      fetchInvoicesStats(getStatsData({ entity: 'invoice', currency }));
-      fetchQuotesStats(getStatsData({ entity: 'quote', currency }));
-      fetchPayemntsStats(getStatsData({ entity: 'payment', currency }));
+      fetchDashboard(
+        request.batch({
+          requests: [
+            { id: 'invoice', url: `invoice/summary?currency=${currency}` },
+            { id: 'quote', url: `quote/summary?currency=${currency}` },
+            { id: 'payment', url: `payment/summary?currency=${currency}` },
+            { id: 'client', url: 'client/summary' },
+            { id: 'recentInvoices', url: 'invoice/list' },
+            { id: 'recentQuotes', url: 'quote/list' },
+          ],
+        })
+      );
     }
   }, [money_format_settings.default_currency_code]);
 
+  const dashboard = {};
+  (Array.isArray(batchResult) ? batchResult : []).forEach(({ id, body }) => {
+    dashboard[id] = body?.result;
+  });
+
+  const {
+    invoice: invoiceResult,
+    quote: quoteResult,
+    payment: paymentResult,
+    client: clientResult,
+  } = dashboard;
+
   const dataTableColumns = [
     {
       title: translate('number'),
@@ -91,13 +89,13 @@ export default function DashboardModule() {
   const entityData = [
     {
       result: invoiceResult,
-      isLoading: invoiceLoading,
+      isLoading,
       entity: 'invoice',
       title: translate('Invoices'),
     },
     {
       result: quoteResult,
-      isLoading: quoteLoading,
+      isLoading,
       entity: 'quote',
       title: translate('quote'),
     },
@@ -131,25 +129,25 @@ export default function DashboardModule() {
           <SummaryCard
             title={translate('Invoices')}
             prefix={translate('This month')}
-            isLoading={invoiceLoading}
+            isLoading={isLoading}
             data={invoiceResult?.total}
           />
           <SummaryCard
             title={translate('Quote')}
             prefix={translate('This month')}
-            isLoading={quoteLoading}
+            isLoading={isLoading}
             data={quoteResult?.total}
           />
           <SummaryCard
             title={translate('paid')}
             prefix={translate('This month')}
-            isLoading={paymentLoading}
+            isLoading={isLoading}
             data={paymentResult?.total}
           />
           <SummaryCard
             title={translate('Unpaid')}
             prefix={translate('Not Paid')}
-            isLoading={invoiceLoading}
+            isLoading={isLoading}
             data={invoiceResult?.total_undue}
           />
         </Row>
@@ -164,7 +162,7 @@ export default function DashboardModule() {
           </Col>
           <Col className="gutter-row w-full" sm={{ span: 24 }} md={{ span: 24 }} lg={{ span: 6 }}>
             <CustomerPreviewCard
-              isLoading={clientLoading}
+              isLoading={isLoading}
               activeCustomer={clientResult?.active}
               newCustomer={clientResult?.new}
             />
@@ -178,7 +176,12 @@ export default function DashboardModule() {
                 {translate('Recent Invoices')}
               </h3>
 
-              <RecentTable entity={'invoice'} dataTableColumns={dataTableColumns} />
+              <RecentTable
+                entity={'invoice'}
+                dataTableColumns={dataTableColumns}
+                result={dashboard.recentInvoices}
+                isLoading={isLoading}
+              />
             </div>
           </Col>
 
@@ -187,7 +190,12 @@ export default function DashboardModule() {
               <h3 style={{ color: '#22075e', marginBottom: 5, padding: '0 20px 20px' }}>
                 {translate('Recent Quotes')}
               </h3>
-              <RecentTable entity={'quote'} dataTableColumns={dataTableColumns} />
+              <RecentTable
+                entity={'quote'}
+                dataTableColumns={dataTableColumns}
+                result={dashboard.recentQuotes}
+                isLoading={isLoading}
+              />
             </div>
           </Col>
         </Row>
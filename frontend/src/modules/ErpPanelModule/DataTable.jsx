@@ -19,6 +19,7 @@ import useLanguage from '@/locale/useLanguage';
 import { erp } from '@/redux/erp/actions';
 import { selectListItems } from '@/redux/erp/selectors';
 import { useErpContext } from '@/context/erp';
+import { selectForTable } from '@/utils/dataStructure';
 import { generate as uniqueId } from 'shortid';
 import { useNavigate } from 'react-router-dom';
 
@@ -42,6 +43,7 @@ function AddNewItem({ config }) {
 export default function DataTable({ config, extra = [] }) {
   const translate = useLanguage();
   let { entity, dataTableColumns, disableAdd = false, searchConfig } = config;
+  const { dataTableSelect = [] } = config;
 
   const { DATATABLE_TITLE } = config;
 
@@ -105,6 +107,9 @@ export default function DataTable({ config, extra = [] }) {
     navigate(`/invoice/pay/${record._id}`);
   };
 
+  // rows only feed the columns, read and edit pages load the whole document
+  const select = selectForTable({ columns: dataTableColumns, extra: dataTableSelect });
+
   dataTableColumns = [
     ...dataTableColumns,
     {
@@ -152,12 +157,12 @@ export default function DataTable({ config, extra = [] }) {
   const dispatch = useDispatch();
 
   const handelDataTableLoad = (pagination) => {
-    const options = { page: pagination.current || 1, items: pagination.pageSize || 10 };
+    const options = { page: pagination.current || 1, items: pagination.pageSize || 10, select };
     dispatch(erp.list({ entity, options }));
   };
 
   const dispatcher = () => {
-    dispatch(erp.list({ entity }));
+    dispatch(erp.list({ entity, options: { page: 1, items: 10, select } }));
   };
 
   useEffect(() => {
@@ -169,7 +174,7 @@ export default function DataTable({ config, extra = [] }) {
   }, []);
 
   const filterTable = (value) => {
-    const options = { equal: value, filter: searchConfig?.entity };
+    const options = { equal: value, filter: searchConfig?.entity, select };
     dispatch(erp.list({ entity, options }));
   };
 
@@ -2,7 +2,7 @@ import { ErpLayout } from '@/layout';
 
 import PageLoader from '@/components/PageLoader';
 import { erp } from '@/redux/erp/actions';
-import { selectItemById, selectCurrentItem, selectRecordPaymentItem } from '@/redux/erp/selectors';
+import { selectReadItem } from '@/redux/erp/selectors';
 import { useEffect } from 'react';
 import { useDispatch, useSelector } from 'react-redux';
 import { useParams } from 'react-router-dom';
@@ -12,18 +12,13 @@ export default function RecordPaymentModule({ config }) {
   const dispatch = useDispatch();
   const { id } = useParams();
 
-  let item = useSelector(selectItemById(id));
-
   useEffect(() => {
-    if (item) {
-      dispatch(erp.currentItem({ data: item }));
-    } else {
-      dispatch(erp.read({ entity: config.entity, id }));
-    }
-  }, [item, id]);
+    // list rows only carry the table columns, read the whole invoice
+    dispatch(erp.read({ entity: config.entity, id }));
+  }, [id]);
 
-  const { result: currentResult } = useSelector(selectCurrentItem);
-  item = currentResult;
+  const { result: currentResult, isLoading } = useSelector(selectReadItem);
+  const item = !isLoading && currentResult?._id === id ? currentResult : null;
 
   useEffect(() => {
     dispatch(erp.currentAction({ actionType: 'recordPayment', data: item }));
@@ -31,7 +26,7 @@ export default function RecordPaymentModule({ config }) {
 
   return (
     <ErpLayout>
-      {item ? <Payment config={config} currentItem={currentResult} /> : <PageLoader />}
+      {item ? <Payment config={config} currentItem={item} /> : <PageLoader />}
     </ErpLayout>
   );
 }
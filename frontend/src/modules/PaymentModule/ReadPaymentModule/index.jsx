@@ -3,7 +3,7 @@ import ReadItem from './components/ReadItem';
 
 import PageLoader from '@/components/PageLoader';
 import { erp } from '@/redux/erp/actions';
-import { selectItemById, selectCurrentItem } from '@/redux/erp/selectors';
+import { selectReadItem } from '@/redux/erp/selectors';
 import { useEffect } from 'react';
 import { useDispatch, useSelector } from 'react-redux';
 import { useParams } from 'react-router-dom';
@@ -12,19 +12,15 @@ export default function ReadPaymentModule({ config }) {
   const dispatch = useDispatch();
 
   const { id } = useParams();
-  let item = useSelector(selectItemById(id));
 
   useEffect(() => {
-    if (item) {
-      dispatch(erp.currentItem({ data: item }));
-    } else {
-      dispatch(erp.read({ entity: config.entity, id }));
-    }
-  }, [item]);
+    // list rows only carry the table columns, read the whole payment
+    dispatch(erp.read({ entity: config.entity, id }));
+  }, [id]);
 
-  const { result: currentResult } = useSelector(selectCurrentItem);
+  const { result: currentResult, isLoading } = useSelector(selectReadItem);
 
-  item = currentResult;
+  const item = !isLoading && currentResult?._id === id ? currentResult : null;
   return (
     <ErpLayout>
       {item ? <ReadItem config={config} selectedItem={item} /> : <PageLoader />}
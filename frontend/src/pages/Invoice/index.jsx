@@ -97,6 +97,7 @@ export default function Invoice() {
   const config = {
     ...configPage,
     dataTableColumns,
+    dataTableSelect: ['currency'],
     searchConfig,
     deleteModalLabels,
   };
@@ -79,6 +79,7 @@ export default function Payment() {
     ...configPage,
     disableAdd: true,
     dataTableColumns,
+    dataTableSelect: ['currency'],
     searchConfig,
     deleteModalLabels,
   };
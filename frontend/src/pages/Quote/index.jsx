@@ -89,6 +89,7 @@ export default function Quote() {
   const config = {
     ...configPage,
     dataTableColumns,
+    dataTableSelect: ['currency'],
     searchConfig,
     deleteModalLabels,
   };
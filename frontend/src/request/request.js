@@ -4,6 +4,7 @@ import { API_BASE_URL } from '@/config/serverApiConfig';
 import errorHandler from './errorHandler';
 import successHandler from './successHandler';
 import storePersist from '@/redux/storePersist';
+import { cachedRequest, invalidate, clearCache, supersede, release } from './requestCache';
 
 function findKeyByPrefix(object, prefix) {
   for (var property in object) {
@@ -13,10 +14,19 @@ function findKeyByPrefix(object, prefix) {
   }
 }
 
+let persistedAuth = null;
+
 function includeToken() {
   axios.defaults.baseURL = API_BASE_URL;
 
   axios.defaults.withCredentials = true;
+
+  // only parse the persisted auth again when it changed (login, logout, profile update)
+  const rawAuth = window.localStorage.getItem('auth');
+  if (rawAuth === persistedAuth) return;
+  persistedAuth = rawAuth;
+  clearCache();
+
   const auth = storePersist.get('auth');
 
   if (auth) {
@@ -24,11 +34,33 @@ function includeToken() {
   }
 }
 
+function buildQuery(options) {
+  let query = '?';
+  for (var key in options) {
+    query += key + '=' + options[key] + '&';
+  }
+  return query.slice(0, -1);
+}
+
+function cachedGet(path, options = { notifyOnSuccess: false, notifyOnFailed: false }) {
+  includeToken();
+  return cachedRequest(path, async () => {
+    try {
+      const response = await axios.get(path);
+      successHandler(response, options);
+      return response.data;
+    } catch (error) {
+      return errorHandler(error);
+    }
+  });
+}
+
 const request = {
   create: async ({ entity, jsonData }) => {
     try {
       includeToken();
       const response = await axios.post(entity + '/create', jsonData);
+      invalidate(entity);
       successHandler(response, {
         notifyOnSuccess: true,
         notifyOnFailed: true,
@@ -46,6 +78,7 @@ const request = {
           'Content-Type': 'multipart/form-data',
         },
       });
+      invalidate(entity);
       successHandler(response, {
         notifyOnSuccess: true,
         notifyOnFailed: true,
@@ -56,22 +89,16 @@ const request = {
     }
   },
   read: async ({ entity, id }) => {
-    try {
-      includeToken();
-      const response = await axios.get(entity + '/read/' + id);
-      successHandler(response, {
-        notifyOnSuccess: false,
-        notifyOnFailed: true,
-      });
-      return response.data;
-    } catch (error) {
-      return errorHandler(error);
-    }
+    return cachedGet(entity + '/read/' + id, {
+      notifyOnSuccess: false,
+      notifyOnFailed: true,
+    });
   },
   update: async ({ entity, id, jsonData }) => {
     try {
       includeToken();
       const response = await axios.patch(entity + '/update/' + id, jsonData);
+      invalidate(entity);
       successHandler(response, {
         notifyOnSuccess: true,
         notifyOnFailed: true,
@@ -89,6 +116,7 @@ const request = {
           'Content-Type': 'multipart/form-data',
         },
       });
+      invalidate(entity);
       successHandler(response, {
         notifyOnSuccess: true,
         notifyOnFailed: true,
@@ -103,6 +131,7 @@ const request = {
     try {
       includeToken();
       const response = await axios.delete(entity + '/delete/' + id);
+      invalidate(entity);
       successHandler(response, {
         notifyOnSuccess: true,
         notifyOnFailed: true,
@@ -114,89 +143,53 @@ const request = {
   },
 
   filter: async ({ entity, options = {} }) => {
-    try {
-      includeToken();
-      let filter = options.filter ? 'filter=' + options.filter : '';
-      let equal = options.equal ? '&equal=' + options.equal : '';
-      let query = `?${filter}${equal}`;
+    let filter = options.filter ? 'filter=' + options.filter : '';
+    let equal = options.equal ? '&equal=' + options.equal : '';
+    let query = `?${filter}${equal}`;
 
-      const response = await axios.get(entity + '/filter' + query);
-      successHandler(response, {
-        notifyOnSuccess: false,
-        notifyOnFailed: false,
-      });
-      return response.data;
-    } catch (error) {
-      return errorHandler(error);
-    }
+    return cachedGet(entity + '/filter' + query);
   },
 
   search: async ({ entity, options = {} }) => {
-    try {
-      includeToken();
-      let query = '?';
-      for (var key in options) {
-        query += key + '=' + options[key] + '&';
-      }
-      query = query.slice(0, -1);
-      // headersInstance.cancelToken = source.token;
-      const response = await axios.get(entity + '/search' + query);
+    includeToken();
+    const path = entity + '/search' + buildQuery(options);
+    const channel = entity + '/search';
 
-      successHandler(response, {
-        notifyOnSuccess: false,
-        notifyOnFailed: false,
-      });
-      return response.data;
-    } catch (error) {
-      return errorHandler(error);
-    }
-  },
+    return cachedRequest(path, async () => {
+      // only a search that goes out aborts the previous one for the same entity: a cache
+      // hit aborts nothing, and an identical search joins this request and its signal
+      const signal = supersede(channel);
+      try {
+        const response = await axios.get(path, { signal });
 
-  list: async ({ entity, options = {} }) => {
-    try {
-      includeToken();
-      let query = '?';
-      for (var key in options) {
-        query += key + '=' + options[key] + '&';
+        successHandler(response, {
+          notifyOnSuccess: false,
+          notifyOnFailed: false,
+        });
+        return response.data;
+      } catch (error) {
+        if (axios.isCancel(error)) {
+          return { success: false, result: [], message: 'Search superseded' };
+        }
+        return errorHandler(error);
+      } finally {
+        release(channel, signal);
       }
-      query = query.slice(0, -1);
-
-      const response = await axios.get(entity + '/list' + query);
+    });
+  },
 
-      successHandler(response, {
-        notifyOnSuccess: false,
-        notifyOnFailed: false,
-      });
-      return response.data;
-    } catch (error) {
-      return errorHandler(error);
-    }
+  list: async ({ entity, options = {} }) => {
+    return cachedGet(entity + '/list' + buildQuery(options));
   },
   listAll: async ({ entity, options = {} }) => {
-    try {
-      includeToken();
-      let query = '?';
-      for (var key in options) {
-        query += key + '=' + options[key] + '&';
-      }
-      query = query.slice(0, -1);
-
-      const response = await axios.get(entity + '/listAll' + query);
-
-      successHandler(response, {
-        notifyOnSuccess: false,
-        notifyOnFailed: false,
-      });
-      return response.data;
-    } catch (error) {
-      return errorHandler(error);
-    }
+    return cachedGet(entity + '/listAll' + buildQuery(options));
   },
 
   post: async ({ entity, jsonData }) => {
     try {
       includeToken();
       const response = await axios.post(entity, jsonData);
+      invalidate(entity);
 
       return response.data;
     } catch (error) {
@@ -216,6 +209,7 @@ const request = {
     try {
       includeToken();
       const response = await axios.patch(entity, jsonData);
+      invalidate(entity);
       successHandler(response, {
         notifyOnSuccess: true,
         notifyOnFailed: true,
@@ -234,6 +228,7 @@ const request = {
           'Content-Type': 'multipart/form-data',
         },
       });
+      invalidate(entity);
       successHandler(response, {
         notifyOnSuccess: true,
         notifyOnFailed: true,
@@ -251,20 +246,17 @@ const request = {
   },
 
   summary: async ({ entity, options = {} }) => {
+    return cachedGet(entity + '/summary' + buildQuery(options));
+  },
+
+  batch: async ({ requests }) => {
     try {
       includeToken();
-      let query = '?';
-      for (var key in options) {
-        query += key + '=' + options[key] + '&';
-      }
-      query = query.slice(0, -1);
-      const response = await axios.get(entity + '/summary' + query);
-
+      const response = await axios.post('batch', { requests });
       successHandler(response, {
         notifyOnSuccess: false,
         notifyOnFailed: false,
       });
-
       return response.data;
     } catch (error) {
       return errorHandler(error);
@@ -289,6 +281,7 @@ const request = {
     try {
       includeToken();
       const response = await axios.get(`${entity}/convert/${id}`);
+      invalidate(entity);
       successHandler(response, {
         notifyOnSuccess: true,
         notifyOnFailed: true,
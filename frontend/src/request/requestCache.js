@@ -0,0 +1,80 @@
+// Keyed stale-while-revalidate cache with in-flight deduplication for GET requests.
+// Entries younger than FRESH_TTL are returned as is, entries younger than
+// STALE_TTL are returned immediately while a background request refreshes them.
+const FRESH_TTL = 10 * 1000;
+const STALE_TTL = 60 * 1000;
+
+// Mutating an entity also changes what these entities return (populated fields,
+// payment status, converted quotes...)
+const relatedEntities = {
+  client: ['invoice', 'quote', 'payment'],
+  invoice: ['payment', 'client'],
+  payment: ['invoice'],
+  quote: ['invoice'],
+  paymentmode: ['payment'],
+  admin: ['invoice', 'quote', 'payment'],
+};
+
+const entries = new Map();
+const inflight = new Map();
+const controllers = new Map();
+// bumped on every invalidation so responses started before a mutation are not cached
+let generation = 0;
+
+export const entityOf = (path) => path.split('/')[0].toLowerCase();
+
+const revalidate = (key, fetcher) => {
+  if (inflight.has(key)) return inflight.get(key);
+
+  const startedAt = generation;
+  const promise = fetcher()
+    .then((data) => {
+      if (data && data.success === true && startedAt === generation) {
+        entries.set(key, { data, time: Date.now() });
+      }
+      return data;
+    })
+    .finally(() => inflight.delete(key));
+  inflight.set(key, promise);
+  return promise;
+};
+
+export const cachedRequest = (key, fetcher) => {
+  const entry = entries.get(key);
+  const age = entry ? Date.now() - entry.time : Infinity;
+
+  if (age < FRESH_TTL) return Promise.resolve(entry.data);
+  if (age < STALE_TTL) {
+    revalidate(key, fetcher);
+    return Promise.resolve(entry.data);
+  }
+  return revalidate(key, fetcher);
+};
+
+export const invalidate = (path) => {
+  const entity = entityOf(path);
+  const affected = [entity, ...(relatedEntities[entity] || [])];
+  generation += 1;
+  for (const key of entries.keys()) {
+    if (affected.includes(entityOf(key))) entries.delete(key);
+  }
+};
+
+export const clearCache = () => {
+  generation += 1;
+  entries.clear();
+};
+
+// Aborts the previous request sharing the same channel (search-as-you-type)
+export const supersede = (channel) => {
+  const previous = controllers.get(channel);
+  if (previous) previous.abort();
+  const controller = new AbortController();
+  controllers.set(channel, controller);
+  return controller.signal;
+};
+
+export const release = (channel, signal) => {
+  const current = controllers.get(channel);
+  if (current && current.signal === signal) controllers.delete(channel);
+};
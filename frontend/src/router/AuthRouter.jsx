@@ -1,24 +1,29 @@
+import { lazy, Suspense } from 'react';
 import { Routes, Route, Navigate } from 'react-router-dom';
 
-import Login from '@/pages/Login';
-import NotFound from '@/pages/NotFound';
-
-import ForgetPassword from '@/pages/ForgetPassword';
-import ResetPassword from '@/pages/ResetPassword';
+import PageLoader from '@/components/PageLoader';
 
 import { useDispatch } from 'react-redux';
 
+const Login = lazy(() => import('@/pages/Login'));
+const NotFound = lazy(() => import('@/pages/NotFound'));
+
+const ForgetPassword = lazy(() => import('@/pages/ForgetPassword'));
+const ResetPassword = lazy(() => import('@/pages/ResetPassword'));
+
 export default function AuthRouter() {
   const dispatch = useDispatch();
 
   return (
-    <Routes>
-      <Route element={<Login />} path="/" />
-      <Route element={<Login />} path="/login" />
-      <Route element={<Navigate to="/login" replace />} path="/logout" />
-      <Route element={<ForgetPassword />} path="/forgetpassword" />
-      <Route element={<ResetPassword />} path="/resetpassword/:userId/:resetToken" />
-      <Route path="*" element={<NotFound />} />
-    </Routes>
+    <Suspense fallback={<PageLoader />}>
+      <Routes>
+        <Route element={<Login />} path="/" />
+        <Route element={<Login />} path="/login" />
+        <Route element={<Navigate to="/login" replace />} path="/logout" />
+        <Route element={<ForgetPassword />} path="/forgetpassword" />
+        <Route element={<ResetPassword />} path="/resetpassword/:userId/:resetToken" />
+        <Route path="*" element={<NotFound />} />
+      </Routes>
+    </Suspense>
   );
 }
@@ -20,6 +20,15 @@ export const dataForRead = ({ fields, translate }) => {
   return columns;
 };
 
+// ?select= of a list showing these columns: the field of each column (dotted for
+// nested ones such as ['client', 'name']) and the extra fields their renders use
+export const selectForTable = ({ columns, extra = [] }) => {
+  const paths = columns
+    .map(({ dataIndex }) => (Array.isArray(dataIndex) ? dataIndex.join('.') : dataIndex))
+    .filter(Boolean);
+  return [...new Set([...paths, ...extra])].join(',');
+};
+
 export function dataForTable({ fields, translate, moneyFormatter, dateFormat }) {
   let columns = [];
 
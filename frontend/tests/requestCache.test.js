@@ -0,0 +1,96 @@
+/**
+ * Request cache tests
+ * Deduplication, stale-while-revalidate and invalidation of GET requests
+ */
+
+import { describe, it, expect, beforeEach } from 'vitest';
+import {
+  cachedRequest,
+  invalidate,
+  clearCache,
+  supersede,
+  release,
+} from '../src/request/requestCache';
+
+const counter = (data = { success: true, result: [] }) => {
+  const fetcher = async () => {
+    fetcher.calls += 1;
+    return data;
+  };
+  fetcher.calls = 0;
+  return fetcher;
+};
+
+describe('Request cache', () => {
+  beforeEach(() => clearCache());
+
+  it('should share one request between concurrent callers', async () => {
+    const fetcher = counter();
+    await Promise.all([
+      cachedRequest('invoice/list?page=1', fetcher),
+      cachedRequest('invoice/list?page=1', fetcher),
+      cachedRequest('invoice/list?page=1', fetcher),
+    ]);
+    expect(fetcher.calls).toBe(1);
+  });
+
+  it('should serve fresh entries from the cache', async () => {
+    const fetcher = counter();
+    await cachedRequest('client/listAll', fetcher);
+    await cachedRequest('client/listAll', fetcher);
+    expect(fetcher.calls).toBe(1);
+  });
+
+  it('should not cache failed responses', async () => {
+    const fetcher = counter({ success: false, result: null });
+    await cachedRequest('quote/read/1', fetcher);
+    await cachedRequest('quote/read/1', fetcher);
+    expect(fetcher.calls).toBe(2);
+  });
+
+  it('should invalidate the entity and its dependents', async () => {
+    const invoices = counter();
+    const payments = counter();
+    const taxes = counter();
+    await cachedRequest('invoice/list', invoices);
+    await cachedRequest('payment/list', payments);
+    await cachedRequest('taxes/listAll', taxes);
+
+    invalidate('client');
+    await cachedRequest('invoice/list', invoices);
+    await cachedRequest('payment/list', payments);
+    await cachedRequest('taxes/listAll', taxes);
+
+    expect(invoices.calls).toBe(2);
+    expect(payments.calls).toBe(2);
+    expect(taxes.calls).toBe(1);
+  });
+
+  it('should abort the superseded request of a channel', () => {
+    const first = supersede('client/search');
+    const second = supersede('client/search');
+    expect(first.aborted).toBe(true);
+    expect(second.aborted).toBe(false);
+    release('client/search', second);
+  });
+
+  it('should not abort a search joined by an identical one or served from the cache', async () => {
+    const signals = [];
+    const search = async () => {
+      const signal = supersede('client/search');
+      signals.push(signal);
+      await Promise.resolve();
+      release('client/search', signal);
+      return { success: !signal.aborted, result: [] };
+    };
+    const [first, second] = await Promise.all([
+      cachedRequest('client/search?q=ac', search),
+      cachedRequest('client/search?q=ac', search),
+    ]);
+    await cachedRequest('client/search?q=ac', search);
+
+    expect(signals).toHaveLength(1);
+    expect(signals[0].aborted).toBe(false);
+    expect(first.success && second.success).toBe(true);
+  });
+});
@@ -19,14 +19,24 @@ export default ({ mode }) => {
         '@': path.resolve(__dirname, 'src'),
       },
     },
+    build: {
+      // .vite/manifest.json maps every source module to its chunk (selenium-tests/bundle_budget.py)
+      manifest: true,
+    },
     server: {
       port: 3000,
+      // also used by `vite preview` (selenium-tests/stack.py builds with VITE_BACKEND_SERVER=/)
       proxy: {
         '/api': {
           target: proxy_url,
           changeOrigin: true,
           secure: false,
         },
+        '/download': {
+          target: proxy_url,
+          changeOrigin: true,
+          secure: false,
+        },
       },
     },
   };
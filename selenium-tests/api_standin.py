@@ -0,0 +1,326 @@
+"""
+Record/replay API stand-in server
+
+record  proxies every request to the backend behind config.API_BASE_URL and
+        stores the normalized request -> response pairs in a cassette
+        (recordings/<name>.json).
+replay  serves the cassette without backend or mongod, optionally adding a
+        latency profile, so UI timings no longer depend on backend variance.
+
+Requests are matched on method, path, sorted query parameters and the
+canonical JSON body; the Authorization header is ignored. Repeated requests
+replay the recorded responses in order, then keep returning the last one.
+The positions in these sequences are shared by every client of the stand-in:
+concurrent clients take turns through them, so only one client at a time gets
+the recorded order. Cassettes hold whole responses, login tokens included, and
+stay out of git (recordings/ is ignored).
+GET /__standin/stats returns hit/miss counters, POST /__standin/reset rewinds
+the sequences.
+
+The frontend must call the stand-in instead of the backend: run the replay on
+the backend port (--port 8888) or build the frontend with
+VITE_DEV_REMOTE=remote VITE_BACKEND_SERVER=http://localhost:8890/.
+
+Run: python api_standin.py record --cassette navigation
+     python api_standin.py replay --cassette navigation --latency fast
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+import config
+
+# (mean ms, jitter ms) added to every replayed response; 'recorded' replays the
+# backend time measured while recording
+LATENCY_PROFILES = {
+    'none': (0, 0),
+    'lan': (5, 2),
+    'fast': (40, 10),
+    'slow': (250, 80),
+    'recorded': None,
+}
+
+# Query parameters that change on every call and must not split recordings
+VOLATILE_PARAMS = {'_', 't', 'timestamp'}
+
+# Headers the stand-in sets itself or that no longer apply to the stored body
+DROPPED_HEADERS = {'content-length', 'content-encoding', 'transfer-encoding', 'connection',
+                   'date', 'keep-alive', 'access-control-allow-origin',
+                   'access-control-allow-credentials', 'vary'}
+
+CONTROL_PREFIX = '/__standin/'
+
+
+def normalize(method, path, body=b''):
+    """Return the matching key of a request"""
+    parts = urlsplit(path)
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if key not in VOLATILE_PARAMS)
+    key = f"{method.upper()} {parts.path.rstrip('/') or '/'}"
+    if query:
+        key += '?' + urlencode(query)
+    if body:
+        try:
+            canonical = json.dumps(json.loads(body), sort_keys=True, separators=(',', ':'))
+            digest = hashlib.sha1(canonical.encode()).hexdigest()
+        except ValueError:
+            digest = hashlib.sha1(body).hexdigest()
+        key += f" #{digest[:12]}"
+    return key
+
+
+def encode_body(data):
+    """Store text bodies as text and anything else as base64"""
+    try:
+        return {'text': data.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'base64': base64.b64encode(data).decode()}
+
+
+def decode_body(body):
+    if 'base64' in body:
+        return base64.b64decode(body['base64'])
+    return body['text'].encode('utf-8')
+
+
+class Cassette:
+    """Recorded responses per normalized request key"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.positions = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)['entries']
+
+    def add(self, key, response):
+        with self.lock:
+            self.entries.setdefault(key, []).append(response)
+
+    def next(self, key):
+        """Return the next recorded response of a key, repeating the last one"""
+        with self.lock:
+            responses = self.entries.get(key)
+            if not responses:
+                return None
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+            return responses[min(position, len(responses) - 1)]
+
+    def rewind(self):
+        with self.lock:
+            self.positions = {}
+
+    def save(self):
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + '.tmp', 'w') as f:
+                json.dump({'entries': self.entries}, f, indent=1, sort_keys=True)
+            os.replace(self.path + '.tmp', self.path)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """HTTP server holding the cassette, mode and counters"""
+    daemon_threads = True
+
+    def __init__(self, address, mode, cassette, upstream=None, latency='none'):
+        super().__init__(address, StandInHandler)
+        if latency not in LATENCY_PROFILES:
+            raise ValueError(f"Unsupported latency profile: {latency}")
+        self.mode = mode
+        self.cassette = cassette
+        self.upstream = upstream
+        self.latency = latency
+        self.random = random.Random(0)
+        self.session = requests.Session()
+        self.stats_lock = threading.Lock()
+        self.stats = {'recorded': 0, 'hits': 0, 'misses': 0, 'missed_keys': []}
+
+    def count(self, name, key=None):
+        with self.stats_lock:
+            self.stats[name] += 1
+            if key and name == 'misses' and key not in self.stats['missed_keys']:
+                self.stats['missed_keys'].append(key)
+
+    def delay(self, response):
+        """Return the seconds to wait before serving a replayed response"""
+        profile = LATENCY_PROFILES[self.latency]
+        if profile is None:
+            return response.get('elapsed_ms', 0) / 1000
+        mean, jitter = profile
+        return max(mean + self.random.uniform(-jitter, jitter), 0) / 1000
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Records or replays one request"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_OPTIONS(self):
+        # CORS preflight is answered locally in both modes
+        self.send_response(204)
+        self.send_cors_headers()
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PATCH, PUT, DELETE, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers',
+                         self.headers.get('Access-Control-Request-Headers', '*'))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def do_PATCH(self):
+        self.handle_request()
+
+    def do_PUT(self):
+        self.handle_request()
+
+    def do_DELETE(self):
+        self.handle_request()
+
+    def send_cors_headers(self):
+        origin = self.headers.get('Origin')
+        if origin:
+            self.send_header('Access-Control-Allow-Origin', origin)
+            self.send_header('Access-Control-Allow-Credentials', 'true')
+            self.send_header('Vary', 'Origin')
+
+    def send_stored(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_cors_headers()
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload):
+        self.send_stored(status, [('Content-Type', 'application/json')],
+                         json.dumps(payload).encode())
+
+    def handle_request(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        if self.path.startswith(CONTROL_PREFIX):
+            return self.handle_control()
+
+        key = normalize(self.command, self.path, body)
+        if self.server.mode == 'record':
+            return self.record(key, body)
+
+        response = self.server.cassette.next(key)
+        if response is None:
+            self.server.count('misses', key)
+            return self.send_json(404, {'success': False, 'result': None,
+                                        'message': f"No recording for {key}"})
+        self.server.count('hits')
+        time.sleep(self.server.delay(response))
+        self.send_stored(response['status'], response['headers'], decode_body(response['body']))
+
+    def record(self, key, body):
+        headers = {name: value for name, value in self.headers.items()
+                   if name.lower() not in ('host', 'content-length', 'accept-encoding')}
+        start = time.perf_counter()
+        upstream = self.server.session.request(self.command, self.server.upstream + self.path,
+                                               headers=headers, data=body or None,
+                                               allow_redirects=False, timeout=60)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stored_headers = [(name, value) for name, value in upstream.headers.items()
+                          if name.lower() not in DROPPED_HEADERS]
+        self.server.cassette.add(key, {
+            'status': upstream.status_code,
+            'headers': stored_headers,
+            'body': encode_body(upstream.content),
+            'elapsed_ms': round(elapsed_ms, 2),
+        })
+        self.server.count('recorded')
+        self.send_stored(upstream.status_code, stored_headers, upstream.content)
+
+    def handle_control(self):
+        action = self.path[len(CONTROL_PREFIX):]
+        if action == 'stats':
+            return self.send_json(200, self.server.stats)
+        if action == 'reset':
+            self.server.cassette.rewind()
+            return self.send_json(200, {'success': True})
+        if action == 'save':
+            self.server.cassette.save()
+            return self.send_json(200, {'success': True})
+        return self.send_json(404, {'success': False, 'message': f"Unknown action {action}"})
+
+
+def upstream_origin(api_base_url=None):
+    """Return scheme://host:port of the backend behind API_BASE_URL"""
+    parts = urlsplit(api_base_url or config.API_BASE_URL)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def cassette_path(name):
+    return os.path.join(config.STANDIN_RECORDINGS_DIR, f"{name}.json")
+
+
+def start(mode, cassette, port=0, latency='none', upstream=None):
+    """Start a stand-in on a background thread and return the server"""
+    server = StandInServer(('127.0.0.1', port), mode, cassette,
+                           upstream or upstream_origin(), latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop(server):
+    """Stop a stand-in, saving the cassette when recording"""
+    server.shutdown()
+    server.server_close()
+    if server.mode == 'record':
+        server.cassette.save()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('--cassette', default='default')
+    parser.add_argument('--port', type=int, default=config.STANDIN_PORT)
+    parser.add_argument('--latency', choices=sorted(LATENCY_PROFILES),
+                        default=config.STANDIN_LATENCY)
+    parser.add_argument('--upstream', default=upstream_origin(),
+                        help='backend origin used when recording')
+    args = parser.parse_args(argv)
+
+    path = cassette_path(args.cassette)
+    if args.mode == 'replay' and not os.path.exists(path):
+        print(f"⚠ No cassette at {path}, record one first")
+        return 1
+
+    server = start(args.mode, Cassette(path), args.port, args.latency, args.upstream)
+    print(f"✓ {args.mode} stand-in on http://127.0.0.1:{args.port}/api/ ({path})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop(server)
+        print(f"📊 {json.dumps(server.stats)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
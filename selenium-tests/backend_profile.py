@@ -0,0 +1,311 @@
+"""
+Backend CPU profile and heap sampling around a load window
+
+The backend exposes /api/profiler/start|stop when it runs with PROFILER=true
+(src/handlers/profilerHandler, an in-process inspector session). The harness
+starts a profile once the load has settled, stops it after the window and
+turns the V8 profiles into:
+
+<label>.cpuprofile / .heapprofile   raw profiles (DevTools Performance / Memory)
+<label>.cpu.folded / .heap.folded   collapsed stacks (flamegraph.pl, speedscope)
+<label>.cpu.svg                     flamegraph
+handlers                            CPU time and allocated bytes per route
+                                    handler: the innermost named function of
+                                    src/controllers or src/handlers on the stack
+                                    (paginatedList, generatePdf, isValidAuthToken)
+
+Run: python journey.py load --users 50 --duration 120 --profile-at 30 --profile-for 60
+     python backend_profile.py record --seconds 30   # around a load already running
+     python backend_profile.py report reports/profiles/x.cpuprofile
+"""
+import argparse
+import asyncio
+import html
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import config
+
+PROFILE_DIR = os.path.join(config.REPORT_DIR, 'profiles')
+HANDLER_DIRS = ('src/controllers/', 'src/handlers/')
+# V8 pseudo frames, reported under their own name
+SPECIAL_FRAMES = ('(idle)', '(program)', '(garbage collector)')
+FRAMEWORK = '(framework)'
+SVG_WIDTH = 1200
+SVG_ROW = 16
+
+
+# ---- collapsed stacks -------------------------------------------------------------
+
+def short_path(url):
+    """Backend sources as src/..., packages as node_modules/<package>/..."""
+    path = url.replace('file://', '')
+    if '/node_modules/' in path:
+        return 'node_modules/' + path.rsplit('/node_modules/', 1)[1]
+    if '/src/' in path:
+        return 'src/' + path.split('/src/', 1)[1]
+    return path
+
+
+def frame_label(call_frame):
+    name = call_frame.get('functionName') or '(anonymous)'
+    path = short_path(call_frame.get('url', ''))
+    if not path:
+        return name
+    return f"{name} {path}:{call_frame.get('lineNumber', 0) + 1}"
+
+
+def collapse_cpu(profile):
+    """{'frame;frame;...': microseconds} of a .cpuprofile"""
+    nodes = {node['id']: node for node in profile['nodes']}
+    parents = {child: node['id'] for node in profile['nodes']
+               for child in node.get('children', [])}
+    stacks = {}
+
+    def stack(node_id):
+        if node_id not in stacks:
+            frames = []
+            current = node_id
+            while current in nodes:
+                label = frame_label(nodes[current]['callFrame'])
+                if label != '(root)':
+                    frames.append(label)
+                current = parents.get(current)
+            stacks[node_id] = ';'.join(reversed(frames))
+        return stacks[node_id]
+
+    samples, deltas = profile.get('samples', []), profile.get('timeDeltas', [])
+    folded = Counter()
+    for index, node_id in enumerate(samples):
+        # a sample lasts until the next one
+        weight = deltas[index + 1] if index + 1 < len(deltas) else 0
+        folded[stack(node_id)] += max(weight, 0)
+    return +folded
+
+
+def collapse_heap(profile):
+    """{'frame;frame;...': bytes} of a sampling .heapprofile"""
+    folded = Counter()
+
+    def walk(node, frames):
+        label = frame_label(node['callFrame'])
+        if label != '(root)':
+            frames = frames + [label]
+        if node.get('selfSize'):
+            folded[';'.join(frames)] += node['selfSize']
+        for child in node.get('children', []):
+            walk(child, frames)
+
+    walk(profile['head'], [])
+    return folded
+
+
+def write_folded(folded, path):
+    with open(path, 'w') as f:
+        for stack, value in sorted(folded.items()):
+            f.write(f"{stack} {value}\n")
+    return path
+
+
+def read_folded(path):
+    folded = Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, value = line.rstrip('\n').rpartition(' ')
+            folded[stack] += int(value)
+    return folded
+
+
+# ---- attribution ------------------------------------------------------------------
+
+def is_handler(frame):
+    name, _, location = frame.partition(' ')
+    return name != '(anonymous)' and location.startswith(HANDLER_DIRS)
+
+
+def handler_of(stack):
+    """The innermost route handler frame of a stack"""
+    frames = stack.split(';')
+    for frame in reversed(frames):
+        if is_handler(frame):
+            return frame
+    leaf = frames[-1] if frames else ''
+    return leaf if leaf in SPECIAL_FRAMES else FRAMEWORK
+
+
+def attribute(folded, top=5):
+    """Total and hottest leaf frames per handler, largest first"""
+    total = sum(folded.values()) or 1
+    handlers = {}
+    for stack, value in folded.items():
+        handler = handler_of(stack)
+        entry = handlers.setdefault(handler, {'handler': handler, 'value': 0,
+                                              'leaves': Counter()})
+        entry['value'] += value
+        entry['leaves'][stack.rsplit(';', 1)[-1]] += value
+    rows = []
+    for entry in sorted(handlers.values(), key=lambda entry: entry['value'], reverse=True):
+        rows.append({'handler': entry['handler'], 'value': entry['value'],
+                     'share': round(entry['value'] / total, 4),
+                     'hottest': [{'frame': frame, 'value': value}
+                                 for frame, value in entry['leaves'].most_common(top)]})
+    return rows
+
+
+# ---- flamegraph -------------------------------------------------------------------
+
+def frame_color(frame):
+    if is_handler(frame):
+        return '#f08c3c'
+    if ' src/' in frame:
+        return '#f2c84b'
+    if ' node_modules/' in frame:
+        return '#8fb4d9'
+    return '#c8c8c8'
+
+
+def render_svg(folded, title, unit='µs'):
+    """A self-contained flamegraph (root at the bottom) of collapsed stacks"""
+    tree = {}
+    for stack, value in folded.items():
+        node = tree
+        for frame in stack.split(';'):
+            entry = node.setdefault(frame, [0, {}])
+            entry[0] += value
+            node = entry[1]
+    total = sum(folded.values()) or 1
+    depth = max((stack.count(';') + 1 for stack in folded), default=1)
+    height = (depth + 2) * SVG_ROW
+    boxes = []
+
+    def draw(node, x, level):
+        for frame, (value, children) in sorted(node.items()):
+            width = value / total * SVG_WIDTH
+            if width >= 0.5:
+                y = height - (level + 1) * SVG_ROW
+                label = html.escape(frame)
+                text = html.escape(frame[:int(width / 7)]) if width > 28 else ''
+                boxes.append(
+                    f'<g><title>{label} ({value:,} {unit}, {value / total:.1%})</title>'
+                    f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{SVG_ROW - 1}" '
+                    f'fill="{frame_color(frame)}"/>'
+                    f'<text x="{x + 3:.1f}" y="{y + SVG_ROW - 4}">{text}</text></g>')
+                draw(children, x, level + 1)
+            x += width
+
+    draw(tree, 0.0, 0)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{SVG_WIDTH}" height="{height}" '
+            f'font-family="monospace" font-size="11">'
+            f'<text x="4" y="12">{html.escape(title)}</text>{"".join(boxes)}</svg>')
+
+
+# ---- artifacts --------------------------------------------------------------------
+
+def write_artifacts(result, label, directory=None):
+    """Save the profiles of a /profiler/stop answer and return the report entry"""
+    directory = directory or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}")
+    report = {'label': label, 'elapsed_ms': result.get('elapsedMs'), 'files': {}}
+    if result.get('cpuProfile'):
+        with open(f"{base}.cpuprofile", 'w') as f:
+            json.dump(result['cpuProfile'], f)
+        folded = collapse_cpu(result['cpuProfile'])
+        with open(f"{base}.cpu.svg", 'w') as f:
+            f.write(render_svg(folded, f"CPU {label}"))
+        report['files'].update(cpuprofile=f"{base}.cpuprofile", cpu_svg=f"{base}.cpu.svg",
+                               cpu_folded=write_folded(folded, f"{base}.cpu.folded"))
+        report['cpu_handlers'] = attribute(folded)
+    if result.get('heapProfile'):
+        with open(f"{base}.heapprofile", 'w') as f:
+            json.dump(result['heapProfile'], f)
+        folded = collapse_heap(result['heapProfile'])
+        report['files'].update(heapprofile=f"{base}.heapprofile",
+                               heap_folded=write_folded(folded, f"{base}.heap.folded"))
+        report['heap_handlers'] = attribute(folded)
+    return report
+
+
+def print_handlers(title, rows, unit, scale, top=10):
+    print(f"\n{title}")
+    for row in rows[:top]:
+        print(f"  {row['share']:>6.1%} {row['value'] / scale:>12,.1f} {unit}  {row['handler']}")
+        for leaf in row['hottest'][:2]:
+            print(f"         {leaf['value'] / scale:>12,.1f} {unit}    ↳ {leaf['frame']}")
+
+
+def print_report(report):
+    if 'cpu_handlers' in report:
+        print_handlers('CPU time per handler', report['cpu_handlers'], 'ms', 1000)
+    if 'heap_handlers' in report:
+        print_handlers('Sampled allocations per handler', report['heap_handlers'], 'KB', 1024)
+    for kind, path in report['files'].items():
+        print(f"📊 {kind}: {path}")
+
+
+# ---- profiling windows ------------------------------------------------------------
+
+async def profile_window(api, delay, seconds, label):
+    """Profile the backend from delay to delay + seconds, alongside running load"""
+    await asyncio.sleep(delay)
+    await asyncio.to_thread(api.login)
+    await asyncio.to_thread(api.profiler.start, label)
+    print(f"▶ Profiling {label} for {seconds:.0f}s")
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        result = await asyncio.to_thread(api.profiler.stop)
+    return write_artifacts(result, label)
+
+
+async def run_profiled_load_async(scenarios, users, duration, ramp_up, think_scale, seed,
+                                  at, seconds, label):
+    import journey
+    from crm_client import CrmClient
+
+    with CrmClient() as api:
+        metrics, report = await asyncio.gather(
+            journey.run_load_async(scenarios, users, duration, ramp_up,
+                                   think_scale=think_scale, seed=seed),
+            profile_window(api, at, min(seconds, max(duration - at, 0)), label))
+    return metrics, report
+
+
+def run_profiled_load(scenarios, users, duration, ramp_up, think_scale, seed, at, seconds,
+                      label):
+    """journey.run_load with a profile of the [at, at + seconds] window: (Metrics, report)"""
+    return asyncio.run(run_profiled_load_async(scenarios, users, duration, ramp_up,
+                                               think_scale, seed, at, seconds, label))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('mode', choices=['record', 'report'])
+    parser.add_argument('profile', nargs='?', help='report: .cpuprofile or .heapprofile')
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--label', default='manual')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'record':
+        from crm_client import CrmClient
+
+        with CrmClient() as api:
+            report = asyncio.run(profile_window(api, 0, args.seconds, args.label))
+    else:
+        if not args.profile:
+            parser.error('report needs a profile file')
+        with open(args.profile) as f:
+            profile = json.load(f)
+        # node --cpu-prof writes the same format as the profiler route
+        key = 'heapProfile' if 'head' in profile else 'cpuProfile'
+        label = os.path.basename(args.profile).split('.')[0]
+        report = write_artifacts({key: profile}, label)
+    print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
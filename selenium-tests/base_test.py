@@ -1,9 +1,9 @@
 """
 Base test class for Selenium tests
 """
+import json
 import os
 import time
-from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -19,6 +19,37 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 import config
+import locator
+from browser_profiles import get_profile
+from screenshots import get_pipeline
+
+# LCP entries are only exposed to a buffered PerformanceObserver
+WEB_VITALS_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const nav = performance.getEntriesByType('navigation')[0] || {};
+const paint = {};
+performance.getEntriesByType('paint').forEach((entry) => { paint[entry.name] = entry.startTime; });
+const api = performance.getEntriesByType('resource')
+  .filter((entry) => ['xmlhttprequest', 'fetch'].includes(entry.initiatorType))
+  .map((entry) => ({ url: entry.name, start: entry.startTime, duration: entry.duration,
+                     end: entry.responseEnd, bytes: entry.transferSize }));
+function finish(lcp) {
+  done({
+    ttfb: nav.responseStart, dom_content_loaded: nav.domContentLoadedEventEnd,
+    load: nav.loadEventEnd, fcp: paint['first-contentful-paint'] || null, lcp: lcp,
+    data_ready: api.length ? Math.max(...api.map((entry) => entry.end)) : null, api: api,
+  });
+}
+try {
+  new PerformanceObserver((list) => {
+    const entries = list.getEntries();
+    finish(entries.length ? entries[entries.length - 1].startTime : null);
+  }).observe({ type: 'largest-contentful-paint', buffered: true });
+} catch (e) {
+  finish(null);
+}
+setTimeout(() => finish(null), 1000);
+"""
 
 
 class BaseTest:
@@ -29,10 +60,10 @@ class BaseTest:
         self.driver = None
         self.wait = None
         self.screenshot_dir = config.SCREENSHOT_DIR
-        os.makedirs(self.screenshot_dir, exist_ok=True)
+        self.profile = get_profile()
         self.driver = self._create_driver()
         self.wait = WebDriverWait(self.driver, config.EXPLICIT_WAIT)
-        self.driver.maximize_window()
+        self.profile.start(self.driver)
         self.driver.implicitly_wait(config.IMPLICIT_WAIT)
         self.driver.set_page_load_timeout(config.PAGE_LOAD_TIMEOUT)
     
@@ -53,6 +84,9 @@ class BaseTest:
             options.add_argument('--disable-dev-shm-usage')
             options.add_argument('--disable-gpu')
             options.add_argument('--window-size=1920,1080')
+            # Network events are needed to count API calls per navigation
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            self.profile.configure_chromium(options)
             driver_path = ChromeDriverManager().install()
             # Find the actual chromedriver executable
             driver_dir = os.path.dirname(driver_path) if os.path.isfile(driver_path) else driver_path
@@ -73,6 +107,7 @@ class BaseTest:
             options = FirefoxOptions()
             if config.HEADLESS:
                 options.add_argument('--headless')
+            self.profile.configure_firefox(options)
             service = FirefoxService(GeckoDriverManager().install())
             return webdriver.Firefox(service=service, options=options)
         
@@ -80,20 +115,43 @@ class BaseTest:
             options = EdgeOptions()
             if config.HEADLESS:
                 options.add_argument('--headless')
+            self.profile.configure_chromium(options)
             service = EdgeService(EdgeChromiumDriverManager().install())
             return webdriver.Edge(service=service, options=options)
         
         else:
             raise ValueError(f"Unsupported browser: {browser}")
     
-    def take_screenshot(self, name):
-        """Take a screenshot and save it"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{name}_{timestamp}.png"
-        filepath = os.path.join(self.screenshot_dir, filename)
-        self.driver.save_screenshot(filepath)
-        print(f"Screenshot saved: {filepath}")
-        return filepath
+    def take_screenshot(self, name, failure=None):
+        """Capture a screenshot, stored in the background according to SCREENSHOT_POLICY"""
+        return get_pipeline().capture(self.driver, name, failure)
+    
+    def locate(self, candidates, timeout=None, enabled=False):
+        """Return the first visible match of ranked candidates in one round trip per poll"""
+        if timeout is None:
+            timeout = config.ELEMENT_TIMEOUT
+        return locator.resolve(self.driver, candidates, timeout, enabled)
+    
+    def check_visual(self, name):
+        """Compare the current page with its baseline (VISUAL_MODE: off, report or enforce)"""
+        if config.VISUAL_MODE == 'off':
+            return None
+        import visual_diff
+        
+        rects = self.driver.execute_script(
+            "const ratio = window.devicePixelRatio || 1;"
+            "return arguments[0].flatMap(s => Array.from(document.querySelectorAll(s)))"
+            ".map(e => e.getBoundingClientRect())"
+            ".map(r => [r.x * ratio, r.y * ratio, r.width * ratio, r.height * ratio]);",
+            visual_diff.PAGE_MASKS.get(name, []),
+        )
+        actual = visual_diff.decode(self.driver.get_screenshot_as_png())
+        result = visual_diff.check(name, actual, config.BROWSER, rects)
+        visual_diff.print_result(result)
+        if config.VISUAL_MODE == 'enforce':
+            assert result['status'] != 'fail', \
+                f"Visual regression on {name}: {result.get('heatmap', result.get('reason'))}"
+        return result
     
     def wait_for_element(self, by, value, timeout=None):
         """Wait for an element to be present"""
@@ -151,3 +209,23 @@ class BaseTest:
         # Wait for navigation to dashboard
         time.sleep(3)
         self.wait_for_element(By.TAG_NAME, 'body')
+    
+    def api_requests(self):
+        """Return the API requests the browser sent since the last call (Chrome only)"""
+        try:
+            entries = self.driver.get_log('performance')
+        except (WebDriverException, ValueError):
+            return []
+        requests = []
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            if message['method'] != 'Network.requestWillBeSent':
+                continue
+            request = message['params']['request']
+            if request['url'].startswith(config.API_BASE_URL) and request['method'] != 'OPTIONS':
+                requests.append(f"{request['method']} {request['url'][len(config.API_BASE_URL):]}")
+        return requests
+
+    def web_vitals(self):
+        """Return navigation timing, paint and LCP milliseconds plus XHR/fetch timings"""
+        return self.driver.execute_async_script(WEB_VITALS_SCRIPT)
@@ -0,0 +1,150 @@
+"""
+Browser profiles
+
+lean  functional runs: images, fonts and analytics are blocked through CDP
+      Network.setBlockedURLs, background Chrome features are disabled and the
+      HTTP cache lives in a persistent directory (.browser-cache/) so built
+      chunks are reused between runs.
+full  performance measurements: every resource is downloaded, default Chrome.
+
+Select with BROWSER_PROFILE=lean|full.
+
+Run: python browser_profiles.py --warm   # pre-warm the lean cache directory
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass, field
+
+import config
+
+BLOCKED_IMAGES = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico']
+BLOCKED_FONTS = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*fonts.googleapis.com*',
+                 '*fonts.gstatic.com*']
+BLOCKED_ANALYTICS = ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+                     '*hotjar.com*', '*segment.io*', '*sentry.io*']
+
+LEAN_CHROME_ARGS = [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--no-first-run',
+    '--mute-audio',
+    '--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication,'
+    'InterestFeedContentSuggestions,CalculateNativeWinOcclusion',
+]
+
+# Pages loaded by --warm so the lazy route chunks are in the cache
+WARM_PATHS = ['/login', '/', '/customer', '/invoice', '/quote', '/payment', '/settings']
+
+
+@dataclass
+class BrowserProfile:
+    """How the test browser is launched"""
+    name: str
+    blocked_urls: list = field(default_factory=list)
+    chrome_args: list = field(default_factory=list)
+    firefox_prefs: dict = field(default_factory=dict)
+    persistent_cache: bool = False
+    maximize: bool = True
+
+    def cache_dir(self):
+        """Return the cache directory of this process (one per pytest-xdist worker)"""
+        worker = os.getenv('PYTEST_XDIST_WORKER', 'main')
+        return os.path.join(config.BROWSER_CACHE_DIR, f"{self.name}-{worker}")
+
+    def prepare_cache(self):
+        """Create the cache directory, seeded from the warmed main cache for xdist workers"""
+        path = self.cache_dir()
+        seed = os.path.join(config.BROWSER_CACHE_DIR, f"{self.name}-main")
+        if not os.path.exists(path) and path != seed and os.path.isdir(seed):
+            shutil.copytree(seed, path)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def configure_chromium(self, options):
+        """Add the profile's arguments to Chrome or Edge options"""
+        for argument in self.chrome_args:
+            options.add_argument(argument)
+        if self.persistent_cache:
+            options.add_argument(f"--disk-cache-dir={self.prepare_cache()}")
+
+    def configure_firefox(self, options):
+        """Firefox has no CDP URL blocking, use preferences instead"""
+        for key, value in self.firefox_prefs.items():
+            options.set_preference(key, value)
+
+    def start(self, driver):
+        """Apply the runtime settings once the browser is up"""
+        if self.blocked_urls and hasattr(driver, 'execute_cdp_cmd'):
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+        if self.maximize:
+            driver.maximize_window()
+
+
+PROFILES = {
+    'lean': BrowserProfile(
+        name='lean',
+        blocked_urls=BLOCKED_IMAGES + BLOCKED_FONTS + BLOCKED_ANALYTICS,
+        chrome_args=LEAN_CHROME_ARGS,
+        firefox_prefs={
+            'permissions.default.image': 2,
+            'browser.display.use_document_fonts': 0,
+        },
+        persistent_cache=True,
+        # --window-size already sets the layout, skip the extra resize round trip
+        maximize=False,
+    ),
+    'full': BrowserProfile(name='full'),
+}
+
+
+def get_profile(name=None):
+    """Return the configured profile"""
+    name = name or config.BROWSER_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unsupported browser profile: {name}")
+    return PROFILES[name]
+
+
+def warm(paths=WARM_PATHS):
+    """Load the main pages once with the lean profile to fill its cache directory"""
+    from base_test import BaseTest
+
+    test = BaseTest()
+    test.setup_method()
+    try:
+        test.login()
+        for path in paths:
+            start = time.perf_counter()
+            test.navigate_to(path)
+            print(f"✓ {path:12} {time.perf_counter() - start:6.2f}s")
+    finally:
+        test.teardown_method()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--warm', action='store_true', help='pre-warm the lean cache directory')
+    args = parser.parse_args(argv)
+
+    for profile in PROFILES.values():
+        print(f"{profile.name:6} blocked {len(profile.blocked_urls):>3} patterns, "
+              f"{len(profile.chrome_args):>2} extra args, "
+              f"cache {profile.cache_dir() if profile.persistent_cache else 'default'}")
+    if args.warm:
+        if config.BROWSER_PROFILE != 'lean':
+            print("⚠ Set BROWSER_PROFILE=lean to warm the lean cache")
+            return 1
+        warm()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
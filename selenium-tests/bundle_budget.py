@@ -0,0 +1,288 @@
+"""
+Frontend bundle budget analyzer
+
+Parses the Vite build manifest (frontend/dist/.vite/manifest.json), attributes
+raw/gzip/brotli bytes to every chunk and to every route declared in the
+routers, enforces per-route budgets and, with --measure, cross-checks the
+prediction against the scripts and styles Chrome actually downloads per page.
+
+Build first: cd ../frontend && npm run build && npm run preview -- --port 3000
+Run: python bundle_budget.py --measure
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+import config
+from browser_profiles import PROFILES
+
+try:
+    import brotli
+except ImportError:  # optional, brotli sizes are reported as null without it
+    brotli = None
+
+# Route declaration files and the modules every route in them needs on top of
+# the page itself (the lazy IdurarOs shell, and the ERP layout once logged in).
+# Logged-in routes come first: they win when both routers declare a path ('/').
+ROUTERS = {
+    'src/router/routes.jsx': ['src/apps/IdurarOs.jsx', 'src/apps/ErpApp.jsx'],
+    'src/router/AuthRouter.jsx': ['src/apps/IdurarOs.jsx'],
+}
+PUBLIC_ROUTER = 'src/router/AuthRouter.jsx'
+ENTRY = 'index.html'
+
+# Modules a route must never pull in
+FORBIDDEN = {
+    '/login': ['src/apps/ErpApp.jsx'],
+    '/forgetpassword': ['src/apps/ErpApp.jsx'],
+}
+
+# gzip KiB per route, '*' applies to every other route
+DEFAULT_BUDGETS = {
+    '/login': 250,
+    '*': 500,
+}
+
+LAZY_IMPORT = re.compile(r"const (\w+) = lazy\(\(\) => import\('([^']+)'\)\)")
+ROUTE_PATTERNS = [
+    re.compile(r"path: '([^']+)',\s*element: <(\w+)"),
+    re.compile(r'<Route element=\{<(?P<component>\w+) ?/>\} path="(?P<path>[^"]+)"'),
+    re.compile(r'<Route path="(?P<path>[^"]+)" element=\{<(?P<component>\w+)'),
+]
+RESOLVE_SUFFIXES = ['', '.jsx', '.js', '/index.jsx', '/index.js']
+
+
+def load_manifest(dist_dir):
+    """Return the Vite manifest (Vite 5 writes it under .vite/)"""
+    for path in (os.path.join(dist_dir, '.vite', 'manifest.json'),
+                 os.path.join(dist_dir, 'manifest.json')):
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+    raise FileNotFoundError(f"No Vite manifest in {dist_dir}, build with build.manifest enabled")
+
+
+def resolve(spec, manifest):
+    """Map an import specifier ('@/pages/Invoice') to its manifest key"""
+    base = 'src/' + spec[2:] if spec.startswith('@/') else spec
+    for suffix in RESOLVE_SUFFIXES:
+        if base + suffix in manifest:
+            return base + suffix
+    return None
+
+
+def parse_routes(source):
+    """Return [(path, component)] and {component: import specifier} of a router file"""
+    lazy = dict(LAZY_IMPORT.findall(source))
+    routes = []
+    for pattern in ROUTE_PATTERNS:
+        for match in pattern.finditer(source):
+            if pattern.groupindex:
+                routes.append((match.group('path'), match.group('component')))
+            else:
+                routes.append(match.groups())
+    return routes, lazy
+
+
+def route_modules(frontend_dir, manifest):
+    """Return {route path: {'modules': [manifest keys loaded for it], 'public': bool}}"""
+    result = {}
+    for router, shell in ROUTERS.items():
+        with open(os.path.join(frontend_dir, router)) as f:
+            routes, lazy = parse_routes(f.read())
+        for path, component in routes:
+            if component not in lazy or path in result:
+                continue
+            page = resolve(lazy[component], manifest)
+            if page:
+                result[path] = {'modules': [ENTRY] + shell + [page],
+                                'public': router == PUBLIC_ROUTER}
+    return result
+
+
+def closure(keys, manifest):
+    """Return every manifest key statically reachable from keys, in load order"""
+    seen = []
+    stack = list(reversed(keys))
+    while stack:
+        key = stack.pop()
+        if key in seen or key not in manifest:
+            continue
+        seen.append(key)
+        stack.extend(reversed(manifest[key].get('imports', [])))
+    return seen
+
+
+def chunk_files(keys, manifest):
+    """Return the JS and CSS files emitted for the given manifest keys"""
+    files = []
+    for key in keys:
+        for file in [manifest[key]['file']] + manifest[key].get('css', []):
+            if file not in files:
+                files.append(file)
+    return files
+
+
+def file_sizes(path):
+    """Return raw, gzip and brotli sizes of a built file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return {
+        'raw': len(data),
+        'gzip': len(gzip.compress(data, 9)),
+        'brotli': len(brotli.compress(data)) if brotli else None,
+    }
+
+
+def add_sizes(sizes):
+    """Sum a list of size dicts (brotli stays null if any is unknown)"""
+    total = {'raw': 0, 'gzip': 0, 'brotli': 0}
+    for size in sizes:
+        for kind in total:
+            if total[kind] is None or size[kind] is None:
+                total[kind] = None
+            else:
+                total[kind] += size[kind]
+    return total
+
+
+def budget_for(path, budgets):
+    """Return the gzip budget in KiB of a route"""
+    return budgets.get(path, budgets.get('*'))
+
+
+def analyze(frontend_dir, budgets):
+    """Build the per-chunk and per-route report"""
+    dist_dir = os.path.join(frontend_dir, 'dist')
+    manifest = load_manifest(dist_dir)
+
+    chunks = {}
+    for key, chunk in manifest.items():
+        for file in [chunk['file']] + chunk.get('css', []):
+            if file not in chunks:
+                chunks[file] = dict(file_sizes(os.path.join(dist_dir, file)),
+                                    source=chunk.get('src', key))
+
+    routes = {}
+    for path, route in route_modules(frontend_dir, manifest).items():
+        keys = closure(route['modules'], manifest)
+        files = chunk_files(keys, manifest)
+        total = add_sizes(chunks[file] for file in files)
+        budget = budget_for(path, budgets)
+        leaks = [key for key in FORBIDDEN.get(path, []) if key in keys]
+        routes[path] = {
+            'public': route['public'],
+            'files': files,
+            'bytes': total,
+            'budget_kb': budget,
+            'over_budget': budget is not None and total['gzip'] > budget * 1024,
+            'forbidden': leaks,
+        }
+    return {'chunks': chunks, 'routes': routes}
+
+
+def measure(routes):
+    """Load every concrete route in Chrome and return the built files it downloaded"""
+    from base_test import BaseTest
+
+    public = [path for path, route in routes.items() if route['public']]
+    private = [path for path, route in routes.items() if not route['public']]
+    test = BaseTest()
+    test.setup_method()
+    downloaded = {}
+    try:
+        for path in public + [None] + private:
+            if path is None:
+                test.login()
+                continue
+            if ':' in path or path in ('/logout', '*'):
+                continue
+            test.driver.get(f"{config.BASE_URL}{path}")
+            time.sleep(2)  # Allow lazy chunks to load
+            entries = test.driver.execute_script(
+                "return performance.getEntriesByType('resource')"
+                ".map(e => [e.name, e.transferSize]);")
+            files = {}
+            for name, transfer in entries:
+                file = name.split('?')[0].replace(config.BASE_URL, '').lstrip('/')
+                if file.endswith(('.js', '.css')):
+                    files[file] = transfer
+            downloaded[path] = files
+    finally:
+        test.teardown_method()
+    return downloaded
+
+
+def cross_check(report, downloaded):
+    """Attach the measured downloads and the prediction mismatches to each route"""
+    for path, files in downloaded.items():
+        route = report['routes'][path]
+        route['measured'] = {
+            'files': files,
+            'transfer_bytes': sum(files.values()),
+            'unexpected': sorted(set(files) - set(route['files'])),
+            'not_loaded': sorted(set(route['files']) - set(files)),
+        }
+
+
+def print_report(report):
+    """Print the per-route table"""
+    print("=" * 100)
+    print(f"{'route':32} {'files':>5} {'raw KiB':>9} {'gzip KiB':>9} {'br KiB':>8} {'budget':>7}")
+    for path, route in sorted(report['routes'].items()):
+        size = route['bytes']
+        brotli_kb = f"{size['brotli'] / 1024:8.1f}" if size['brotli'] is not None else f"{'-':>8}"
+        flag = '⚠' if route['over_budget'] or route['forbidden'] else '✓'
+        print(f"{flag} {path:30} {len(route['files']):>5} {size['raw'] / 1024:9.1f} "
+              f"{size['gzip'] / 1024:9.1f} {brotli_kb} {route['budget_kb']:>7}")
+        for key in route['forbidden']:
+            print(f"    ⚠ loads {key}")
+        measured = route.get('measured')
+        if measured and measured['unexpected']:
+            print(f"    ⚠ downloaded but not predicted: {', '.join(measured['unexpected'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frontend-dir', default=config.FRONTEND_DIR)
+    parser.add_argument('--budgets', help='JSON file of {route: gzip KiB}, "*" for the default')
+    parser.add_argument('--measure', action='store_true',
+                        help='cross-check against the files Chrome downloads (needs vite preview)')
+    parser.add_argument('--browser-profile', choices=sorted(PROFILES),
+                        default=config.PERF_BROWSER_PROFILE, help='--measure: browser profile')
+    parser.add_argument('--output', default=os.path.join(config.REPORT_DIR, 'bundle_budget.json'))
+    args = parser.parse_args(argv)
+
+    budgets = dict(DEFAULT_BUDGETS)
+    if args.budgets:
+        with open(args.budgets) as f:
+            budgets.update(json.load(f))
+
+    try:
+        report = analyze(args.frontend_dir, budgets)
+    except FileNotFoundError as e:
+        print(f"⚠ {e}")
+        return 1
+
+    if args.measure:
+        config.BROWSER_PROFILE = args.browser_profile
+        cross_check(report, measure(report['routes']))
+        report['browser_profile'] = config.BROWSER_PROFILE
+
+    print_report(report)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Report: {args.output}")
+
+    failed = [path for path, route in report['routes'].items()
+              if route['over_budget'] or route['forbidden']]
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Conditional GET benchmark
+Replays a repeated navigation loop (settings, lists, reads) against the backend
+with and without If-None-Match revalidation and reports bytes on the wire and
+latency for both runs.
+
+Run: python cache_benchmark.py --loops 50
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+import config
+
+# Requests the frontend issues when moving between the main pages
+NAVIGATION = [
+    'setting/listAll',
+    'invoice/list?page=1&items=10',
+    'quote/list?page=1&items=10',
+    'payment/list?page=1&items=10',
+    'client/list?page=1&items=10',
+    'client/listAll',
+    'taxes/listAll',
+    'paymentMode/listAll',
+]
+
+
+def login(session):
+    """Log in through the API and install the bearer token on the session"""
+    response = session.post(
+        f"{config.API_BASE_URL}/login",
+        json={'email': config.TEST_EMAIL, 'password': config.TEST_PASSWORD},
+        timeout=10,
+    )
+    response.raise_for_status()
+    token = response.json()['result']['token']
+    session.headers['Authorization'] = f'Bearer {token}'
+
+
+def first_invoice_read(session):
+    """Return the read path of the first listed invoice, if there is one"""
+    response = session.get(f"{config.API_BASE_URL}/invoice/list?page=1&items=1", timeout=10)
+    result = response.json().get('result') or []
+    return [f"invoice/read/{result[0]['_id']}"] if result else []
+
+
+def fetch(session, path, etags=None):
+    """GET a path and return (status, wire bytes, seconds)"""
+    headers = {'Accept-Encoding': 'gzip'}
+    if etags is not None and path in etags:
+        headers['If-None-Match'] = etags[path]
+
+    start = time.perf_counter()
+    response = session.get(f"{config.API_BASE_URL}/{path}", headers=headers,
+                           stream=True, timeout=30)
+    body = response.raw.read(decode_content=False)
+    elapsed = time.perf_counter() - start
+
+    if etags is not None and response.headers.get('ETag'):
+        etags[path] = response.headers['ETag']
+    header_bytes = sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+    return response.status_code, len(body) + header_bytes, elapsed
+
+
+def run_loop(session, paths, loops, conditional):
+    """Run the navigation loop and collect per-request measurements"""
+    etags = {} if conditional else None
+    samples, statuses = [], {}
+    for _ in range(loops):
+        for path in paths:
+            status, size, elapsed = fetch(session, path, etags)
+            samples.append((size, elapsed))
+            statuses[status] = statuses.get(status, 0) + 1
+
+    latencies = sorted(elapsed for _, elapsed in samples)
+    return {
+        'requests': len(samples),
+        'bytes': sum(size for size, _ in samples),
+        'statuses': statuses,
+        'latency_ms': {
+            'mean': statistics.mean(latencies) * 1000,
+            'p50': latencies[len(latencies) // 2] * 1000,
+            'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        },
+    }
+
+
+def print_result(name, result):
+    """Print one benchmark row"""
+    latency = result['latency_ms']
+    print(f"{name:14} {result['requests']:>6} req {result['bytes'] / 1024:>10.1f} KiB "
+          f"mean {latency['mean']:>7.2f}ms p50 {latency['p50']:>7.2f}ms "
+          f"p95 {latency['p95']:>7.2f}ms  {result['statuses']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--loops', type=int, default=20)
+    parser.add_argument('--output', default=os.path.join(config.REPORT_DIR, 'cache_benchmark.json'))
+    args = parser.parse_args(argv)
+
+    session = requests.Session()
+    try:
+        login(session)
+    except requests.exceptions.RequestException as e:
+        print(f"⚠ Backend API not accessible: {e}")
+        return 1
+
+    paths = NAVIGATION + first_invoice_read(session)
+    results = {
+        'unconditional': run_loop(session, paths, args.loops, conditional=False),
+        'conditional': run_loop(session, paths, args.loops, conditional=True),
+    }
+
+    print("=" * 100)
+    for name, result in results.items():
+        print_result(name, result)
+    saved = 1 - results['conditional']['bytes'] / max(results['unconditional']['bytes'], 1)
+    print(f"\n✓ Bytes saved by revalidation: {saved:.1%}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"📊 Report: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
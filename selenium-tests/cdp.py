@@ -0,0 +1,46 @@
+"""
+Minimal Chrome DevTools Protocol client over a websocket
+
+WebDriver's execute_cdp_cmd only returns command results; this session also
+receives the events sent in between (heap snapshot chunks) and talks to the
+Node inspector of the backend. trio-websocket comes with selenium.
+"""
+import json
+
+import requests
+
+# a heap snapshot chunk or a large Runtime.evaluate value
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+
+def targets(address):
+    """The debuggable targets of a Chrome debuggerAddress or node --inspect host:port"""
+    return requests.get(f"http://{address}/json/list", timeout=5).json()
+
+
+def send(ws_url, commands, on_event=None):
+    """Run (method, params) commands in order on one connection and return their results
+
+    on_event(method, params) is called with every event received meanwhile.
+    """
+    import trio
+    from trio_websocket import open_websocket_url
+
+    async def session():
+        results = []
+        async with open_websocket_url(ws_url, max_message_size=MAX_MESSAGE_SIZE) as ws:
+            for id, (method, params) in enumerate(commands, 1):
+                await ws.send_message(json.dumps({'id': id, 'method': method,
+                                                  'params': params or {}}))
+                while True:
+                    message = json.loads(await ws.get_message())
+                    if message.get('id') == id:
+                        break
+                    if on_event and 'method' in message:
+                        on_event(message['method'], message.get('params', {}))
+                if 'error' in message:
+                    raise RuntimeError(f"{method}: {message['error'].get('message')}")
+                results.append(message.get('result', {}))
+        return results
+
+    return trio.run(session)
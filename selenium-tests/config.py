@@ -14,6 +14,24 @@ TEST_PASSWORD = os.getenv('TEST_PASSWORD', 'admin123')
 # Screenshot settings
 SCREENSHOT_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
 REPORT_DIR = os.path.join(os.path.dirname(__file__), 'reports')
+# on-failure | sampled | always (see screenshots.py)
+SCREENSHOT_POLICY = os.getenv('SCREENSHOT_POLICY', 'on-failure')
+SCREENSHOT_SAMPLE_RATE = float(os.getenv('SCREENSHOT_SAMPLE_RATE', '0.1'))
+SCREENSHOT_WORKERS = int(os.getenv('SCREENSHOT_WORKERS', '2'))
+SCREENSHOT_PHASH_DISTANCE = int(os.getenv('SCREENSHOT_PHASH_DISTANCE', '2'))
+SCREENSHOT_MAX_FILES = int(os.getenv('SCREENSHOT_MAX_FILES', '2000'))
+SCREENSHOT_MAX_BYTES = int(os.getenv('SCREENSHOT_MAX_MB', '500')) * 1024 * 1024
+SCREENSHOT_MAX_AGE_DAYS = int(os.getenv('SCREENSHOT_MAX_AGE_DAYS', '7'))
+
+# Visual regression (see visual_diff.py): off | report | enforce. Off by default: a check
+# is a synchronous full-page capture on the test thread
+VISUAL_MODE = os.getenv('VISUAL_MODE', 'off')
+VISUAL_BASELINE_DIR = os.getenv('VISUAL_BASELINE_DIR',
+                                os.path.join(os.path.dirname(__file__), 'baselines'))
+VISUAL_UPDATE = os.getenv('VISUAL_UPDATE', 'False').lower() == 'true'
+VISUAL_TOLERANCE = int(os.getenv('VISUAL_TOLERANCE', '16'))
+VISUAL_MAX_CHANGED = float(os.getenv('VISUAL_MAX_CHANGED', '0.001'))
+VISUAL_MIN_SSIM = float(os.getenv('VISUAL_MIN_SSIM', '0.98'))
 
 # Browser settings
 BROWSER_ENV = os.getenv('BROWSER', 'chrome')
@@ -23,9 +41,89 @@ if BROWSER_ENV.lower() in ['chrome', 'firefox', 'edge']:
 else:
     BROWSER = 'chrome'  # Default to chrome
 HEADLESS = os.getenv('HEADLESS', 'False').lower() == 'true'
-IMPLICIT_WAIT = 10
+# lean (functional runs, blocks images/fonts/analytics) or full (performance runs)
+BROWSER_PROFILE = os.getenv('BROWSER_PROFILE', 'lean')
+# network_benchmark.py and bundle_budget.py --measure: blocked URLs and the disk cache of
+# lean would skew what they measure
+PERF_BROWSER_PROFILE = os.getenv('BROWSER_PROFILE', 'full')
+BROWSER_CACHE_DIR = os.getenv('BROWSER_CACHE_DIR',
+                              os.path.join(os.path.dirname(__file__), '.browser-cache'))
+# Implicit waits stay off: lookups go through explicit waits or locator.resolve
+IMPLICIT_WAIT = 0
 EXPLICIT_WAIT = 20
 
 # Test timeouts
 PAGE_LOAD_TIMEOUT = 30
 ELEMENT_TIMEOUT = 10
+
+# MongoDB settings (local mongod used by the performance tooling)
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
+MONGO_DB = os.getenv('MONGO_DB', 'idurar_perf')
+MONGOD_BIN = os.getenv('MONGOD_BIN', 'mongod')
+
+# Frontend sources and Vite build output (bundle budget analyzer)
+FRONTEND_DIR = os.getenv('FRONTEND_DIR', os.path.join(os.path.dirname(__file__), '..', 'frontend'))
+# Backend sources (seeding and per-worker backends, see db_isolation.py)
+BACKEND_DIR = os.getenv('BACKEND_DIR', os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+# Record/replay API stand-in (see api_standin.py)
+STANDIN_PORT = int(os.getenv('STANDIN_PORT', '8890'))
+STANDIN_LATENCY = os.getenv('STANDIN_LATENCY', 'none')
+STANDIN_RECORDINGS_DIR = os.path.join(os.path.dirname(__file__), 'recordings')
+
+# Network-condition injection proxy (see netem_proxy.py and network_benchmark.py)
+# latency_ms is the added round trip, kbps are per direction (0 = unlimited)
+NETWORK_SCENARIOS = {
+    'localhost': {},
+    'office-lan': {'latency_ms': 2, 'jitter_ms': 1, 'down_kbps': 100000, 'up_kbps': 100000},
+    'branch-office': {'latency_ms': 60, 'jitter_ms': 10, 'down_kbps': 10000, 'up_kbps': 2000},
+    'remote-vpn': {'latency_ms': 150, 'jitter_ms': 30, 'down_kbps': 4000, 'up_kbps': 1000,
+                   'drop_rate': 0.005},
+    'mobile-3g': {'latency_ms': 300, 'jitter_ms': 80, 'down_kbps': 1600, 'up_kbps': 750,
+                  'drop_rate': 0.02},
+}
+NETWORK_SCENARIO = os.getenv('NETWORK_SCENARIO', 'branch-office')
+NETWORK_PROXY_WEB_PORT = int(os.getenv('NETWORK_PROXY_WEB_PORT', '3001'))
+NETWORK_PROXY_API_PORT = int(os.getenv('NETWORK_PROXY_API_PORT', '8891'))
+
+# Soak mode (see soak.py): allowed growth per 1000 requests once warmed up
+SOAK_GROWTH_LIMITS = {
+    'rss_mb': 0.5,
+    'heap_mb': 0.25,
+    'external_mb': 0.25,
+    'open_fds': 0.05,
+    'mongo_connections': 0.05,
+    'download_mb': 1.0,
+}
+SOAK_WARMUP = float(os.getenv('SOAK_WARMUP', '0.2'))  # share of the requests ignored
+SOAK_MIN_R2 = float(os.getenv('SOAK_MIN_R2', '0.6'))
+
+# Browser heap leak detector (see heap_leak.py): the pages office staff switch between
+# all day, and the allowed growth per navigation cycle
+HEAP_LEAK_ROUTES = ['/invoice', '/customer', '/quote', '/payment']
+HEAP_LEAK_LIMITS = {
+    'JSHeapUsedSize': 20 * 1024,  # bytes
+    'Nodes': 5,
+    'JSEventListeners': 1,
+    'Documents': 0.05,
+}
+
+# Query tracing (see query_trace.py): shapes flagged in the per-scenario report
+QUERY_TRACE_MAX_EXAMINED_RATIO = 10  # documents examined per document returned
+QUERY_TRACE_MAX_CALLS_PER_JOURNEY = 20
+
+# Revenue rollups (see rollup_benchmark.py): allowed p50 growth of a summary from the
+# smallest to the largest invoice count
+ROLLUP_MAX_GROWTH = 2
+
+# Bulk import (see import_benchmark.py): allowed backend RSS growth while streaming a file
+IMPORT_MAX_RSS_GROWTH_MB = 256
+
+# Sparse fieldsets (see projection_benchmark.py): smallest share of the list payload the
+# ?select= of the DataTable columns must save over whole documents
+PROJECTION_MIN_REDUCTION = 0.5
+
+# Overload (see overload_benchmark.py): share of the measured capacity the goodput must
+# keep, and the p99 of the admitted requests, at every step past capacity
+OVERLOAD_MIN_GOODPUT = 0.8
+OVERLOAD_MAX_P99_MS = 3000
@@ -1,8 +1,35 @@
 """
 Pytest configuration file
 """
+import os
+
 import pytest
 from base_test import BaseTest
+import config as test_config
+from db_isolation import WorkerDatabase
+from stack import export_for_worker
+
+try:
+    from pytest_metadata.plugin import metadata_key
+except ImportError:  # pytest-html not installed
+    metadata_key = None
+
+# the stack of this worker under `stack.py run --stacks N`, else None
+worker_stack = None
+
+
+def pytest_configure(config):
+    """Record the browser and profile in the HTML report environment table"""
+    global worker_stack
+    # under `stack.py run`, every worker talks to its own stack
+    worker_stack = export_for_worker()
+    if metadata_key is not None:
+        config.stash[metadata_key]['Browser'] = test_config.BROWSER
+        config.stash[metadata_key]['Browser profile'] = test_config.BROWSER_PROFILE
+
+
+def pytest_report_header():
+    return f"browser: {test_config.BROWSER}, browser profile: {test_config.BROWSER_PROFILE}"
 
 
 @pytest.fixture(scope='function')
@@ -12,3 +39,30 @@ def setup_teardown():
     test_instance.setup_method()
     yield test_instance
     test_instance.teardown_method()
+
+
+@pytest.fixture(scope='session')
+def worker_database():
+    """Database and backend of this pytest worker, restored from the seeded template"""
+    database = WorkerDatabase(stack=worker_stack).start()
+    yield database
+    database.stop()
+
+
+@pytest.fixture(scope='function')
+def isolated_db(worker_database):
+    """Worker database restored to the template before the test"""
+    worker_database.restore()
+    return worker_database
+
+
+@pytest.fixture(scope='function')
+def browser_db(request):
+    """isolated_db for tests creating data through the browser, which only reaches the
+    backend of its frontend: that of the worker's stack, or the one shared by all workers"""
+    if worker_stack:
+        return request.getfixturevalue('isolated_db')
+    if os.getenv('PYTEST_XDIST_WORKER'):
+        pytest.skip('creates data through the browser: under xdist run it with a stack per '
+                    'worker (python stack.py run --stacks N -- pytest -n N)')
+    return None
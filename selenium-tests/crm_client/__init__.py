@@ -0,0 +1,17 @@
+"""
+Python client for the IDURAR backend API
+
+CrmClient (requests) and AsyncCrmClient (aiohttp) keep one keep-alive
+connection pool each, log in with the test account and renew the Bearer
+token when isValidAuthToken rejects it, expose every route as a typed helper
+(api.invoice.list(), api.setting.read_by_key(), ...), iterate lazily over
+paginatedList pages, run bulk create/update/delete with bounded parallelism
+and report every call to the registered timing hooks.
+"""
+from crm_client.aio import AsyncCrmClient
+from crm_client.client import CrmClient
+from crm_client.routes import APP_ENTITIES, Entity
+from crm_client.types import ApiError, CallTiming, Page
+
+__all__ = ['APP_ENTITIES', 'ApiError', 'AsyncCrmClient', 'CallTiming', 'CrmClient', 'Entity',
+           'Page']
@@ -0,0 +1,224 @@
+"""
+asyncio client: one aiohttp connector (keep-alive pool) per client
+
+async with AsyncCrmClient() as api:
+    await api.login()
+    async for invoice in api.invoice.iterate():
+        ...
+    await api.client.bulk_create(clients, concurrency=32)
+"""
+import asyncio
+import time
+from json import loads
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+try:
+    import aiohttp
+except ImportError:  # the sync client works without it
+    aiohttp = None
+
+import config
+from crm_client.routes import (APP_ENTITIES, Admin, Entity, Profiler, QueryTrace, Recurring,
+                               Settings, batch_requests, download_path, result, server_url)
+from crm_client.types import ApiError, CallTiming, Page, unwrap
+
+DEFAULT_POOL_SIZE = 64
+DEFAULT_TIMEOUT = 30
+
+
+class AsyncCrmClient:
+    """Same routes as CrmClient, every helper returns an awaitable"""
+
+    def __init__(self, base_url: Optional[str] = None, email: Optional[str] = None,
+                 password: Optional[str] = None, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT, hooks: Sequence[Callable] = ()):
+        if aiohttp is None:
+            raise RuntimeError('AsyncCrmClient needs aiohttp (pip install -r requirements.txt)')
+        self.base_url = (base_url or config.API_BASE_URL).rstrip('/') + '/'
+        self.server_url = server_url(self.base_url)
+        self.email = email or config.TEST_EMAIL
+        self.password = password or config.TEST_PASSWORD
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.hooks = list(hooks)
+        self.token = None
+        self.session = None
+        self.login_lock = None
+        for name in APP_ENTITIES:
+            setattr(self, name, Entity(self, name))
+        self.setting = Settings(self)
+        self.admin = Admin(self)
+        self.profiler = Profiler(self)
+        self.query_trace = QueryTrace(self)
+        self.recurring = Recurring(self)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self.login_lock = asyncio.Lock()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def entity(self, name: str) -> Entity:
+        return getattr(self, name)
+
+    def on_call(self, hook: Callable[[CallTiming], None]):
+        """Register a hook called with the CallTiming of every request"""
+        self.hooks.append(hook)
+        return hook
+
+    def _emit(self, timing: CallTiming):
+        for hook in self.hooks:
+            hook(timing)
+
+    async def _send(self, method, path, params, json, files, attempt):
+        await self.open()
+        headers = {'Authorization': f"Bearer {self.token}"} if self.token else {}
+        data = None
+        if files:
+            data = aiohttp.FormData()
+            for field, (filename, content) in files.items():
+                data.add_field(field, content, filename=filename)
+        if params:
+            params = {key: str(value) for key, value in params.items() if value is not None}
+        start = time.perf_counter()
+        try:
+            async with self.session.request(method, self.base_url + path, params=params,
+                                            json=json, data=data, headers=headers) as response:
+                body = await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            self._emit(CallTiming(method, path, 0, time.perf_counter() - start, 0,
+                                  error=type(error).__name__, attempt=attempt))
+            raise
+        timing = CallTiming(method, path, status, time.perf_counter() - start, len(body),
+                            attempt=attempt)
+        try:
+            payload = loads(body) if body else None
+        except ValueError:
+            payload = body.decode('utf-8', 'replace')
+        try:
+            return unwrap(status, payload)
+        except ApiError as error:
+            timing.error = error.message
+            raise
+        finally:
+            self._emit(timing)
+
+    async def call(self, method: str, path: str, params: Optional[dict] = None,
+                   json: Any = None, files: Optional[dict] = None,
+                   parse: Callable[[dict], Any] = result):
+        """Send one request; a rejected token is renewed once with the stored credentials"""
+        try:
+            payload = await self._send(method, path, params, json, files, 1)
+        except ApiError as error:
+            if not (error.expired and self.token and path != 'login'):
+                raise
+            rejected = self.token
+            async with self.login_lock:
+                # concurrent calls share a single re-login
+                if self.token == rejected:
+                    await self.login()
+            payload = await self._send(method, path, params, json, files, 2)
+        return parse(payload) if isinstance(payload, dict) else payload
+
+    # ---- core routes -------------------------------------------------------------
+
+    async def login(self, email: Optional[str] = None, password: Optional[str] = None,
+                    remember: bool = False) -> Dict[str, Any]:
+        self.email = email or self.email
+        self.password = password or self.password
+        self.token = None
+        admin = await self.call('POST', 'login', json={'email': self.email,
+                                                       'password': self.password,
+                                                       'remember': remember})
+        self.token = admin['token']
+        return admin
+
+    async def logout(self):
+        answer = await self.call('POST', 'logout')
+        self.token = None
+        return answer
+
+    def forget_password(self, email: str):
+        return self.call('POST', 'forgetpassword', json={'email': email})
+
+    def reset_password(self, user_id: str, reset_token: str, password: str):
+        return self.call('POST', 'resetpassword',
+                         json={'userId': user_id, 'resetToken': reset_token, 'password': password})
+
+    def health(self):
+        return self.call('GET', 'health', parse=lambda payload: payload)
+
+    def batch(self, urls: Sequence[str]):
+        """Run read-only sub-requests in one /batch round trip"""
+        return self.call('POST', 'batch', json=batch_requests(urls))
+
+    async def download(self, directory: str, id: str) -> bytes:
+        """GET /download/<directory>/<directory>-<id>.pdf (served next to /api/)"""
+        await self.open()
+        path = download_path(directory, id)
+        start = time.perf_counter()
+        try:
+            async with self.session.get(self.server_url + path) as response:
+                body = await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            self._emit(CallTiming('GET', path, 0, time.perf_counter() - start, 0,
+                                  error=type(error).__name__))
+            raise
+        timing = CallTiming('GET', path, status, time.perf_counter() - start, len(body))
+        try:
+            if status >= 400:
+                try:
+                    payload = loads(body)
+                except ValueError:
+                    payload = body.decode('utf-8', 'replace')
+                unwrap(status, payload)
+            return body
+        except ApiError as error:
+            timing.error = error.message
+            raise
+        finally:
+            self._emit(timing)
+
+    # ---- iteration and bulk ------------------------------------------------------
+
+    async def iter_pages(self, entity: Entity, items: int, query: dict) -> AsyncIterator[Page]:
+        number = 1
+        while True:
+            page = await entity.list(page=number, items=items, **query)
+            yield page
+            if page.last or not page.items:
+                return
+            number += 1
+
+    async def iter_items(self, entity: Entity, items: int,
+                         query: dict) -> AsyncIterator[Dict[str, Any]]:
+        async for page in self.iter_pages(entity, items, query):
+            for item in page.items:
+                yield item
+
+    async def bulk(self, function: Callable, arguments: List[tuple],
+                   concurrency: Optional[int] = None,
+                   return_exceptions: bool = False) -> List[Any]:
+        """Await function(*args) for every args with at most concurrency requests in flight"""
+        semaphore = asyncio.Semaphore(min(concurrency or self.pool_size, self.pool_size))
+
+        async def run(args):
+            async with semaphore:
+                return await function(*args)
+
+        return await asyncio.gather(*(run(args) for args in arguments),
+                                    return_exceptions=return_exceptions)
@@ -0,0 +1,203 @@
+"""
+Synchronous client: one keep-alive connection pool per client
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from crm_client.routes import (APP_ENTITIES, Admin, Entity, Profiler, QueryTrace, Recurring,
+                               Settings, batch_requests, download_path, result, server_url)
+from crm_client.types import ApiError, CallTiming, Page, unwrap
+
+DEFAULT_POOL_SIZE = 16
+DEFAULT_TIMEOUT = 30
+
+
+class CrmClient:
+    """Pooled client of the backend API with Bearer token handling
+
+    api = CrmClient()
+    api.login()
+    for invoice in api.invoice.iterate(status='draft'):
+        ...
+    api.client.bulk_create(clients, concurrency=8)
+    """
+
+    def __init__(self, base_url: Optional[str] = None, email: Optional[str] = None,
+                 password: Optional[str] = None, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT, hooks: Sequence[Callable] = ()):
+        self.base_url = (base_url or config.API_BASE_URL).rstrip('/') + '/'
+        self.server_url = server_url(self.base_url)
+        self.email = email or config.TEST_EMAIL
+        self.password = password or config.TEST_PASSWORD
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.hooks = list(hooks)
+        self.token = None
+        self.login_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        for name in APP_ENTITIES:
+            setattr(self, name, Entity(self, name))
+        self.setting = Settings(self)
+        self.admin = Admin(self)
+        self.profiler = Profiler(self)
+        self.query_trace = QueryTrace(self)
+        self.recurring = Recurring(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def entity(self, name: str) -> Entity:
+        return getattr(self, name)
+
+    def on_call(self, hook: Callable[[CallTiming], None]):
+        """Register a hook called with the CallTiming of every request"""
+        self.hooks.append(hook)
+        return hook
+
+    def _emit(self, timing: CallTiming):
+        for hook in self.hooks:
+            hook(timing)
+
+    def _send(self, method, path, params, json, files, attempt):
+        headers = {'Authorization': f"Bearer {self.token}"} if self.token else {}
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, params=params,
+                                            json=json, files=files, headers=headers,
+                                            timeout=self.timeout)
+        except requests.RequestException as error:
+            self._emit(CallTiming(method, path, 0, time.perf_counter() - start, 0,
+                                  error=type(error).__name__, attempt=attempt))
+            raise
+        timing = CallTiming(method, path, response.status_code, time.perf_counter() - start,
+                            len(response.content), attempt=attempt)
+        try:
+            payload = response.json() if response.content else None
+        except ValueError:
+            payload = response.text
+        try:
+            return unwrap(response.status_code, payload)
+        except ApiError as error:
+            timing.error = error.message
+            raise
+        finally:
+            self._emit(timing)
+
+    def call(self, method: str, path: str, params: Optional[dict] = None, json: Any = None,
+             files: Optional[dict] = None, parse: Callable[[dict], Any] = result):
+        """Send one request; a rejected token is renewed once with the stored credentials"""
+        try:
+            payload = self._send(method, path, params, json, files, 1)
+        except ApiError as error:
+            if not (error.expired and self.token and path != 'login'):
+                raise
+            rejected = self.token
+            with self.login_lock:
+                # concurrent calls share a single re-login
+                if self.token == rejected:
+                    self.login()
+            payload = self._send(method, path, params, json, files, 2)
+        return parse(payload) if isinstance(payload, dict) else payload
+
+    # ---- core routes -------------------------------------------------------------
+
+    def login(self, email: Optional[str] = None, password: Optional[str] = None,
+              remember: bool = False) -> Dict[str, Any]:
+        self.email = email or self.email
+        self.password = password or self.password
+        self.token = None
+        admin = self.call('POST', 'login', json={'email': self.email, 'password': self.password,
+                                                 'remember': remember})
+        self.token = admin['token']
+        return admin
+
+    def logout(self):
+        answer = self.call('POST', 'logout')
+        self.token = None
+        return answer
+
+    def forget_password(self, email: str):
+        return self.call('POST', 'forgetpassword', json={'email': email})
+
+    def reset_password(self, user_id: str, reset_token: str, password: str):
+        return self.call('POST', 'resetpassword',
+                         json={'userId': user_id, 'resetToken': reset_token, 'password': password})
+
+    def health(self) -> Dict[str, Any]:
+        return self.call('GET', 'health', parse=lambda payload: payload)
+
+    def batch(self, urls: Sequence[str]) -> List[Dict[str, Any]]:
+        """Run read-only sub-requests in one /batch round trip"""
+        return self.call('POST', 'batch', json=batch_requests(urls))
+
+    def download(self, directory: str, id: str) -> bytes:
+        """GET /download/<directory>/<directory>-<id>.pdf (served next to /api/)"""
+        path = download_path(directory, id)
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.server_url + path, timeout=self.timeout)
+        except requests.RequestException as error:
+            self._emit(CallTiming('GET', path, 0, time.perf_counter() - start, 0,
+                                  error=type(error).__name__))
+            raise
+        timing = CallTiming('GET', path, response.status_code, time.perf_counter() - start,
+                            len(response.content))
+        try:
+            if response.status_code >= 400:
+                try:
+                    payload = response.json()
+                except ValueError:
+                    payload = response.text
+                unwrap(response.status_code, payload)
+            return response.content
+        except ApiError as error:
+            timing.error = error.message
+            raise
+        finally:
+            self._emit(timing)
+
+    # ---- iteration and bulk ------------------------------------------------------
+
+    def iter_pages(self, entity: Entity, items: int, query: dict) -> Iterator[Page]:
+        number = 1
+        while True:
+            page = entity.list(page=number, items=items, **query)
+            yield page
+            if page.last or not page.items:
+                return
+            number += 1
+
+    def iter_items(self, entity: Entity, items: int, query: dict) -> Iterator[Dict[str, Any]]:
+        for page in self.iter_pages(entity, items, query):
+            yield from page.items
+
+    def bulk(self, function: Callable, arguments: List[tuple], concurrency: Optional[int] = None,
+             return_exceptions: bool = False) -> List[Any]:
+        """Call function(*args) for every args with at most concurrency requests in flight"""
+        workers = min(concurrency or self.pool_size, self.pool_size, max(len(arguments), 1))
+
+        def run(args):
+            try:
+                return function(*args)
+            except Exception as error:
+                if return_exceptions:
+                    return error
+                raise
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, arguments))
@@ -0,0 +1,264 @@
+"""
+Typed helpers for every route of backend/src/routes (appApi.js, coreApi.js,
+coreAuth.js, coreBatch.js, coreDownloadRouter.js, coreProfiler.js,
+coreQueryTrace.js and coreRecurring.js)
+
+The helpers only describe the requests; the client they are bound to sends
+them, so the same classes serve the sync client (values) and the asyncio
+client (awaitables).
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from crm_client.types import Page
+
+# routesList of backend/src/models/utils: one entry per file of models/appModels
+APP_ENTITIES = ('client', 'invoice', 'quote', 'payment', 'paymentmode', 'taxes')
+MAIL_ENTITIES = ('invoice', 'quote', 'payment')
+CONVERT_ENTITIES = ('quote',)
+REVENUE_ENTITIES = ('invoice', 'payment')
+IMPORT_ENTITIES = ('client', 'invoice')
+
+
+def result(payload: dict) -> Any:
+    return payload.get('result')
+
+
+def selected(select: Optional[Sequence[str]]) -> Dict[str, str]:
+    """The ?select= sparse fieldset of a list or read (fields, dotted into references)"""
+    return {'select': ','.join(select)} if select else {}
+
+
+class Entity:
+    """The routerApp routes of one entity"""
+
+    def __init__(self, client, name: str):
+        self.client = client
+        self.name = name
+
+    def _call(self, method: str, route: str, params=None, json=None, parse=result):
+        return self.client.call(method, f"{self.name}/{route}", params=params, json=json,
+                                parse=parse)
+
+    def create(self, data: Dict[str, Any]):
+        return self._call('POST', 'create', json=data)
+
+    def read(self, id: str, select: Optional[Sequence[str]] = None):
+        return self._call('GET', f"read/{id}", params=selected(select) or None)
+
+    def update(self, id: str, data: Dict[str, Any]):
+        return self._call('PATCH', f"update/{id}", json=data)
+
+    def delete(self, id: str):
+        return self._call('DELETE', f"delete/{id}")
+
+    def search(self, q: str, fields: Sequence[str] = ('name',),
+               select: Optional[Sequence[str]] = None):
+        return self._call('GET', 'search',
+                          params={'q': q, 'fields': ','.join(fields), **selected(select)})
+
+    def list(self, page: int = 1, items: int = 10, select: Optional[Sequence[str]] = None,
+             **query) -> Page:
+        """One paginatedList page (sortBy, sortValue, filter, equal, q, fields)"""
+        return self._call('GET', 'list',
+                          params={'page': page, 'items': items, **selected(select), **query},
+                          parse=Page.from_payload)
+
+    def list_all(self, sort: str = 'desc', select: Optional[Sequence[str]] = None, **query):
+        return self._call('GET', 'listAll', params={'sort': sort, **selected(select), **query})
+
+    def filter(self, filter: str, equal: Any, select: Optional[Sequence[str]] = None):
+        return self._call('GET', 'filter',
+                          params={'filter': filter, 'equal': equal, **selected(select)})
+
+    def summary(self, **query):
+        """Totals of the entity (type=week|month|year for client, invoice and payment)"""
+        return self._call('GET', 'summary', params=query or None)
+
+    def mail(self, data: Dict[str, Any]):
+        if self.name not in MAIL_ENTITIES:
+            raise AttributeError(f"{self.name} has no mail route")
+        return self._call('POST', 'mail', json=data)
+
+    def revenue(self, from_: Optional[str] = None, to: Optional[str] = None,
+                interval: str = 'day', currency: Optional[str] = None):
+        """Count and totals per day, week or month between two YYYY-MM-DD days"""
+        if self.name not in REVENUE_ENTITIES:
+            raise AttributeError(f"{self.name} has no revenue route")
+        params = {'from': from_, 'to': to, 'interval': interval, 'currency': currency}
+        return self._call('GET', 'revenue',
+                          params={key: value for key, value in params.items() if value})
+
+    def imports(self, id: Optional[str] = None):
+        """Progress of the bulk imports of this entity on the backend process, or of one import
+        with its per-row errors (the upload itself: POST {entity}/import with a streamed body)"""
+        if self.name not in IMPORT_ENTITIES:
+            raise AttributeError(f"{self.name} has no import route")
+        return self._call('GET', f"import/{id}" if id else 'import')
+
+    def convert(self, id: str):
+        if self.name not in CONVERT_ENTITIES:
+            raise AttributeError(f"{self.name} has no convert route")
+        return self._call('GET', f"convert/{id}")
+
+    def download(self, id: str) -> bytes:
+        """The PDF of a document, regenerated by the backend on every download"""
+        return self.client.download(self.name, id)
+
+    def pages(self, items: int = 100, **query):
+        """Lazily iterate over the list pages, one request per page"""
+        return self.client.iter_pages(self, items, query)
+
+    def iterate(self, items: int = 100, **query):
+        """Lazily iterate over the documents of every list page"""
+        return self.client.iter_items(self, items, query)
+
+    def bulk_create(self, documents: Iterable[Dict[str, Any]], concurrency: Optional[int] = None,
+                    return_exceptions: bool = False):
+        """Create documents concurrently, results in input order"""
+        return self.client.bulk(self.create, [(document,) for document in documents],
+                                concurrency, return_exceptions)
+
+    def bulk_update(self, updates: Iterable[Tuple[str, Dict[str, Any]]],
+                    concurrency: Optional[int] = None, return_exceptions: bool = False):
+        """Apply (id, data) updates concurrently, results in input order"""
+        return self.client.bulk(self.update, list(updates), concurrency, return_exceptions)
+
+    def bulk_delete(self, ids: Iterable[str], concurrency: Optional[int] = None,
+                    return_exceptions: bool = False):
+        return self.client.bulk(self.delete, [(id,) for id in ids], concurrency,
+                                return_exceptions)
+
+
+class Settings:
+    """The /setting routes of coreApi.js"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _call(self, method: str, route: str, params=None, json=None):
+        return self.client.call(method, f"setting/{route}", params=params, json=json)
+
+    def create(self, data: Dict[str, Any]):
+        return self._call('POST', 'create', json=data)
+
+    def read(self, id: str):
+        return self._call('GET', f"read/{id}")
+
+    def update(self, id: str, data: Dict[str, Any]):
+        return self._call('PATCH', f"update/{id}", json=data)
+
+    def search(self, q: str, fields: Sequence[str] = ('settingKey',)):
+        return self._call('GET', 'search', params={'q': q, 'fields': ','.join(fields)})
+
+    def list(self, page: int = 1, items: int = 10, **query):
+        return self._call('GET', 'list', params={'page': page, 'items': items, **query})
+
+    def list_all(self, **query):
+        return self._call('GET', 'listAll', params=query or None)
+
+    def filter(self, filter: str, equal: Any):
+        return self._call('GET', 'filter', params={'filter': filter, 'equal': equal})
+
+    def read_by_key(self, key: str):
+        return self._call('GET', f"readBySettingKey/{key}")
+
+    def list_by_keys(self, keys: Sequence[str]):
+        return self._call('GET', 'listBySettingKey', params={'settingKeyArray': ','.join(keys)})
+
+    def update_by_key(self, key: str, value: Any):
+        return self._call('PATCH', f"updateBySettingKey/{key}", json={'settingValue': value})
+
+    def update_many(self, settings: List[Dict[str, Any]]):
+        """settings: [{settingKey, settingValue}, ...]"""
+        return self._call('PATCH', 'updateManySetting', json={'settings': settings})
+
+    def upload(self, key: str, filename: str, content: bytes):
+        return self.client.call('PATCH', f"setting/upload/{key}",
+                                files={'settingValue': (filename, content)})
+
+
+class Admin:
+    """The /admin routes of coreApi.js"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def read(self, id: str):
+        return self.client.call('GET', f"admin/read/{id}")
+
+    def update_password(self, id: str, password: str):
+        return self.client.call('PATCH', f"admin/password-update/{id}",
+                                json={'password': password})
+
+    def update_profile(self, data: Dict[str, Any]):
+        return self.client.call('PATCH', 'admin/profile/update', json=data)
+
+    def update_profile_password(self, password: str, password_check: str):
+        return self.client.call('PATCH', 'admin/profile/password',
+                                json={'password': password, 'passwordCheck': password_check})
+
+
+class Profiler:
+    """The /profiler routes, mounted when the backend runs with PROFILER=true"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def start(self, label: str = '', cpu: bool = True, heap: bool = True,
+              sampling_interval: int = 1000, heap_sampling_interval: int = 32768):
+        """sampling_interval in microseconds, heap_sampling_interval in bytes"""
+        return self.client.call('POST', 'profiler/start', json={
+            'label': label, 'cpu': cpu, 'heap': heap, 'samplingInterval': sampling_interval,
+            'heapSamplingInterval': heap_sampling_interval})
+
+    def stop(self):
+        """The V8 profiles: cpuProfile (.cpuprofile) and heapProfile (.heapprofile)"""
+        return self.client.call('POST', 'profiler/stop')
+
+    def status(self):
+        return self.client.call('GET', 'profiler/status')
+
+
+class QueryTrace:
+    """The /querytrace routes, mounted when the backend runs with QUERY_TRACE=true"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def read(self, sort: str = 'totalMs', limit: int = 50):
+        """Per-shape statistics (rows) and the sampled slow-query log (slowLog)"""
+        return self.client.call('GET', 'querytrace', params={'sort': sort, 'limit': limit})
+
+    def reset(self):
+        return self.client.call('POST', 'querytrace/reset')
+
+
+class Recurring:
+    """The /recurring routes of the recurring invoice scheduler"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def run(self):
+        """Run a pass now: its report (status, generated, skipped, ms, perSecond)"""
+        return self.client.call('POST', 'recurring/run')
+
+    def status(self):
+        return self.client.call('GET', 'recurring/status')
+
+
+def batch_requests(urls: Sequence[str]) -> Dict[str, Any]:
+    """Return the /batch body for read-only sub-request URLs (relative to /api/)"""
+    return {'requests': [{'id': str(index), 'url': url} for index, url in enumerate(urls)]}
+
+
+def download_path(directory: str, id: str) -> str:
+    """coreDownloadRouter takes the id from the file name"""
+    return f"download/{directory}/{directory}-{id}.pdf"
+
+
+def server_url(api_base_url: str) -> str:
+    """The server root of an .../api/ base URL, where /download is mounted"""
+    if api_base_url.endswith('/api/'):
+        return api_base_url[:-len('api/')]
+    return api_base_url
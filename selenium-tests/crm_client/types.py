@@ -0,0 +1,70 @@
+"""
+Result, error and timing types shared by the sync and asyncio clients
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+class ApiError(Exception):
+    """An HTTP error status or a {success: false} answer of the backend"""
+
+    def __init__(self, status: int, message: str, payload: Optional[dict] = None):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+        self.payload = payload or {}
+
+    @property
+    def expired(self) -> bool:
+        """True when isValidAuthToken rejected the token"""
+        return self.status == 401 and bool(self.payload.get('jwtExpired'))
+
+
+@dataclass
+class Page:
+    """One page of a paginatedList answer"""
+    items: List[Dict[str, Any]]
+    page: int
+    pages: int
+    count: int
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> 'Page':
+        pagination = payload.get('pagination') or {}
+        return cls(items=payload.get('result') or [], page=int(pagination.get('page', 1)),
+                   pages=int(pagination.get('pages', 0)), count=int(pagination.get('count', 0)))
+
+    @property
+    def last(self) -> bool:
+        return self.page >= self.pages
+
+
+@dataclass
+class CallTiming:
+    """Passed to the timing hooks after every call"""
+    method: str
+    path: str
+    status: int
+    seconds: float
+    bytes: int
+    error: Optional[str] = None
+    attempt: int = 1
+    extra: dict = field(default_factory=dict)
+
+
+# search (202 "No document found") and listAll (203 "Collection is Empty") answer an
+# empty result with success: false
+EMPTY_STATUSES = (202, 203)
+
+
+def unwrap(status: int, payload: Any) -> Any:
+    """Return the payload of a successful answer, raise ApiError otherwise"""
+    if not isinstance(payload, dict):
+        if status >= 400:
+            raise ApiError(status, str(payload)[:200])
+        return payload
+    if status in EMPTY_STATUSES and payload.get('result') == []:
+        return payload
+    if status >= 400 or payload.get('success') is False:
+        raise ApiError(status, payload.get('message') or 'Request failed', payload)
+    return payload
@@ -0,0 +1,134 @@
+"""
+Dashboard time-to-data benchmark
+Compares loading the dashboard data with the individual summary/list requests
+against a single /api/batch round trip, over an emulated slow link.
+
+Run: python dashboard_benchmark.py --rtt-ms 150 --kbps 512
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import config
+
+# Same requests the DashboardModule needs, in batch sub-request form
+DASHBOARD_REQUESTS = [
+    {'id': 'invoice', 'url': 'invoice/summary'},
+    {'id': 'quote', 'url': 'quote/summary'},
+    {'id': 'payment', 'url': 'payment/summary'},
+    {'id': 'client', 'url': 'client/summary'},
+    {'id': 'recentInvoices', 'url': 'invoice/list'},
+    {'id': 'recentQuotes', 'url': 'quote/list'},
+]
+
+# Browsers open at most six HTTP/1.1 connections per origin
+BROWSER_CONNECTIONS = 6
+
+
+class SlowLink:
+    """Emulates a link with a fixed round-trip time and a shared bandwidth cap"""
+
+    def __init__(self, rtt_ms=0, kbps=0):
+        self.rtt = rtt_ms / 1000
+        self.bytes_per_second = kbps * 1024 / 8 if kbps else 0
+        self.lock = threading.Lock()
+
+    def transfer(self, response):
+        """Delay the caller as if the response had crossed the link"""
+        time.sleep(self.rtt)
+        if self.bytes_per_second:
+            # the downlink is shared by all connections
+            with self.lock:
+                time.sleep(len(response.content) / self.bytes_per_second)
+        return response
+
+
+def login():
+    """Return a bearer token for the test account"""
+    response = requests.post(
+        f"{config.API_BASE_URL}/login",
+        json={'email': config.TEST_EMAIL, 'password': config.TEST_PASSWORD},
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()['result']['token']
+
+
+def load_separately(headers, link):
+    """Fetch every dashboard request on its own, like the previous frontend did"""
+    def fetch(item):
+        response = requests.get(f"{config.API_BASE_URL}/{item['url']}", headers=headers,
+                                timeout=60)
+        return link.transfer(response).status_code
+
+    with ThreadPoolExecutor(max_workers=BROWSER_CONNECTIONS) as pool:
+        return list(pool.map(fetch, DASHBOARD_REQUESTS))
+
+
+def load_batched(headers, link):
+    """Fetch every dashboard request in one /batch round trip"""
+    response = requests.post(f"{config.API_BASE_URL}/batch", headers=headers,
+                             json={'requests': DASHBOARD_REQUESTS}, timeout=60)
+    link.transfer(response)
+    return [item['status'] for item in response.json()['result']]
+
+
+def measure(loader, headers, link, runs):
+    """Return time-to-data samples in milliseconds"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        statuses = loader(headers, link)
+        samples.append((time.perf_counter() - start) * 1000)
+        failed = [status for status in statuses if status >= 400]
+        if failed:
+            print(f"⚠ {loader.__name__}: sub-requests failed with {failed}")
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--rtt-ms', type=float, default=150)
+    parser.add_argument('--kbps', type=float, default=1024)
+    parser.add_argument('--output',
+                        default=os.path.join(config.REPORT_DIR, 'dashboard_benchmark.json'))
+    args = parser.parse_args(argv)
+
+    try:
+        headers = {'Authorization': f'Bearer {login()}'}
+    except requests.exceptions.RequestException as e:
+        print(f"⚠ Backend API not accessible: {e}")
+        return 1
+
+    link = SlowLink(args.rtt_ms, args.kbps)
+    results = {}
+    for loader in (load_separately, load_batched):
+        samples = sorted(measure(loader, headers, link, args.runs))
+        results[loader.__name__] = {
+            'runs': len(samples),
+            'mean_ms': statistics.mean(samples),
+            'p50_ms': samples[len(samples) // 2],
+            'max_ms': samples[-1],
+        }
+        print(f"{loader.__name__:16} mean {results[loader.__name__]['mean_ms']:8.1f}ms "
+              f"p50 {results[loader.__name__]['p50_ms']:8.1f}ms "
+              f"max {results[loader.__name__]['max_ms']:8.1f}ms")
+
+    results['link'] = {'rtt_ms': args.rtt_ms, 'kbps': args.kbps}
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"📊 Report: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
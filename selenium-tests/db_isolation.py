@@ -0,0 +1,261 @@
+"""
+Per-worker database isolation
+
+Every pytest worker (PYTEST_XDIST_WORKER, 'main' without xdist) gets its own
+database <MONGO_DB>_<worker> on the local mongod and its own backend process
+(node src/server.js with DATABASE and PORT overridden). A template database
+<MONGO_DB>_template is seeded once with src/setup/setup.js; the first worker
+to claim it seeds it while the others wait.
+
+Between tests the worker database is restored on the server: dbHash tells
+which collections differ from the template, those are cloned back with an
+aggregation $out (indexes of the existing collection are kept) and the
+collections the test created are dropped. Nothing is re-seeded through the
+API. The ETag write counters (cacheversions) are bumped instead of restored so
+the backend never revalidates a cached response against rolled-back data.
+
+Under `stack.py run --stacks N` the worker database is the one of the
+worker's stack, served by the stack's backend, so browser tests restore the
+data their frontend shows. Tests that create data through the browser use
+browser_db: isolated_db with a stack per worker, skipped under xdist without
+one since every worker would share the one backend behind the frontend.
+
+Fixtures (conftest.py): worker_database (session), isolated_db (restores
+before the test) and browser_db.
+
+Run: python db_isolation.py --seed   # (re)build the template database
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+from pymongo import MongoClient, ReturnDocument
+
+import config
+
+MARKER = '__snapshot'
+# Write counters of the ETag layer, must only ever grow
+VERSION_COLLECTION = 'cacheversions'
+SKIPPED = {MARKER, VERSION_COLLECTION}
+SEED_TIMEOUT = 120
+
+
+def worker_id():
+    return os.getenv('PYTEST_XDIST_WORKER', 'main')
+
+
+def database_name(worker=None):
+    """Return the database of a worker"""
+    return f"{config.MONGO_DB}_{worker or worker_id()}"
+
+
+def template_name():
+    return f"{config.MONGO_DB}_template"
+
+
+def database_uri(name, mongo_uri=None):
+    return f"{(mongo_uri or config.MONGO_URI).rstrip('/')}/{name}"
+
+
+def collection_hashes(db):
+    """Return {collection: md5} computed by the server"""
+    hashes = db.command('dbHash')['collections']
+    return {name: digest for name, digest in hashes.items()
+            if name not in SKIPPED and not name.startswith('system.')}
+
+
+def plan_restore(template, current):
+    """Return (collections to clone from the template, collections to drop)"""
+    clone = sorted(name for name, digest in template.items() if current.get(name) != digest)
+    drop = sorted(name for name in current if name not in template)
+    return clone, drop
+
+
+def seed_database(client, name, mongo_uri=None):
+    """Run the backend setup script (admin, settings, taxes, payment mode) against a database"""
+    env = dict(os.environ, DATABASE=database_uri(name, mongo_uri))
+    subprocess.run(['node', 'src/setup/setup.js'], cwd=config.BACKEND_DIR, env=env,
+                   check=True, capture_output=True, timeout=SEED_TIMEOUT)
+    if not client[name]['admins'].count_documents({}):
+        raise RuntimeError('src/setup/setup.js did not create the admin user')
+
+
+def seed_template(client, force=False):
+    """Seed the template database once across all workers, return True if this call seeded it"""
+    db = client[template_name()]
+    if force:
+        client.drop_database(template_name())
+    claim = db[MARKER].find_one_and_update(
+        {'_id': 'seed'}, {'$setOnInsert': {'state': 'seeding', 'worker': worker_id()}},
+        upsert=True, return_document=ReturnDocument.BEFORE)
+    if claim is not None:
+        deadline = time.monotonic() + SEED_TIMEOUT
+        while db[MARKER].find_one({'_id': 'seed'})['state'] != 'ready':
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{template_name()} is still being seeded by {claim['worker']}")
+            time.sleep(0.5)
+        return False
+
+    try:
+        seed_database(client, template_name())
+    except Exception:
+        db[MARKER].delete_one({'_id': 'seed'})
+        raise
+    db[MARKER].update_one({'_id': 'seed'}, {'$set': {'state': 'ready'}})
+    return True
+
+
+class DatabaseSnapshot:
+    """Restores a worker database to the template with server-side clones"""
+
+    def __init__(self, client, target=None):
+        self.template = client[template_name()]
+        self.db = client[target or database_name()]
+        self.template_hashes = collection_hashes(self.template)
+
+    def clone(self, name):
+        source = self.template[name]
+        if name not in self.db.list_collection_names():
+            self.db.create_collection(name)
+            for index in source.list_indexes():
+                if index['name'] == '_id_':
+                    continue
+                options = {key: value for key, value in index.items()
+                           if key not in ('key', 'v', 'ns')}
+                self.db[name].create_index(list(index['key'].items()), **options)
+        if source.estimated_document_count():
+            source.aggregate([{'$out': {'db': self.db.name, 'coll': name}}])
+        else:
+            self.db[name].delete_many({})
+
+    def restore(self):
+        """Bring the worker database back to the template, return the collections touched"""
+        clone, drop = plan_restore(self.template_hashes, collection_hashes(self.db))
+        for name in clone:
+            self.clone(name)
+        for name in drop:
+            self.db.drop_collection(name)
+        if clone or drop:
+            self.db[VERSION_COLLECTION].update_many({}, {'$inc': {'version': 1}})
+        return clone + drop
+
+    def drop(self):
+        self.db.client.drop_database(self.db.name)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class WorkerBackend:
+    """A backend process serving one worker database"""
+
+    def __init__(self, database, port=None, mongo_uri=None, node_args=(), env=None):
+        self.database = database
+        self.port = port or free_port()
+        self.mongo_uri = mongo_uri
+        self.node_args = list(node_args)
+        self.env = dict(env or {})
+        self.process = None
+
+    @property
+    def api_base_url(self):
+        return f"http://localhost:{self.port}/api/"
+
+    def start(self, timeout=60):
+        env = dict(os.environ, DATABASE=database_uri(self.database, self.mongo_uri),
+                   PORT=str(self.port),
+                   # restores bump the ETag counters, pick them up before the next test
+                   CACHE_VERSION_SYNC_MS='100', **self.env)
+        self.process = subprocess.Popen(['node', *self.node_args, 'src/server.js'],
+                                        cwd=config.BACKEND_DIR, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Backend for {self.database} exited with "
+                                   f"{self.process.returncode}")
+            try:
+                # ready, not only listening: auto-setup and the indexes are done
+                if requests.get(f"{self.api_base_url}ready", timeout=1).ok:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise TimeoutError(f"Backend for {self.database} did not answer on port {self.port}")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class WorkerDatabase:
+    """The isolated database and backend of the current worker, or of its stack"""
+
+    def __init__(self, client=None, stack=None):
+        self.client = client or MongoClient(config.MONGO_URI)
+        self.stack = stack
+        self.name = stack['database'] if stack else database_name()
+        self.snapshot = None
+        self.backend = None
+
+    @property
+    def api_base_url(self):
+        if self.stack:
+            return f"{self.stack['api_base_url'].rstrip('/')}/"
+        return self.backend.api_base_url
+
+    def start(self):
+        seed_template(self.client)
+        self.snapshot = DatabaseSnapshot(self.client, self.name)
+        self.snapshot.restore()
+        # a stack already runs the backend (and frontend) of its database
+        if not self.stack:
+            self.backend = WorkerBackend(self.name).start()
+        return self
+
+    def restore(self):
+        return self.snapshot.restore()
+
+    def stop(self):
+        if self.backend:
+            self.backend.stop()
+        if self.snapshot and not self.stack:
+            self.snapshot.drop()
+        self.client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', action='store_true', help='drop and reseed the template')
+    args = parser.parse_args(argv)
+
+    client = MongoClient(config.MONGO_URI)
+    start = time.perf_counter()
+    seeded = seed_template(client, force=args.seed)
+    print(f"✓ {template_name()} {'seeded' if seeded else 'ready'} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    snapshot = DatabaseSnapshot(client, database_name('benchmark'))
+    for label in ('initial clone', 'unchanged restore'):
+        start = time.perf_counter()
+        touched = snapshot.restore()
+        print(f"📊 {label:18} {len(touched):>3} collections in "
+              f"{(time.perf_counter() - start) * 1000:.1f}ms")
+    snapshot.drop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
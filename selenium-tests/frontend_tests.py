@@ -12,21 +12,21 @@ from webdriver_manager.chrome import ChromeDriverManager
 import time
 import os
 
-# Configuration - Your Frontend URL
-FRONTEND_URL = "http://20.239.224.248/"
+import config
+from locator import resolve
+from screenshots import get_pipeline
+
+# Configuration - Your Frontend URL (BASE_URL, or the stack started by stack.py)
+FRONTEND_URL = os.getenv('FRONTEND_URL', f"{config.BASE_URL.rstrip('/')}/")
 EMAIL = "admin@admin.com"
 PASSWORD = "admin123"
 SCREENSHOT_DIR = "screenshots"
-
-# Create screenshot directory
-os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+# Standalone runs keep every screenshot unless SCREENSHOT_POLICY says otherwise
+SCREENSHOT_POLICY = os.getenv('SCREENSHOT_POLICY', 'always')
 
 def take_screenshot(driver, name):
-    """Take a screenshot"""
-    filename = f"{SCREENSHOT_DIR}/{name}.png"
-    driver.save_screenshot(filename)
-    print(f"  Screenshot: {filename}")
-    return filename
+    """Take a screenshot (written in the background, see screenshots.py)"""
+    return get_pipeline(directory=SCREENSHOT_DIR, policy=SCREENSHOT_POLICY).capture(driver, name)
 
 def setup_driver():
     """Setup Chrome driver"""
@@ -39,7 +39,8 @@ def setup_driver():
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=options)
     driver.maximize_window()
-    driver.implicitly_wait(10)
+    # Lookups poll through locator.resolve / WebDriverWait instead of implicit waits
+    driver.implicitly_wait(0)
     return driver
 
 def find_and_fill_login_form(driver, email, password):
@@ -49,45 +50,29 @@ def find_and_fill_login_form(driver, email, password):
     # Wait for page to load
     time.sleep(2)
     
-    # Find email input - try multiple selectors for Ant Design
-    email_input = None
-    for by, selector in [
+    # Find email input - try multiple selectors for Ant Design (one browser round trip per poll)
+    match = resolve(driver, [
         (By.CSS_SELECTOR, "input[type='email']"),
         (By.CSS_SELECTOR, "input[placeholder*='admin@admin.com']"),
         (By.CSS_SELECTOR, ".ant-input[type='email']"),
         (By.CSS_SELECTOR, ".ant-input"),
         (By.XPATH, "//input[@type='email']"),
         (By.XPATH, "//input[contains(@placeholder, 'admin@admin.com')]"),
-    ]:
-        try:
-            email_input = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((by, selector))
-            )
-            if email_input.is_displayed():
-                break
-        except:
-            continue
-    
-    if not email_input:
+    ], timeout=10)
+    if not match:
         raise Exception("Email input field not found")
+    email_input = match.element
     
     # Find password input
-    password_input = None
-    for by, selector in [
+    match = resolve(driver, [
         (By.CSS_SELECTOR, "input[type='password']"),
         (By.CSS_SELECTOR, "input.ant-input-password"),
         (By.CSS_SELECTOR, ".ant-input-password input"),
         (By.XPATH, "//input[@type='password']"),
-    ]:
-        try:
-            password_input = driver.find_element(by, selector)
-            if password_input.is_displayed():
-                break
-        except:
-            continue
-    
-    if not password_input:
+    ], timeout=5)
+    if not match:
         raise Exception("Password input field not found")
+    password_input = match.element
     
     # Check if form is already prefilled with correct credentials
     email_value = email_input.get_attribute("value") or ""
@@ -363,7 +348,7 @@ def main():
     
     print("="*70)
     print(f"Results: {passed}/{total} tests passed")
-    print(f"Screenshots saved in: {SCREENSHOT_DIR}/")
+    print(f"Screenshots saved in: {SCREENSHOT_DIR}/ (see {SCREENSHOT_DIR}/index.jsonl)")
     print("="*70)
     print("\nTest execution completed!")
 
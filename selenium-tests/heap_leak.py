@@ -0,0 +1,261 @@
+"""
+Browser JS heap leak detector for repeated SPA navigation
+
+Logs in once and cycles through config.HEAP_LEAK_ROUTES with router
+navigation (no reload, like a tab kept open all day). After every route a full
+GC is forced and Performance.getMetrics is sampled: JSHeapUsedSize, Nodes,
+JSEventListeners and Documents.
+
+Detection (per metric, on the sample after the last route of each cycle):
+the least-squares slope per cycle must stay under HEAP_LEAK_LIMITS, and the
+minima of blocks of cycles must not keep rising. The sample after each route
+gives the same trend per route.
+
+Attribution: every growing route is then isolated, /about -> route -> /about
+repeated --isolate times, and heap snapshots taken after the route in the
+first and the last cycle are summarised per constructor and diffed. The
+snapshots (reports/heap/<route>-start|end.heapsnapshot) open in the DevTools
+Memory panel for a closer look. Chrome only.
+
+Run: python heap_leak.py --cycles 300
+     python heap_leak.py --routes /invoice /customer --no-snapshots
+"""
+import argparse
+import json
+import os
+import sys
+
+import cdp
+import config
+from journey import UiRunner, write_report
+from soak import fit
+
+HEAP_REPORT = os.path.join(config.REPORT_DIR, 'heap_leak.json')
+SNAPSHOT_DIR = os.path.join(config.REPORT_DIR, 'heap')
+METRICS = ('JSHeapUsedSize', 'Nodes', 'JSEventListeners', 'Documents')
+# a static page to come back to between the visits of an isolated route
+ANCHOR = '/about'
+BLOCK = 10
+
+
+# ---- browser probes ---------------------------------------------------------------
+
+def enable(driver):
+    driver.execute_cdp_cmd('Performance.enable', {})
+    driver.execute_cdp_cmd('HeapProfiler.enable', {})
+
+
+def sample(driver):
+    """Performance metrics after a full GC (twice, for objects freed by finalizers)"""
+    for _ in range(2):
+        driver.execute_cdp_cmd('HeapProfiler.collectGarbage', {})
+    metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+    values = {metric['name']: metric['value'] for metric in metrics}
+    return {name: values.get(name) for name in METRICS}
+
+
+def page_target(driver):
+    """The websocket URL of the page under test"""
+    address = driver.capabilities['goog:chromeOptions']['debuggerAddress']
+    pages = [target for target in cdp.targets(address) if target['type'] == 'page']
+    current = driver.current_url
+    return next((page for page in pages if page['url'] == current), pages[0])[
+        'webSocketDebuggerUrl']
+
+
+def take_snapshot(driver, path):
+    """Stream HeapProfiler.takeHeapSnapshot into path"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        def on_event(method, params):
+            if method == 'HeapProfiler.addHeapSnapshotChunk':
+                f.write(params['chunk'])
+
+        cdp.send(page_target(driver), [('HeapProfiler.enable', {}),
+                                       ('HeapProfiler.takeHeapSnapshot',
+                                        {'reportProgress': False})], on_event)
+    return path
+
+
+# ---- heap snapshots ---------------------------------------------------------------
+
+def summarize_snapshot(snapshot):
+    """{constructor: [count, self_size]} of a parsed .heapsnapshot
+
+    Groups like the Summary view of DevTools: objects and DOM natives by name,
+    the other node types as (closure), (string), (array), ...
+    """
+    meta = snapshot['snapshot']['meta']
+    fields = meta['node_fields']
+    types = meta['node_types'][0]
+    width = len(fields)
+    kind, name, size = fields.index('type'), fields.index('name'), fields.index('self_size')
+    nodes, strings = snapshot['nodes'], snapshot['strings']
+    summary = {}
+    for offset in range(0, len(nodes), width):
+        node_type = types[nodes[offset + kind]]
+        key = strings[nodes[offset + name]] if node_type in ('object', 'native') \
+            else f"({node_type})"
+        entry = summary.setdefault(key, [0, 0])
+        entry[0] += 1
+        entry[1] += nodes[offset + size]
+    return summary
+
+
+def load_summary(path):
+    with open(path) as f:
+        return summarize_snapshot(json.load(f))
+
+
+def diff_summaries(start, end, top=10):
+    """Constructors that gained the most retained bytes between two summaries"""
+    rows = []
+    for key in set(start) | set(end):
+        count = end.get(key, [0, 0])[0] - start.get(key, [0, 0])[0]
+        size = end.get(key, [0, 0])[1] - start.get(key, [0, 0])[1]
+        if count > 0 or size > 0:
+            rows.append({'constructor': key, 'count_delta': count, 'size_delta': size})
+    rows.sort(key=lambda row: (row['size_delta'], row['count_delta']), reverse=True)
+    return rows[:top]
+
+
+# ---- analysis ---------------------------------------------------------------------
+
+def block_minima(values, size=BLOCK):
+    """Minimum of each block of size values, robust to GC and render noise"""
+    return [min(values[index:index + size]) for index in range(0, len(values), size)
+            if len(values[index:index + size]) == size]
+
+
+def trend(values, limit):
+    """Growth per cycle of a metric series and whether it keeps rising"""
+    values = [value for value in values if value is not None]
+    slope, r2 = fit(range(len(values)), values)
+    minima = block_minima(values)
+    rises = [later > earlier for earlier, later in zip(minima, minima[1:])]
+    rising = bool(rises) and sum(rises) / len(rises) >= 0.8
+    return {'start': values[0] if values else None, 'end': values[-1] if values else None,
+            'per_cycle': round(slope, 2), 'r2': round(r2, 3), 'limit': limit,
+            'growing': rising and slope > limit}
+
+
+def analyse(samples, routes, limits=None):
+    """Per metric trend of the cycle ends and of the sample after every route"""
+    limits = config.HEAP_LEAK_LIMITS if limits is None else limits
+    result = {'cycle': {}, 'routes': {}}
+    ends = [row for row in samples if row['route'] == routes[-1]]
+    for metric in METRICS:
+        result['cycle'][metric] = trend([row[metric] for row in ends], limits[metric])
+    for route in routes:
+        rows = [row for row in samples if row['route'] == route]
+        result['routes'][route] = {
+            metric: trend([row[metric] for row in rows], limits[metric]) for metric in METRICS}
+    return result
+
+
+def growing(trends):
+    return [metric for metric, row in trends.items() if row['growing']]
+
+
+# ---- run --------------------------------------------------------------------------
+
+def snapshot_path(route, label):
+    return os.path.join(SNAPSHOT_DIR, f"{route.strip('/').replace('/', '_') or 'home'}-"
+                                      f"{label}.heapsnapshot")
+
+
+def run_cycles(runner, routes, cycles, snapshots):
+    driver = runner.test.driver
+    samples = []
+    for cycle in range(cycles):
+        for route in routes:
+            runner.open(route)
+            samples.append({'cycle': cycle, 'route': route, **sample(driver)})
+            if snapshots and cycle in (0, cycles - 1):
+                take_snapshot(driver, snapshot_path(route, 'start' if cycle == 0 else 'end'))
+        if cycle % 25 == 0 or cycle == cycles - 1:
+            last = samples[-1]
+            print(f"  cycle {cycle:>4}: heap {last['JSHeapUsedSize'] / 1024 / 1024:7.2f}MB  "
+                  f"nodes {last['Nodes']:>7.0f}  listeners {last['JSEventListeners']:>6.0f}  "
+                  f"documents {last['Documents']:>3.0f}")
+    return samples
+
+
+def isolate(runner, route, repeats, limits=None):
+    """Trend of the anchor page after repeated visits of one route"""
+    limits = config.HEAP_LEAK_LIMITS if limits is None else limits
+    rows = []
+    for _ in range(repeats):
+        runner.open(route)
+        runner.open(ANCHOR)
+        rows.append(sample(runner.test.driver))
+    return {metric: trend([row[metric] for row in rows], limits[metric]) for metric in METRICS}
+
+
+def print_trends(title, trends):
+    print(f"\n{title}")
+    for metric, row in trends.items():
+        flag = '⚠' if row['growing'] else '✓'
+        print(f"{flag} {metric:18} {row['start']:>14,.0f} → {row['end']:>14,.0f}  "
+              f"{row['per_cycle']:>10,.2f}/cycle  (limit {row['limit']:,})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--routes', nargs='+', default=config.HEAP_LEAK_ROUTES)
+    parser.add_argument('--cycles', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=2, help='unmeasured cycles first')
+    parser.add_argument('--isolate', type=int, default=30,
+                        help='visits of each growing route in isolation (0 = skip)')
+    parser.add_argument('--no-snapshots', action='store_true')
+    args = parser.parse_args(argv)
+
+    from base_test import BaseTest
+
+    test = BaseTest()
+    test.setup_method()
+    try:
+        if not hasattr(test.driver, 'execute_cdp_cmd'):
+            print(f"⚠ {config.BROWSER} has no CDP, run with BROWSER=chrome")
+            return 1
+        test.login()
+        runner = UiRunner(test, api=None)
+        runner.loaded = True
+        enable(test.driver)
+        print(f"▶ Warm-up: {args.warmup} cycles")
+        for _ in range(args.warmup):
+            for route in args.routes:
+                runner.open(route)
+        print(f"▶ {args.cycles} cycles of {' → '.join(args.routes)}")
+        samples = run_cycles(runner, args.routes, args.cycles, not args.no_snapshots)
+        result = analyse(samples, args.routes)
+        print_trends('Per cycle', result['cycle'])
+
+        suspects = [route for route in args.routes if growing(result['routes'][route])]
+        isolated, diffs = {}, {}
+        for route in suspects:
+            if args.isolate:
+                print(f"▶ Isolating {route}: {ANCHOR} → {route} × {args.isolate}")
+                isolated[route] = isolate(runner, route, args.isolate)
+                print_trends(f"{route} in isolation", isolated[route])
+            if not args.no_snapshots:
+                diffs[route] = diff_summaries(load_summary(snapshot_path(route, 'start')),
+                                              load_summary(snapshot_path(route, 'end')))
+                print(f"\n{route}: retained since the first cycle")
+                for row in diffs[route]:
+                    print(f"  {row['constructor'][:48]:48} {row['count_delta']:>+8} "
+                          f"{row['size_delta']:>+12,} B")
+    finally:
+        test.teardown_method()
+
+    leaking = growing(result['cycle'])
+    write_report(HEAP_REPORT, {
+        'routes': args.routes, 'cycles': args.cycles, 'growing': leaking,
+        'trends': result, 'isolated': isolated, 'snapshot_diffs': diffs,
+        'samples': samples})
+    print(f"\n{'⚠ Growing: ' + ', '.join(leaking) if leaking else '✓ No growth detected'}")
+    return 1 if leaking else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
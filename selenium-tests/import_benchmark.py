@@ -0,0 +1,263 @@
+"""
+Bulk import benchmark
+
+Streams a generated CSV or NDJSON file of --rows clients or invoices (1M by
+default) to POST /{entity}/import of a backend serving a scratch database,
+without ever holding the file in memory on either side, while polling
+GET /{entity}/import/:id for the progress the backend reports of the upload
+(named with ?id=) and sampling the backend's RSS. Invoices reference
+--clients clients imported first (NDJSON with their _id). --bad-every N makes
+every Nth row invalid; the per-row error report must list exactly those.
+
+Reports rows/s (wall clock and the backend's own), the peak RSS and checks
+that the collection grew by the rows the backend says it inserted and that
+the peak RSS grew by at most IMPORT_MAX_RSS_GROWTH_MB over the idle backend.
+
+Run: python import_benchmark.py --entity client --rows 1000000
+     python import_benchmark.py --entity invoice --rows 1000000 --format ndjson --bad-every 1000
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+import requests
+from bson import ObjectId
+from pymongo import MongoClient
+
+import config
+from crm_client import ApiError, CrmClient
+from db_isolation import WorkerBackend, seed_database
+from journey import write_report
+from soak import rss_mb
+
+BENCHMARK_REPORT = os.path.join(config.REPORT_DIR, 'import_benchmark.json')
+CHUNK_ROWS = 1000
+POLL_INTERVAL = 1
+UPLOAD_TIMEOUT = 3600
+CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+COLLECTIONS = {'client': 'clients', 'invoice': 'invoices'}
+COLUMNS = {
+    'client': ['_id', 'name', 'email', 'phone', 'country'],
+    'invoice': ['client', 'number', 'year', 'status', 'date', 'expiredDate', 'taxRate',
+                'currency', 'items.0.itemName', 'items.0.quantity', 'items.0.price',
+                'items.0.total', 'notes'],
+}
+
+
+def client_row(number, rng):
+    return {'_id': str(ObjectId()), 'name': f'Imported Client {number}',
+            'email': f'client{number}@example.com', 'phone': f'+1555{number:07d}',
+            'country': rng.choice(['US', 'DE', 'FR', 'PK'])}
+
+
+def invoice_row(number, rng, clients):
+    day = date(2020, 1, 1) + timedelta(days=rng.randint(0, 1800))
+    quantity = rng.randint(1, 10)
+    price = round(rng.uniform(10, 500), 2)
+    return {'client': rng.choice(clients), 'number': number, 'year': day.year,
+            'status': rng.choice(['draft', 'pending', 'sent']), 'date': day.isoformat(),
+            'expiredDate': (day + timedelta(days=30)).isoformat(),
+            'taxRate': rng.choice([0, 10, 20]), 'currency': 'USD',
+            'items': [{'itemName': 'Service', 'quantity': quantity, 'price': price,
+                       'total': round(quantity * price, 2)}],
+            'notes': 'Imported'}
+
+
+def broken(entity, row):
+    """The row made invalid: a client without name, an invoice without status"""
+    row = dict(row)
+    row.pop('name' if entity == 'client' else 'status')
+    return row
+
+
+def generate_rows(entity, count, seed=0, clients=(), bad_every=0):
+    """Yield count rows, every bad_every-th one (1-based) invalid"""
+    rng = random.Random(seed)
+    for number in range(1, count + 1):
+        row = client_row(number, rng) if entity == 'client' else invoice_row(number, rng,
+                                                                               clients)
+        yield broken(entity, row) if bad_every and number % bad_every == 0 else row
+
+
+def flatten(row, prefix=''):
+    """Dotted keys for nested rows: items.0.itemName"""
+    flat = {}
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, list):
+            flat.update(flatten(dict(enumerate(value)), f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def encode(rows, fmt, columns, chunk_rows=CHUNK_ROWS):
+    """Yield the file as byte chunks of chunk_rows rows, the CSV header first"""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator='\n')
+        writer.writeheader()
+    count = 0
+    for row in rows:
+        if writer:
+            writer.writerow(flatten(row))
+        else:
+            buffer.write(json.dumps(row) + '\n')
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def upload(api, entity, fmt, chunks, ordered=False, job_id=None):
+    """POST a streamed body (chunked transfer encoding) to /{entity}/import"""
+    params = {'format': fmt, 'ordered': str(ordered).lower()}
+    if job_id:
+        params['id'] = job_id
+    response = requests.post(f"{api.base_url}{entity}/import", params=params,
+                             data=chunks, timeout=UPLOAD_TIMEOUT,
+                             headers={'Authorization': f"Bearer {api.token}",
+                                      'Content-Type': CONTENT_TYPES[fmt]})
+    response.raise_for_status()
+    return response.json()['result']
+
+
+def expected_errors(rows, bad_every):
+    """Row numbers of the invalid rows"""
+    return list(range(bad_every, rows + 1, bad_every)) if bad_every else []
+
+
+def check(job, grown, rows, bad_rows, rss_growth, limit=None):
+    """What is wrong with a finished import"""
+    limit = limit or config.IMPORT_MAX_RSS_GROWTH_MB
+    problems = []
+    if job['status'] != 'done':
+        problems.append(f"import ended {job['status']}")
+    if job['rows'] != rows:
+        problems.append(f"{job['rows']} rows read of {rows}")
+    if job['inserted'] != rows - len(bad_rows) or grown != job['inserted']:
+        problems.append(f"{job['inserted']} reported and {grown} stored, "
+                        f"expected {rows - len(bad_rows)}")
+    reported = [error['row'] for error in job['errors']]
+    if job['failed'] != len(bad_rows) or reported != bad_rows[:len(reported)]:
+        problems.append(f"{job['failed']} rows rejected, expected rows {bad_rows[:5]}...")
+    if rss_growth > limit:
+        problems.append(f"backend RSS grew {rss_growth:.0f}MB (limit {limit}MB)")
+    return problems
+
+
+def watch(api, entity, job_id, pid, stop, samples):
+    """Poll the progress of the job_id import and the backend RSS until stop is set"""
+    while not stop.wait(POLL_INTERVAL):
+        try:
+            job = api.entity(entity).imports(job_id)
+        except ApiError:
+            # the upload has not reached the backend yet
+            job = None
+        sample = {'time': time.monotonic(), 'rss_mb': rss_mb(pid)}
+        if job:
+            sample.update(rows=job['rows'], rows_per_second=job['rowsPerSecond'])
+            print(f"  {sample['rows']:>9} rows  {sample['rows_per_second']:>7}/s  "
+                  f"rss {sample['rss_mb']:7.1f}MB", end='\r')
+        samples.append(sample)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entity', choices=sorted(COLLECTIONS), default='client')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--format', choices=sorted(CONTENT_TYPES), default='csv')
+    parser.add_argument('--clients', type=int, default=1000, help='clients of the invoices')
+    parser.add_argument('--bad-every', type=int, default=0, help='make every Nth row invalid')
+    parser.add_argument('--ordered', action='store_true', help='stop at the first bad row')
+    parser.add_argument('--database', default=f"{config.MONGO_DB}_import")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark database')
+    args = parser.parse_args(argv)
+
+    client = MongoClient(config.MONGO_URI)
+    db = client[args.database]
+    client.drop_database(args.database)
+    print(f"▶ Seeding {args.database}")
+    seed_database(client, args.database)
+    backend = WorkerBackend(args.database,
+                            env={'REQUEST_TIMEOUT_MS': str(UPLOAD_TIMEOUT * 1000)}).start()
+    api = CrmClient(base_url=backend.api_base_url)
+    samples = []
+    try:
+        api.login()
+        clients = []
+        if args.entity == 'invoice':
+            rows = list(generate_rows('client', args.clients, args.seed))
+            upload(api, 'client', 'ndjson', encode(rows, 'ndjson', COLUMNS['client']))
+            clients = [row['_id'] for row in rows]
+            print(f"✓ {len(clients)} clients imported for the invoices")
+
+        collection = db[COLLECTIONS[args.entity]]
+        before = collection.count_documents({})
+        idle_rss = rss_mb(backend.process.pid)
+        stop = threading.Event()
+        job_id = f"benchmark-{args.entity}-{args.seed}"
+        watcher = threading.Thread(target=watch, args=(api, args.entity, job_id,
+                                                       backend.process.pid, stop, samples))
+        print(f"▶ Importing {args.rows} {args.entity} rows as {args.format}")
+        watcher.start()
+        started = time.monotonic()
+        try:
+            rows = generate_rows(args.entity, args.rows, args.seed, clients, args.bad_every)
+            job = upload(api, args.entity, args.format,
+                         encode(rows, args.format, COLUMNS[args.entity]), args.ordered, job_id)
+        finally:
+            stop.set()
+            watcher.join()
+        wall_s = round(time.monotonic() - started, 2)
+        job.update(api.entity(args.entity).imports(job['id']))
+        grown = collection.count_documents({}) - before
+    finally:
+        api.close()
+        backend.stop()
+        if not args.keep:
+            client.drop_database(args.database)
+        client.close()
+
+    peak_rss = max([sample['rss_mb'] for sample in samples] + [job['peakRss'] / 2 ** 20])
+    problems = [] if args.ordered else check(job, grown, args.rows,
+                                             expected_errors(args.rows, args.bad_every),
+                                             peak_rss - idle_rss)
+    summary = {'entity': args.entity, 'format': args.format, 'rows': args.rows,
+               'inserted': job['inserted'], 'failed': job['failed'], 'wall_s': wall_s,
+               'rows_per_second': round(args.rows / wall_s) if wall_s else 0,
+               'server_rows_per_second': job['rowsPerSecond'],
+               'idle_rss_mb': round(idle_rss, 1), 'peak_rss_mb': round(peak_rss, 1),
+               'problems': problems}
+
+    print()
+    print("=" * 100)
+    print(f"📊 {job['inserted']} of {args.rows} {args.entity} rows in {wall_s}s "
+          f"({summary['rows_per_second']}/s, backend {job['rowsPerSecond']}/s)")
+    print(f"📊 Backend RSS {idle_rss:.0f}MB idle, {peak_rss:.0f}MB peak")
+    for error in job['errors'][:5]:
+        print(f"   row {error['row']}: {error['message']}")
+    for problem in problems:
+        print(f"⚠ {problem}")
+    if not problems:
+        print("✓ Every valid row stored, every invalid one reported")
+    write_report(BENCHMARK_REPORT, {'summary': summary, 'job': job, 'samples': samples})
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
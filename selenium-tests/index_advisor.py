@@ -0,0 +1,399 @@
+"""
+Mongo query-shape profiler and index advisor
+
+Replays the query shapes issued by the backend CRUD controllers (paginatedList,
+filter, search, listAll) and the summary aggregations against a seeded local
+mongod, flags COLLSCANs and in-memory sorts, proposes indexes and verifies them
+by re-running every shape.
+
+Run: python index_advisor.py --seed --invoices 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+import config
+
+# Partial filter shared by every proposed index: all controllers query removed:false
+PARTIAL_FILTER = {'removed': False}
+
+# Stages that mean the query did not use an index properly
+COLLSCAN = 'COLLSCAN'
+BLOCKING_SORT = 'SORT'
+
+
+@dataclass
+class QueryShape:
+    """A single query shape issued by a controller"""
+    name: str
+    collection: str
+    filter: dict
+    sort: dict = field(default_factory=dict)
+    limit: int = 0
+    kind: str = 'find'  # find, count or aggregate
+    pipeline: list = field(default_factory=list)
+
+
+def build_shapes(sample):
+    """Return the query shapes issued by the backend, filled with sample values"""
+    now = datetime.utcnow()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    shapes = []
+
+    # createCRUDController / invoiceController / quoteController list endpoints
+    for collection in ['invoices', 'quotes', 'payments', 'clients']:
+        shapes += [
+            QueryShape(f'{collection}.paginatedList', collection,
+                       {'removed': False}, sort={'enabled': -1}, limit=10),
+            QueryShape(f'{collection}.paginatedList.count', collection,
+                       {'removed': False}, kind='count'),
+            QueryShape(f'{collection}.listAll', collection,
+                       {'removed': False}, sort={'created': -1}),
+        ]
+
+    shapes += [
+        QueryShape('clients.listAll.enabled', 'clients',
+                   {'removed': False, 'enabled': True}, sort={'created': -1}),
+        QueryShape('clients.search', 'clients',
+                   {'$or': [{'name': {'$regex': 'acme', '$options': 'i'}}], 'removed': False},
+                   limit=20),
+        QueryShape('invoices.filter.status', 'invoices',
+                   {'removed': False, 'status': 'pending'}),
+        QueryShape('invoices.filter.paymentStatus', 'invoices',
+                   {'removed': False, 'paymentStatus': 'unpaid'},
+                   sort={'enabled': -1}, limit=10),
+        QueryShape('invoices.filter.client', 'invoices',
+                   {'removed': False, 'client': sample['client']},
+                   sort={'enabled': -1}, limit=10),
+        QueryShape('quotes.filter.client', 'quotes',
+                   {'removed': False, 'client': sample['client']},
+                   sort={'enabled': -1}, limit=10),
+        QueryShape('payments.filter.invoice', 'payments',
+                   {'invoice': sample['invoice']}),
+        QueryShape('paymentmodes.listAll.enabled', 'paymentmodes',
+                   {'removed': False, 'enabled': True}, sort={'created': -1}),
+        QueryShape('taxes.listAll.enabled', 'taxes',
+                   {'removed': False, 'enabled': True}, sort={'created': -1}),
+        QueryShape('settings.readBySettingKey', 'settings',
+                   {'settingKey': 'last_invoice_number'}),
+
+        # Summary aggregations
+        QueryShape('invoices.summary.unpaid', 'invoices', {}, kind='aggregate', pipeline=[
+            {'$match': {'removed': False, 'paymentStatus': {'$in': ['unpaid', 'partially']}}},
+            {'$group': {'_id': None, 'total_amount': {'$sum': {'$subtract': ['$total', '$credit']}}}},
+        ]),
+        QueryShape('invoices.summary.overdue', 'invoices', {}, kind='aggregate', pipeline=[
+            {'$match': {'removed': False, 'expiredDate': {'$lt': now}}},
+            {'$group': {'_id': '$status', 'count': {'$sum': 1}}},
+        ]),
+        QueryShape('clients.summary.new', 'clients', {}, kind='aggregate', pipeline=[
+            {'$match': {'removed': False, 'enabled': True,
+                        'created': {'$gte': month_start, '$lte': now}}},
+            {'$count': 'count'},
+        ]),
+        # The $lookup in clientController/summary.js probes invoices by client
+        QueryShape('invoices.summary.lookupByClient', 'invoices',
+                   {'client': sample['client']}),
+    ]
+    return shapes
+
+
+def seed(db, clients=1000, invoices=10000, quotes=2000, payments=5000):
+    """Seed the database with synthetic documents shaped like the backend models"""
+    print(f"Seeding {db.name}: {clients} clients, {invoices} invoices, "
+          f"{quotes} quotes, {payments} payments")
+    for name in ['clients', 'invoices', 'quotes', 'payments', 'paymentmodes', 'taxes']:
+        db[name].drop()
+
+    admin_id = ObjectId()
+    now = datetime.utcnow()
+
+    client_ids = [ObjectId() for _ in range(clients)]
+    db.clients.insert_many([{
+        '_id': client_id,
+        'removed': random.random() < 0.05,
+        'enabled': random.random() < 0.9,
+        'name': f'Client {i}',
+        'email': f'client{i}@example.com',
+        'createdBy': admin_id,
+        'created': now - timedelta(days=random.randint(0, 720)),
+    } for i, client_id in enumerate(client_ids)])
+
+    def document(i):
+        date = now - timedelta(days=random.randint(0, 720))
+        total = round(random.uniform(10, 5000), 2)
+        return {
+            'removed': random.random() < 0.05,
+            'createdBy': admin_id,
+            'number': i,
+            'year': date.year,
+            'date': date,
+            'expiredDate': date + timedelta(days=30),
+            'client': random.choice(client_ids),
+            'items': [{'itemName': 'Service', 'quantity': 1, 'price': total, 'total': total}],
+            'subTotal': total,
+            'total': total,
+            'credit': 0,
+            'currency': 'USD',
+            'status': random.choice(['draft', 'pending', 'sent']),
+            'created': date,
+        }
+
+    invoice_docs = []
+    for i in range(invoices):
+        doc = document(i)
+        doc['paymentStatus'] = random.choice(['unpaid', 'paid', 'partially'])
+        invoice_docs.append(doc)
+    invoice_ids = db.invoices.insert_many(invoice_docs).inserted_ids
+    db.quotes.insert_many([document(i) for i in range(quotes)])
+    db.payments.insert_many([{
+        'removed': False,
+        'createdBy': admin_id,
+        'number': i,
+        'client': random.choice(client_ids),
+        'invoice': random.choice(invoice_ids),
+        'date': now,
+        'amount': round(random.uniform(10, 500), 2),
+        'currency': 'USD',
+        'created': now - timedelta(days=random.randint(0, 720)),
+    } for i in range(payments)])
+    db.paymentmodes.insert_one({'removed': False, 'enabled': True, 'name': 'Default Payment',
+                                'description': 'Default', 'created': now})
+    db.taxes.insert_one({'removed': False, 'enabled': True, 'taxName': 'Tax 0%', 'taxValue': 0,
+                         'created': now})
+    print("✓ Seeding complete")
+
+
+def explain(db, shape):
+    """Run explain('executionStats') for a shape and return the raw output"""
+    if shape.kind == 'aggregate':
+        command = {'aggregate': shape.collection, 'pipeline': shape.pipeline, 'cursor': {}}
+    elif shape.kind == 'count':
+        command = {'count': shape.collection, 'query': shape.filter}
+    else:
+        command = {'find': shape.collection, 'filter': shape.filter}
+        if shape.sort:
+            command['sort'] = shape.sort
+        if shape.limit:
+            command['limit'] = shape.limit
+    return db.command('explain', command, verbosity='executionStats')
+
+
+def _walk(node, key):
+    """Yield every value stored under key anywhere in a nested explain document"""
+    if isinstance(node, dict):
+        for k, v in node.items():
+            if k == key:
+                yield v
+            yield from _walk(v, key)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item, key)
+
+
+def summarize(output):
+    """Reduce an explain document to the stages and execution counters we care about"""
+    stages = sorted(set(s for s in _walk(output, 'stage') if isinstance(s, str)))
+    stats = next(_walk(output, 'executionStats'), {}) or {}
+    return {
+        'stages': stages,
+        'collscan': COLLSCAN in stages,
+        'blocking_sort': BLOCKING_SORT in stages,
+        'docs_examined': stats.get('totalDocsExamined', 0),
+        'keys_examined': stats.get('totalKeysExamined', 0),
+        'returned': stats.get('nReturned', 0),
+        'millis': stats.get('executionTimeMillis', 0),
+    }
+
+
+def _shape_filter(shape):
+    """Return the filter and sort a shape applies before any grouping"""
+    if shape.kind != 'aggregate':
+        return shape.filter, shape.sort
+    match, sort = {}, {}
+    for stage in shape.pipeline:
+        if '$match' in stage and not match:
+            match = stage['$match']
+        elif '$sort' in stage and not sort:
+            sort = stage['$sort']
+    return match, sort
+
+
+def propose_index(shape):
+    """Propose an Equality-Sort-Range index for a shape, or None if nothing is indexable"""
+    query, sort = _shape_filter(shape)
+    equality, ranges = [], []
+    for key, value in query.items():
+        if key.startswith('$') or key == 'removed':
+            continue
+        if isinstance(value, dict):
+            operators = set(value)
+            if operators & {'$regex', '$options', '$ne', '$nin', '$exists'}:
+                continue
+            if operators <= {'$in', '$eq'}:
+                equality.append(key)
+            else:
+                ranges.append(key)
+        else:
+            equality.append(key)
+
+    keys = [(key, 1) for key in equality]
+    keys += [(key, direction) for key, direction in sort.items() if key not in equality]
+    keys += [(key, 1) for key in ranges if key not in sort]
+    if not keys:
+        return None
+    partial = query.get('removed') is False
+    return {
+        'collection': shape.collection,
+        'keys': keys,
+        'partial': partial,
+    }
+
+
+def _covers(longer, shorter):
+    """True if index longer makes index shorter redundant"""
+    return (longer['collection'] == shorter['collection']
+            and longer['partial'] == shorter['partial']
+            and longer['keys'][:len(shorter['keys'])] == shorter['keys'])
+
+
+def dedupe(proposals):
+    """Drop proposals that are prefixes of (or identical to) another proposal"""
+    kept = []
+    for proposal in sorted(proposals, key=lambda p: -len(p['keys'])):
+        if not any(_covers(existing, proposal) for existing in kept):
+            kept.append(proposal)
+    return kept
+
+
+def index_name(proposal):
+    """Build a stable index name for a proposal"""
+    name = 'advisor_' + '_'.join(f'{key}_{direction}' for key, direction in proposal['keys'])
+    return name + ('_live' if proposal['partial'] else '')
+
+
+def schema_declaration(proposal):
+    """Render the Mongoose schema declaration for a proposal"""
+    keys = ', '.join(f'{key}: {direction}' for key, direction in proposal['keys'])
+    options = ', { partialFilterExpression: { removed: false } }' if proposal['partial'] else ''
+    return f"schema.index({{ {keys} }}{options});"
+
+
+def create_index(db, proposal):
+    """Create a proposed index and return its name"""
+    options = {'name': index_name(proposal)}
+    if proposal['partial']:
+        options['partialFilterExpression'] = PARTIAL_FILTER
+    return db[proposal['collection']].create_index(proposal['keys'], **options)
+
+
+def needs_index(summary):
+    """True if a shape scanned the collection or sorted in memory"""
+    return summary['collscan'] or summary['blocking_sort']
+
+
+def run(db, apply=False):
+    """Profile every shape, propose indexes, verify them and return the report"""
+    sample = {
+        'client': (db.clients.find_one({}, {'_id': 1}) or {}).get('_id', ObjectId()),
+        'invoice': (db.invoices.find_one({}, {'_id': 1}) or {}).get('_id', ObjectId()),
+    }
+    shapes = build_shapes(sample)
+
+    before = {shape.name: summarize(explain(db, shape)) for shape in shapes}
+    proposals = []
+    for shape in shapes:
+        if needs_index(before[shape.name]):
+            proposal = propose_index(shape)
+            if proposal:
+                proposals.append(proposal)
+    proposals = dedupe(proposals)
+
+    created = [create_index(db, proposal) for proposal in proposals]
+    after = {shape.name: summarize(explain(db, shape)) for shape in shapes}
+
+    if not apply:
+        for proposal, name in zip(proposals, created):
+            db[proposal['collection']].drop_index(name)
+
+    rows = []
+    for shape in shapes:
+        rows.append({
+            'shape': shape.name,
+            'collection': shape.collection,
+            'indexable': propose_index(shape) is not None,
+            'before': before[shape.name],
+            'after': after[shape.name],
+        })
+    return {
+        'database': db.name,
+        'generated': datetime.now().isoformat(),
+        'applied': apply,
+        'shapes': rows,
+        'proposals': [dict(p, name=index_name(p), schema=schema_declaration(p)) for p in proposals],
+    }
+
+
+def print_report(report):
+    """Print a human readable before/after table"""
+    print()
+    print("=" * 100)
+    print(f"{'Shape':45} {'Before':28} {'After':28}")
+    print("=" * 100)
+    for row in report['shapes']:
+        cells = []
+        for side in ('before', 'after'):
+            s = row[side]
+            flag = 'COLLSCAN' if s['collscan'] else ('SORT' if s['blocking_sort'] else 'IXSCAN')
+            cells.append(f"{flag:9} {s['docs_examined']:>8} docs {s['millis']:>4}ms")
+        print(f"{row['shape']:45} {cells[0]:28} {cells[1]:28}")
+    print()
+    print("Proposed indexes:")
+    for proposal in report['proposals']:
+        print(f"  {proposal['collection']:14} {proposal['schema']}")
+    if not report['proposals']:
+        print("  ✓ Every shape is already served by an index")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--uri', default=config.MONGO_URI)
+    parser.add_argument('--db', default=config.MONGO_DB)
+    parser.add_argument('--seed', action='store_true', help='drop and re-seed the collections')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--invoices', type=int, default=10000)
+    parser.add_argument('--quotes', type=int, default=2000)
+    parser.add_argument('--payments', type=int, default=5000)
+    parser.add_argument('--apply', action='store_true', help='keep the proposed indexes')
+    parser.add_argument('--output', default=os.path.join(config.REPORT_DIR, 'index_advisor.json'))
+    args = parser.parse_args(argv)
+
+    db = MongoClient(args.uri)[args.db]
+    if args.seed:
+        seed(db, args.clients, args.invoices, args.quotes, args.payments)
+
+    report = run(db, apply=args.apply)
+    print_report(report)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n📊 Report: {args.output}")
+
+    # Full listings of {removed: false} always scan; only fail on shapes an index should serve
+    unresolved = [row['shape'] for row in report['shapes']
+                  if row['indexable'] and needs_index(row['after'])]
+    for name in unresolved:
+        print(f"⚠ {name} still scans or sorts in memory")
+    return 1 if unresolved else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
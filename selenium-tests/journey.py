@@ -0,0 +1,540 @@
+"""
+Declarative user journeys
+
+A scenario (scenarios/*.yaml, or built in Python with the step helpers below)
+is a weighted list of steps:
+
+login                          log in (UI form, or POST /login)
+visit: /invoice                open a page; the API mode sends the requests the
+                               page makes (page_requests)
+think: [2, 5]                  pause a random number of seconds
+create: {entity, data, save_as}
+read: {entity, id, save_as}
+search: {entity, q}
+download: {entity, id}         fetch the PDF, regenerated by the backend each time
+
+Strings may bind ${name} or ${name.field}: user, iteration, rand, today,
+next_month, year, currency, the scenario vars and every save_as result.
+
+The same scenario runs as a Selenium journey on BaseTest (UiRunner, see
+test_journeys.py) and as asyncio virtual users on AsyncCrmClient (run_load),
+so the UI and API latency of every step can be compared. Records are always
+created through the API, also in UI runs: the forms have no stable selectors,
+the UI run measures the pages that display them.
+
+Run: python journey.py list
+     python journey.py ui --scenario office-invoicing
+     python journey.py load --users 500 --duration 300 --ramp-up 120
+     python journey.py compare
+     python journey.py load --scenario office-invoicing --profile-at 30 --profile-for 60
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+import yaml
+from selenium.webdriver.support.ui import WebDriverWait
+
+import config
+from crm_client.routes import APP_ENTITIES
+
+SCENARIO_DIR = os.path.join(os.path.dirname(__file__), 'scenarios')
+UI_REPORT = os.path.join(config.REPORT_DIR, 'journey_ui.json')
+LOAD_REPORT = os.path.join(config.REPORT_DIR, 'journey_load.json')
+ACTIONS = ('login', 'visit', 'think', 'create', 'read', 'search', 'download')
+BINDING = re.compile(r'\$\{([\w.]+)\}')
+# a browser opens about six connections per origin
+USER_POOL_SIZE = 6
+
+# The single /batch request of DashboardModule (default currency of the seeded settings)
+DASHBOARD_URLS = ['invoice/summary?currency=USD', 'quote/summary?currency=USD',
+                  'payment/summary?currency=USD', 'client/summary', 'invoice/list', 'quote/list']
+
+# Routes of frontend/src/router/routes.jsx that show an entity under another name
+PAGE_ENTITIES = {'customer': 'client', 'payment/mode': 'paymentmode'}
+
+# A page is ready once the layout is rendered and no spinner or skeleton is left
+READY_SCRIPT = """
+return !!document.querySelector('.ant-layout-content') &&
+  !document.querySelector('.ant-spin-spinning, .ant-skeleton-active');
+"""
+NEXT_FRAME_SCRIPT = "requestAnimationFrame(() => requestAnimationFrame(arguments[0]));"
+
+
+@dataclass
+class Step:
+    action: str
+    args: dict
+    name: str = ''
+
+    def __post_init__(self):
+        if self.action not in ACTIONS:
+            raise ValueError(f"Unknown journey step: {self.action}")
+        if not self.name:
+            target = self.args.get('path') or self.args.get('entity') or ''
+            self.name = f"{self.action} {target}".strip()
+
+
+@dataclass
+class Scenario:
+    name: str
+    steps: list
+    weight: float = 1
+    vars: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        # step names identify a step in the reports, make repeated ones unique
+        seen = {}
+        for step in self.steps:
+            seen[step.name] = seen.get(step.name, 0) + 1
+            if seen[step.name] > 1:
+                step.name = f"{step.name} #{seen[step.name]}"
+
+
+# ---- Python DSL ---------------------------------------------------------------------
+
+def login():
+    return Step('login', {})
+
+
+def visit(path):
+    return Step('visit', {'path': path})
+
+
+def think(low, high=None):
+    return Step('think', {'min': low, 'max': low if high is None else high}, 'think')
+
+
+def create(entity, data, save_as=None):
+    return Step('create', {'entity': entity, 'data': data, 'save_as': save_as})
+
+
+def read(entity, id, save_as=None):
+    return Step('read', {'entity': entity, 'id': id, 'save_as': save_as})
+
+
+def search(entity, q):
+    return Step('search', {'entity': entity, 'q': q})
+
+
+def download(entity, id):
+    return Step('download', {'entity': entity, 'id': id})
+
+
+def parse_step(raw):
+    """Build a Step from its YAML form ('login', {visit: /path}, {think: [1, 3]}, ...)"""
+    if isinstance(raw, str):
+        return Step(raw, {})
+    (action, args), = raw.items()
+    if action == 'visit':
+        return visit(args)
+    if action == 'think':
+        return think(*args) if isinstance(args, list) else think(args)
+    return Step(action, dict(args or {}))
+
+
+def load_scenario(path):
+    with open(path) as f:
+        raw = yaml.safe_load(f)
+    return Scenario(name=raw['name'], steps=[parse_step(step) for step in raw['steps']],
+                    weight=raw.get('weight', 1), vars=raw.get('vars') or {})
+
+
+def load_scenarios(directory=SCENARIO_DIR, names=None):
+    scenarios = [load_scenario(path)
+                 for path in sorted(glob.glob(os.path.join(directory, '*.y*ml')))]
+    if names:
+        scenarios = [scenario for scenario in scenarios if scenario.name in names]
+    return scenarios
+
+
+# ---- data bindings ------------------------------------------------------------------
+
+def lookup(context, name):
+    value = context
+    for part in name.split('.'):
+        value = value[part]
+    return value
+
+
+def resolve(value, context):
+    """Replace ${...} bindings; a string that is a single binding keeps the bound type"""
+    if isinstance(value, dict):
+        return {key: resolve(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve(item, context) for item in value]
+    if not isinstance(value, str):
+        return value
+    whole = BINDING.fullmatch(value)
+    if whole:
+        return lookup(context, whole.group(1))
+    return BINDING.sub(lambda match: str(lookup(context, match.group(1))), value)
+
+
+def base_context(scenario, user, iteration, rng):
+    today = date.today()
+    context = {
+        'user': user,
+        'iteration': iteration,
+        'rand': rng.randint(100000, 999999),
+        'today': today.isoformat(),
+        'next_month': (today + timedelta(days=30)).isoformat(),
+        'year': today.year,
+        'currency': 'USD',
+    }
+    context.update(resolve(scenario.vars, context))
+    return context
+
+
+def pick(scenarios, rng):
+    """Choose a scenario according to the weights"""
+    return rng.choices(scenarios, weights=[scenario.weight for scenario in scenarios])[0]
+
+
+def page_requests(api, path):
+    """Return the calls the frontend makes when it renders a page, as zero-argument callables"""
+    parts = path.strip('/').split('/')
+    if path.strip('/') == '':
+        return [lambda: api.batch(DASHBOARD_URLS)]
+    if path.strip('/') == 'settings':
+        return [lambda: api.setting.list_all()]
+    route = '/'.join(parts[:2]) if '/'.join(parts[:2]) in PAGE_ENTITIES else parts[0]
+    name = PAGE_ENTITIES.get(route, route)
+    if name not in APP_ENTITIES:
+        return []
+    entity = api.entity(name)
+    rest = parts[len(route.split('/')):]
+    if not rest:
+        return [lambda: entity.list(page=1, items=10)]
+    if rest[0] in ('read', 'update', 'pay') and len(rest) > 1:
+        return [lambda: entity.read(rest[1])]
+    if rest[0] == 'create':
+        return [lambda: api.taxes.list_all()]
+    return []
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+
+class Metrics:
+    """Step durations per scenario"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.journeys = 0
+
+    def record(self, scenario, step, seconds, error=None):
+        key = (scenario, step)
+        if error:
+            self.errors.setdefault(key, []).append(error)
+        else:
+            self.samples.setdefault(key, []).append(seconds)
+
+    def summary(self):
+        rows = []
+        for key in sorted(set(self.samples) | set(self.errors)):
+            samples = [seconds * 1000 for seconds in self.samples.get(key, [])]
+            errors = self.errors.get(key, [])
+            row = {'scenario': key[0], 'step': key[1], 'count': len(samples),
+                   'errors': len(errors)}
+            if errors:
+                row['first_error'] = errors[0]
+            if samples:
+                row.update(mean_ms=round(statistics.mean(samples), 1),
+                           p50_ms=round(percentile(samples, 0.5), 1),
+                           p95_ms=round(percentile(samples, 0.95), 1),
+                           p99_ms=round(percentile(samples, 0.99), 1))
+            rows.append(row)
+        return rows
+
+
+# ---- UI runs --------------------------------------------------------------------------
+
+class UiRunner:
+    """Runs a scenario in the browser of a BaseTest; records are created with a CrmClient"""
+
+    def __init__(self, test, api, seed=None):
+        self.test = test
+        self.api = api
+        self.rng = random.Random(seed)
+        self.metrics = Metrics()
+        self.loaded = False
+
+    def open(self, path):
+        if self.loaded:
+            # router navigation, like a click, keeps the SPA and its request cache
+            self.test.driver.execute_script(
+                "window.history.pushState({}, '', arguments[0]);"
+                "window.dispatchEvent(new PopStateEvent('popstate'));", path)
+        else:
+            self.test.driver.get(f"{config.BASE_URL}{path}")
+            self.loaded = True
+        # let React commit the new route before looking for spinners
+        self.test.driver.execute_async_script(NEXT_FRAME_SCRIPT)
+        WebDriverWait(self.test.driver, config.PAGE_LOAD_TIMEOUT, poll_frequency=0.05).until(
+            lambda driver: driver.execute_script(READY_SCRIPT))
+
+    def execute(self, step, context, think_scale):
+        args = resolve(step.args, context)
+        if step.action == 'login':
+            self.test.login()
+            self.api.login()
+            self.loaded = True
+        elif step.action == 'visit':
+            self.open(args['path'])
+        elif step.action == 'think':
+            time.sleep(self.rng.uniform(args['min'], args['max']) * think_scale)
+        elif step.action == 'create':
+            context[args.get('save_as') or args['entity']] = \
+                self.api.entity(args['entity']).create(args['data'])
+        elif step.action == 'read':
+            context[args.get('save_as') or args['entity']] = \
+                self.api.entity(args['entity']).read(args['id'])
+        elif step.action == 'search':
+            self.api.entity(args['entity']).search(args['q'])
+        elif step.action == 'download':
+            self.api.entity(args['entity']).download(args['id'])
+
+    def run(self, scenario, user=0, iteration=0, think_scale=0.0):
+        """Run every step, stop at the first failure; return the step results"""
+        context = base_context(scenario, user, iteration, self.rng)
+        results = []
+        for step in scenario.steps:
+            start = time.perf_counter()
+            try:
+                self.execute(step, context, think_scale)
+            except Exception as error:
+                seconds = time.perf_counter() - start
+                self.metrics.record(scenario.name, step.name, seconds, repr(error))
+                results.append({'step': step.name, 'seconds': seconds, 'error': repr(error)})
+                break
+            seconds = time.perf_counter() - start
+            if step.action != 'think':
+                self.metrics.record(scenario.name, step.name, seconds)
+            results.append({'step': step.name, 'seconds': seconds})
+        self.metrics.journeys += 1
+        return results
+
+
+# ---- API virtual users --------------------------------------------------------------
+
+async def execute_api(api, step, context, rng, think_scale):
+    args = resolve(step.args, context)
+    if step.action == 'login':
+        await api.login()
+    elif step.action == 'visit':
+        # the browser sends a page's requests in parallel
+        await asyncio.gather(*(call() for call in page_requests(api, args['path'])))
+    elif step.action == 'think':
+        await asyncio.sleep(rng.uniform(args['min'], args['max']) * think_scale)
+    elif step.action == 'create':
+        context[args.get('save_as') or args['entity']] = \
+            await api.entity(args['entity']).create(args['data'])
+    elif step.action == 'read':
+        context[args.get('save_as') or args['entity']] = \
+            await api.entity(args['entity']).read(args['id'])
+    elif step.action == 'search':
+        await api.entity(args['entity']).search(args['q'])
+    elif step.action == 'download':
+        await api.entity(args['entity']).download(args['id'])
+
+
+async def virtual_user(index, scenarios, metrics, deadline, start_delay, client_factory,
+                       think_scale, seed):
+    """Run weighted journeys until the deadline, each with a fresh login"""
+    rng = random.Random(seed * 100003 + index)
+    await asyncio.sleep(start_delay)
+    iteration = 0
+    while time.monotonic() < deadline:
+        scenario = pick(scenarios, rng)
+        context = base_context(scenario, index, iteration, rng)
+        api = client_factory()
+        try:
+            for step in scenario.steps:
+                if time.monotonic() >= deadline:
+                    break
+                start = time.perf_counter()
+                try:
+                    await execute_api(api, step, context, rng, think_scale)
+                except Exception as error:
+                    metrics.record(scenario.name, step.name, time.perf_counter() - start,
+                                   repr(error))
+                    break
+                if step.action != 'think':
+                    metrics.record(scenario.name, step.name, time.perf_counter() - start)
+            else:
+                metrics.journeys += 1
+        finally:
+            await api.close()
+        iteration += 1
+
+
+def default_client():
+    from crm_client import AsyncCrmClient
+
+    return AsyncCrmClient(pool_size=USER_POOL_SIZE)
+
+
+async def run_load_async(scenarios, users, duration, ramp_up=0, client_factory=None,
+                         think_scale=1.0, seed=0, metrics=None):
+    metrics = Metrics() if metrics is None else metrics
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        virtual_user(index, scenarios, metrics, deadline, ramp_up * index / max(users, 1),
+                     client_factory or default_client, think_scale, seed)
+        for index in range(users)))
+    return metrics
+
+
+def run_load(scenarios, users, duration, ramp_up=0, client_factory=None, think_scale=1.0,
+             seed=0):
+    """Run users concurrent virtual users for duration seconds and return the Metrics"""
+    return asyncio.run(run_load_async(scenarios, users, duration, ramp_up, client_factory,
+                                      think_scale, seed))
+
+
+# ---- reports --------------------------------------------------------------------------
+
+def write_report(path, report):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📊 Report: {path}")
+
+
+def print_rows(rows):
+    print("=" * 100)
+    for row in rows:
+        latency = (f"p50 {row['p50_ms']:>8.1f}ms p95 {row['p95_ms']:>8.1f}ms"
+                   if 'p50_ms' in row else '-')
+        flag = '⚠' if row['errors'] else '✓'
+        print(f"{flag} {row['scenario']:22} {row['step']:32} {row['count']:>6} ok "
+              f"{row['errors']:>4} err  {latency}")
+
+
+def compare(ui_rows, load_rows):
+    """Join the UI and API latency of the same scenario steps"""
+    load = {(row['scenario'], row['step']): row for row in load_rows}
+    rows = []
+    for row in ui_rows:
+        other = load.get((row['scenario'], row['step']))
+        if 'p50_ms' in row and other and 'p50_ms' in other:
+            rows.append({'scenario': row['scenario'], 'step': row['step'],
+                         'ui_p50_ms': row['p50_ms'], 'api_p50_ms': other['p50_ms'],
+                         'ui_overhead_ms': round(row['p50_ms'] - other['p50_ms'], 1)})
+    return rows
+
+
+def run_ui(scenarios, iterations, think_scale):
+    from base_test import BaseTest
+    from crm_client import CrmClient
+
+    metrics = Metrics()
+    for scenario in scenarios:
+        for iteration in range(iterations):
+            test = BaseTest()
+            test.setup_method()
+            try:
+                with CrmClient() as api:
+                    runner = UiRunner(test, api, seed=iteration)
+                    runner.metrics = metrics
+                    runner.run(scenario, iteration=iteration, think_scale=think_scale)
+            finally:
+                test.teardown_method()
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('mode', choices=['list', 'ui', 'load', 'compare'])
+    parser.add_argument('--scenario', action='append', help='repeatable, default: all')
+    parser.add_argument('--directory', default=SCENARIO_DIR)
+    parser.add_argument('--iterations', type=int, default=1, help='ui: runs per scenario')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=60, help='load: seconds')
+    parser.add_argument('--ramp-up', type=float, default=10, help='load: seconds')
+    parser.add_argument('--think-scale', type=float,
+                        help='multiplier of the think times (default: 0 for ui, 1 for load)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile-for', type=float, default=0,
+                        help='load: seconds of backend profile (PROFILER=true backend)')
+    parser.add_argument('--profile-at', type=float, default=0,
+                        help='load: seconds into the run the profile starts')
+    args = parser.parse_args(argv)
+
+    scenarios = load_scenarios(args.directory, args.scenario)
+    if args.mode != 'compare' and not scenarios:
+        print(f"⚠ No scenarios in {args.directory}")
+        return 1
+
+    if args.mode == 'list':
+        for scenario in scenarios:
+            print(f"{scenario.name} (weight {scenario.weight})")
+            for step in scenario.steps:
+                print(f"    {step.name}")
+        return 0
+
+    if args.mode == 'ui':
+        think_scale = 0.0 if args.think_scale is None else args.think_scale
+        metrics = run_ui(scenarios, args.iterations, think_scale)
+        rows = metrics.summary()
+        print_rows(rows)
+        write_report(UI_REPORT, {'browser_profile': config.BROWSER_PROFILE, 'steps': rows})
+        return 1 if any(row['errors'] for row in rows) else 0
+
+    if args.mode == 'load':
+        think_scale = 1.0 if args.think_scale is None else args.think_scale
+        start = time.perf_counter()
+        profile = None
+        if args.profile_for:
+            from backend_profile import print_report, run_profiled_load
+
+            label = '+'.join(scenario.name for scenario in scenarios)
+            metrics, profile = run_profiled_load(scenarios, args.users, args.duration,
+                                                 args.ramp_up, think_scale, args.seed,
+                                                 args.profile_at, args.profile_for, label)
+        else:
+            metrics = run_load(scenarios, args.users, args.duration, args.ramp_up,
+                               think_scale=think_scale, seed=args.seed)
+        elapsed = time.perf_counter() - start
+        rows = metrics.summary()
+        print_rows(rows)
+        requests = sum(row['count'] + row['errors'] for row in rows)
+        print(f"\n{args.users} users, {metrics.journeys} journeys, "
+              f"{requests / elapsed:.1f} steps/s over {elapsed:.0f}s")
+        if profile:
+            print_report(profile)
+        write_report(LOAD_REPORT, {'users': args.users, 'duration': elapsed,
+                                   'journeys': metrics.journeys, 'steps': rows,
+                                   'profile': profile})
+        return 0
+
+    for path in (UI_REPORT, LOAD_REPORT):
+        if not os.path.exists(path):
+            print(f"⚠ {path} missing, run the ui and load modes first")
+            return 1
+    with open(UI_REPORT) as f:
+        ui_rows = json.load(f)['steps']
+    with open(LOAD_REPORT) as f:
+        load_rows = json.load(f)['steps']
+    print("=" * 100)
+    for row in compare(ui_rows, load_rows):
+        print(f"{row['scenario']:22} {row['step']:32} ui {row['ui_p50_ms']:>8.1f}ms "
+              f"api {row['api_p50_ms']:>8.1f}ms  +{row['ui_overhead_ms']:.1f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
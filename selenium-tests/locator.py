@@ -0,0 +1,202 @@
+"""
+Batched selector resolution
+
+Evaluates a ranked list of candidate selectors (CSS, XPath or visible text) in
+a single execute_script call and returns the first visible match together with
+the candidate that matched. Waiting is done by polling that one call, so
+implicit waits can stay disabled. Every resolution records which candidate hit
+and which ones missed before it; the totals are merged into
+reports/locator_stats.json at exit so dead candidates can be pruned. xdist
+workers merge one at a time under a lock on locator_stats.json.lock.
+
+Candidates are (By.CSS_SELECTOR, value), (By.XPATH, value) or
+(TEXT, text[, tags]) where tags is a CSS selector limiting the elements whose
+visible text is searched (default 'a, button').
+
+Run: python locator.py   # print candidates that never matched
+"""
+import argparse
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+from selenium.webdriver.common.by import By
+
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves of parallel processes are not serialized
+    fcntl = None
+
+TEXT = 'text'
+DEFAULT_TEXT_TAGS = 'a, button'
+POLL_INTERVAL = 0.1
+STATS_FILE = os.path.join(config.REPORT_DIR, 'locator_stats.json')
+
+RESOLVE_SCRIPT = """
+const candidates = arguments[0];
+const requireEnabled = arguments[1];
+
+function visible(el) {
+  if (!el.getClientRects().length) return false;
+  const style = window.getComputedStyle(el);
+  if (style.visibility === 'hidden' || style.display === 'none') return false;
+  return !requireEnabled || !el.disabled;
+}
+
+function find(kind, value, tags) {
+  if (kind === 'css selector') return Array.from(document.querySelectorAll(value));
+  if (kind === 'xpath') {
+    const snapshot = document.evaluate(value, document, null,
+      XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+    return nodes;
+  }
+  const text = value.toLowerCase();
+  return Array.from(document.querySelectorAll(tags))
+    .filter((el) => (el.innerText || '').toLowerCase().includes(text));
+}
+
+for (let i = 0; i < candidates.length; i++) {
+  const [kind, value, tags] = candidates[i];
+  let nodes;
+  try {
+    nodes = find(kind, value, tags);
+  } catch (e) {
+    continue;
+  }
+  const match = nodes.find(visible);
+  if (match) return [i, match];
+}
+return null;
+"""
+
+
+@dataclass
+class Match:
+    """The element found and the candidate that found it"""
+    element: object
+    index: int
+    candidate: tuple
+
+
+class LocatorStats:
+    """Per-candidate hit and miss counters, merged into STATS_FILE at exit"""
+
+    def __init__(self, path=STATS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    @staticmethod
+    def key(candidate):
+        return ' | '.join(str(part) for part in candidate)
+
+    def record(self, candidates, index):
+        """Count a hit for candidates[index] and a miss for every candidate tried before it"""
+        tried = candidates if index is None else candidates[:index + 1]
+        with self.lock:
+            for position, candidate in enumerate(tried):
+                counts = self.counts.setdefault(self.key(candidate), {'hits': 0, 'misses': 0})
+                counts['hits' if position == index else 'misses'] += 1
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Hold the thread lock and the cross-process lock of the stats file"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock, open(self.path + '.lock', 'a') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def save(self):
+        """Merge the counters recorded since the last save into the stats file"""
+        if not self.counts:
+            return
+        with self._file_lock():
+            totals = load_stats(self.path)
+            for key, counts in self.counts.items():
+                total = totals.setdefault(key, {'hits': 0, 'misses': 0})
+                total['hits'] += counts['hits']
+                total['misses'] += counts['misses']
+            with open(self.path + '.tmp', 'w') as f:
+                json.dump(totals, f, indent=2, sort_keys=True)
+            os.replace(self.path + '.tmp', self.path)
+            self.counts = {}
+
+
+stats = LocatorStats()
+atexit.register(stats.save)
+
+
+def normalize(candidate):
+    """Return the [kind, value, tags] triple sent to the browser"""
+    kind, value = candidate[0], candidate[1]
+    if kind == TEXT:
+        return [TEXT, value, candidate[2] if len(candidate) > 2 else DEFAULT_TEXT_TAGS]
+    if kind not in (By.CSS_SELECTOR, By.XPATH):
+        raise ValueError(f"Unsupported locator strategy: {kind}")
+    return [kind, value, None]
+
+
+def resolve(driver, candidates, timeout=0, enabled=False):
+    """Return the first visible Match of the ranked candidates, polling until timeout"""
+    payload = [normalize(candidate) for candidate in candidates]
+    deadline = time.monotonic() + timeout
+    while True:
+        result = driver.execute_script(RESOLVE_SCRIPT, payload, enabled)
+        if result is not None:
+            index, element = result
+            stats.record(candidates, index)
+            return Match(element, index, tuple(candidates[index]))
+        if time.monotonic() >= deadline:
+            stats.record(candidates, None)
+            return None
+        time.sleep(POLL_INTERVAL)
+
+
+def load_stats(path=STATS_FILE):
+    """Return the accumulated counters, empty when nothing was recorded yet"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def dead_candidates(totals, min_attempts=10):
+    """Return candidates tried at least min_attempts times that never matched"""
+    return sorted(key for key, counts in totals.items()
+                  if counts['hits'] == 0 and counts['misses'] >= min_attempts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stats', default=STATS_FILE)
+    parser.add_argument('--min-attempts', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    totals = load_stats(args.stats)
+    print("=" * 100)
+    for key, counts in sorted(totals.items(), key=lambda item: -item[1]['hits']):
+        print(f"{counts['hits']:>6} hits {counts['misses']:>6} misses  {key}")
+    dead = dead_candidates(totals, args.min_attempts)
+    if dead:
+        print(f"\n⚠ {len(dead)} candidates never matched:")
+        for key in dead:
+            print(f"    {key}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Network-condition injection proxy
+
+A TCP proxy that forwards a local port to a target (the frontend, or the
+backend behind /api) and shapes the traffic like a slow link:
+
+latency_ms   round-trip time added, half in each direction
+jitter_ms    uniform +/- variation of each one-way delay (order is preserved)
+down_kbps    downstream bandwidth shared by all connections of the proxy
+up_kbps      upstream bandwidth
+drop_rate    share of segments "lost"; TCP hides the loss, so the segment is
+             delivered after an extra retransmission timeout (rto_ms)
+
+Scenarios are declared in config.NETWORK_SCENARIOS.
+
+Run: python netem_proxy.py --scenario branch-office --listen 3001 --target localhost:3000
+"""
+import argparse
+import json
+import queue
+import random
+import socket
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+import config
+
+CHUNK_SIZE = 16 * 1024
+
+
+@dataclass
+class NetworkConditions:
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    down_kbps: float = 0
+    up_kbps: float = 0
+    drop_rate: float = 0
+    rto_ms: float = 200
+
+    @classmethod
+    def scenario(cls, name):
+        """Return the conditions of a config.NETWORK_SCENARIOS entry"""
+        if name not in config.NETWORK_SCENARIOS:
+            raise ValueError(f"Unknown network scenario: {name}")
+        return cls(**config.NETWORK_SCENARIOS[name])
+
+
+class Link:
+    """One direction of the emulated link: serializes bytes at a fixed rate"""
+
+    def __init__(self, kbps):
+        self.bytes_per_second = kbps * 1024 / 8 if kbps else 0
+        self.free_at = 0.0
+        self.lock = threading.Lock()
+
+    def transmit(self, size, ready_at):
+        """Return when size bytes ready at ready_at have fully crossed the link"""
+        if not self.bytes_per_second:
+            return ready_at
+        with self.lock:
+            start = max(ready_at, self.free_at)
+            self.free_at = start + size / self.bytes_per_second
+            return self.free_at
+
+
+class ConditionedProxy:
+    """Forwards listen_port to target with the given network conditions"""
+
+    def __init__(self, target, conditions, listen_port=0, seed=None):
+        host, _, port = target.rpartition(':')
+        self.target = (host or 'localhost', int(port))
+        self.conditions = conditions
+        self.links = {'up': Link(conditions.up_kbps), 'down': Link(conditions.down_kbps)}
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {'connections': 0, 'closed': 0, 'bytes_up': 0, 'bytes_down': 0,
+                      'segments': 0, 'dropped': 0, 'added_delay_ms': 0.0}
+        self.server = socket.create_server(('127.0.0.1', listen_port))
+        self.port = self.server.getsockname()[1]
+        self.running = False
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.server.close()
+
+    def reset_stats(self):
+        with self.stats_lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def report(self):
+        """Return the conditions and counters for a benchmark report"""
+        with self.stats_lock:
+            return {'conditions': asdict(self.conditions), **dict(self.stats)}
+
+    def _accept(self):
+        while self.running:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                break
+            try:
+                upstream = socket.create_connection(self.target, timeout=10)
+            except OSError:
+                client.close()
+                continue
+            # the timeout is for connecting only: idle keep-alive connections and slow
+            # responses must not be dropped by the proxy
+            upstream.settimeout(None)
+            with self.stats_lock:
+                self.stats['connections'] += 1
+            finished = self._closer(client, upstream)
+            for source, sink, direction in ((client, upstream, 'up'), (upstream, client, 'down')):
+                segments = queue.Queue()
+                threading.Thread(target=self._read, args=(source, segments, direction),
+                                 daemon=True).start()
+                threading.Thread(target=self._write, args=(sink, segments, finished),
+                                 daemon=True).start()
+
+    def _closer(self, client, upstream):
+        """Return a callback closing both sockets once both directions have finished"""
+        lock = threading.Lock()
+        writers = [2]
+
+        def finished():
+            with lock:
+                writers[0] -= 1
+                if writers[0]:
+                    return
+            for sock in (client, upstream):
+                try:
+                    # wakes a reader still blocked in recv
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sock.close()
+            with self.stats_lock:
+                self.stats['closed'] += 1
+
+        return finished
+
+    def _one_way_delay(self):
+        """Return the delay of one segment in seconds, and whether it was dropped"""
+        conditions = self.conditions
+        with self.random_lock:
+            jitter = self.random.uniform(-conditions.jitter_ms, conditions.jitter_ms)
+            dropped = self.random.random() < conditions.drop_rate
+        delay = max(conditions.latency_ms / 2 + jitter, 0)
+        if dropped:
+            delay += conditions.rto_ms
+        return delay / 1000, dropped
+
+    def _read(self, source, segments, direction):
+        """Timestamp incoming segments with the time they may leave the link"""
+        link = self.links[direction]
+        deliver_at = 0.0
+        try:
+            while True:
+                data = source.recv(CHUNK_SIZE)
+                if not data:
+                    break
+                now = time.monotonic()
+                delay, dropped = self._one_way_delay()
+                # a segment never overtakes the previous one of the same connection
+                deliver_at = max(link.transmit(len(data), now) + delay, deliver_at)
+                with self.stats_lock:
+                    self.stats[f'bytes_{direction}'] += len(data)
+                    self.stats['segments'] += 1
+                    self.stats['dropped'] += dropped
+                    self.stats['added_delay_ms'] += (deliver_at - now) * 1000
+                segments.put((deliver_at, data))
+        except OSError:
+            pass
+        segments.put((None, None))
+
+    def _write(self, sink, segments, finished):
+        """Send each segment once its delivery time is reached"""
+        try:
+            while True:
+                deliver_at, data = segments.get()
+                if data is None:
+                    break
+                wait = deliver_at - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                sink.sendall(data)
+            sink.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+        finally:
+            finished()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', default=config.NETWORK_SCENARIO,
+                        choices=sorted(config.NETWORK_SCENARIOS))
+    parser.add_argument('--listen', type=int, default=config.NETWORK_PROXY_WEB_PORT)
+    parser.add_argument('--target', default='localhost:3000')
+    args = parser.parse_args(argv)
+
+    proxy = ConditionedProxy(args.target, NetworkConditions.scenario(args.scenario),
+                             args.listen).start()
+    print(f"✓ 127.0.0.1:{proxy.port} -> {args.target} ({args.scenario})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+        print(f"📊 {json.dumps(proxy.report())}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
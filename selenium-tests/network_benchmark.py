@@ -0,0 +1,135 @@
+"""
+Dashboard load time under network scenarios
+
+For every scenario of config.NETWORK_SCENARIOS two conditioned proxies (see
+netem_proxy.py) are started: one in front of the frontend (browser -> web)
+and one in front of the backend (browser -> /api). The browser logs in
+through the web proxy, reloads the dashboard and the Web Vitals (TTFB, FCP,
+LCP, load), the API timings and the proxy counters are written to one report,
+so the number of dashboard round trips can be read against the load time.
+
+The frontend must send its API calls to the API proxy: build or start it with
+VITE_DEV_REMOTE=remote VITE_BACKEND_SERVER=http://localhost:8891/.
+The browser uses the full profile so images and fonts cross the link as well.
+
+Run: python network_benchmark.py --scenario localhost --scenario mobile-3g --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+from selenium.webdriver.common.by import By
+
+import config
+from browser_profiles import PROFILES
+from netem_proxy import ConditionedProxy, NetworkConditions
+
+DASHBOARD_READY = '.ant-table-tbody'
+SUMMARY_METRICS = ['ttfb', 'fcp', 'lcp', 'load', 'data_ready']
+
+
+def target_of(url):
+    """Return host:port of a URL"""
+    parts = urlsplit(url)
+    return f"{parts.hostname}:{parts.port or (443 if parts.scheme == 'https' else 80)}"
+
+
+def summarize(runs):
+    """Return the median of every metric over the runs"""
+    summary = {}
+    for metric in SUMMARY_METRICS:
+        values = [run[metric] for run in runs if run.get(metric) is not None]
+        summary[metric] = round(statistics.median(values), 1) if values else None
+    summary['api_requests'] = statistics.median(len(run['api']) for run in runs) if runs else 0
+    return summary
+
+
+def measure(runs):
+    """Log in through the proxies and return the Web Vitals of each dashboard reload"""
+    from base_test import BaseTest
+
+    test = BaseTest()
+    test.setup_method()
+    results = []
+    try:
+        test.login()
+        for _ in range(runs):
+            test.driver.get(f"{config.BASE_URL}/")
+            test.wait_for_element(By.CSS_SELECTOR, DASHBOARD_READY, config.PAGE_LOAD_TIMEOUT)
+            time.sleep(1)  # let the remaining dashboard requests settle
+            results.append(test.web_vitals())
+    finally:
+        test.teardown_method()
+    return results
+
+
+def run_scenario(name, runs):
+    """Measure one scenario with the web and API traffic going through conditioned proxies"""
+    conditions = NetworkConditions.scenario(name)
+    web = ConditionedProxy(target_of(config.BASE_URL), conditions,
+                           config.NETWORK_PROXY_WEB_PORT, seed=0).start()
+    api = ConditionedProxy(target_of(config.API_BASE_URL), conditions,
+                           config.NETWORK_PROXY_API_PORT, seed=1).start()
+    base_url = config.BASE_URL
+    config.BASE_URL = f"http://localhost:{web.port}"
+    try:
+        results = measure(runs)
+    finally:
+        config.BASE_URL = base_url
+        web.stop()
+        api.stop()
+    return {
+        'scenario': name,
+        'summary': summarize(results),
+        'runs': results,
+        'proxy': {'web': web.report(), 'api': api.report()},
+    }
+
+
+def print_report(report):
+    """Print one row per scenario"""
+    print("=" * 100)
+    print(f"{'scenario':15} {'api':>4} {'ttfb':>8} {'fcp':>8} {'lcp':>8} {'data':>8} "
+          f"{'segments':>9} {'dropped':>8}  (ms, median)")
+    for scenario in report['scenarios']:
+        summary = scenario['summary']
+        proxy = scenario['proxy']
+        cells = ' '.join(f"{summary[metric] if summary[metric] is not None else '-':>8}"
+                         for metric in ['ttfb', 'fcp', 'lcp', 'data_ready'])
+        segments = proxy['web']['segments'] + proxy['api']['segments']
+        dropped = proxy['web']['dropped'] + proxy['api']['dropped']
+        print(f"{scenario['scenario']:15} {summary['api_requests']:>4} {cells} "
+              f"{segments:>9} {dropped:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=sorted(config.NETWORK_SCENARIOS),
+                        help='repeatable, default: every scenario')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--browser-profile', choices=sorted(PROFILES),
+                        default=config.PERF_BROWSER_PROFILE)
+    parser.add_argument('--output',
+                        default=os.path.join(config.REPORT_DIR, 'network_benchmark.json'))
+    args = parser.parse_args(argv)
+    config.BROWSER_PROFILE = args.browser_profile
+
+    report = {'browser_profile': config.BROWSER_PROFILE, 'scenarios': []}
+    for name in args.scenario or list(config.NETWORK_SCENARIOS):
+        print(f"Measuring {name}...")
+        report['scenarios'].append(run_scenario(name, args.runs))
+
+    print_report(report)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📊 Report: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Overload benchmark
+
+Drives a backend serving a scratch database with an open-loop mix of
+requests (cheap lists and heavy summaries by default, --classes adds PDF
+downloads and logins) at rising multiples of its capacity, while
+/api/health is probed on a connection of its own.
+
+capacity   goodput (answers 2xx per second) of --users closed-loop users
+steps      requests sent at --multiples x capacity (0.5 1 2 3) for --duration
+           seconds each, whatever the backend answers
+
+Per step: offered and goodput rates, shed (429/503) and failed requests, the
+latency of the admitted requests and of the health probes. At every step past
+capacity the goodput must stay at least OVERLOAD_MIN_GOODPUT of the capacity
+and the p99 of the admitted requests under OVERLOAD_MAX_P99_MS; every health
+probe must answer 200 within HEALTH_TIMEOUT and every shed answer must carry a
+Retry-After. --no-admission runs the backend with ADMISSION=false to compare.
+
+Run: python overload_benchmark.py --duration 30
+     python overload_benchmark.py --duration 30 --no-admission
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from pymongo import MongoClient
+
+try:
+    import aiohttp
+except ImportError:  # the verdicts work without it
+    aiohttp = None
+
+import config
+from crm_client import CrmClient
+from crm_client.routes import server_url
+from db_isolation import WorkerBackend, seed_database
+from journey import write_report
+from rollup_benchmark import grow, rebuild_rollups
+from startup_benchmark import distribution
+
+BENCHMARK_REPORT = os.path.join(config.REPORT_DIR, 'overload_benchmark.json')
+HEALTH_INTERVAL = 0.25
+HEALTH_TIMEOUT = 1
+REQUEST_TIMEOUT = 30
+SHED = (429, 503)
+# (class, method, path under the api or the server, weight); {invoice} is a seeded invoice
+MIX = (
+    ('api', 'GET', 'invoice/list?page=1&items=10', 6),
+    ('api', 'GET', 'client/list?page=1&items=10', 2),
+    ('api', 'GET', 'payment/list?page=1&items=10', 2),
+    ('heavy', 'GET', 'invoice/summary?type=month', 1),
+    ('heavy', 'GET', 'payment/summary?type=month', 1),
+    ('heavy', 'GET', 'client/summary', 1),
+    ('pdf', 'GET', '/download/invoice/invoice-{invoice}.pdf', 1),
+    ('auth', 'POST', 'login', 1),
+)
+
+
+def request_mix(classes, api_url, server_url, invoice):
+    """[(class, method, url)] and their weights for the chosen classes"""
+    requests, weights = [], []
+    for name, method, path, weight in MIX:
+        if name not in classes:
+            continue
+        path = path.format(invoice=invoice)
+        url = server_url.rstrip('/') + path if path.startswith('/') else api_url + path
+        requests.append((name, method, url))
+        weights.append(weight)
+    return requests, weights
+
+
+async def send(session, request, headers, timeout=REQUEST_TIMEOUT):
+    """One request: its class, status (0 when it never got an answer), ms and Retry-After"""
+    name, method, url = request
+    body = ({'email': config.TEST_EMAIL, 'password': config.TEST_PASSWORD}
+            if name == 'auth' else None)
+    started = time.perf_counter()
+    try:
+        async with session.request(method, url, json=body, headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            await response.read()
+            status, retry_after = response.status, response.headers.get('Retry-After')
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        status, retry_after = 0, None
+    return {'class': name, 'status': status, 'retry_after': retry_after,
+            'ms': round((time.perf_counter() - started) * 1000, 2), 'end': time.monotonic()}
+
+
+async def closed_loop(session, pick, headers, users, duration):
+    """users sending one request after the other for duration seconds"""
+    results = []
+    deadline = time.monotonic() + duration
+
+    async def user():
+        while time.monotonic() < deadline:
+            results.append(await send(session, pick(), headers))
+
+    await asyncio.gather(*(user() for _ in range(users)))
+    return results
+
+
+async def open_loop(session, pick, headers, rate, duration):
+    """rate requests per second for duration seconds, not waiting for the answers"""
+    tasks = []
+    started = time.monotonic()
+    for index in range(int(rate * duration)):
+        delay = started + index / rate - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(session, pick(), headers)))
+    sent_s = time.monotonic() - started
+    return await asyncio.gather(*tasks), started, sent_s
+
+
+async def probe_health(url, stop):
+    """GET /api/health every HEALTH_INTERVAL on a connection of its own until stop is set"""
+    probes = []
+    async with aiohttp.ClientSession() as session:
+        while not stop.is_set():
+            probes.append(await send(session, ('health', 'GET', url), {}, HEALTH_TIMEOUT))
+            try:
+                await asyncio.wait_for(stop.wait(), HEALTH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    return probes
+
+
+def p99(values):
+    values = sorted(values)
+    return values[int(round(0.99 * (len(values) - 1)))] if values else None
+
+
+def summarize(results, started, sent_s):
+    """Rates over the time from the first request to the last answer"""
+    elapsed = max([sent_s] + [result['end'] - started for result in results]) or 1
+    admitted = [result for result in results if 200 <= result['status'] < 300]
+    shed = [result for result in results if result['status'] in SHED]
+    latency = [result['ms'] for result in admitted]
+    return {
+        'sent': len(results),
+        'offered_rps': round(len(results) / sent_s, 1) if sent_s else 0,
+        'goodput_rps': round(len(admitted) / elapsed, 1),
+        'shed': len(shed),
+        'shed_without_retry_after': sum(1 for result in shed if not result['retry_after']),
+        'failed': len(results) - len(admitted) - len(shed),
+        'admitted_ms': dict(distribution(latency), p99=p99(latency)),
+        'by_class': {name: {'admitted': sum(1 for result in admitted if result['class'] == name),
+                            'shed': sum(1 for result in shed if result['class'] == name)}
+                     for name in sorted({result['class'] for result in results})},
+    }
+
+
+def health_summary(probes):
+    latency = [probe['ms'] for probe in probes]
+    return {'probes': len(probes),
+            'failed': sum(1 for probe in probes if probe['status'] != 200),
+            'ms': dict(distribution(latency), p99=p99(latency))}
+
+
+def failures(steps, capacity, min_goodput=None, max_p99_ms=None):
+    """What went wrong at the steps past capacity and with the health probes of every step"""
+    min_goodput = config.OVERLOAD_MIN_GOODPUT if min_goodput is None else min_goodput
+    max_p99_ms = config.OVERLOAD_MAX_P99_MS if max_p99_ms is None else max_p99_ms
+    problems = []
+    for step in steps:
+        label = f"x{step['multiple']}"
+        load, health = step['load'], step['health']
+        if load['offered_rps'] < 0.9 * step['target_rps']:
+            problems.append(f"{label}: the load generator only offered {load['offered_rps']}/s "
+                            f"of {step['target_rps']}/s")
+        if health['failed']:
+            problems.append(f"{label}: {health['failed']} of {health['probes']} health probes "
+                            f"failed")
+        if load['shed_without_retry_after']:
+            problems.append(f"{label}: {load['shed_without_retry_after']} shed answers "
+                            f"without Retry-After")
+        if step['multiple'] <= 1:
+            continue
+        if load['goodput_rps'] < min_goodput * capacity:
+            problems.append(f"{label}: goodput {load['goodput_rps']}/s fell under "
+                            f"{min_goodput:.0%} of the {capacity}/s capacity")
+        if (load['admitted_ms'].get('p99') or 0) > max_p99_ms:
+            problems.append(f"{label}: admitted p99 {load['admitted_ms']['p99']}ms "
+                            f"(limit {max_p99_ms}ms)")
+    return problems
+
+
+async def run(backend, requests, weights, token, args):
+    rng = random.Random(args.seed)
+
+    def pick():
+        return rng.choices(requests, weights)[0]
+
+    headers = {'Authorization': f"Bearer {token}"}
+    health_url = f"{backend.api_base_url}health"
+    # no client side pool limit: the backend alone decides what waits
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        print(f"▶ Measuring capacity with {args.users} closed-loop users")
+        results = await closed_loop(session, pick, headers, args.users, args.duration)
+        capacity = round(sum(1 for result in results if 200 <= result['status'] < 300)
+                         / args.duration, 1)
+        print(f"✓ Capacity {capacity} requests/s")
+
+        steps = []
+        for multiple in args.multiples:
+            rate = round(capacity * multiple, 1)
+            print(f"▶ x{multiple}: {rate} requests/s for {args.duration}s")
+            stop = asyncio.Event()
+            prober = asyncio.create_task(probe_health(health_url, stop))
+            results, started, sent_s = await open_loop(session, pick, headers, rate,
+                                                       args.duration)
+            stop.set()
+            steps.append({'multiple': multiple, 'target_rps': rate,
+                          'load': summarize(results, started, sent_s),
+                          'health': health_summary(await prober)})
+            # let the queues drain before the next step
+            await asyncio.sleep(2)
+    return capacity, steps
+
+
+def print_steps(capacity, steps):
+    print("=" * 100)
+    print(f"{'step':>5}  {'offered/s':>9}  {'goodput/s':>9}  {'shed':>6}  {'failed':>6}  "
+          f"{'p50 ms':>8}  {'p99 ms':>8}  {'health p99':>10}")
+    for step in steps:
+        load, health = step['load'], step['health']
+        print(f"x{step['multiple']:<4}  {load['offered_rps']:>9}  {load['goodput_rps']:>9}  "
+              f"{load['shed']:>6}  {load['failed']:>6}  {load['admitted_ms'].get('p50', '-'):>8}  "
+              f"{load['admitted_ms'].get('p99') or '-':>8}  {health['ms'].get('p99') or '-':>10}")
+    print(f"📊 Capacity {capacity}/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=32, help='closed-loop users for capacity')
+    parser.add_argument('--multiples', type=float, nargs='+', default=[0.5, 1, 2, 3])
+    parser.add_argument('--duration', type=float, default=30, help='seconds per step')
+    parser.add_argument('--classes', nargs='+', default=['api', 'heavy'],
+                        choices=sorted({name for name, *_ in MIX}))
+    parser.add_argument('--no-admission', action='store_true',
+                        help='run the backend with ADMISSION=false')
+    parser.add_argument('--database', default=f"{config.MONGO_DB}_overload")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark database')
+    args = parser.parse_args(argv)
+    if aiohttp is None:
+        parser.error('the load generator needs aiohttp (pip install -r requirements.txt)')
+
+    client = MongoClient(config.MONGO_URI)
+    db = client[args.database]
+    client.drop_database(args.database)
+    print(f"▶ Seeding {args.database} with {args.invoices} invoices")
+    seed_database(client, args.database)
+    grow(db, 0, args.invoices, random.Random(args.seed))
+    rebuild_rollups(args.database)
+    invoice = db.invoices.find_one({'removed': False}, {'_id': 1})['_id']
+
+    env = {'ADMISSION': 'false'} if args.no_admission else {}
+    backend = WorkerBackend(args.database, env=env).start()
+    try:
+        with CrmClient(base_url=backend.api_base_url) as api:
+            token = api.login()['token']
+        requests, weights = request_mix(args.classes, backend.api_base_url,
+                                        server_url(backend.api_base_url), invoice)
+        capacity, steps = asyncio.run(run(backend, requests, weights, token, args))
+    finally:
+        backend.stop()
+        if not args.keep:
+            client.drop_database(args.database)
+        client.close()
+
+    problems = failures(steps, capacity)
+    print_steps(capacity, steps)
+    for problem in problems:
+        print(f"⚠ {problem}")
+    if not problems:
+        print("✓ Goodput and admitted latency held past capacity, health always answered")
+    write_report(BENCHMARK_REPORT, {'admission': not args.no_admission, 'classes': args.classes,
+                                    'capacity_rps': capacity, 'steps': steps,
+                                    'problems': problems})
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
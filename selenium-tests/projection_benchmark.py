@@ -0,0 +1,242 @@
+"""
+Sparse fieldset benchmark
+
+Seeds a scratch database with --invoices invoices shaped like real ones
+(several items with descriptions, notes, attached files, clients with an
+address) and pages through /invoice/list at 10, 50 and 100 items, once for
+the whole documents and once with the ?select= of the invoice DataTable
+columns. For every page size and variant it reports the JSON payload bytes
+(and gzipped) per page, the time to the last byte and the time the client
+spends parsing the page.
+
+The selected pages must only carry the selected fields, and must be at least
+PROJECTION_MIN_REDUCTION smaller than the whole documents.
+
+Run: python projection_benchmark.py --invoices 2000 --requests 30
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+import config
+from crm_client import CrmClient
+from db_isolation import WorkerBackend, seed_database
+from journey import write_report
+from startup_benchmark import distribution
+
+BENCHMARK_REPORT = os.path.join(config.REPORT_DIR, 'projection_benchmark.json')
+CHUNK = 1000
+CLIENTS = 100
+PAGE_SIZES = (10, 50, 100)
+# dataTableColumns (and dataTableSelect) of frontend/src/pages/Invoice
+DATATABLE_SELECT = ('number', 'client.name', 'date', 'expiredDate', 'total', 'credit', 'status',
+                    'paymentStatus', 'currency')
+WORDS = ('design', 'hosting', 'support', 'audit', 'migration', 'training', 'licence', 'review')
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def client_document(number, rng, admin, now):
+    return {'removed': False, 'enabled': True, 'name': f'Client {number}',
+            'email': f'client{number}@example.com', 'phone': f'+1555{number:07d}',
+            'country': rng.choice(['US', 'DE', 'FR', 'PK']),
+            'address': f'{number} {sentence(rng, 3)}', 'createdBy': admin,
+            'created': now, 'updated': now}
+
+
+def invoice_document(number, rng, admin, client, now):
+    """An invoice of 3 to 15 described items, with notes and attached files"""
+    date = now - timedelta(days=rng.randint(0, 365))
+    items = []
+    for _ in range(rng.randint(3, 15)):
+        quantity = rng.randint(1, 10)
+        price = round(rng.uniform(10, 500), 2)
+        items.append({'_id': ObjectId(), 'itemName': sentence(rng, 2),
+                      'description': sentence(rng, 12), 'quantity': quantity, 'price': price,
+                      'total': round(quantity * price, 2)})
+    sub_total = round(sum(item['total'] for item in items), 2)
+    return {
+        'removed': False,
+        'createdBy': admin,
+        'number': number,
+        'year': date.year,
+        'date': date,
+        'expiredDate': date + timedelta(days=30),
+        'client': client,
+        'items': items,
+        'taxRate': 0,
+        'subTotal': sub_total,
+        'taxTotal': 0,
+        'total': sub_total,
+        'credit': 0,
+        'discount': 0,
+        'currency': 'USD',
+        'status': rng.choice(['draft', 'pending', 'sent']),
+        'paymentStatus': 'unpaid',
+        'notes': ' '.join(sentence(rng, 10) for _ in range(3)),
+        'pdf': f'invoice-{number}.pdf',
+        'files': [{'_id': ObjectId(), 'id': str(ObjectId()), 'name': f'attachment-{index}.pdf',
+                   'path': f'/uploads/attachment-{number}-{index}.pdf',
+                   'description': sentence(rng, 6), 'isPublic': True}
+                  for index in range(rng.randint(0, 3))],
+        'created': date,
+        'updated': date,
+    }
+
+
+def seed_invoices(db, count, rng, now=None):
+    now = now or datetime.now()
+    admin = db.admins.find_one({}, {'_id': 1})['_id']
+    clients = db.clients.insert_many([client_document(number, rng, admin, now)
+                                      for number in range(CLIENTS)]).inserted_ids
+    for first in range(0, count, CHUNK):
+        db.invoices.insert_many([invoice_document(number, rng, admin, rng.choice(clients), now)
+                                 for number in range(first, min(first + CHUNK, count))],
+                                ordered=False)
+
+
+def allowed_keys(select):
+    """The keys a selected document may carry, per level: top level and references"""
+    top = {'_id'} | {path.split('.')[0] for path in select}
+    nested = {}
+    for path in select:
+        field, _, subfield = path.partition('.')
+        if subfield:
+            nested.setdefault(field, {'_id'}).add(subfield)
+    return top, nested
+
+
+def extra_fields(documents, select):
+    """Fields of the selected documents that were not selected"""
+    top, nested = allowed_keys(select)
+    extra = set()
+    for document in documents:
+        extra |= set(document) - top
+        for field, keys in nested.items():
+            if isinstance(document.get(field), dict):
+                extra |= {f'{field}.{key}' for key in set(document[field]) - keys}
+    return sorted(extra)
+
+
+def fetch(api, params):
+    """One list page: the JSON body, ms to its last byte, ms to parse it, its documents"""
+    started = time.perf_counter()
+    response = api.session.get(f"{api.base_url}invoice/list", params=params,
+                               timeout=api.timeout,
+                               headers={'Authorization': f"Bearer {api.token}",
+                                        'Accept-Encoding': 'identity'})
+    response.raise_for_status()
+    body = response.content
+    request_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    payload = json.loads(body)
+    parse_ms = (time.perf_counter() - started) * 1000
+    return body, request_ms, parse_ms, payload['result']
+
+
+def mean(values):
+    return round(sum(values) / len(values))
+
+
+def measure(api, items, select, requests, pages):
+    """Fetch `requests` list pages of `items` invoices, cycling through the first pages"""
+    sizes, gzipped, request_ms, parse_ms, extra = [], [], [], [], set()
+    for index in range(requests):
+        params = {'page': index % pages + 1, 'items': items}
+        if select:
+            params['select'] = ','.join(select)
+        body, took, parsed, documents = fetch(api, params)
+        sizes.append(len(body))
+        gzipped.append(len(gzip.compress(body)))
+        request_ms.append(round(took, 2))
+        parse_ms.append(round(parsed, 3))
+        if select:
+            extra.update(extra_fields(documents, select))
+    return {'bytes': mean(sizes), 'gzip_bytes': mean(gzipped),
+            'bytes_per_item': round(mean(sizes) / items),
+            'request_ms': distribution(request_ms), 'parse_ms': distribution(parse_ms),
+            'extra_fields': sorted(extra)}
+
+
+def reductions(results, limit=None):
+    """Payload reduction of the selected pages per page size, and what is wrong with them"""
+    limit = config.PROJECTION_MIN_REDUCTION if limit is None else limit
+    verdicts, problems = {}, []
+    for items, variants in results.items():
+        reduction = round(1 - variants['select']['bytes'] / variants['full']['bytes'], 3)
+        verdicts[items] = reduction
+        if reduction < limit:
+            problems.append(f"{items} items: select pages only {reduction:.0%} smaller "
+                            f"(limit {limit:.0%})")
+        if variants['select']['extra_fields']:
+            problems.append(f"{items} items: unselected fields returned "
+                            f"{variants['select']['extra_fields']}")
+    return verdicts, problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=30, help='requests per size and variant')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(PAGE_SIZES))
+    parser.add_argument('--database', default=f"{config.MONGO_DB}_projection")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark database')
+    args = parser.parse_args(argv)
+
+    client = MongoClient(config.MONGO_URI)
+    db = client[args.database]
+    client.drop_database(args.database)
+    print(f"▶ Seeding {args.database} with {args.invoices} invoices")
+    seed_database(client, args.database)
+    seed_invoices(db, args.invoices, random.Random(args.seed))
+
+    backend = WorkerBackend(args.database).start()
+    results = {}
+    try:
+        with CrmClient(base_url=backend.api_base_url) as api:
+            api.login()
+            for items in args.sizes:
+                pages = max(args.invoices // items, 1)
+                results[items] = {
+                    'full': measure(api, items, None, args.requests, pages),
+                    'select': measure(api, items, DATATABLE_SELECT, args.requests, pages),
+                }
+    finally:
+        backend.stop()
+        if not args.keep:
+            client.drop_database(args.database)
+        client.close()
+
+    verdicts, problems = reductions(results)
+    print("=" * 100)
+    print(f"{'items':>5}  {'variant':7}  {'bytes/page':>10}  {'gzip':>8}  {'p50 ms':>8}  "
+          f"{'p95 ms':>8}  {'parse ms':>8}")
+    for items, variants in results.items():
+        for variant, stats in variants.items():
+            print(f"{items:>5}  {variant:7}  {stats['bytes']:>10}  {stats['gzip_bytes']:>8}  "
+                  f"{stats['request_ms']['p50']:>8}  {stats['request_ms']['p95']:>8}  "
+                  f"{stats['parse_ms']['p50']:>8}")
+        print(f"📊 {items} items: select pages {verdicts[items]:.0%} smaller")
+    for problem in problems:
+        print(f"⚠ {problem}")
+    if not problems:
+        print("✓ Selected pages carry only their columns")
+    write_report(BENCHMARK_REPORT, {'invoices': args.invoices, 'select': DATATABLE_SELECT,
+                                    'results': results, 'reductions': verdicts,
+                                    'problems': problems})
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Top Mongo query shapes per journey scenario
+
+With QUERY_TRACE=true the backend times every driver command per query shape
+(src/middlewares/queryTrace): collection, operation, filter keys, sort and
+pipeline stages, a latency histogram, the documents returned and, for the
+sampled slow commands, the documents examined according to explain. This tool
+runs each scenario of scenarios/ alone as API load, resetting the table before
+and reading it after, and reports the top offenders of every scenario:
+
+total / p95 time    where the database time of the scenario goes
+calls per journey   fan-out, e.g. one autopopulate find per listed document
+examined/returned   documents read per document returned (COLLSCAN, $lookup)
+
+Run: python query_trace.py --users 20 --duration 60
+     python query_trace.py --scenario office-invoicing --sort p95Ms --top 5
+"""
+import argparse
+import os
+import sys
+
+import config
+import journey
+
+TRACE_REPORT = os.path.join(config.REPORT_DIR, 'query_trace.json')
+
+
+def trace_scenario(api, scenario, users, duration, ramp_up=0, think_scale=0.2, seed=0,
+                   client_factory=None):
+    """Run one scenario against a freshly reset trace table: (Metrics, trace snapshot)"""
+    api.query_trace.reset()
+    metrics = journey.run_load([scenario], users, duration, ramp_up, client_factory,
+                               think_scale, seed)
+    return metrics, api.query_trace.read(limit=500)
+
+
+def flags(row, calls_per_journey):
+    found = []
+    if row.get('planSummary') == 'COLLSCAN':
+        found.append('COLLSCAN')
+    ratio = row.get('examinedRatio')
+    if ratio is not None and ratio > config.QUERY_TRACE_MAX_EXAMINED_RATIO:
+        found.append(f"examines {ratio:g}x")
+    if calls_per_journey > config.QUERY_TRACE_MAX_CALLS_PER_JOURNEY:
+        found.append(f"{calls_per_journey:g} calls/journey")
+    return found
+
+
+def offenders(snapshot, journeys, sort='totalMs', top=10):
+    """The top shapes of a trace snapshot with their per-journey cost and flags"""
+    rows = []
+    for row in sorted(snapshot['rows'], key=lambda row: row.get(sort) or 0, reverse=True)[:top]:
+        per_journey = round(row['count'] / max(journeys, 1), 1)
+        rows.append({'shape': row['key'], 'count': row['count'],
+                     'calls_per_journey': per_journey,
+                     'total_ms': row['totalMs'], 'p95_ms': row['p95Ms'], 'max_ms': row['maxMs'],
+                     'docs_returned': row['docsReturned'],
+                     'examined_ratio': row.get('examinedRatio'),
+                     'plan': row.get('planSummary'), 'flags': flags(row, per_journey)})
+    return rows
+
+
+def print_offenders(scenario, journeys, rows, snapshot):
+    print(f"\n{scenario}: {journeys} journeys, {snapshot['shapes']} shapes"
+          + (f" ({snapshot['evicted']} evicted)" if snapshot.get('evicted') else ''))
+    print("=" * 110)
+    for row in rows:
+        flag = '⚠' if row['flags'] else '✓'
+        print(f"{flag} {row['total_ms']:>9.0f}ms total {row['p95_ms']:>6}ms p95 "
+              f"{row['calls_per_journey']:>6}/journey  {row['shape'][:60]}")
+        if row['flags']:
+            print(f"      {', '.join(row['flags'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', action='append', help='repeatable, default: all')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=60, help='seconds per scenario')
+    parser.add_argument('--ramp-up', type=float, default=5)
+    parser.add_argument('--think-scale', type=float, default=0.2)
+    parser.add_argument('--sort', default='totalMs',
+                        choices=['totalMs', 'p95Ms', 'maxMs', 'count', 'examinedRatio'])
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    from crm_client import ApiError, CrmClient
+
+    scenarios = journey.load_scenarios(names=args.scenario)
+    if not scenarios:
+        print("⚠ No scenario selected")
+        return 1
+    report = {}
+    with CrmClient() as api:
+        api.login()
+        try:
+            api.query_trace.reset()
+        except ApiError as error:
+            print(f"⚠ Query trace unavailable ({error}); start the backend with QUERY_TRACE=true")
+            return 1
+        for scenario in scenarios:
+            print(f"▶ {scenario.name}: {args.users} users for {args.duration:.0f}s")
+            metrics, snapshot = trace_scenario(api, scenario, args.users, args.duration,
+                                               args.ramp_up, args.think_scale)
+            rows = offenders(snapshot, metrics.journeys, args.sort, args.top)
+            print_offenders(scenario.name, metrics.journeys, rows, snapshot)
+            report[scenario.name] = {'journeys': metrics.journeys, 'shapes': snapshot['shapes'],
+                                     'evicted': snapshot.get('evicted', 0), 'offenders': rows,
+                                     'slow_log': snapshot.get('slowLog', [])[:20]}
+    journey.write_report(TRACE_REPORT, report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Month-end recurring invoice run
+
+Seeds a scratch database with --sources monthly recurring invoices (one
+retainer per client, all billed on the same day) that fall due now, starts
+--replicas backends against it and asks every replica for a scheduler pass
+at once. One replica takes the lease and generates the invoices in batches
+while the others answer busy. With --crash-after the lease holder is killed
+midway; another replica finishes the pass once the lease has expired.
+
+Then checks on mongod that every run happened exactly once:
+
+generated    one invoice per source for this run
+duplicates   no (recurrenceOf, recurrenceRun) and no invoice number twice
+advanced     no source still due
+totals       the generated totals add up to the sources' items and tax
+
+Run: python recurring_benchmark.py --sources 100000 --replicas 2
+     python recurring_benchmark.py --sources 100000 --replicas 2 --crash-after 3
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+import config
+from crm_client import CrmClient
+from db_isolation import WorkerBackend, seed_database
+from journey import write_report
+
+BENCHMARK_REPORT = os.path.join(config.REPORT_DIR, 'recurring_benchmark.json')
+CHUNK = 10000
+LEASE = 'recurring-invoices'
+# lease of the scheduler (LEASE_MS in middlewares/recurring) plus a margin
+TAKEOVER_TIMEOUT = 90
+RUN_TIMEOUT = 600
+CENT = Decimal('0.01')
+
+
+def cents(value):
+    """Round half up to cents like currency.js"""
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def month_before(moment):
+    """The same day one month earlier, the last day of that month if it is shorter"""
+    last = moment.replace(day=1) - timedelta(days=1)
+    return moment.replace(year=last.year, month=last.month, day=min(moment.day, last.day))
+
+
+def source_invoice(number, due, rng, admin, client):
+    """A monthly recurring invoice dated a month before `due` and due then"""
+    quantity = rng.randint(1, 10)
+    price = float(cents(rng.uniform(50, 500)))
+    tax_rate = rng.choice((0, 10, 20))
+    sub_total = cents(quantity * price)
+    total = sub_total + cents(sub_total * tax_rate / 100)
+    date = month_before(due)
+    return {
+        'removed': False,
+        'createdBy': admin,
+        'number': number,
+        'year': date.year,
+        'recurring': 'monthly',
+        'nextRun': due,
+        'date': date,
+        'expiredDate': date + timedelta(days=14),
+        'client': client,
+        'items': [{'_id': ObjectId(), 'itemName': 'Retainer', 'quantity': quantity,
+                   'price': price, 'total': float(sub_total)}],
+        'taxRate': tax_rate,
+        'subTotal': float(sub_total),
+        'taxTotal': float(total - sub_total),
+        'total': float(total),
+        'currency': 'USD',
+        'credit': float(total),
+        'discount': 0,
+        'paymentStatus': 'paid',
+        'status': 'sent',
+        'created': date,
+        'updated': date,
+    }
+
+
+def seed_sources(db, sources, due, rng):
+    """Insert the recurring invoices in chunks, return the sum of their totals"""
+    admin = db.admins.find_one({}, {'_id': 1})['_id']
+    expected = Decimal(0)
+    for first in range(0, sources, CHUNK):
+        clients = db.clients.insert_many([
+            {'removed': False, 'enabled': True, 'name': f'Retainer {number}',
+             'createdBy': admin, 'created': due}
+            for number in range(first, min(first + CHUNK, sources))]).inserted_ids
+        invoices = [source_invoice(first + index + 1, due, rng, admin, client)
+                    for index, client in enumerate(clients)]
+        db.invoices.insert_many(invoices, ordered=False)
+        expected += sum(cents(invoice['total']) for invoice in invoices)
+    db.settings.update_one({'settingKey': 'last_invoice_number'},
+                           {'$set': {'settingValue': sources}})
+    return expected
+
+
+def duplicates(db, key, match):
+    pipeline = [{'$match': match}, {'$group': {'_id': key, 'n': {'$sum': 1}}},
+                {'$match': {'n': {'$gt': 1}}}, {'$count': 'n'}]
+    return next(db.invoices.aggregate(pipeline), {'n': 0})['n']
+
+
+def verify(db, due):
+    """Counts of the generated invoices read straight from mongod"""
+    generated = {'removed': False, 'recurrenceRun': due}
+    total = next(db.invoices.aggregate([{'$match': generated},
+                                        {'$group': {'_id': None, 'total': {'$sum': '$total'}}}]),
+                 {'total': 0})['total']
+    return {
+        'generated': db.invoices.count_documents(generated),
+        'duplicate_runs': duplicates(db, {'source': '$recurrenceOf', 'run': '$recurrenceRun'},
+                                     {'recurrenceOf': {'$exists': True}}),
+        'duplicate_numbers': duplicates(db, '$number', {'removed': False}),
+        'still_due': db.invoices.count_documents({'removed': False, 'nextRun': {'$lte': due}}),
+        'total': total,
+    }
+
+
+def failures(counts, sources, expected_total):
+    """What is wrong with a run that should have generated one invoice per source"""
+    problems = []
+    if counts['generated'] != sources:
+        problems.append(f"{counts['generated']} invoices generated for {sources} sources")
+    if counts['duplicate_runs']:
+        problems.append(f"{counts['duplicate_runs']} runs generated more than once")
+    if counts['duplicate_numbers']:
+        problems.append(f"{counts['duplicate_numbers']} invoice numbers used twice")
+    if counts['still_due']:
+        problems.append(f"{counts['still_due']} sources still due")
+    if abs(cents(counts['total']) - expected_total) > CENT:
+        problems.append(f"generated total {counts['total']:.2f}, expected {expected_total}")
+    return problems
+
+
+def connect(backend, timeout=RUN_TIMEOUT):
+    api = CrmClient(base_url=backend.api_base_url, timeout=timeout)
+    api.login()
+    return api
+
+
+def run_pass(backend, reports, index):
+    """POST /recurring/run on one replica and keep its report (status crashed if it died)"""
+    try:
+        with connect(backend) as api:
+            reports[index] = api.recurring.run()
+    except Exception as error:
+        reports[index] = {'status': 'crashed', 'error': str(error)}
+
+
+def lease_holder(db, owners):
+    """Index of the replica holding the scheduler lease, None if none does"""
+    lease = db.leases.find_one({'_id': LEASE, 'expires': {'$gt': datetime.utcnow()}}) or {}
+    return owners.index(lease['owner']) if lease.get('owner') in owners else None
+
+
+def finish_pass(backends, alive, started):
+    """Ask the surviving replicas for passes until one completes after the takeover"""
+    reports = []
+    while time.monotonic() - started < TAKEOVER_TIMEOUT:
+        for index in alive:
+            with connect(backends[index]) as api:
+                report = api.recurring.run()
+            reports.append(dict(report, replica=index))
+            if report['status'] in ('done', 'idle'):
+                return reports
+        time.sleep(5)
+    raise TimeoutError(f"No replica took the lease over within {TAKEOVER_TIMEOUT}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sources', type=int, default=100000)
+    parser.add_argument('--replicas', type=int, default=2)
+    parser.add_argument('--crash-after', type=float, default=None,
+                        help='kill the lease holder this many seconds into the pass')
+    parser.add_argument('--database', default=f"{config.MONGO_DB}_recurring")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark database')
+    args = parser.parse_args(argv)
+
+    client = MongoClient(config.MONGO_URI)
+    db = client[args.database]
+    client.drop_database(args.database)
+    print(f"▶ Seeding {args.database} with {args.sources} recurring invoices")
+    seed_database(client, args.database)
+    due = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=1)
+    expected_total = seed_sources(db, args.sources, due, random.Random(args.seed))
+
+    backends = [WorkerBackend(args.database).start() for _ in range(args.replicas)]
+    try:
+        owners = []
+        for backend in backends:
+            with connect(backend) as api:
+                owners.append(api.recurring.status()['owner'])
+
+        print(f"▶ Month-end pass on {args.replicas} replicas")
+        reports = [None] * len(backends)
+        threads = [threading.Thread(target=run_pass, args=(backend, reports, index))
+                   for index, backend in enumerate(backends)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        crashed = None
+        if args.crash_after is not None:
+            time.sleep(args.crash_after)
+            crashed = lease_holder(db, owners)
+            if crashed is not None:
+                print(f"⚠ Killing replica {crashed}, the lease holder")
+                backends[crashed].process.kill()
+        for thread in threads:
+            thread.join()
+        reports = [dict(report, replica=index) for index, report in enumerate(reports)]
+        if crashed is not None:
+            alive = [index for index in range(len(backends)) if index != crashed]
+            reports += finish_pass(backends, alive, time.monotonic())
+        wall_s = round(time.monotonic() - started, 2)
+    finally:
+        for backend in backends:
+            backend.stop()
+
+    counts = verify(db, due)
+    problems = failures(counts, args.sources, expected_total)
+    generated = sum(report.get('generated', 0) for report in reports)
+    summary = {'sources': args.sources, 'replicas': args.replicas, 'crashed': crashed,
+               'wall_s': wall_s, 'per_second': round(counts['generated'] / wall_s) if wall_s else 0,
+               'reported_generated': generated, 'counts': counts, 'problems': problems}
+    if not args.keep:
+        client.drop_database(args.database)
+    client.close()
+
+    print("=" * 100)
+    for report in reports:
+        print(f"  replica {report['replica']}: {report['status']:8} "
+              f"generated {report.get('generated', 0):>7}  skipped {report.get('skipped', 0):>5}"
+              f"  {report.get('ms', 0):>7}ms  {report.get('perSecond', 0):>6}/s")
+    print(f"📊 {counts['generated']} invoices in {wall_s}s ({summary['per_second']}/s)")
+    for problem in problems:
+        print(f"⚠ {problem}")
+    if not problems:
+        print("✓ Every source generated exactly once")
+    write_report(BENCHMARK_REPORT, {'summary': summary, 'reports': reports})
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
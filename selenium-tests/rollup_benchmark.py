@@ -0,0 +1,231 @@
+"""
+Revenue rollup benchmark
+
+Grows the invoices of a scratch database step by step (10k, 100k, 1M by
+default, dated over the last two years, a third of them with a payment),
+rebuilds the daily rollup buckets after each step with npm run rollups and
+times against a backend serving that database:
+
+invoice.summary   /invoice/summary for type=month and type=year
+payment.summary   /payment/summary for type=month
+invoice.revenue   /invoice/revenue per month over the last year
+
+and, for contrast, the former all-time $facet scan of the invoices straight
+on mongod. The rollup answers read at most one bucket per day and
+combination, so their p50 should stay flat while the scan grows with the
+collection; an endpoint whose p50 at the largest size exceeds
+ROLLUP_MAX_GROWTH times its p50 at the smallest is flagged.
+
+Run: python rollup_benchmark.py --sizes 10000 100000 1000000 --requests 30
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+import config
+from crm_client import CrmClient
+from db_isolation import WorkerBackend, database_uri, seed_database
+from journey import write_report
+from startup_benchmark import distribution
+
+BENCHMARK_REPORT = os.path.join(config.REPORT_DIR, 'rollup_benchmark.json')
+CHUNK = 10000
+SPREAD_DAYS = 730
+STATUSES = ('draft', 'pending', 'sent')
+PAYMENT_STATUSES = ('unpaid', 'paid', 'partially')
+LEGACY_SCAN = 'legacy.scan'
+
+# The all-time pipeline invoiceController/summary.js ran before the rollups
+LEGACY_PIPELINE = [
+    {'$match': {'removed': False}},
+    {'$facet': {
+        'totalInvoice': [{'$group': {'_id': None, 'total': {'$sum': '$total'},
+                                     'count': {'$sum': 1}}}],
+        'statusCounts': [{'$group': {'_id': '$status', 'count': {'$sum': 1}}}],
+        'paymentStatusCounts': [{'$group': {'_id': '$paymentStatus', 'count': {'$sum': 1}}}],
+        'overdueCounts': [{'$match': {'expiredDate': {'$lt': datetime.now()}}},
+                          {'$group': {'_id': '$status', 'count': {'$sum': 1}}}],
+    }},
+]
+
+
+def invoice_document(number, now, rng, admin, client):
+    """An invoice shaped like models/appModels/Invoice.js, dated within SPREAD_DAYS"""
+    date = now - timedelta(days=rng.randint(0, SPREAD_DAYS - 1), minutes=rng.randint(0, 1439))
+    total = round(rng.uniform(10, 5000), 2)
+    payment_status = rng.choice(PAYMENT_STATUSES)
+    credit = {'unpaid': 0, 'paid': total, 'partially': round(total / 2, 2)}[payment_status]
+    return {
+        'removed': rng.random() < 0.02,
+        'createdBy': admin,
+        'number': number,
+        'year': date.year,
+        'date': date,
+        'expiredDate': date + timedelta(days=30),
+        'client': client,
+        'items': [{'itemName': 'Service', 'quantity': 1, 'price': total, 'total': total}],
+        'taxRate': 0,
+        'subTotal': total,
+        'taxTotal': 0,
+        'total': total,
+        'credit': credit,
+        'discount': 0,
+        'currency': 'USD',
+        'status': rng.choice(STATUSES),
+        'paymentStatus': payment_status,
+        'created': date,
+        'updated': date,
+    }
+
+
+def payment_document(invoice, number):
+    """The payment that brought an invoice to its credit"""
+    return {
+        'removed': False,
+        'createdBy': invoice['createdBy'],
+        'number': number,
+        'client': invoice['client'],
+        'invoice': invoice['_id'],
+        'date': invoice['date'] + timedelta(days=1),
+        'amount': invoice['credit'],
+        'currency': invoice['currency'],
+        'created': invoice['date'],
+        'updated': invoice['date'],
+    }
+
+
+def grow(db, start, size, rng, now=None):
+    """Insert invoices numbered start..size-1 (and their payments) in chunks"""
+    now = now or datetime.now()
+    admin = db.admins.find_one({}, {'_id': 1})['_id']
+    client = db.clients.insert_one({'removed': False, 'enabled': True, 'name': 'Rollup Client',
+                                    'createdBy': admin, 'created': now}).inserted_id
+    for first in range(start, size, CHUNK):
+        invoices = [dict(invoice_document(number, now, rng, admin, client), _id=ObjectId())
+                    for number in range(first, min(first + CHUNK, size))]
+        db.invoices.insert_many(invoices, ordered=False)
+        payments = [payment_document(invoice, invoice['number'])
+                    for invoice in invoices if invoice['credit'] and not invoice['removed']]
+        if payments:
+            db.payments.insert_many(payments, ordered=False)
+        print(f"  {min(first + CHUNK, size):>9} invoices", end='\r')
+    print()
+
+
+def rebuild_rollups(database):
+    """npm run rollups against the database, return the seconds it took"""
+    start = time.perf_counter()
+    subprocess.run(['npm', 'run', 'rollups'], cwd=config.BACKEND_DIR, check=True,
+                   capture_output=True, env=dict(os.environ, DATABASE=database_uri(database)))
+    return round(time.perf_counter() - start, 2)
+
+
+def timed(call, requests):
+    """Call requests times, return the distribution of the durations in ms"""
+    durations = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        call()
+        durations.append(round((time.perf_counter() - start) * 1000, 2))
+    return distribution(durations)
+
+
+def endpoints(api, db, today=None):
+    """{name: call} of every timed request"""
+    today = today or datetime.now().date()
+    year_ago = (today - timedelta(days=364)).isoformat()
+    return {
+        'invoice.summary.month': lambda: api.invoice.summary(type='month'),
+        'invoice.summary.year': lambda: api.invoice.summary(type='year'),
+        'payment.summary.month': lambda: api.payment.summary(type='month'),
+        'invoice.revenue.month': lambda: api.invoice.revenue(from_=year_ago,
+                                                             to=today.isoformat(),
+                                                             interval='month'),
+        LEGACY_SCAN: lambda: list(db.invoices.aggregate(LEGACY_PIPELINE)),
+    }
+
+
+def flatness(steps, limit=None):
+    """{endpoint: {growth, flat}}: p50 at the largest size over p50 at the smallest"""
+    limit = limit or config.ROLLUP_MAX_GROWTH
+    smallest, largest = steps[0], steps[-1]
+    verdicts = {}
+    for name, row in largest['endpoints'].items():
+        growth = round(row['p50'] / max(smallest['endpoints'][name]['p50'], 0.01), 2)
+        verdicts[name] = {'growth': growth, 'flat': growth <= limit}
+    return verdicts
+
+
+def print_steps(steps, verdicts):
+    print("=" * 100)
+    names = list(steps[0]['endpoints'])
+    print(f"{'invoices':>10} " + ''.join(f"{name:>24}" for name in names))
+    for step in steps:
+        print(f"{step['invoices']:>10} " + ''.join(
+            f"{step['endpoints'][name]['p50']:>22.1f}ms" for name in names))
+    for name, verdict in verdicts.items():
+        flag = '✓' if verdict['flat'] or name == LEGACY_SCAN else '⚠'
+        print(f"{flag} {name:24} p50 x{verdict['growth']} from "
+              f"{steps[0]['invoices']} to {steps[-1]['invoices']} invoices")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--requests', type=int, default=30, help='timed calls per endpoint')
+    parser.add_argument('--database', default=f"{config.MONGO_DB}_rollups")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark database')
+    args = parser.parse_args(argv)
+
+    client = MongoClient(config.MONGO_URI)
+    db = client[args.database]
+    client.drop_database(args.database)
+    print(f"▶ Seeding {args.database}")
+    seed_database(client, args.database)
+    backend = WorkerBackend(args.database).start()
+    api = CrmClient(base_url=backend.api_base_url)
+    rng = random.Random(args.seed)
+
+    steps = []
+    try:
+        api.login()
+        size = 0
+        for target in sorted(args.sizes):
+            print(f"▶ Growing to {target} invoices")
+            grow(db, size, target, rng)
+            size = target
+            rebuild_s = rebuild_rollups(args.database)
+            step = {'invoices': size, 'payments': db.payments.estimated_document_count(),
+                    'buckets': db.rollups.estimated_document_count(), 'rebuild_s': rebuild_s,
+                    'endpoints': {}}
+            for name, call in endpoints(api, db).items():
+                call()
+                step['endpoints'][name] = timed(call, args.requests)
+            steps.append(step)
+            print(f"✓ {size} invoices, {step['buckets']} buckets (rebuilt in {rebuild_s}s)")
+    finally:
+        api.close()
+        backend.stop()
+        if not args.keep:
+            client.drop_database(args.database)
+        client.close()
+
+    verdicts = flatness(steps)
+    print_steps(steps, verdicts)
+    write_report(BENCHMARK_REPORT, {'requests': args.requests, 'steps': steps,
+                                    'verdicts': verdicts})
+    rising = [name for name, verdict in verdicts.items()
+              if not verdict['flat'] and name != LEGACY_SCAN]
+    return 1 if rising else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,8 @@ import os
 import subprocess
 from datetime import datetime
 
+import config
+
 def run_tests():
     """Run all Selenium tests and generate report"""
     
@@ -13,6 +15,7 @@ def run_tests():
     print("SELENIUM AUTOMATED TESTING - IDURAR ERP CRM")
     print("=" * 70)
     print(f"Test Execution Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Browser profile: {config.BROWSER_PROFILE}")
     print()
     
     # Test files to run
@@ -0,0 +1,273 @@
+"""
+Asynchronous screenshot pipeline
+
+The test thread only asks the browser for the screenshot; decoding, perceptual
+hashing, compression and writing happen on a background thread pool. Images are
+stored content-addressed under screenshots/objects/ and near-identical captures
+(same perceptual hash within SCREENSHOT_PHASH_DISTANCE bits) reuse the stored
+object. screenshots/index.jsonl maps every capture name to its object; it is
+shared by every xdist worker, so appends and rewrites hold an exclusive lock on
+index.jsonl.lock. A capture that fails to store is reported on stderr.
+
+Policies (SCREENSHOT_POLICY):
+    on-failure  capture only while an exception is being handled
+    sampled     failures plus SCREENSHOT_SAMPLE_RATE of the other captures
+    always      every capture
+"""
+import atexit
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the threads of one process are serialized
+    fcntl = None
+
+try:
+    from PIL import Image, features
+except ImportError:  # without Pillow PNGs are stored as captured, deduplicated by exact hash
+    Image = None
+
+POLICIES = ('on-failure', 'sampled', 'always')
+INDEX_FILE = 'index.jsonl'
+INDEX_LOCK = INDEX_FILE + '.lock'
+OBJECTS_DIR = 'objects'
+
+
+def perceptual_hash(image, size=16):
+    """Return the size*size bit difference hash of a Pillow image"""
+    pixels = image.convert('L').resize((size + 1, size), Image.LANCZOS).tobytes()
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            offset = row * (size + 1) + col
+            value = (value << 1) | (pixels[offset] > pixels[offset + 1])
+    return value
+
+
+def hamming(a, b):
+    """Return the number of differing bits of two hashes"""
+    return bin(a ^ b).count('1')
+
+
+class ScreenshotPipeline:
+    """Captures screenshots on the calling thread and stores them in the background"""
+
+    def __init__(self, directory=None, policy=None, sample_rate=None, workers=None,
+                 max_files=None, max_bytes=None, max_age_days=None, phash_distance=None):
+        self.directory = directory or config.SCREENSHOT_DIR
+        self.policy = policy or config.SCREENSHOT_POLICY
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unsupported screenshot policy: {self.policy}")
+        self.sample_rate = config.SCREENSHOT_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.max_files = config.SCREENSHOT_MAX_FILES if max_files is None else max_files
+        self.max_bytes = config.SCREENSHOT_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_age_days = config.SCREENSHOT_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        self.phash_distance = (config.SCREENSHOT_PHASH_DISTANCE if phash_distance is None
+                               else phash_distance)
+        self.format = 'webp' if Image is not None and features.check('webp') else 'png'
+
+        self.objects_dir = os.path.join(self.directory, OBJECTS_DIR)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.random = random.Random()
+        self.hashes = self._load_hashes()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or config.SCREENSHOT_WORKERS,
+            thread_name_prefix='screenshot',
+        )
+        self.stats = {'captured': 0, 'skipped': 0, 'stored': 0, 'deduplicated': 0,
+                      'failed': 0, 'capture_seconds': 0.0}
+
+    def _load_hashes(self):
+        """Return {perceptual hash: object file} of the objects still on disk"""
+        hashes = {}
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return hashes
+        with open(path) as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.get('phash') is not None and \
+                        os.path.exists(os.path.join(self.directory, entry['object'])):
+                    hashes[int(entry['phash'], 16)] = entry['object']
+        return hashes
+
+    def should_capture(self, failure):
+        """Apply the policy to one capture request"""
+        if failure or self.policy == 'always':
+            return True
+        if self.policy == 'sampled':
+            return self.random.random() < self.sample_rate
+        return False
+
+    def capture(self, driver, name, failure=None):
+        """Grab a screenshot and queue it for storage, return the pending Future or None"""
+        if failure is None:
+            # called from an except block
+            failure = sys.exc_info()[0] is not None
+        if not self.should_capture(failure):
+            self.stats['skipped'] += 1
+            return None
+
+        start = time.perf_counter()
+        data = driver.get_screenshot_as_base64()
+        self.stats['capture_seconds'] += time.perf_counter() - start
+        self.stats['captured'] += 1
+        future = self.executor.submit(self._store, name, data, failure, time.time())
+        future.add_done_callback(lambda f: self._report(name, f))
+        return future
+
+    def _report(self, name, future):
+        """Print the error of a capture that could not be stored"""
+        error = future.exception()
+        if error is not None:
+            with self.lock:
+                self.stats['failed'] += 1
+            print(f"Screenshot {name} not saved: {error!r}", file=sys.stderr)
+
+    @contextlib.contextmanager
+    def _index_lock(self):
+        """Hold the thread lock and the cross-process lock of the index file"""
+        with self.lock, open(os.path.join(self.directory, INDEX_LOCK), 'a') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _store(self, name, data, failure, captured_at):
+        """Decode, deduplicate, compress and write one capture (worker thread)"""
+        png = base64.b64decode(data)
+        phash = None
+        if Image is not None:
+            image = Image.open(io.BytesIO(png))
+            phash = perceptual_hash(image)
+            obj = self._find_similar(phash)
+            if obj is None:
+                buffer = io.BytesIO()
+                if self.format == 'webp':
+                    image.save(buffer, 'WEBP', quality=80, method=4)
+                else:
+                    image.save(buffer, 'PNG', optimize=True)
+                content = buffer.getvalue()
+        else:
+            obj = None
+            content = png
+
+        stored = False
+        if obj is None:
+            digest = hashlib.sha256(content).hexdigest()
+            obj = f"{OBJECTS_DIR}/{digest}.{self.format}"
+            path = os.path.join(self.directory, obj)
+            if not os.path.exists(path):
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(content)
+                os.replace(path + '.tmp', path)
+                stored = True
+        if not stored:
+            try:
+                # reused objects count as recent for retention
+                os.utime(os.path.join(self.directory, obj))
+            except FileNotFoundError:
+                pass
+
+        entry = {
+            'name': name,
+            'object': obj,
+            'failure': failure,
+            'time': captured_at,
+            'phash': f"{phash:064x}" if phash is not None else None,
+        }
+        with self._index_lock():
+            self.stats['stored' if stored else 'deduplicated'] += 1
+            if phash is not None:
+                self.hashes.setdefault(phash, obj)
+            with open(os.path.join(self.directory, INDEX_FILE), 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+        print(f"Screenshot saved: {name} -> {obj}")
+        return os.path.join(self.directory, obj)
+
+    def _find_similar(self, phash):
+        """Return the stored object whose perceptual hash is close enough, if any"""
+        with self.lock:
+            if phash in self.hashes:
+                return self.hashes[phash]
+            for known, obj in self.hashes.items():
+                if hamming(known, phash) <= self.phash_distance:
+                    return obj
+        return None
+
+    def enforce_retention(self):
+        """Delete the oldest objects beyond the age, count and size limits"""
+        objects = []
+        for entry in os.scandir(self.objects_dir):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                objects.append((stat.st_mtime, stat.st_size, entry.path))
+        objects.sort()
+
+        removed = []
+        total = sum(size for _, size, _ in objects)
+        cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days else None
+        while objects and ((cutoff and objects[0][0] < cutoff)
+                           or (self.max_files and len(objects) > self.max_files)
+                           or (self.max_bytes and total > self.max_bytes)):
+            _, size, path = objects.pop(0)
+            os.remove(path)
+            total -= size
+            removed.append(f"{OBJECTS_DIR}/{os.path.basename(path)}")
+
+        if removed:
+            self._prune_index(set(removed))
+        return removed
+
+    def _prune_index(self, removed):
+        """Drop index entries that point at deleted objects
+
+        The file is re-read under the index lock, so entries other workers
+        appended since this pipeline started are kept.
+        """
+        with self._index_lock():
+            self.hashes = {h: obj for h, obj in self.hashes.items() if obj not in removed}
+            path = os.path.join(self.directory, INDEX_FILE)
+            if not os.path.exists(path):
+                return
+            with open(path) as f:
+                kept = [line for line in f if json.loads(line)['object'] not in removed]
+            with open(path + '.tmp', 'w') as f:
+                f.writelines(kept)
+            os.replace(path + '.tmp', path)
+
+    def close(self):
+        """Wait for pending writes and apply the retention limits"""
+        self.executor.shutdown(wait=True)
+        self.enforce_retention()
+
+
+_pipeline = None
+
+
+def get_pipeline(**options):
+    """Return the process-wide pipeline, flushed at interpreter exit
+
+    options are only used by the first call, which creates the pipeline.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = ScreenshotPipeline(**options)
+        atexit.register(_pipeline.close)
+    return _pipeline
@@ -13,22 +13,20 @@ from webdriver_manager.chrome import ChromeDriverManager
 import time
 import os
 
+from screenshots import get_pipeline
+
 # Configuration
 BASE_URL = "http://localhost:3000"
 API_URL = "http://localhost:8888/api"
 EMAIL = "admin@admin.com"
 PASSWORD = "admin123"
 SCREENSHOT_DIR = "screenshots"
-
-# Create screenshot directory
-os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+# Standalone runs keep every screenshot unless SCREENSHOT_POLICY says otherwise
+SCREENSHOT_POLICY = os.getenv('SCREENSHOT_POLICY', 'always')
 
 def take_screenshot(driver, name):
-    """Take a screenshot"""
-    filename = f"{SCREENSHOT_DIR}/{name}.png"
-    driver.save_screenshot(filename)
-    print(f"  Screenshot saved: {filename}")
-    return filename
+    """Take a screenshot (written in the background, see screenshots.py)"""
+    return get_pipeline(directory=SCREENSHOT_DIR, policy=SCREENSHOT_POLICY).capture(driver, name)
 
 def setup_driver():
     """Setup Chrome driver"""
@@ -40,7 +38,8 @@ def setup_driver():
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=options)
     driver.maximize_window()
-    driver.implicitly_wait(10)
+    # Lookups use explicit waits, implicit waits would stall every miss
+    driver.implicitly_wait(0)
     return driver
 
 def test_1_homepage_loads():
@@ -279,7 +278,7 @@ def main():
     
     print("="*60)
     print(f"Total: {passed}/{total} tests passed")
-    print(f"Screenshots saved in: {SCREENSHOT_DIR}/")
+    print(f"Screenshots saved in: {SCREENSHOT_DIR}/ (see {SCREENSHOT_DIR}/index.jsonl)")
     print("="*60)
 
 if __name__ == "__main__":
@@ -0,0 +1,356 @@
+"""
+Soak mode: hours of mixed workload with backend resource-growth detection
+
+The journeys of scenarios/*.yaml run as API virtual users (journey.py) against
+a local backend while these are sampled every --interval seconds:
+
+rss_mb              VmRSS of the backend process (/proc/<pid>/status)
+heap_mb             V8 heap used after a forced GC (Node inspector)
+external_mb         Buffers and other memory outside the V8 heap (Node inspector)
+open_fds            entries of /proc/<pid>/fd
+mongo_connections   serverStatus connections.current
+download_mb         size of src/public/download, where the PDFs are regenerated
+
+The backend is started here (node --inspect on a copy of the template
+database, see db_isolation.py) unless --pid names a running one.
+
+Growth is the least-squares slope of each resource against the number of HTTP
+requests, after the warm-up. A resource fails when it keeps growing (R² of at
+least SOAK_MIN_R2) faster than its SOAK_GROWTH_LIMITS per 1000 requests. To
+tell which step drives it, the run is cut into windows that each favour one
+scenario, and the growth of every window is regressed on its step counts.
+
+Run: python soak.py --duration 4h --users 50
+     python soak.py --duration 30m --pid 12345 --inspect-port 9229
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+from pymongo import MongoClient
+
+import cdp
+import config
+import journey
+
+SOAK_REPORT = os.path.join(config.REPORT_DIR, 'soak.json')
+RESOURCES = ('rss_mb', 'heap_mb', 'external_mb', 'open_fds', 'mongo_connections',
+             'download_mb')
+# weight multiplier of the favoured scenario of a window
+EMPHASIS = 4
+MB = 1024 * 1024
+
+
+def parse_duration(value):
+    """'4h', '30m', '90s' or a number of seconds"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([hms]?)', str(value).strip())
+    if not match:
+        raise ValueError(f"Bad duration: {value}")
+    return float(match.group(1)) * {'h': 3600, 'm': 60, 's': 1, '': 1}[match.group(2)]
+
+
+# ---- resource probes --------------------------------------------------------------
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def open_fds(pid):
+    return len(os.listdir(f"/proc/{pid}/fd"))
+
+
+def directory_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass  # replaced by a concurrent download
+    return total / MB
+
+
+class Inspector:
+    """Node inspector (node --inspect) session for heap figures"""
+
+    def __init__(self, port, host='127.0.0.1'):
+        self.address = f"{host}:{port}"
+
+    def _send(self, commands):
+        return cdp.send(cdp.targets(self.address)[0]['webSocketDebuggerUrl'], commands)
+
+    def memory(self):
+        """process.memoryUsage() after a full GC, in MB"""
+        _, evaluated = self._send([
+            ('HeapProfiler.collectGarbage', {}),
+            ('Runtime.evaluate', {'expression': 'JSON.stringify(process.memoryUsage())',
+                                  'returnByValue': True}),
+        ])
+        usage = json.loads(evaluated['result']['value'])
+        return {'heap_mb': usage['heapUsed'] / MB, 'external_mb': usage['external'] / MB}
+
+
+class RequestCounter:
+    """Timing hook of the virtual users' clients"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, timing):
+        self.count += 1
+
+
+class Sampler:
+    """Samples the backend resources together with the request and step counters"""
+
+    def __init__(self, pid, metrics, counter, inspector=None, mongo=None):
+        self.pid = pid
+        self.metrics = metrics
+        self.counter = counter
+        self.inspector = inspector
+        self.mongo = mongo
+        self.download_dir = os.path.join(f"/proc/{pid}/cwd", 'src', 'public', 'download')
+        self.samples = []
+        self.start = time.monotonic()
+
+    def steps(self):
+        counts = {}
+        for source in (dict(self.metrics.samples), dict(self.metrics.errors)):
+            for (scenario, step), values in source.items():
+                key = f"{scenario} / {step}"
+                counts[key] = counts.get(key, 0) + len(values)
+        return counts
+
+    def probe(self):
+        values = {'rss_mb': rss_mb(self.pid), 'open_fds': open_fds(self.pid),
+                  'download_mb': directory_mb(self.download_dir)}
+        if self.inspector:
+            try:
+                values.update(self.inspector.memory())
+            except Exception as error:
+                print(f"⚠ Inspector: {error!r}")
+        if self.mongo is not None:
+            status = self.mongo.admin.command('serverStatus')
+            values['mongo_connections'] = status['connections']['current']
+        return values
+
+    def take(self, window):
+        sample = {'t': round(time.monotonic() - self.start, 1), 'window': window,
+                  'requests': self.counter.count, 'steps': self.steps()}
+        sample.update(self.probe())
+        self.samples.append(sample)
+        return sample
+
+    async def run(self, interval, window):
+        """Sample every interval seconds until cancelled; window() is the current window"""
+        while True:
+            await asyncio.sleep(interval)
+            sample = await asyncio.to_thread(self.take, window())
+            print(f"  {sample['t']:>8.0f}s {sample['requests']:>9} req  "
+                  f"rss {sample['rss_mb']:7.1f}MB  heap {sample.get('heap_mb', 0):7.1f}MB  "
+                  f"fds {sample['open_fds']:>5}")
+
+
+# ---- analysis ---------------------------------------------------------------------
+
+def fit(xs, ys):
+    """Least-squares line: (slope, r2)"""
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    if len(xs) < 3 or np.ptp(xs) == 0:
+        return 0.0, 0.0
+    slope, intercept = np.polyfit(xs, ys, 1)
+    residual = np.sum((ys - (slope * xs + intercept)) ** 2)
+    total = np.sum((ys - ys.mean()) ** 2)
+    return float(slope), float(1 - residual / total) if total else 0.0
+
+
+def growth(samples, limits=None, warmup=None, min_r2=None):
+    """Growth per 1000 requests of every sampled resource after the warm-up"""
+    limits = config.SOAK_GROWTH_LIMITS if limits is None else limits
+    warmup = config.SOAK_WARMUP if warmup is None else warmup
+    min_r2 = config.SOAK_MIN_R2 if min_r2 is None else min_r2
+    if not samples:
+        return {}
+    cutoff = samples[-1]['requests'] * warmup
+    steady = [sample for sample in samples if sample['requests'] >= cutoff]
+    results = {}
+    for resource in RESOURCES:
+        points = [(sample['requests'], sample[resource]) for sample in steady
+                  if sample.get(resource) is not None]
+        if not points:
+            continue
+        slope, r2 = fit(*zip(*points))
+        per_1k = slope * 1000
+        limit = limits.get(resource)
+        results[resource] = {
+            'start': round(points[0][1], 2), 'end': round(points[-1][1], 2),
+            'per_1k_requests': round(per_1k, 4), 'r2': round(r2, 3), 'limit': limit,
+            'growing': limit is not None and per_1k > limit and r2 >= min_r2,
+        }
+    return results
+
+
+def window_deltas(samples, resource):
+    """Per window: (step counts, resource growth) between its first and last sample"""
+    windows = {}
+    for sample in samples:
+        if sample.get(resource) is not None:
+            windows.setdefault(sample['window'], []).append(sample)
+    deltas = []
+    for window in sorted(windows):
+        first, last = windows[window][0], windows[window][-1]
+        steps = {key: count - first['steps'].get(key, 0)
+                 for key, count in last['steps'].items()}
+        deltas.append((steps, last[resource] - first[resource]))
+    return deltas
+
+
+def attribute(samples, resource, top=3):
+    """Estimate the growth per 1000 executions of every step (least squares over windows)"""
+    deltas = window_deltas(samples, resource)
+    steps = sorted({key for counts, _ in deltas for key in counts})
+    if len(deltas) < 2 or not steps:
+        return []
+    counts = np.array([[window.get(key, 0) for key in steps] for window, _ in deltas],
+                      dtype=float)
+    grown = np.array([delta for _, delta in deltas], dtype=float)
+    coefficients = np.linalg.lstsq(counts, grown, rcond=None)[0]
+    total = grown.sum()
+    rows = []
+    for index, key in enumerate(steps):
+        share = coefficients[index] * counts[:, index].sum()
+        if coefficients[index] > 0:
+            rows.append({'step': key, 'per_1k_executions': round(coefficients[index] * 1000, 4),
+                         'share': round(share / total, 3) if total > 0 else None})
+    rows.sort(key=lambda row: row['per_1k_executions'], reverse=True)
+    return rows[:top]
+
+
+# ---- run --------------------------------------------------------------------------
+
+def window_scenarios(scenarios, index):
+    """The scenarios of window index, the favoured one EMPHASIS times heavier"""
+    favoured = index % len(scenarios)
+    return [dataclasses.replace(scenario, weight=scenario.weight * EMPHASIS)
+            if position == favoured else scenario
+            for position, scenario in enumerate(scenarios)]
+
+
+async def soak_async(scenarios, sampler, users, duration, window, interval, ramp_up,
+                     client_factory, think_scale, seed):
+    current = {'window': 0}
+    sampling = asyncio.create_task(sampler.run(interval, lambda: current['window']))
+    end = time.monotonic() + duration
+    try:
+        while time.monotonic() < end:
+            index = current['window']
+            await asyncio.to_thread(sampler.take, index)
+            print(f"▶ Window {index}: favouring {scenarios[index % len(scenarios)].name}")
+            await journey.run_load_async(
+                window_scenarios(scenarios, index), users,
+                min(window, end - time.monotonic()), ramp_up if index == 0 else 0,
+                client_factory, think_scale, seed + index, sampler.metrics)
+            await asyncio.to_thread(sampler.take, index)
+            current['window'] += 1
+    finally:
+        sampling.cancel()
+
+
+def start_backend(inspect_port):
+    """A backend with the inspector enabled on a fresh copy of the template database"""
+    from db_isolation import DatabaseSnapshot, WorkerBackend, database_name, seed_template
+
+    client = MongoClient(config.MONGO_URI)
+    seed_template(client)
+    DatabaseSnapshot(client, database_name('soak')).restore()
+    backend = WorkerBackend(database_name('soak'),
+                            node_args=[f"--inspect=127.0.0.1:{inspect_port}"])
+    return backend.start()
+
+
+def print_report(growths, attributions):
+    print("\n" + "=" * 90)
+    print(f"{'Resource':18} {'start':>10} {'end':>10} {'per 1k req':>12} {'R²':>6} {'limit':>8}")
+    print("=" * 90)
+    for resource, row in growths.items():
+        flag = '⚠' if row['growing'] else '✓'
+        limit = '-' if row['limit'] is None else row['limit']
+        print(f"{flag} {resource:16} {row['start']:>10} {row['end']:>10} "
+              f"{row['per_1k_requests']:>12} {row['r2']:>6} {limit:>8}")
+        for step in attributions.get(resource, []):
+            share = '' if step['share'] is None else f" ({step['share']:.0%} of the growth)"
+            print(f"      ← {step['step']}: {step['per_1k_executions']} per 1k runs{share}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', default='2h', help='e.g. 4h, 30m, 900')
+    parser.add_argument('--window', default='10m', help='length of a scenario window')
+    parser.add_argument('--interval', default='30s', help='sampling interval')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--ramp-up', default='60s')
+    parser.add_argument('--think-scale', type=float, default=0.2,
+                        help='multiplier of the scenario think times')
+    parser.add_argument('--scenario', action='append', help='repeatable, default: all')
+    parser.add_argument('--pid', type=int, help='sample a running backend instead')
+    parser.add_argument('--inspect-port', type=int, help='its node --inspect port')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from crm_client import AsyncCrmClient
+
+    scenarios = journey.load_scenarios(names=args.scenario)
+    if not scenarios:
+        print("⚠ No scenario selected")
+        return 1
+    backend = None
+    if args.pid:
+        pid, api_base_url, inspect_port = args.pid, config.API_BASE_URL, args.inspect_port
+    else:
+        inspect_port = args.inspect_port or 9229
+        backend = start_backend(inspect_port)
+        pid, api_base_url = backend.process.pid, backend.api_base_url
+        print(f"✓ Backend {pid} on {api_base_url} (inspector {inspect_port})")
+
+    counter = RequestCounter()
+    sampler = Sampler(pid, journey.Metrics(), counter,
+                      Inspector(inspect_port) if inspect_port else None,
+                      MongoClient(config.MONGO_URI))
+
+    def client_factory():
+        return AsyncCrmClient(api_base_url, pool_size=journey.USER_POOL_SIZE, hooks=[counter])
+
+    try:
+        asyncio.run(soak_async(scenarios, sampler, args.users, parse_duration(args.duration),
+                               parse_duration(args.window), parse_duration(args.interval),
+                               parse_duration(args.ramp_up), client_factory,
+                               args.think_scale, args.seed))
+    except KeyboardInterrupt:
+        print("⚠ Interrupted, analysing the samples so far")
+    finally:
+        if backend:
+            backend.stop()
+
+    growths = growth(sampler.samples)
+    attributions = {resource: attribute(sampler.samples, resource)
+                    for resource, row in growths.items() if row['growing']}
+    print_report(growths, attributions)
+    journey.write_report(SOAK_REPORT, {
+        'users': args.users, 'requests': counter.count, 'journeys': sampler.metrics.journeys,
+        'growth': growths, 'drivers': attributions, 'steps': sampler.metrics.summary(),
+        'samples': sampler.samples})
+    return 1 if attributions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
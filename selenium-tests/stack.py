@@ -0,0 +1,303 @@
+"""
+Ephemeral local stack orchestrator
+
+Starts a complete, isolated application stack on free ports:
+
+mongod    throw-away --dbpath in a temporary directory
+seed      backend/src/setup/setup.js (admin, settings, taxes, payment mode)
+backend   node src/server.js with DATABASE and PORT overridden, gated on /api/ready
+frontend  vite preview of a build made with VITE_BACKEND_SERVER=/ so the
+          browser calls its own origin; the preview proxies /api and
+          /download to the stack's backend, gated on /api/health through it
+
+The frontend build is made once (frontend/dist-stack) and shared by every
+stack; it is rebuilt when a source file is newer. BASE_URL, API_BASE_URL and
+MONGO_URI are exported into config and the environment. N stacks can be
+started in parallel, one per pytest-xdist worker: the endpoints are passed in
+STACK_ENDPOINTS and conftest.py picks the stack of its worker.
+
+Startup time per phase is appended to reports/stack_startup.jsonl and compared
+with the median of the previous runs.
+
+Run: python stack.py up
+     python stack.py run --stacks 4 -- pytest -n 4 test_navigation.py
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from pymongo import MongoClient
+
+import config
+from db_isolation import WorkerBackend, free_port, seed_database
+
+BUILD_DIR = 'dist-stack'
+VITE = os.path.join('node_modules', 'vite', 'bin', 'vite.js')
+STARTUP_HISTORY = os.path.join(config.REPORT_DIR, 'stack_startup.jsonl')
+# a run slower than the previous median by this factor is flagged
+STARTUP_REGRESSION = 1.2
+
+
+def wait_until(check, timeout, what):
+    """Poll check() until it returns True"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except (requests.RequestException, OSError):
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f"{what} not ready after {timeout}s")
+
+
+def newest_source(directory):
+    """Return the newest modification time of the files that feed the frontend build"""
+    newest = 0
+    for root in ('src', 'public'):
+        for path, _, files in os.walk(os.path.join(directory, root)):
+            for file in files:
+                newest = max(newest, os.path.getmtime(os.path.join(path, file)))
+    for file in ('index.html', 'vite.config.js', 'package-lock.json'):
+        candidate = os.path.join(directory, file)
+        if os.path.exists(candidate):
+            newest = max(newest, os.path.getmtime(candidate))
+    return newest
+
+
+def build_frontend(force=False):
+    """Build the relative-API frontend once, return True if a build was made"""
+    index = os.path.join(config.FRONTEND_DIR, BUILD_DIR, 'index.html')
+    if not force and os.path.exists(index) and \
+            os.path.getmtime(index) >= newest_source(config.FRONTEND_DIR):
+        return False
+    env = dict(os.environ, VITE_BACKEND_SERVER='/')
+    subprocess.run(['node', VITE, 'build', '--outDir', BUILD_DIR], cwd=config.FRONTEND_DIR,
+                   env=env, check=True, capture_output=True)
+    return True
+
+
+def spawn(command, cwd=None, env=None):
+    """Start a process in its own group so its children are stopped with it"""
+    return subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def terminate(process, timeout=10):
+    if process is None or process.poll() is not None:
+        return
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+class Stack:
+    """mongod, backend and frontend preview of one isolated stack"""
+
+    def __init__(self, index=0):
+        self.index = index
+        self.database = f"{config.MONGO_DB}_stack{index}"
+        self.dbpath = None
+        self.mongod = None
+        self.mongo_port = None
+        self.backend = None
+        self.frontend = None
+        self.frontend_port = None
+        self.timings = {}
+
+    @property
+    def mongo_uri(self):
+        return f"mongodb://127.0.0.1:{self.mongo_port}"
+
+    @property
+    def base_url(self):
+        return f"http://localhost:{self.frontend_port}"
+
+    @property
+    def api_base_url(self):
+        # through the preview proxy, i.e. the URLs the browser requests
+        return f"{self.base_url}/api"
+
+    def endpoints(self):
+        return {'base_url': self.base_url, 'api_base_url': self.api_base_url,
+                'mongo_uri': self.mongo_uri, 'database': self.database,
+                'backend_url': f"http://localhost:{self.backend.port}"}
+
+    def _phase(self, name, start):
+        self.timings[name] = round(time.perf_counter() - start, 3)
+
+    def start(self, timeout=60):
+        start = time.perf_counter()
+        try:
+            self.start_mongod(timeout)
+            self._phase('mongod', start)
+
+            phase = time.perf_counter()
+            with MongoClient(self.mongo_uri) as client:
+                seed_database(client, self.database, self.mongo_uri)
+            self._phase('seed', phase)
+
+            phase = time.perf_counter()
+            self.backend = WorkerBackend(self.database, mongo_uri=self.mongo_uri).start(timeout)
+            self._phase('backend', phase)
+
+            phase = time.perf_counter()
+            self.start_frontend(timeout)
+            self._phase('frontend', phase)
+        except Exception:
+            self.stop()
+            raise
+        self._phase('total', start)
+        return self
+
+    def start_mongod(self, timeout):
+        self.dbpath = tempfile.mkdtemp(prefix=f"idurar-stack{self.index}-")
+        self.mongo_port = free_port()
+        self.mongod = spawn([config.MONGOD_BIN, '--dbpath', self.dbpath,
+                             '--port', str(self.mongo_port), '--bind_ip', '127.0.0.1',
+                             '--wiredTigerCacheSizeGB', '0.25'])
+
+        def ping():
+            with MongoClient(self.mongo_uri, serverSelectionTimeoutMS=500) as client:
+                return client.admin.command('ping')['ok'] == 1
+
+        wait_until(ping, timeout, f"mongod of stack {self.index}")
+
+    def start_frontend(self, timeout):
+        self.frontend_port = free_port()
+        env = dict(os.environ, VITE_DEV_REMOTE='remote',
+                   VITE_BACKEND_SERVER=f"http://localhost:{self.backend.port}/")
+        self.frontend = spawn(['node', VITE, 'preview', '--outDir', BUILD_DIR,
+                               '--port', str(self.frontend_port), '--strictPort'],
+                              cwd=config.FRONTEND_DIR, env=env)
+        wait_until(lambda: requests.get(f"{self.api_base_url}/health", timeout=1).ok,
+                   timeout, f"frontend of stack {self.index}")
+
+    def stop(self):
+        terminate(self.frontend)
+        if self.backend:
+            self.backend.stop()
+        terminate(self.mongod)
+        if self.dbpath:
+            shutil.rmtree(self.dbpath, ignore_errors=True)
+            self.dbpath = None
+
+    def export(self):
+        """Point config (and child processes) at this stack"""
+        config.BASE_URL = self.base_url
+        config.API_BASE_URL = self.api_base_url
+        config.MONGO_URI = self.mongo_uri
+        config.MONGO_DB = self.database
+        os.environ.update(BASE_URL=config.BASE_URL, API_BASE_URL=config.API_BASE_URL,
+                          MONGO_URI=config.MONGO_URI, MONGO_DB=config.MONGO_DB)
+
+
+def start_stacks(count=1, timeout=60):
+    """Build the frontend if needed and start count stacks in parallel"""
+    built = time.perf_counter()
+    build_frontend()
+    build_seconds = round(time.perf_counter() - built, 3)
+
+    stacks = [Stack(index) for index in range(count)]
+    atexit.register(stop_stacks, stacks)
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        futures = [pool.submit(stack.start, timeout) for stack in stacks]
+    errors = [future.exception() for future in futures if future.exception()]
+    if errors:
+        stop_stacks(stacks)
+        raise errors[0]
+    for stack in stacks:
+        stack.timings['build'] = build_seconds
+    return stacks
+
+
+def stop_stacks(stacks):
+    for stack in stacks:
+        stack.stop()
+
+
+def export_for_worker():
+    """Apply the stack of this pytest-xdist worker from STACK_ENDPOINTS, if any"""
+    endpoints = json.loads(os.getenv('STACK_ENDPOINTS') or '[]')
+    if not endpoints:
+        return None
+    worker = os.getenv('PYTEST_XDIST_WORKER', 'gw0')
+    index = int(worker[2:]) if worker[2:].isdigit() else 0
+    stack = endpoints[index % len(endpoints)]
+    config.BASE_URL = stack['base_url']
+    config.API_BASE_URL = stack['api_base_url']
+    config.MONGO_URI = stack['mongo_uri']
+    config.MONGO_DB = stack['database']
+    return stack
+
+
+def record_startup(stacks, path=STARTUP_HISTORY):
+    """Append this run's startup timings and return (slowest total, previous median)"""
+    history = []
+    if os.path.exists(path):
+        with open(path) as f:
+            history = [json.loads(line) for line in f if line.strip()]
+    previous = [entry['total'] for entry in history if entry['stacks'] == len(stacks)]
+    total = max(stack.timings['total'] for stack in stacks)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps({'time': time.time(), 'stacks': len(stacks), 'total': total,
+                            'phases': [stack.timings for stack in stacks]}) + '\n')
+    return total, statistics.median(previous) if previous else None
+
+
+def print_startup(stacks, total, median):
+    print("=" * 100)
+    for stack in stacks:
+        phases = ' '.join(f"{name} {seconds:.2f}s" for name, seconds in stack.timings.items())
+        print(f"✓ stack {stack.index}: {stack.base_url} (api {stack.api_base_url}) {phases}")
+    print(f"📊 Startup {total:.2f}s" + (f" (median {median:.2f}s)" if median else ''))
+    if median and total > median * STARTUP_REGRESSION:
+        print(f"⚠ Startup is {total / median:.1f}x the median of previous runs")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('mode', choices=['up', 'run'])
+    parser.add_argument('--stacks', type=int, default=1)
+    parser.add_argument('--timeout', type=int, default=60)
+    parser.add_argument('--rebuild', action='store_true', help='force a frontend build')
+    parser.add_argument('command', nargs=argparse.REMAINDER,
+                        help='run: command started against the stacks (after --)')
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        build_frontend(force=True)
+    stacks = start_stacks(args.stacks, args.timeout)
+    print_startup(stacks, *record_startup(stacks))
+    stacks[0].export()
+    os.environ['STACK_ENDPOINTS'] = json.dumps([stack.endpoints() for stack in stacks])
+
+    try:
+        if args.mode == 'run':
+            command = args.command[1:] if args.command[:1] == ['--'] else args.command
+            return subprocess.run(command).returncode
+        print(f"export BASE_URL={config.BASE_URL} API_BASE_URL={config.API_BASE_URL}")
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        stop_stacks(stacks)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Backend cold start benchmark
+
+Restarts node src/server.js many times against one seeded database and
+measures, for every start, the time from spawning the process to:
+
+listening   the first 200 of /api/health (the HTTP server is up)
+ready       the first 200 of /api/ready (database, auto-setup and indexes done)
+
+together with the server's own phase timings from the /api/ready answer
+(models, database, setup, indexes, listening; ms since process start). The
+distribution over the restarts is what a pod restart or a scale-out pays
+before it takes traffic. The p50 is appended to reports/startup_history.jsonl
+and compared with the median of the previous runs of the same options.
+
+Run: python startup_benchmark.py --restarts 30
+     python startup_benchmark.py --restarts 30 --manifest --skip-setup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+from pymongo import MongoClient
+
+import config
+from db_isolation import database_uri, free_port, seed_database
+from journey import write_report
+
+BENCHMARK_REPORT = os.path.join(config.REPORT_DIR, 'startup_benchmark.json')
+STARTUP_HISTORY = os.path.join(config.REPORT_DIR, 'startup_history.jsonl')
+MANIFEST = os.path.join(config.BACKEND_DIR, 'src', 'setup', 'manifest.json')
+SERVER_COMMAND = ('node', 'src/server.js')
+POLL_INTERVAL = 0.005
+# a run slower than the previous median by this factor is flagged
+STARTUP_REGRESSION = 1.2
+
+
+def first_ok(url):
+    try:
+        response = requests.get(url, timeout=1)
+    except requests.RequestException:
+        return None
+    return response if response.ok else None
+
+
+def measure_start(env, command=SERVER_COMMAND, cwd=None, timeout=60):
+    """Spawn one server, wait for /api/ready and stop it: {listening_ms, ready_ms, phases}"""
+    port = free_port()
+    base = f"http://localhost:{port}/api"
+    start = time.perf_counter()
+    process = subprocess.Popen(list(command), cwd=cwd or config.BACKEND_DIR,
+                               env=dict(env, PORT=str(port)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    result = {'listening_ms': None, 'ready_ms': None, 'phases': {}}
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Backend exited with {process.returncode}")
+            elapsed = round((time.perf_counter() - start) * 1000, 1)
+            if result['listening_ms'] is None and first_ok(f"{base}/health"):
+                result['listening_ms'] = elapsed
+            if result['listening_ms'] is not None:
+                ready = first_ok(f"{base}/ready")
+                if ready:
+                    result['ready_ms'] = round((time.perf_counter() - start) * 1000, 1)
+                    result['phases'] = ready.json().get('phases', {})
+                    return result
+            time.sleep(POLL_INTERVAL)
+        raise TimeoutError(f"Backend not ready after {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def distribution(values):
+    """min / p50 / p95 / max of a list of timings"""
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return {}
+
+    def rank(share):
+        return values[int(round(share * (len(values) - 1)))]
+
+    return {'min': values[0], 'p50': rank(0.5), 'p95': rank(0.95), 'max': values[-1]}
+
+
+def summarize(runs):
+    phases = sorted({phase for run in runs for phase in run['phases']})
+    return {'restarts': len(runs),
+            'listening_ms': distribution([run['listening_ms'] for run in runs]),
+            'ready_ms': distribution([run['ready_ms'] for run in runs]),
+            'phases_ms': {phase: distribution([run['phases'].get(phase) for run in runs])
+                          for phase in phases}}
+
+
+def record_history(summary, options, path=STARTUP_HISTORY):
+    """Append the ready p50 of this run and return the median of previous comparable runs"""
+    history = []
+    if os.path.exists(path):
+        with open(path) as f:
+            history = [json.loads(line) for line in f if line.strip()]
+    previous = [entry['ready_p50'] for entry in history if entry['options'] == options]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps({'time': time.time(), 'options': options,
+                            'ready_p50': summary['ready_ms']['p50']}) + '\n')
+    return statistics.median(previous) if previous else None
+
+
+def print_summary(summary, median):
+    print("=" * 100)
+    for name in ('listening_ms', 'ready_ms'):
+        row = summary[name]
+        print(f"📊 {name[:-3]:10} min {row['min']:>8.0f}ms  p50 {row['p50']:>8.0f}ms  "
+              f"p95 {row['p95']:>8.0f}ms  max {row['max']:>8.0f}ms")
+    for phase, row in summary['phases_ms'].items():
+        print(f"   {phase:10} p50 {row['p50']:>8.0f}ms  p95 {row['p95']:>8.0f}ms (server clock)")
+    p50 = summary['ready_ms']['p50']
+    if median:
+        flag = '⚠' if p50 > median * STARTUP_REGRESSION else '✓'
+        print(f"{flag} Ready p50 {p50:.0f}ms, median of previous runs {median:.0f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--restarts', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=1, help='unmeasured starts first')
+    parser.add_argument('--database', default=f"{config.MONGO_DB}_startup")
+    parser.add_argument('--manifest', action='store_true',
+                        help='start from a written module manifest (npm run manifest)')
+    parser.add_argument('--skip-setup', action='store_true', help='AUTO_SETUP=false')
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark database')
+    parser.add_argument('--timeout', type=int, default=60)
+    args = parser.parse_args(argv)
+
+    client = MongoClient(config.MONGO_URI)
+    print(f"▶ Seeding {args.database}")
+    seed_database(client, args.database)
+    env = dict(os.environ, DATABASE=database_uri(args.database))
+    if args.skip_setup:
+        env['AUTO_SETUP'] = 'false'
+    wrote_manifest = args.manifest and not os.path.exists(MANIFEST)
+    if args.manifest:
+        subprocess.run(['npm', 'run', 'manifest'], cwd=config.BACKEND_DIR, check=True,
+                       capture_output=True)
+    elif os.path.exists(MANIFEST):
+        print(f"⚠ {MANIFEST} exists, starts use it")
+
+    runs = []
+    try:
+        for index in range(args.warmup + args.restarts):
+            run = measure_start(env, timeout=args.timeout)
+            if index >= args.warmup:
+                runs.append(run)
+                print(f"  start {len(runs):>3}: listening {run['listening_ms']:>7.0f}ms  "
+                      f"ready {run['ready_ms']:>7.0f}ms")
+    finally:
+        if wrote_manifest:
+            os.remove(MANIFEST)
+        if not args.keep:
+            client.drop_database(args.database)
+        client.close()
+
+    summary = summarize(runs)
+    options = {'manifest': args.manifest or os.path.exists(MANIFEST),
+               'skip_setup': args.skip_setup}
+    median = record_history(summary, options)
+    print_summary(summary, median)
+    write_report(BENCHMARK_REPORT, {'options': options, 'summary': summary, 'runs': runs})
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
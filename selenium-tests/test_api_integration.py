@@ -11,9 +11,14 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException
 from base_test import BaseTest
+from crm_client import ApiError, CrmClient
 import config
 
 
+# restored before each test, per worker
+pytestmark = pytest.mark.usefixtures('browser_db')
+
+
 class TestAPIIntegration(BaseTest):
     """Test cases for frontend-to-backend API integration"""
     
@@ -122,9 +127,9 @@ class TestAPIIntegration(BaseTest):
             # Verify API endpoint is accessible
             try:
                 # Try to verify backend is running
-                response = requests.get(f"{config.API_BASE_URL.replace('/api', '')}/health", timeout=5)
-                print(f"✓ Backend health check: {response.status_code}")
-            except requests.exceptions.RequestException:
+                with CrmClient(timeout=5) as api:
+                    print(f"✓ Backend health check: {api.health()['status']}")
+            except (requests.exceptions.RequestException, ApiError):
                 # Backend might not have health endpoint, that's okay
                 print("⚠ Backend health endpoint not available (this is okay)")
             
@@ -135,41 +140,22 @@ class TestAPIIntegration(BaseTest):
     def test_direct_api_endpoint_access(self):
         """Test direct API endpoint access"""
         try:
-            # Test login API endpoint directly
-            login_url = f"{config.API_BASE_URL}core/auth/login"
-            
             # Take screenshot of test setup
             self.navigate_to('/login')
             self.take_screenshot('direct_api_test')
             
-            # Make direct API call
+            # Make direct API call (POST /api/login)
+            timings = []
             try:
-                response = requests.post(
-                    login_url,
-                    json={
-                        'email': config.TEST_EMAIL,
-                        'password': config.TEST_PASSWORD
-                    },
-                    headers={'Content-Type': 'application/json'},
-                    timeout=10
-                )
-                
-                print(f"✓ API Response Status: {response.status_code}")
-                print(f"✓ API Response Headers: {dict(response.headers)}")
-                
-                # Check if response is successful
-                if response.status_code in [200, 201]:
+                with CrmClient(timeout=10, hooks=[timings.append]) as api:
+                    admin = api.login()
+                    print(f"✓ API Response Status: {timings[-1].status} "
+                          f"in {timings[-1].seconds * 1000:.0f}ms")
                     print("✓ API endpoint is accessible and responding")
-                    # Check for token in response
-                    try:
-                        data = response.json()
-                        if 'token' in data or 'x-auth-token' in str(response.headers):
-                            print("✓ Authentication token received from API")
-                    except:
-                        print("⚠ Could not parse JSON response")
-                else:
-                    print(f"⚠ API returned status {response.status_code}")
-                    
+                    if admin.get('token'):
+                        print("✓ Authentication token received from API")
+            except ApiError as e:
+                print(f"⚠ API returned status {e.status}: {e.message}")
             except requests.exceptions.ConnectionError:
                 print("⚠ Backend API not accessible (backend may not be running)")
             except Exception as e:
@@ -0,0 +1,99 @@
+"""
+API stand-in unit tests
+These tests record against an in-process fake backend and replay without it
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import api_standin
+from api_standin import Cassette
+
+
+class FakeBackend(BaseHTTPRequestHandler):
+    """Answers every request with a counter so replays can be told apart"""
+    calls = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        FakeBackend.calls += 1
+        body = json.dumps({'success': True, 'result': {'call': FakeBackend.calls,
+                                                       'path': self.path}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestApiStandIn:
+    """Test cases for request normalization, recording and replay"""
+
+    def test_normalize_ignores_query_order_and_volatile_params(self):
+        """Test that equivalent requests share a key"""
+        first = api_standin.normalize('get', '/api/invoice/list?page=1&items=10&_=123')
+        second = api_standin.normalize('GET', '/api/invoice/list?items=10&page=1')
+        assert first == second == 'GET /api/invoice/list?items=10&page=1'
+
+    def test_normalize_canonicalizes_json_bodies(self):
+        """Test that key order in JSON bodies does not matter"""
+        first = api_standin.normalize('POST', '/api/login', b'{"email": "a", "password": "b"}')
+        second = api_standin.normalize('POST', '/api/login', b'{"password":"b","email":"a"}')
+        assert first == second
+
+    def test_record_then_replay_without_backend(self, tmp_path):
+        """Test that a recorded session is served after the backend is gone"""
+        backend = serve(FakeBackend)
+        path = str(tmp_path / 'navigation.json')
+        recorder = api_standin.start('record', Cassette(path),
+                                     upstream=f"http://127.0.0.1:{backend.server_port}")
+        url = f"http://127.0.0.1:{recorder.server_port}/api/client/list?page=1"
+        recorded = [requests.get(url, timeout=5).json() for _ in range(2)]
+        api_standin.stop(recorder)
+        backend.shutdown()
+        backend.server_close()
+
+        replayer = api_standin.start('replay', Cassette(path))
+        url = f"http://127.0.0.1:{replayer.server_port}/api/client/list?page=1"
+        replayed = [requests.get(url, timeout=5).json() for _ in range(3)]
+        missing = requests.get(url.replace('client', 'quote'), timeout=5)
+        stats = requests.get(f"http://127.0.0.1:{replayer.server_port}/__standin/stats",
+                             timeout=5).json()
+        api_standin.stop(replayer)
+
+        assert replayed == recorded + recorded[-1:]
+        assert missing.status_code == 404
+        assert stats['hits'] == 3 and stats['misses'] == 1
+
+    def test_cors_preflight_and_latency_profile(self, tmp_path):
+        """Test that preflights are answered locally and latency is injected"""
+        cassette = Cassette(str(tmp_path / 'c.json'))
+        cassette.add('GET /api/setting/listAll', {
+            'status': 200, 'headers': [['Content-Type', 'application/json']],
+            'body': {'text': '{"success": true}'}, 'elapsed_ms': 1,
+        })
+        server = api_standin.start('replay', cassette, latency='slow')
+        base = f"http://127.0.0.1:{server.server_port}/api/setting/listAll"
+        preflight = requests.options(base, headers={'Origin': 'http://localhost:3000'}, timeout=5)
+        start = time.perf_counter()
+        response = requests.get(base, headers={'Origin': 'http://localhost:3000'}, timeout=5)
+        elapsed = time.perf_counter() - start
+        api_standin.stop(server)
+
+        assert preflight.status_code == 204
+        assert response.headers['Access-Control-Allow-Origin'] == 'http://localhost:3000'
+        assert response.json() == {'success': True}
+        assert elapsed >= 0.15
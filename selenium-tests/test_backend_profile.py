@@ -0,0 +1,106 @@
+"""
+Backend profile aggregation unit tests
+These tests fold V8 profiles (synthetic and from node --cpu-prof) and attribute them
+to route handlers
+"""
+import glob
+import json
+import shutil
+import subprocess
+
+import pytest
+
+import backend_profile
+
+CONTROLLER = 'file:///srv/backend/src/controllers/middlewaresControllers/createCRUDController/'
+
+
+def frame(id, name, url='', children=(), line=0):
+    return {'id': id, 'callFrame': {'functionName': name, 'url': url, 'lineNumber': line},
+            'children': list(children)}
+
+
+def cpu_profile():
+    """(root) -> processTicks -> paginatedList -> exec (mongoose), and (idle)"""
+    return {
+        'nodes': [
+            frame(1, '(root)', children=[2, 5]),
+            frame(2, 'processTicksAndRejections', 'node:internal/process/task_queues',
+                  children=[3]),
+            frame(3, 'paginatedList', CONTROLLER + 'paginatedList.js', children=[4]),
+            frame(4, 'exec', 'file:///srv/backend/node_modules/mongoose/lib/query.js', line=9),
+            frame(5, '(idle)'),
+        ],
+        'samples': [3, 4, 4, 5, 3],
+        'timeDeltas': [0, 100, 200, 300, 400],
+    }
+
+
+class TestBackendProfile:
+    """Test cases for collapsed stacks, handler attribution and the flamegraph"""
+
+    def test_cpu_profile_folds_by_sample_duration(self):
+        """Test that every sample is weighted by the time until the next one"""
+        folded = backend_profile.collapse_cpu(cpu_profile())
+        handler = ('processTicksAndRejections node:internal/process/task_queues:1;'
+                   'paginatedList src/controllers/middlewaresControllers/'
+                   'createCRUDController/paginatedList.js:1')
+        assert folded == {
+            handler: 100,
+            handler + ';exec node_modules/mongoose/lib/query.js:10': 500,
+            '(idle)': 400,
+        }
+
+    def test_time_goes_to_the_innermost_handler(self):
+        """Test that library frames count for the handler that called them"""
+        folded = backend_profile.collapse_cpu(cpu_profile())
+        rows = backend_profile.attribute(folded)
+        assert [row['handler'].split()[0] for row in rows] == ['paginatedList', '(idle)']
+        assert rows[0]['value'] == 600 and rows[0]['share'] == 0.6
+        assert rows[0]['hottest'][0]['frame'].startswith('exec node_modules/mongoose')
+        inner = ('isValidAuthToken src/controllers/a/isValidAuthToken.js:1;'
+                 'next node_modules/express/lib/router/index.js:1;'
+                 'generatePdf src/controllers/pdfController/index.js:15;'
+                 'render node_modules/pug/lib/index.js:1')
+        assert backend_profile.handler_of(inner).startswith('generatePdf')
+        assert backend_profile.handler_of('(anonymous) src/app.js:1;parse x.js:1') == \
+            backend_profile.FRAMEWORK
+
+    def test_heap_profile_and_artifacts(self, tmp_path):
+        """Test that sampled allocations fold by self size and every artifact is written"""
+        heap = {'head': {'callFrame': {'functionName': '(root)', 'url': ''}, 'selfSize': 0,
+                         'children': [{'callFrame': {
+                             'functionName': 'generatePdf', 'lineNumber': 14,
+                             'url': '/srv/backend/src/controllers/pdfController/index.js'},
+                             'selfSize': 65536, 'children': []}]}}
+        report = backend_profile.write_artifacts(
+            {'cpuProfile': cpu_profile(), 'heapProfile': heap, 'elapsedMs': 1000},
+            'invoicing<&>', directory=str(tmp_path))
+        assert report['heap_handlers'][0]['handler'] == \
+            'generatePdf src/controllers/pdfController/index.js:15'
+        folded = backend_profile.read_folded(report['files']['cpu_folded'])
+        assert sum(folded.values()) == 1000
+        with open(report['files']['cpu_svg']) as f:
+            svg = f.read()
+        assert svg.count('<rect') == 4 and 'invoicing&lt;&amp;&gt;' in svg
+
+    @pytest.mark.skipif(not shutil.which('node'), reason='node is not installed')
+    def test_node_cpu_prof_is_attributed(self, tmp_path, monkeypatch):
+        """Test the real profile format with a handler file under src/controllers"""
+        source = tmp_path / 'src' / 'controllers' / 'reportController.js'
+        source.parent.mkdir(parents=True)
+        source.write_text(
+            "const buildReport = () => { let s = ''; const end = Date.now() + 300;\n"
+            "  while (Date.now() < end) { s = [s.length, Math.random()].join(','); }\n"
+            "  return s; };\n"
+            "buildReport();\n")
+        subprocess.run(['node', '--cpu-prof', '--cpu-prof-dir', str(tmp_path),
+                        '--cpu-prof-interval', '100', str(source)], check=True)
+        profile, = glob.glob(str(tmp_path / '*.cpuprofile'))
+        monkeypatch.setattr(backend_profile, 'PROFILE_DIR', str(tmp_path / 'profiles'))
+        assert backend_profile.main(['report', profile]) == 0
+        assert glob.glob(str(tmp_path / 'profiles' / '*.cpu.svg'))
+        with open(profile) as f:
+            rows = backend_profile.attribute(backend_profile.collapse_cpu(json.load(f)))
+        assert rows[0]['handler'].startswith('buildReport src/controllers/reportController.js')
+        assert rows[0]['share'] > 0.5
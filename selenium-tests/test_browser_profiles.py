@@ -0,0 +1,54 @@
+"""
+Browser profile unit tests
+These tests check the launch options and CDP calls without starting a browser
+"""
+from selenium.webdriver.chrome.options import Options
+
+import browser_profiles
+import config
+
+
+class RecordingDriver:
+    """Records CDP commands and window calls"""
+
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+
+    def maximize_window(self):
+        self.commands.append(('maximize', None))
+
+
+class TestBrowserProfiles:
+    """Test cases for the lean and full profiles"""
+
+    def test_lean_blocks_resources_through_cdp(self):
+        """Test that the lean profile blocks images, fonts and analytics without resizing"""
+        driver = RecordingDriver()
+        browser_profiles.get_profile('lean').start(driver)
+        assert driver.commands[0] == ('Network.enable', {})
+        command, params = driver.commands[1]
+        assert command == 'Network.setBlockedURLs'
+        assert '*.png' in params['urls'] and '*.woff2' in params['urls']
+        assert ('maximize', None) not in driver.commands
+
+    def test_full_profile_downloads_everything(self):
+        """Test that the full profile only maximizes the window"""
+        driver = RecordingDriver()
+        browser_profiles.get_profile('full').start(driver)
+        assert driver.commands == [('maximize', None)]
+
+    def test_lean_cache_seeded_for_workers(self, tmp_path, monkeypatch):
+        """Test that an xdist worker starts from a copy of the warmed cache"""
+        monkeypatch.setattr(config, 'BROWSER_CACHE_DIR', str(tmp_path))
+        (tmp_path / 'lean-main').mkdir()
+        (tmp_path / 'lean-main' / 'index').write_text('warm')
+        monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw1')
+
+        options = Options()
+        browser_profiles.get_profile('lean').configure_chromium(options)
+        assert f"--disk-cache-dir={tmp_path / 'lean-gw1'}" in options.arguments
+        assert (tmp_path / 'lean-gw1' / 'index').read_text() == 'warm'
+        assert '--disable-extensions' in options.arguments
@@ -0,0 +1,103 @@
+"""
+Bundle budget analyzer unit tests
+These tests run the route attribution against a synthetic Vite build
+"""
+import json
+import os
+
+import bundle_budget
+
+ROUTES_JSX = """
+const Dashboard = lazy(() => import('@/pages/Dashboard'));
+const Invoice = lazy(() => import('@/pages/Invoice'));
+let routes = {
+  default: [
+    {
+      path: '/',
+      element: <Dashboard />,
+    },
+    {
+      path: '/invoice',
+      element: <Invoice />,
+    },
+  ],
+};
+"""
+
+AUTH_ROUTER_JSX = """
+const Login = lazy(() => import('@/pages/Login'));
+      <Routes>
+        <Route element={<Login />} path="/" />
+        <Route element={<Login />} path="/login" />
+        <Route element={<Navigate to="/login" replace />} path="/logout" />
+      </Routes>
+"""
+
+MANIFEST = {
+    'index.html': {'file': 'assets/index.js', 'isEntry': True, 'css': ['assets/index.css'],
+                   'dynamicImports': ['src/apps/IdurarOs.jsx']},
+    'src/apps/IdurarOs.jsx': {'file': 'assets/IdurarOs.js', 'imports': ['index.html'],
+                              'dynamicImports': ['src/apps/ErpApp.jsx', 'src/pages/Login.jsx']},
+    'src/apps/ErpApp.jsx': {'file': 'assets/ErpApp.js', 'imports': ['index.html', '_antd.js']},
+    'src/pages/Login.jsx': {'file': 'assets/Login.js', 'imports': ['index.html', '_antd.js']},
+    'src/pages/Dashboard.jsx': {'file': 'assets/Dashboard.js', 'imports': ['_antd.js']},
+    'src/pages/Invoice/index.jsx': {'file': 'assets/Invoice.js', 'imports': ['_antd.js']},
+    '_antd.js': {'file': 'assets/antd.js'},
+}
+
+
+def build(tmp_path, manifest=MANIFEST):
+    """Write router sources, a manifest and chunk files under tmp_path"""
+    os.makedirs(tmp_path / 'src' / 'router')
+    (tmp_path / 'src' / 'router' / 'routes.jsx').write_text(ROUTES_JSX)
+    (tmp_path / 'src' / 'router' / 'AuthRouter.jsx').write_text(AUTH_ROUTER_JSX)
+    os.makedirs(tmp_path / 'dist' / '.vite')
+    os.makedirs(tmp_path / 'dist' / 'assets')
+    (tmp_path / 'dist' / '.vite' / 'manifest.json').write_text(json.dumps(manifest))
+    for chunk in manifest.values():
+        for file in [chunk['file']] + chunk.get('css', []):
+            (tmp_path / 'dist' / file).write_bytes(os.urandom(2048))
+    return str(tmp_path)
+
+
+class TestBundleBudget:
+    """Test cases for chunk and route attribution"""
+
+    def test_logged_in_routes_win_shared_paths(self, tmp_path):
+        """Test that '/' is attributed to the dashboard, not the login page"""
+        routes = bundle_budget.route_modules(build(tmp_path), MANIFEST)
+        assert routes['/']['modules'][-1] == 'src/pages/Dashboard.jsx'
+        assert routes['/login']['public'] is True
+        assert '/logout' not in routes
+
+    def test_closure_follows_static_imports_only(self):
+        """Test that dynamic imports are not counted as loaded"""
+        keys = bundle_budget.closure(['index.html', 'src/pages/Login.jsx'], MANIFEST)
+        assert keys == ['index.html', 'src/pages/Login.jsx', '_antd.js']
+
+    def test_route_sizes_and_budgets(self, tmp_path):
+        """Test that route bytes sum every chunk and css file once"""
+        report = bundle_budget.analyze(build(tmp_path), {'/login': 1, '*': 500})
+        login = report['routes']['/login']
+        assert login['files'] == ['assets/index.js', 'assets/index.css', 'assets/IdurarOs.js',
+                                  'assets/Login.js', 'assets/antd.js']
+        assert login['bytes']['raw'] == 5 * 2048
+        assert login['over_budget'] is True
+        assert report['routes']['/invoice']['over_budget'] is False
+
+    def test_forbidden_module_on_login(self, tmp_path):
+        """Test that a login page importing the ERP layout is reported"""
+        manifest = dict(MANIFEST)
+        manifest['src/pages/Login.jsx'] = {'file': 'assets/Login.js',
+                                           'imports': ['src/apps/ErpApp.jsx']}
+        report = bundle_budget.analyze(build(tmp_path, manifest), bundle_budget.DEFAULT_BUDGETS)
+        assert report['routes']['/login']['forbidden'] == ['src/apps/ErpApp.jsx']
+
+    def test_cross_check_reports_unexpected_downloads(self, tmp_path):
+        """Test that measured downloads are compared with the prediction"""
+        report = bundle_budget.analyze(build(tmp_path), bundle_budget.DEFAULT_BUDGETS)
+        downloaded = {'/login': {'assets/index.js': 900, 'assets/ErpApp.js': 4000}}
+        bundle_budget.cross_check(report, downloaded)
+        measured = report['routes']['/login']['measured']
+        assert measured['unexpected'] == ['assets/ErpApp.js']
+        assert measured['transfer_bytes'] == 4900
@@ -0,0 +1,153 @@
+"""
+API client unit tests
+These tests run the client against an in-process fake backend
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from crm_client import ApiError, CrmClient, Page
+
+INVOICES = [{'_id': str(index), 'number': index} for index in range(25)]
+
+
+class FakeApi(BaseHTTPRequestHandler):
+    """Just enough of the backend: login, lists, empty results, create and token expiry"""
+    protocol_version = 'HTTP/1.1'
+    tokens = []
+    connections = set()
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def answer(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def authorized(self):
+        token = (self.headers.get('Authorization') or '').replace('Bearer ', '')
+        if token not in FakeApi.tokens[-1:]:
+            self.answer(401, {'success': False, 'result': None, 'jwtExpired': True,
+                              'message': 'Token verification failed, authorization denied.'})
+            return False
+        return True
+
+    def do_GET(self):
+        FakeApi.connections.add(self.client_address)
+        parts = urlsplit(self.path)
+        if parts.path == '/api/health':
+            return self.answer(200, {'status': 'ok'})
+        if not self.authorized():
+            return
+        if parts.path == '/api/client/search':
+            return self.answer(202, {'success': False, 'result': [],
+                                     'message': 'No document found by this request'})
+        if parts.path == '/api/client/listAll':
+            return self.answer(203, {'success': False, 'result': [],
+                                     'message': 'Collection is Empty'})
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        page, items = int(query['page']), int(query['items'])
+        pages = -(-len(INVOICES) // items)
+        self.answer(200, {'success': True, 'result': INVOICES[(page - 1) * items:page * items],
+                          'pagination': {'page': str(page), 'pages': pages,
+                                         'count': len(INVOICES)}})
+
+    def do_POST(self):
+        FakeApi.connections.add(self.client_address)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])) or b'{}')
+        if self.path == '/api/login':
+            if body['password'] != 'admin123':
+                return self.answer(403, {'success': False, 'result': None,
+                                         'message': 'Invalid credentials.'})
+            FakeApi.tokens.append(f"token-{len(FakeApi.tokens)}")
+            return self.answer(200, {'success': True, 'result': {'token': FakeApi.tokens[-1]}})
+        if not self.authorized():
+            return
+        with FakeApi.lock:
+            FakeApi.in_flight += 1
+            FakeApi.max_in_flight = max(FakeApi.max_in_flight, FakeApi.in_flight)
+        time.sleep(0.02)
+        with FakeApi.lock:
+            FakeApi.in_flight -= 1
+        self.answer(200, {'success': True, 'result': {'_id': 'new', **body}})
+
+
+@pytest.fixture
+def api():
+    FakeApi.tokens, FakeApi.connections, FakeApi.max_in_flight = [], set(), 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = CrmClient(f"http://127.0.0.1:{server.server_address[1]}/api", 'admin@admin.com',
+                       'admin123', pool_size=4)
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+class TestCrmClient:
+    """Test cases for auth, pagination, bulk operations and timing hooks"""
+
+    def test_login_sends_bearer_token_on_one_connection(self, api):
+        """Test that calls after login are authorized and reuse the pooled connection"""
+        api.login()
+        assert api.health() == {'status': 'ok'}
+        page = api.invoice.list(page=1, items=10)
+        assert isinstance(page, Page)
+        assert (page.page, page.pages, page.count, len(page.items)) == (1, 3, 25, 10)
+        assert len(FakeApi.connections) == 1
+
+    def test_pages_are_fetched_lazily(self, api):
+        """Test that the iterator requests a page only when it is consumed"""
+        api.login()
+        calls = []
+        api.on_call(calls.append)
+        pages = api.invoice.pages(items=10)
+        assert calls == []
+        assert len(next(pages).items) == 10
+        assert len(calls) == 1
+        assert [item['number'] for item in api.invoice.iterate(items=10)] == list(range(25))
+
+    def test_rejected_token_is_renewed_once(self, api):
+        """Test that an expired session logs in again and retries the call"""
+        api.login()
+        FakeApi.tokens.append('rotated-elsewhere')
+        calls = []
+        api.on_call(calls.append)
+        assert api.invoice.list().count == 25
+        assert [(call.path, call.status, call.attempt) for call in calls] == [
+            ('invoice/list', 401, 1), ('login', 200, 1), ('invoice/list', 200, 2)]
+
+    def test_errors_raise_api_error(self, api):
+        """Test that {success: false} answers raise with the backend message"""
+        with pytest.raises(ApiError) as error:
+            api.login(password='wrong')
+        assert error.value.status == 403
+        assert error.value.message == 'Invalid credentials.'
+        with pytest.raises(AttributeError):
+            api.client.convert('id')
+
+    def test_empty_results_are_not_errors(self, api):
+        """Test that the 202/203 empty answers of search and listAll return []"""
+        api.login()
+        assert api.client.search('Journey') == []
+        assert api.client.list_all() == []
+
+    def test_bulk_create_is_bounded_and_ordered(self, api):
+        """Test that bulk creates keep input order and never exceed the concurrency"""
+        api.login()
+        created = api.client.bulk_create([{'name': f"client {index}"} for index in range(12)],
+                                         concurrency=3)
+        assert [client['name'] for client in created] == [f"client {index}" for index in range(12)]
+        assert 1 < FakeApi.max_in_flight <= 3
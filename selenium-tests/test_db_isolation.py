@@ -0,0 +1,47 @@
+"""
+Database isolation unit tests
+These tests verify the naming and restore planning without a running mongod
+"""
+import db_isolation
+
+
+class TestDbIsolation:
+    """Test cases for per-worker databases and snapshot restore planning"""
+
+    def test_each_worker_gets_its_own_database(self, monkeypatch):
+        """Test that xdist workers never share a database with each other or the template"""
+        monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw3')
+        assert db_isolation.database_name() == f"{db_isolation.config.MONGO_DB}_gw3"
+        monkeypatch.delenv('PYTEST_XDIST_WORKER')
+        assert db_isolation.database_name().endswith('_main')
+        assert db_isolation.database_name() != db_isolation.template_name()
+
+    def test_plan_restores_only_changed_collections(self):
+        """Test that unchanged collections are left alone and new ones are dropped"""
+        template = {'admins': 'a1', 'settings': 's1', 'invoices': 'i0'}
+        current = {'admins': 'a1', 'settings': 's1', 'invoices': 'i7', 'clients': 'c1'}
+        assert db_isolation.plan_restore(template, current) == (['invoices'], ['clients'])
+
+    def test_plan_recreates_dropped_collections(self):
+        """Test that collections missing from the worker database are cloned"""
+        template = {'admins': 'a1', 'taxes': 't1'}
+        assert db_isolation.plan_restore(template, {}) == (['admins', 'taxes'], [])
+        assert db_isolation.plan_restore(template, dict(template)) == ([], [])
+
+    def test_stack_database_is_the_worker_database(self):
+        """Test that under a stack per worker the stack's database and backend are used"""
+        stack = {'database': 'idurar_stack_1', 'api_base_url': 'http://localhost:4101/api'}
+        database = db_isolation.WorkerDatabase(client=object(), stack=stack)
+        assert database.name == 'idurar_stack_1'
+        assert database.api_base_url == 'http://localhost:4101/api/'
+        assert database.backend is None
+
+    def test_cache_versions_are_never_restored(self):
+        """Test that the ETag counters and the seed marker are excluded from the hashes"""
+
+        class FakeDb:
+            def command(self, name):
+                return {'collections': {'invoices': 'i1', 'cacheversions': 'v9',
+                                        '__snapshot': 'm1', 'system.views': 'x'}}
+
+        assert db_isolation.collection_hashes(FakeDb()) == {'invoices': 'i1'}
@@ -0,0 +1,107 @@
+"""
+Heap leak detector unit tests
+These tests check the snapshot summary, the trend detection and the CDP session
+without a browser
+"""
+import json
+import threading
+
+import trio
+from trio_websocket import serve_websocket
+
+import cdp
+import heap_leak
+
+LIMITS = {'JSHeapUsedSize': 20 * 1024, 'Nodes': 5, 'JSEventListeners': 1, 'Documents': 0.05}
+
+
+def snapshot(nodes):
+    """A .heapsnapshot with (type, name, self_size) nodes"""
+    types = ['hidden', 'array', 'string', 'object', 'code', 'closure', 'native']
+    strings = sorted({name for _, name, _ in nodes})
+    flat = []
+    for node_type, name, size in nodes:
+        flat += [types.index(node_type), strings.index(name), 0, size, 0]
+    return {'snapshot': {'meta': {'node_fields': ['type', 'name', 'id', 'self_size',
+                                                  'edge_count'],
+                                  'node_types': [types, 'string', 'number']}},
+            'nodes': flat, 'strings': strings}
+
+
+def cycles(leak_per_cycle, count=100):
+    """Samples of an /invoice -> /customer loop, /invoice retaining leak_per_cycle nodes"""
+    samples = []
+    for cycle in range(count):
+        for route, nodes in (('/invoice', 3000), ('/customer', 2000)):
+            retained = cycle * leak_per_cycle
+            samples.append({'cycle': cycle, 'route': route,
+                            'JSHeapUsedSize': 8e6 + (cycle % 7) * 30000 + retained * 1000,
+                            'Nodes': nodes + (cycle % 3) * 20 + retained,
+                            'JSEventListeners': 300 + (cycle % 2), 'Documents': 1})
+    return samples
+
+
+class TestHeapLeak:
+    """Test cases for snapshot diffs, growth detection and the CDP client"""
+
+    def test_snapshot_summary_groups_like_devtools(self):
+        """Test that objects group by constructor and the rest by node type"""
+        start = heap_leak.summarize_snapshot(snapshot([
+            ('object', 'InvoiceRow', 40), ('closure', 'onClick', 32), ('string', 'x', 16)]))
+        end = heap_leak.summarize_snapshot(snapshot([
+            ('object', 'InvoiceRow', 40), ('object', 'InvoiceRow', 40),
+            ('native', 'Detached HTMLDivElement', 120), ('closure', 'onClick', 32),
+            ('closure', 'onHover', 32)]))
+        assert start == {'InvoiceRow': [1, 40], '(closure)': [1, 32], '(string)': [1, 16]}
+        diff = heap_leak.diff_summaries(start, end)
+        assert [row['constructor'] for row in diff] == ['Detached HTMLDivElement', 'InvoiceRow',
+                                                        '(closure)']
+        assert diff[1] == {'constructor': 'InvoiceRow', 'count_delta': 1, 'size_delta': 40}
+
+    def test_steady_growth_is_detected(self):
+        """Test that DOM nodes retained every cycle are reported and noise is not"""
+        leaking = heap_leak.analyse(cycles(leak_per_cycle=40), ['/invoice', '/customer'], LIMITS)
+        assert heap_leak.growing(leaking['cycle']) == ['JSHeapUsedSize', 'Nodes']
+        assert 39 < leaking['cycle']['Nodes']['per_cycle'] < 41
+        stable = heap_leak.analyse(cycles(leak_per_cycle=0), ['/invoice', '/customer'], LIMITS)
+        assert heap_leak.growing(stable['cycle']) == []
+        assert all(not heap_leak.growing(trends) for trends in stable['routes'].values())
+
+    def test_early_plateau_is_not_a_leak(self):
+        """Test that growth which stops (caches filling up) does not keep rising"""
+        values = [1000 + min(cycle, 15) * 100 for cycle in range(100)]
+        assert not heap_leak.trend(values, limit=5)['growing']
+        assert heap_leak.block_minima([5, 3, 4, 9, 8], size=2) == [3, 4]
+
+    def test_cdp_session_collects_events(self):
+        """Test that events sent before a command result reach on_event"""
+        ready, port = threading.Event(), {}
+
+        async def handler(request):
+            ws = await request.accept()
+            for _ in range(2):
+                message = json.loads(await ws.get_message())
+                if message['method'] == 'HeapProfiler.takeHeapSnapshot':
+                    for chunk in ('{"snap', 'shot"}'):
+                        await ws.send_message(json.dumps({
+                            'method': 'HeapProfiler.addHeapSnapshotChunk',
+                            'params': {'chunk': chunk}}))
+                await ws.send_message(json.dumps({'id': message['id'], 'result': {}}))
+
+        async def server():
+            async with trio.open_nursery() as nursery:
+                listener = await nursery.start(serve_websocket, handler, '127.0.0.1', 0, None)
+                port['value'] = listener.port
+                ready.set()
+                await trio.sleep(5)
+                nursery.cancel_scope.cancel()
+
+        thread = threading.Thread(target=trio.run, args=(server,), daemon=True)
+        thread.start()
+        ready.wait(5)
+        chunks = []
+        results = cdp.send(f"ws://127.0.0.1:{port['value']}", [
+            ('HeapProfiler.enable', {}), ('HeapProfiler.takeHeapSnapshot', {})],
+            lambda method, params: chunks.append(params['chunk']))
+        assert results == [{}, {}]
+        assert ''.join(chunks) == '{"snapshot"}'
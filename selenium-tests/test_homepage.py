@@ -55,6 +55,8 @@ class TestHomepage(BaseTest):
             assert config.BASE_URL in self.driver.current_url, \
                 f"Expected URL to contain {config.BASE_URL}"
             
+            self.check_visual('homepage')
+            
             print("✓ Homepage loaded successfully")
             
         except Exception as e:
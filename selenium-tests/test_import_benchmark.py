@@ -0,0 +1,41 @@
+"""
+Import benchmark unit tests
+These tests check the generated upload and the import checks without a backend
+"""
+import csv
+import io
+import json
+
+from import_benchmark import COLUMNS, check, encode, expected_errors, flatten, generate_rows
+
+
+class TestImportBenchmark:
+    """Test the streamed files and verdicts of import_benchmark.py"""
+
+    def test_streamed_files(self):
+        """Test that CSV and NDJSON come in row chunks with the invalid rows in place"""
+        rows = list(generate_rows('invoice', 25, clients=['c1', 'c2'], bad_every=10))
+        assert 'status' not in rows[9] and 'status' not in rows[19] and 'status' in rows[0]
+        assert flatten(rows[0])['items.0.itemName'] == 'Service'
+
+        chunks = list(encode(rows, 'csv', COLUMNS['invoice'], chunk_rows=10))
+        assert len(chunks) == 3
+        parsed = list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))
+        assert len(parsed) == 25
+        assert parsed[9]['status'] == '' and parsed[0]['items.0.quantity'].isdigit()
+
+        lines = b''.join(encode(rows, 'ndjson', COLUMNS['invoice'], chunk_rows=10)).splitlines()
+        assert [json.loads(line)['number'] for line in lines] == list(range(1, 26))
+
+    def test_check(self):
+        """Test that a clean import passes and lost rows, errors and RSS growth are reported"""
+        bad = expected_errors(100, 30)
+        assert bad == [30, 60, 90]
+        job = {'status': 'done', 'rows': 100, 'inserted': 97, 'failed': 3,
+               'errors': [{'row': row, 'message': 'invalid'} for row in bad]}
+        assert check(job, 97, 100, bad, rss_growth=40, limit=256) == []
+
+        problems = check(dict(job, inserted=96, failed=4), 95, 100, bad, rss_growth=300,
+                         limit=256)
+        assert len(problems) == 3
+        assert problems[-1] == 'backend RSS grew 300MB (limit 256MB)'
@@ -0,0 +1,64 @@
+"""
+Index advisor unit tests
+These tests verify the index proposals without a running mongod
+"""
+from bson import ObjectId
+
+import index_advisor
+from index_advisor import QueryShape
+
+
+class TestIndexAdvisor:
+    """Test cases for the index proposal logic"""
+
+    def test_equality_sort_range_order(self):
+        """Test that proposed keys follow the Equality-Sort-Range rule"""
+        shape = QueryShape('clients.summary.new', 'clients', {}, kind='aggregate', pipeline=[
+            {'$match': {'removed': False, 'created': {'$gte': 1}, 'enabled': True}},
+            {'$sort': {'name': 1}},
+        ])
+        proposal = index_advisor.propose_index(shape)
+        assert proposal['keys'] == [('enabled', 1), ('name', 1), ('created', 1)]
+        assert proposal['partial'] is True
+
+    def test_regex_only_filter_is_not_indexable(self):
+        """Test that case-insensitive regex searches get no proposal"""
+        shape = QueryShape('clients.search', 'clients',
+                           {'$or': [{'name': {'$regex': 'a', '$options': 'i'}}], 'removed': False})
+        assert index_advisor.propose_index(shape) is None
+
+    def test_in_operator_counts_as_equality(self):
+        """Test that $in predicates are placed before the sort keys"""
+        shape = QueryShape('invoices.filter', 'invoices',
+                           {'removed': False, 'paymentStatus': {'$in': ['unpaid']}},
+                           sort={'enabled': -1})
+        proposal = index_advisor.propose_index(shape)
+        assert proposal['keys'] == [('paymentStatus', 1), ('enabled', -1)]
+
+    def test_non_partial_when_removed_not_filtered(self):
+        """Test that shapes without removed:false get a full index"""
+        shape = QueryShape('payments.filter.invoice', 'payments', {'invoice': ObjectId()})
+        assert index_advisor.propose_index(shape)['partial'] is False
+
+    def test_dedupe_drops_prefixes(self):
+        """Test that an index that is a prefix of another proposal is dropped"""
+        long = {'collection': 'invoices', 'keys': [('client', 1), ('enabled', -1)], 'partial': True}
+        short = {'collection': 'invoices', 'keys': [('client', 1)], 'partial': True}
+        other = {'collection': 'quotes', 'keys': [('client', 1)], 'partial': True}
+        assert index_advisor.dedupe([short, long, other, dict(long)]) == [long, other]
+
+    def test_summarize_flags_collscan_and_sort(self):
+        """Test that nested explain output is reduced to flags and counters"""
+        output = {
+            'queryPlanner': {'winningPlan': {'stage': 'SORT', 'inputStage': {'stage': 'COLLSCAN'}}},
+            'executionStats': {'totalDocsExamined': 42, 'nReturned': 10, 'executionTimeMillis': 3},
+        }
+        summary = index_advisor.summarize(output)
+        assert summary['collscan'] and summary['blocking_sort']
+        assert summary['docs_examined'] == 42
+
+    def test_schema_declaration(self):
+        """Test the rendered Mongoose declaration"""
+        proposal = {'collection': 'invoices', 'keys': [('created', -1)], 'partial': True}
+        assert index_advisor.schema_declaration(proposal) == \
+            'schema.index({ created: -1 }, { partialFilterExpression: { removed: false } });'
@@ -0,0 +1,127 @@
+"""
+Journey engine unit tests
+These tests load the scenarios and run the API mode against a fake async client
+"""
+import random
+
+import pytest
+
+import journey
+from journey import Scenario, create, login, think, visit
+
+
+class FakeEntity:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    async def _record(self, call, value=None):
+        self.client.calls.append(call)
+        return value
+
+    def create(self, data):
+        return self._record(('create', self.name, data), {'_id': f"{self.name}-id", **data})
+
+    def read(self, id):
+        return self._record(('read', self.name, id), {'_id': id})
+
+    def list(self, page=1, items=10):
+        return self._record(('list', self.name, page))
+
+    def list_all(self):
+        return self._record(('listAll', self.name))
+
+    def search(self, q):
+        return self._record(('search', self.name, q))
+
+
+class FakeAsyncClient:
+    """Records the calls of one virtual user"""
+    instances = []
+
+    def __init__(self):
+        self.calls = []
+        self.closed = False
+        FakeAsyncClient.instances.append(self)
+        for name in journey.APP_ENTITIES:
+            setattr(self, name, FakeEntity(self, name))
+
+    def entity(self, name):
+        return getattr(self, name)
+
+    async def login(self):
+        self.calls.append(('login',))
+
+    async def batch(self, urls):
+        self.calls.append(('batch', len(urls)))
+
+    async def close(self):
+        self.closed = True
+
+
+class TestJourney:
+    """Test cases for scenario loading, bindings, the page map and virtual users"""
+
+    def test_bundled_scenarios_load(self):
+        """Test that every scenario file parses into known steps"""
+        scenarios = journey.load_scenarios()
+        assert {scenario.name for scenario in scenarios} >= {'office-invoicing',
+                                                            'dashboard-browsing'}
+        for scenario in scenarios:
+            assert scenario.weight > 0
+            assert len({step.name for step in scenario.steps}) == len(scenario.steps)
+
+    def test_bindings_keep_types_and_nest(self):
+        """Test that single bindings keep their type and dotted names reach saved results"""
+        context = {'rand': 123456, 'user': 7, 'invoice': {'_id': 'abc'}}
+        data = {'number': '${rand}', 'ref': 'INV-${user}-${invoice._id}',
+                'items': [{'id': '${invoice._id}'}]}
+        assert journey.resolve(data, context) == {'number': 123456, 'ref': 'INV-7-abc',
+                                                  'items': [{'id': 'abc'}]}
+        with pytest.raises(ValueError):
+            journey.parse_step({'dance': {}})
+
+    def test_weights_shape_the_mix(self):
+        """Test that scenarios are picked in proportion to their weight"""
+        heavy, light = Scenario('heavy', [], weight=9), Scenario('light', [], weight=1)
+        rng = random.Random(1)
+        picks = [journey.pick([heavy, light], rng).name for _ in range(2000)]
+        assert 0.85 < picks.count('heavy') / len(picks) < 0.95
+
+    def test_pages_map_to_their_api_requests(self):
+        """Test that visits send the requests the frontend sends for that page"""
+        client = FakeAsyncClient()
+        assert len(journey.page_requests(client, '/')) == 1
+        assert len(journey.page_requests(client, '/about')) == 0
+        for path, expected in [('/customer', ('list', 'client', 1)),
+                               ('/payment/mode', ('list', 'paymentmode', 1)),
+                               ('/invoice/read/42', ('read', 'invoice', '42'))]:
+            call, = journey.page_requests(client, path)
+            coroutine = call()
+            with pytest.raises(StopIteration):
+                coroutine.send(None)
+            assert client.calls[-1] == expected
+
+    def test_virtual_users_run_weighted_journeys(self):
+        """Test that results saved by one step are bound into the next and every user closes"""
+        FakeAsyncClient.instances = []
+        scenario = Scenario('invoicing', [
+            login(),
+            visit('/'),
+            create('client', {'name': 'Client ${user}'}, save_as='client'),
+            think(0.01),
+            create('invoice', {'client': '${client._id}', 'number': '${rand}'}),
+            visit('/invoice'),
+        ])
+        metrics = journey.run_load([scenario], users=3, duration=0.2, ramp_up=0.05,
+                                   client_factory=FakeAsyncClient, think_scale=1.0)
+        assert metrics.journeys >= 3
+        assert all(client.closed for client in FakeAsyncClient.instances)
+        invoice = next(call for call in FakeAsyncClient.instances[0].calls
+                       if call[:2] == ('create', 'invoice'))
+        assert invoice[2]['client'] == 'client-id'
+        assert isinstance(invoice[2]['number'], int)
+        rows = {row['step']: row for row in metrics.summary()}
+        assert 'think' not in rows
+        assert rows['create invoice']['errors'] == 0
+        assert rows['visit /']['count'] >= metrics.journeys  # cut journeys are not counted
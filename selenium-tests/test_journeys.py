@@ -0,0 +1,40 @@
+"""
+Test Case: User journeys
+This test runs every scenario of scenarios/ in the browser, the same journeys
+journey.py load replays as API virtual users.
+"""
+import pytest
+from base_test import BaseTest
+from crm_client import CrmClient
+import journey
+
+
+SCENARIOS = journey.load_scenarios()
+
+
+# restored before each test, per worker
+pytestmark = pytest.mark.usefixtures('browser_db')
+
+
+class TestJourneys(BaseTest):
+    """Test cases for the declarative user journeys"""
+    
+    def setup_method(self):
+        """Setup before each test"""
+        super().setup_method()
+    
+    def teardown_method(self):
+        """Cleanup after each test"""
+        super().teardown_method()
+    
+    @pytest.mark.parametrize('scenario', SCENARIOS, ids=[s.name for s in SCENARIOS])
+    def test_journey(self, scenario):
+        """Test that every step of the journey completes"""
+        with CrmClient() as api:
+            runner = journey.UiRunner(self, api)
+            results = runner.run(scenario)
+        for result in results:
+            print(f"  {result['step']:<32} {result['seconds'] * 1000:8.0f} ms")
+        failed = [result for result in results if 'error' in result]
+        assert not failed, f"{scenario.name}: {failed[0]['step']} failed: {failed[0]['error']}"
+        assert len(results) == len(scenario.steps)
@@ -0,0 +1,91 @@
+"""
+Locator unit tests
+These tests drive the batched resolution with a scripted driver
+"""
+import multiprocessing
+
+import pytest
+from selenium.webdriver.common.by import By
+
+import locator
+
+
+class ScriptedDriver:
+    """Returns queued execute_script results and counts the round trips"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(args)
+        return self.results.pop(0) if self.results else None
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(tmp_path, monkeypatch):
+    monkeypatch.setattr(locator, 'stats', locator.LocatorStats(str(tmp_path / 'stats.json')))
+
+
+CANDIDATES = [
+    (By.CSS_SELECTOR, 'nav'),
+    (By.XPATH, '//aside'),
+    (locator.TEXT, 'Invoice', 'a'),
+]
+
+
+def save_hits(path, saves):
+    """Save one hit per round, like an xdist worker exiting repeatedly"""
+    stats = locator.LocatorStats(path)
+    for _ in range(saves):
+        stats.record(CANDIDATES[:1], 0)
+        stats.save()
+
+
+class TestLocator:
+    """Test cases for candidate resolution and hit statistics"""
+
+    def test_all_candidates_sent_in_one_call(self):
+        """Test that a single execute_script call evaluates every candidate"""
+        driver = ScriptedDriver([2, 'element'])
+        match = locator.resolve(driver, CANDIDATES)
+        assert len(driver.calls) == 1
+        assert driver.calls[0][0] == [['css selector', 'nav', None], ['xpath', '//aside', None],
+                                      ['text', 'Invoice', 'a']]
+        assert match.element == 'element' and match.candidate == CANDIDATES[2]
+
+    def test_default_text_tags(self):
+        """Test that text candidates search links and buttons by default"""
+        assert locator.normalize((locator.TEXT, 'Create')) == ['text', 'Create', 'a, button']
+        with pytest.raises(ValueError):
+            locator.normalize((By.ID, 'email'))
+
+    def test_polls_until_timeout(self):
+        """Test that a miss polls again and records misses for every candidate"""
+        driver = ScriptedDriver(None, None, None)
+        assert locator.resolve(driver, CANDIDATES, timeout=0.15) is None
+        assert len(driver.calls) >= 2
+        counts = locator.stats.counts
+        assert all(counts[locator.LocatorStats.key(c)] == {'hits': 0, 'misses': 1}
+                   for c in CANDIDATES)
+
+    def test_stats_merge_and_dead_candidates(self):
+        """Test that saved counters accumulate and never-matching candidates are listed"""
+        for _ in range(2):
+            locator.stats.record(CANDIDATES, 1)
+            locator.stats.record(CANDIDATES, 1)
+            locator.stats.save()
+        totals = locator.load_stats(locator.stats.path)
+        assert totals['xpath | //aside'] == {'hits': 4, 'misses': 0}
+        assert totals['css selector | nav'] == {'hits': 0, 'misses': 4}
+        assert locator.dead_candidates(totals, min_attempts=4) == ['css selector | nav']
+
+    def test_parallel_saves_keep_every_count(self, tmp_path):
+        """Test that processes merging into one stats file do not overwrite each other"""
+        path = str(tmp_path / 'shared.json')
+        workers = [multiprocessing.Process(target=save_hits, args=(path, 50)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert locator.load_stats(path)['css selector | nav'] == {'hits': 200, 'misses': 0}
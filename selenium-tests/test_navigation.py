@@ -10,6 +10,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from base_test import BaseTest
+import locator
 import config
 
 
@@ -33,43 +34,24 @@ class TestNavigation(BaseTest):
             
             # Take screenshot
             self.take_screenshot('navigation_menu')
+            self.check_visual('dashboard')
             
             # Look for navigation elements
             # Could be sidebar, top menu, or hamburger menu
-            nav_selectors = [
-                'nav',
-                '[class*="menu"]',
-                '[class*="navigation"]',
-                '[class*="sidebar"]',
-                '[class*="sider"]',
-                'aside',
-                '[role="navigation"]'
-            ]
-            
-            nav_found = False
-            for selector in nav_selectors:
-                try:
-                    nav_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if nav_elements:
-                        print(f"✓ Found navigation element with selector: {selector}")
-                        nav_found = True
-                        break
-                except:
-                    continue
-            
-            if not nav_found:
-                # Check for any clickable menu items
-                clickable_items = self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    'a[href], button, [role="button"], [class*="link"]'
-                )
-                if clickable_items:
-                    print(f"✓ Found {len(clickable_items)} clickable navigation items")
-                    nav_found = True
-            
-            # At minimum, verify page has interactive elements
-            assert nav_found or len(self.driver.find_elements(By.TAG_NAME, 'a')) > 0, \
-                "No navigation elements found"
+            match = self.locate([
+                (By.CSS_SELECTOR, 'nav'),
+                (By.CSS_SELECTOR, '[class*="menu"]'),
+                (By.CSS_SELECTOR, '[class*="navigation"]'),
+                (By.CSS_SELECTOR, '[class*="sidebar"]'),
+                (By.CSS_SELECTOR, '[class*="sider"]'),
+                (By.CSS_SELECTOR, 'aside'),
+                (By.CSS_SELECTOR, '[role="navigation"]'),
+                # Any clickable menu item
+                (By.CSS_SELECTOR, 'a[href], button, [role="button"], [class*="link"]'),
+            ])
+            
+            assert match is not None, "No navigation elements found"
+            print(f"✓ Found navigation element with selector: {match.candidate[1]}")
             
             print("✓ Navigation menu is displayed")
             
@@ -88,34 +70,23 @@ class TestNavigation(BaseTest):
             self.take_screenshot('navigation_invoice_before')
             
             # Try to find and click invoice link
-            invoice_selectors = [
-                'a[href*="invoice"]',
-                'a[href="/invoice"]',
-                'a:contains("Invoice")',
-                '*[class*="invoice"]',
-                'button:contains("Invoice")'
-            ]
+            match = self.locate([
+                (By.CSS_SELECTOR, 'a[href*="invoice"]'),
+                (By.CSS_SELECTOR, 'a[href="/invoice"]'),
+                (locator.TEXT, 'Invoice', 'a'),
+                (By.CSS_SELECTOR, '*[class*="invoice"]'),
+                (locator.TEXT, 'Invoice', 'button'),
+            ])
             
             invoice_clicked = False
-            for selector in invoice_selectors:
+            if match:
                 try:
-                    if ':contains' in selector:
-                        # Find by text
-                        elements = self.driver.find_elements(By.XPATH, 
-                            "//a[contains(text(), 'Invoice') or contains(text(), 'invoice')]")
-                    else:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    
-                    if elements:
-                        element = elements[0]
-                        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                        time.sleep(1)
-                        element.click()
-                        invoice_clicked = True
-                        print(f"✓ Clicked invoice link using selector: {selector}")
-                        break
-                except Exception as e:
-                    continue
+                    self.driver.execute_script("arguments[0].scrollIntoView(true);", match.element)
+                    match.element.click()
+                    invoice_clicked = True
+                    print(f"✓ Clicked invoice link using selector: {match.candidate[1]}")
+                except Exception:
+                    pass
             
             if not invoice_clicked:
                 # Try direct navigation
@@ -137,6 +108,8 @@ class TestNavigation(BaseTest):
             body = self.wait_for_element(By.TAG_NAME, 'body')
             assert body is not None, "Invoice page should load"
             
+            self.check_visual('invoice')
+            
             print("✓ Successfully navigated to Invoice page")
             
         except Exception as e:
@@ -156,13 +129,13 @@ class TestNavigation(BaseTest):
             # Try to navigate to customer page
             try:
                 # Try finding customer link
-                customer_links = self.driver.find_elements(
-                    By.XPATH,
-                    "//a[contains(text(), 'Customer') or contains(text(), 'customer') or contains(@href, 'customer')]"
-                )
+                match = self.locate([
+                    (By.CSS_SELECTOR, 'a[href*="customer"]'),
+                    (locator.TEXT, 'Customer', 'a'),
+                ])
                 
-                if customer_links:
-                    customer_links[0].click()
+                if match:
+                    match.element.click()
                     print("✓ Clicked customer link from menu")
                 else:
                     # Direct navigation
@@ -183,6 +156,8 @@ class TestNavigation(BaseTest):
             assert 'customer' in current_url.lower(), \
                 f"Expected to be on customer page, but URL is: {current_url}"
             
+            self.check_visual('customer')
+            
             print("✓ Successfully navigated to Customer page")
             
         except Exception as e:
@@ -204,42 +179,25 @@ class TestNavigation(BaseTest):
             self.take_screenshot('create_button_before')
             
             # Look for create/new/add button
-            create_selectors = [
-                'button:contains("Create")',
-                'button:contains("New")',
-                'button:contains("Add")',
-                'a[href*="create"]',
-                '*[class*="create"]',
-                '*[class*="add"]',
-                'button[type="button"]'
-            ]
+            match = self.locate([
+                (locator.TEXT, 'Create', 'button'),
+                (locator.TEXT, 'New', 'button'),
+                (locator.TEXT, 'Add', 'button'),
+                (By.CSS_SELECTOR, 'a[href*="create"]'),
+                (By.CSS_SELECTOR, '*[class*="create"]'),
+                (By.CSS_SELECTOR, '*[class*="add"]'),
+                (By.CSS_SELECTOR, 'button[type="button"]'),
+            ], enabled=True)
             
             create_clicked = False
-            for selector in create_selectors:
+            if match:
                 try:
-                    if ':contains' in selector:
-                        # Find by text
-                        elements = self.driver.find_elements(
-                            By.XPATH,
-                            "//button[contains(text(), 'Create') or contains(text(), 'New') or contains(text(), 'Add')]"
-                        )
-                    else:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    
-                    if elements:
-                        # Filter for visible and clickable buttons
-                        for element in elements:
-                            if element.is_displayed() and element.is_enabled():
-                                self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                                time.sleep(1)
-                                element.click()
-                                create_clicked = True
-                                print("✓ Clicked create button")
-                                break
-                        if create_clicked:
-                            break
-                except Exception as e:
-                    continue
+                    self.driver.execute_script("arguments[0].scrollIntoView(true);", match.element)
+                    match.element.click()
+                    create_clicked = True
+                    print("✓ Clicked create button")
+                except Exception:
+                    pass
             
             if not create_clicked:
                 # Try direct navigation to create page
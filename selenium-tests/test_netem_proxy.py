@@ -0,0 +1,117 @@
+"""
+Network-condition proxy unit tests
+These tests shape traffic to an in-process echo server, no browser needed
+"""
+import socket
+import threading
+import time
+
+import pytest
+
+import config
+from netem_proxy import ConditionedProxy, Link, NetworkConditions
+from network_benchmark import summarize, target_of
+
+
+def echo_server():
+    """Start a TCP server echoing every connection and return its port"""
+    server = socket.create_server(('127.0.0.1', 0))
+
+    def handle(connection):
+        with connection:
+            while data := connection.recv(65536):
+                connection.sendall(data)
+
+    def accept():
+        while True:
+            connection, _ = server.accept()
+            threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return server.getsockname()[1]
+
+
+def round_trip(port, payload):
+    """Send payload through the proxy and return (echo, seconds)"""
+    start = time.perf_counter()
+    with socket.create_connection(('127.0.0.1', port)) as client:
+        client.sendall(payload)
+        received = b''
+        while len(received) < len(payload):
+            received += client.recv(65536)
+    return received, time.perf_counter() - start
+
+
+class TestNetemProxy:
+    """Test cases for latency, bandwidth and drop injection"""
+
+    def test_latency_is_added_per_round_trip(self):
+        """Test that a small exchange takes about one added RTT"""
+        proxy = ConditionedProxy(f"127.0.0.1:{echo_server()}",
+                                 NetworkConditions(latency_ms=200)).start()
+        try:
+            echo, seconds = round_trip(proxy.port, b'ping')
+        finally:
+            proxy.stop()
+        assert echo == b'ping'
+        assert 0.19 <= seconds < 0.5
+        assert proxy.report()['connections'] == 1
+
+    def test_connections_are_closed_after_both_directions(self):
+        """Test that a finished connection releases both of its sockets"""
+        proxy = ConditionedProxy(f"127.0.0.1:{echo_server()}", NetworkConditions()).start()
+        try:
+            for _ in range(3):
+                assert round_trip(proxy.port, b'ping')[0] == b'ping'
+            deadline = time.monotonic() + 2
+            while proxy.report()['closed'] < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            proxy.stop()
+        assert proxy.report()['connections'] == proxy.report()['closed'] == 3
+
+    def test_bandwidth_cap_limits_throughput(self):
+        """Test that 64 KiB over a 1024 kbps downlink take about half a second"""
+        proxy = ConditionedProxy(f"127.0.0.1:{echo_server()}",
+                                 NetworkConditions(down_kbps=1024)).start()
+        payload = bytes(range(256)) * 256
+        try:
+            echo, seconds = round_trip(proxy.port, payload)
+        finally:
+            proxy.stop()
+        assert echo == payload
+        assert 0.45 <= seconds < 1.5
+        assert proxy.report()['bytes_down'] == len(payload)
+
+    def test_drops_delay_but_keep_data_in_order(self):
+        """Test that every dropped segment costs one retransmission timeout"""
+        proxy = ConditionedProxy(f"127.0.0.1:{echo_server()}",
+                                 NetworkConditions(drop_rate=1, rto_ms=100), seed=0).start()
+        try:
+            echo, seconds = round_trip(proxy.port, b'data')
+        finally:
+            proxy.stop()
+        stats = proxy.report()
+        assert echo == b'data'
+        assert seconds >= 0.2
+        assert stats['dropped'] == stats['segments'] == 2
+
+    def test_link_serializes_concurrent_transfers(self):
+        """Test that connections share the link bandwidth"""
+        link = Link(kbps=8)  # 1024 bytes per second
+        assert link.transmit(512, 10.0) == pytest.approx(10.5)
+        assert link.transmit(512, 10.0) == pytest.approx(11.0)
+        assert link.transmit(512, 20.0) == pytest.approx(20.5)
+
+    def test_scenarios_and_benchmark_helpers(self):
+        """Test that every configured scenario loads and the report helpers work"""
+        for name in config.NETWORK_SCENARIOS:
+            NetworkConditions.scenario(name)
+        with pytest.raises(ValueError):
+            NetworkConditions.scenario('carrier-pigeon')
+        assert target_of('http://localhost:8888/api') == 'localhost:8888'
+        summary = summarize([{'ttfb': 10, 'lcp': None, 'api': [1, 2]},
+                             {'ttfb': 30, 'lcp': None, 'api': [1, 2, 3, 4]}])
+        assert summary['ttfb'] == 20
+        assert summary['lcp'] is None
+        assert summary['api_requests'] == 3
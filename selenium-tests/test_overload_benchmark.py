@@ -0,0 +1,50 @@
+"""
+Overload benchmark unit tests
+These tests check the request mix and the overload verdicts without a backend
+"""
+from overload_benchmark import failures, p99, request_mix, summarize
+
+
+def result(name, status, ms=10, retry_after=None, end=1.0):
+    return {'class': name, 'status': status, 'retry_after': retry_after, 'ms': ms, 'end': end}
+
+
+def step(multiple, goodput, p99_ms, shed_without_retry_after=0, health_failed=0):
+    return {'multiple': multiple, 'target_rps': 100 * multiple,
+            'load': {'offered_rps': 100 * multiple, 'goodput_rps': goodput,
+                     'shed_without_retry_after': shed_without_retry_after,
+                     'admitted_ms': {'p99': p99_ms}},
+            'health': {'probes': 40, 'failed': health_failed}}
+
+
+class TestOverloadBenchmark:
+    """Test the request mix and verdicts of overload_benchmark.py"""
+
+    def test_request_mix_and_summary(self):
+        """Test that the mix keeps the chosen classes and the summary counts shed answers"""
+        requests, weights = request_mix(['api', 'pdf'], 'http://h/api/', 'http://h/', 'abc')
+        assert {name for name, _, _ in requests} == {'api', 'pdf'}
+        assert len(requests) == len(weights)
+        assert ('pdf', 'GET', 'http://h/download/invoice/invoice-abc.pdf') in requests
+        assert all(url.startswith('http://h/api/') for name, _, url in requests if name == 'api')
+
+        results = [result('api', 200, ms) for ms in range(1, 101)]
+        results += [result('heavy', 429, retry_after='1'), result('heavy', 503), result('api', 0)]
+        summary = summarize(results, 0.0, 1.0)
+        assert summary['sent'] == 103 and summary['goodput_rps'] == 100
+        assert summary['shed'] == 2 and summary['shed_without_retry_after'] == 1
+        assert summary['failed'] == 1
+        assert summary['admitted_ms']['p99'] == 99
+        assert summary['by_class']['heavy'] == {'admitted': 0, 'shed': 2}
+        assert p99([]) is None
+
+    def test_failures(self):
+        """Test that lost goodput, slow admitted requests and failed probes are flagged"""
+        assert failures([step(0.5, 50, 100), step(3, 90, 500)], 100, 0.8, 3000) == []
+        # below capacity the goodput is whatever was offered
+        assert failures([step(0.5, 10, 5000)], 100, 0.8, 3000) == []
+        problems = failures([step(3, 40, 9000, shed_without_retry_after=2, health_failed=1)],
+                            100, 0.8, 3000)
+        assert len(problems) == 4
+        assert any('goodput 40' in problem for problem in problems)
+        assert any('health probes' in problem for problem in problems)
@@ -0,0 +1,42 @@
+"""
+Projection benchmark unit tests
+These tests check the generated invoices and the payload verdicts without a backend
+"""
+import random
+from datetime import datetime
+
+from bson import ObjectId
+
+from crm_client.routes import selected
+from projection_benchmark import DATATABLE_SELECT, extra_fields, invoice_document, reductions
+
+
+class TestProjectionBenchmark:
+    """Test the data generator and verdicts of projection_benchmark.py"""
+
+    def test_invoices_carry_what_lists_should_skip(self):
+        """Test that invoices have items, notes and totals that add up"""
+        rng = random.Random(3)
+        invoices = [invoice_document(number, rng, ObjectId(), ObjectId(), datetime(2024, 6, 1))
+                    for number in range(50)]
+        for invoice in invoices:
+            assert 3 <= len(invoice['items']) <= 15
+            assert invoice['notes'] and all(item['description'] for item in invoice['items'])
+            assert abs(invoice['total'] - sum(item['total'] for item in invoice['items'])) < 0.01
+        assert any(invoice['files'] for invoice in invoices)
+        assert selected(DATATABLE_SELECT)['select'].startswith('number,client.name,')
+        assert selected(None) == {}
+
+    def test_extra_fields_and_reductions(self):
+        """Test that unselected fields are found and small reductions flagged"""
+        select = ('number', 'client.name', 'total')
+        documents = [{'_id': '1', 'number': 1, 'total': 5, 'client': {'_id': 'c', 'name': 'A'}},
+                     {'_id': '2', 'number': 2, 'items': [], 'client': {'_id': 'c', 'email': 'e'}}]
+        assert extra_fields(documents, select) == ['client.email', 'items']
+
+        results = {10: {'full': {'bytes': 10000}, 'select': {'bytes': 1500, 'extra_fields': []}},
+                   100: {'full': {'bytes': 10000}, 'select': {'bytes': 8000,
+                                                              'extra_fields': ['notes']}}}
+        verdicts, problems = reductions(results, limit=0.5)
+        assert verdicts == {10: 0.85, 100: 0.2}
+        assert len(problems) == 2 and all(problem.startswith('100 items') for problem in problems)
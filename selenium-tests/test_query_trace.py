@@ -0,0 +1,66 @@
+"""
+Query trace report unit tests
+These tests rank trace snapshots and run a scenario against a fake trace route
+"""
+from journey import Scenario, login, visit
+from query_trace import offenders, trace_scenario
+from test_journey import FakeAsyncClient
+
+
+def row(key, count, total, examined_ratio=None, plan=None):
+    return {'key': key, 'count': count, 'totalMs': total, 'p95Ms': total / count,
+            'maxMs': total / count * 2, 'docsReturned': count, 'examinedRatio': examined_ratio,
+            'planSummary': plan}
+
+
+class FakeQueryTrace:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.calls = []
+
+    def reset(self):
+        self.calls.append('reset')
+
+    def read(self, sort='totalMs', limit=50):
+        self.calls.append('read')
+        return self.snapshot
+
+
+class FakeApi:
+    def __init__(self, snapshot):
+        self.query_trace = FakeQueryTrace(snapshot)
+
+
+class TestQueryTrace:
+    """Test the offender ranking of query_trace.py"""
+
+    def test_offenders_are_ranked_and_flagged(self):
+        """Test that the costliest shapes come first with scans and fan-out flagged"""
+        snapshot = {'shapes': 3, 'evicted': 0, 'rows': [
+            row('find invoices {removed}', 10, 50),
+            row('find clients {_id}', 400, 200),
+            row('aggregate payments [$match{removed},$group]', 10, 900, 250.0, 'COLLSCAN'),
+        ]}
+        rows = offenders(snapshot, journeys=10, top=2)
+        assert [entry['shape'] for entry in rows] == [
+            'aggregate payments [$match{removed},$group]', 'find clients {_id}']
+        assert rows[0]['flags'] == ['COLLSCAN', 'examines 250x']
+        assert rows[1]['calls_per_journey'] == 40
+        assert rows[1]['flags'] == ['40 calls/journey']
+
+    def test_offenders_sort_key(self):
+        """Test that rows without the sort key (not explained yet) rank last"""
+        snapshot = {'shapes': 2, 'rows': [row('find a {}', 1, 10, 3.0), row('find b {}', 1, 20)]}
+        rows = offenders(snapshot, journeys=0, sort='examinedRatio')
+        assert [entry['shape'] for entry in rows] == ['find a {}', 'find b {}']
+        assert rows[1]['flags'] == []
+
+    def test_trace_scenario_resets_before_the_load(self):
+        """Test that the table is reset before the scenario and read after it"""
+        api = FakeApi({'shapes': 0, 'rows': []})
+        scenario = Scenario('browsing', [login(), visit('/invoice')])
+        metrics, snapshot = trace_scenario(api, scenario, users=2, duration=0.1,
+                                           client_factory=FakeAsyncClient, think_scale=0)
+        assert api.query_trace.calls == ['reset', 'read']
+        assert metrics.journeys >= 2
+        assert snapshot == {'shapes': 0, 'rows': []}
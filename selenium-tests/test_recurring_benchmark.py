@@ -0,0 +1,44 @@
+"""
+Recurring benchmark unit tests
+These tests check the seeded sources and the run checks without mongod
+"""
+import random
+from datetime import datetime
+from decimal import Decimal
+
+from bson import ObjectId
+
+from recurring_benchmark import cents, failures, month_before, source_invoice
+
+
+class TestRecurringBenchmark:
+    """Test the sources and verdicts of recurring_benchmark.py"""
+
+    def test_sources_are_due_monthly_retainers(self):
+        """Test that sources are dated a month before they are due, with consistent totals"""
+        assert month_before(datetime(2024, 3, 31, 10)) == datetime(2024, 2, 29, 10)
+        assert month_before(datetime(2024, 1, 15)) == datetime(2023, 12, 15)
+
+        due = datetime(2024, 10, 31, 23, 59)
+        rng = random.Random(3)
+        for number in range(200):
+            source = source_invoice(number, due, rng, ObjectId(), ObjectId())
+            assert source['recurring'] == 'monthly'
+            assert source['nextRun'] == due
+            assert source['date'] == datetime(2024, 9, 30, 23, 59)
+            item = source['items'][0]
+            assert cents(item['quantity'] * item['price']) == cents(source['subTotal'])
+            tax = cents(Decimal(str(source['subTotal'])) * source['taxRate'] / 100)
+            assert cents(source['total']) == cents(source['subTotal']) + tax
+
+    def test_failures(self):
+        """Test that a clean run passes and every kind of double or missed run is reported"""
+        clean = {'generated': 100, 'duplicate_runs': 0, 'duplicate_numbers': 0,
+                 'still_due': 0, 'total': 1234.5}
+        assert failures(clean, 100, Decimal('1234.50')) == []
+
+        broken = dict(clean, generated=98, duplicate_runs=1, duplicate_numbers=2, still_due=2,
+                      total=1200.0)
+        problems = failures(broken, 100, Decimal('1234.50'))
+        assert len(problems) == 5
+        assert problems[0] == '98 invoices generated for 100 sources'
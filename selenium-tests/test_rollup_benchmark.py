@@ -0,0 +1,48 @@
+"""
+Rollup benchmark unit tests
+These tests check the generated documents and the flatness verdicts without mongod
+"""
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from rollup_benchmark import SPREAD_DAYS, flatness, invoice_document, payment_document
+
+
+class TestRollupBenchmark:
+    """Test the data generator and verdicts of rollup_benchmark.py"""
+
+    def test_documents_match_the_models(self):
+        """Test that credit follows paymentStatus and payments match their invoice"""
+        now = datetime(2024, 6, 30, 12)
+        rng = random.Random(1)
+        invoices = [dict(invoice_document(number, now, rng, ObjectId(), ObjectId()),
+                         _id=ObjectId()) for number in range(300)]
+        for invoice in invoices:
+            assert now - timedelta(days=SPREAD_DAYS) < invoice['date'] <= now
+            assert invoice['expiredDate'] - invoice['date'] == timedelta(days=30)
+            if invoice['paymentStatus'] == 'paid':
+                assert invoice['credit'] == invoice['total']
+            elif invoice['paymentStatus'] == 'unpaid':
+                assert invoice['credit'] == 0
+            else:
+                assert 0 < invoice['credit'] < invoice['total']
+        assert {invoice['paymentStatus'] for invoice in invoices} == {'unpaid', 'paid',
+                                                                       'partially'}
+
+        paid = next(invoice for invoice in invoices if invoice['credit'])
+        payment = payment_document(paid, 7)
+        assert payment['invoice'] == paid['_id']
+        assert payment['amount'] == paid['credit']
+        assert payment['date'] > paid['date']
+
+    def test_flatness(self):
+        """Test that only endpoints growing past the limit are flagged"""
+        steps = [{'invoices': 10000, 'endpoints': {'invoice.summary.month': {'p50': 4.0},
+                                                   'legacy.scan': {'p50': 20.0}}},
+                 {'invoices': 1000000, 'endpoints': {'invoice.summary.month': {'p50': 5.0},
+                                                     'legacy.scan': {'p50': 2000.0}}}]
+        verdicts = flatness(steps, limit=2)
+        assert verdicts['invoice.summary.month'] == {'growth': 1.25, 'flat': True}
+        assert verdicts['legacy.scan'] == {'growth': 100.0, 'flat': False}
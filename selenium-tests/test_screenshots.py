@@ -0,0 +1,113 @@
+"""
+Screenshot pipeline unit tests
+These tests drive the pipeline with an in-memory driver instead of a browser
+"""
+import base64
+import io
+import json
+import os
+
+from PIL import Image, ImageDraw
+
+from screenshots import ScreenshotPipeline
+
+
+class FakeDriver:
+    """Returns a fixed image from get_screenshot_as_base64"""
+
+    def __init__(self, image):
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        self.data = base64.b64encode(buffer.getvalue()).decode()
+
+    def get_screenshot_as_base64(self):
+        return self.data
+
+
+def page(text, shade=255):
+    """Render a simple page-like image"""
+    image = Image.new('RGB', (800, 600), (shade, shade, shade))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, 200, 600], fill=(0, 21, 41))
+    draw.text((300, 100), text, fill=(0, 0, 0))
+    return image
+
+
+def index_entries(directory):
+    with open(os.path.join(directory, 'index.jsonl')) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestScreenshotPipeline:
+    """Test cases for policies, deduplication and retention"""
+
+    def test_on_failure_skips_successful_captures(self, tmp_path):
+        """Test that only captures taken while handling an exception are kept"""
+        pipeline = ScreenshotPipeline(str(tmp_path), policy='on-failure')
+        driver = FakeDriver(page('dashboard'))
+        assert pipeline.capture(driver, 'dashboard') is None
+        try:
+            raise AssertionError('boom')
+        except AssertionError:
+            future = pipeline.capture(driver, 'dashboard_error')
+        pipeline.close()
+        assert future.result().startswith(str(tmp_path))
+        assert [entry['name'] for entry in index_entries(tmp_path)] == ['dashboard_error']
+        assert index_entries(tmp_path)[0]['failure'] is True
+
+    def test_near_identical_captures_share_an_object(self, tmp_path):
+        """Test perceptual deduplication of visually identical pages"""
+        pipeline = ScreenshotPipeline(str(tmp_path), policy='always', workers=1)
+        pipeline.capture(FakeDriver(page('invoices')), 'first')
+        pipeline.capture(FakeDriver(page('invoices', shade=254)), 'second')
+        pipeline.capture(FakeDriver(Image.new('RGB', (800, 600), (0, 0, 0))), 'blank')
+        pipeline.close()
+        entries = index_entries(tmp_path)
+        assert entries[0]['object'] == entries[1]['object']
+        assert entries[2]['object'] != entries[0]['object']
+        assert pipeline.stats['stored'] == 2 and pipeline.stats['deduplicated'] == 1
+
+    def test_sampled_policy(self, tmp_path):
+        """Test that sampling keeps roughly the configured share of captures"""
+        pipeline = ScreenshotPipeline(str(tmp_path), policy='sampled', sample_rate=0.0)
+        assert pipeline.should_capture(False) is False
+        assert pipeline.should_capture(True) is True
+        pipeline.sample_rate = 1.0
+        assert pipeline.should_capture(False) is True
+        pipeline.close()
+
+    def test_retention_keeps_newest_objects(self, tmp_path):
+        """Test that the oldest objects and their index entries are removed"""
+        pipeline = ScreenshotPipeline(str(tmp_path), policy='always', workers=1, max_files=2,
+                                      max_age_days=0, phash_distance=0)
+        for i in range(3):
+            pipeline.capture(FakeDriver(Image.new('RGB', (800, 600), (255, 255, 255)) if i == 2
+                                        else page(f'page {i}', shade=0 if i else 255)),
+                             f"capture_{i}")
+            pipeline.executor.submit(lambda: None).result()
+        for i, entry in enumerate(index_entries(tmp_path)):
+            os.utime(os.path.join(tmp_path, entry['object']), (1000 + i, 1000 + i))
+        pipeline.close()
+        assert len(os.listdir(tmp_path / 'objects')) == 2
+        assert [entry['name'] for entry in index_entries(tmp_path)] == ['capture_1', 'capture_2']
+
+    def test_failed_store_is_reported(self, tmp_path, capsys):
+        """Test that an exception in a worker is printed instead of lost"""
+        pipeline = ScreenshotPipeline(str(tmp_path), policy='always', workers=1)
+        driver = FakeDriver(page('broken'))
+        driver.data = base64.b64encode(b'not an image').decode()
+        pipeline.capture(driver, 'broken')
+        pipeline.close()
+        assert pipeline.stats['failed'] == 1
+        assert 'Screenshot broken not saved' in capsys.readouterr().err
+
+    def test_prune_keeps_entries_of_other_workers(self, tmp_path):
+        """Test that retention re-reads the index appended by other processes"""
+        pipeline = ScreenshotPipeline(str(tmp_path), policy='always', workers=1)
+        pipeline.capture(FakeDriver(page('own')), 'own').result()
+        with open(os.path.join(tmp_path, 'index.jsonl'), 'a') as f:
+            f.write(json.dumps({'name': 'other', 'object': 'objects/other.png'}) + '\n')
+        own = index_entries(tmp_path)[0]['object']
+        pipeline._prune_index({own})
+        pipeline.close()
+        assert [entry['name'] for entry in index_entries(tmp_path)] == ['other']
@@ -0,0 +1,78 @@
+"""
+Soak analysis unit tests
+These tests check the probes on this process and the growth fit on synthetic samples
+"""
+import os
+
+import numpy as np
+
+import soak
+from journey import Metrics, Scenario
+
+
+def samples_of(windows, per_window=5, seed=0):
+    """Synthetic samples: windows is a list of {step: executions}, rss grows 2KB per invoice"""
+    rng = np.random.default_rng(seed)
+    samples, steps, requests = [], {}, 0
+    for index, executions in enumerate(windows):
+        for tick in range(per_window):
+            if tick:
+                for key, count in executions.items():
+                    steps[key] = steps.get(key, 0) + count // (per_window - 1)
+                    requests += count // (per_window - 1)
+            samples.append({
+                'window': index, 'requests': requests, 'steps': dict(steps),
+                'rss_mb': 120 + steps.get('invoicing / create invoice', 0) * 2 / 1024
+                + rng.normal(0, 0.02),
+                'open_fds': 40 + rng.integers(0, 2),
+            })
+    return samples
+
+
+class TestSoak:
+    """Test cases for the probes, the growth fit and the step attribution"""
+
+    def test_probes_read_proc(self, tmp_path):
+        """Test that RSS, descriptors and directory size are read for a pid"""
+        assert soak.rss_mb(os.getpid()) > 1
+        assert soak.open_fds(os.getpid()) > 0
+        (tmp_path / 'invoice').mkdir()
+        (tmp_path / 'invoice' / 'invoice-1.pdf').write_bytes(b'x' * 1024 * 1024)
+        assert soak.directory_mb(tmp_path) == 1
+        assert soak.parse_duration('4h') == 14400
+        assert soak.parse_duration('90') == 90
+
+    def test_steady_growth_fails_and_noise_passes(self):
+        """Test that a linear leak exceeds its limit while a flat, noisy resource does not"""
+        mix = {'invoicing / create invoice': 400, 'browsing / visit /': 800}
+        growths = soak.growth(samples_of([mix] * 6), limits={'rss_mb': 0.5, 'open_fds': 0.05})
+        assert growths['rss_mb']['growing']
+        assert 0.5 < growths['rss_mb']['per_1k_requests'] < 0.8
+        assert not growths['open_fds']['growing']
+
+    def test_warmup_growth_is_ignored(self):
+        """Test that a resource that only grows while warming up passes"""
+        samples = [{'window': 0, 'requests': requests, 'steps': {},
+                    'rss_mb': min(requests, 2000) / 10}
+                   for requests in range(0, 20000, 500)]
+        growths = soak.growth(samples, limits={'rss_mb': 0.5}, warmup=0.2)
+        assert not growths['rss_mb']['growing']
+
+    def test_growth_is_attributed_to_the_step(self):
+        """Test that the windows favouring a scenario point at the step that leaks"""
+        windows = [{'invoicing / create invoice': 800, 'browsing / visit /': 400},
+                   {'invoicing / create invoice': 200, 'browsing / visit /': 1600}] * 3
+        drivers = soak.attribute(samples_of(windows), 'rss_mb')
+        assert drivers[0]['step'] == 'invoicing / create invoice'
+        assert 1.5 < drivers[0]['per_1k_executions'] < 2.5
+        assert drivers[0]['share'] > 0.9
+
+    def test_windows_rotate_the_favoured_scenario(self):
+        """Test that each window multiplies the weight of one scenario"""
+        scenarios = [Scenario('a', [], weight=3), Scenario('b', [], weight=1)]
+        assert [s.weight for s in soak.window_scenarios(scenarios, 0)] == [12, 1]
+        assert [s.weight for s in soak.window_scenarios(scenarios, 3)] == [3, 4]
+        sampler = soak.Sampler(os.getpid(), Metrics(), soak.RequestCounter())
+        sampler.metrics.record('a', 'visit /', 0.1)
+        sampler.metrics.record('a', 'visit /', 0.1, 'ApiError()')
+        assert sampler.take(0)['steps'] == {'a / visit /': 2}
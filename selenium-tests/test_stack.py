@@ -0,0 +1,66 @@
+"""
+Stack orchestrator unit tests
+These tests verify the worker mapping, build reuse and startup tracking without starting processes
+"""
+import json
+import os
+import time
+
+import config
+import stack
+
+
+class FakeStack:
+    def __init__(self, index, total):
+        self.index = index
+        self.timings = {'mongod': 0.5, 'total': total}
+
+
+class TestStack:
+    """Test cases for the stack orchestrator helpers"""
+
+    def test_each_worker_uses_its_own_stack(self, monkeypatch):
+        """Test that xdist workers are mapped to the endpoints of their stack"""
+        endpoints = [{'base_url': f"http://localhost:{4000 + index}",
+                      'api_base_url': f"http://localhost:{4000 + index}/api",
+                      'mongo_uri': f"mongodb://127.0.0.1:{5000 + index}",
+                      'database': f"idurar_perf_stack{index}"} for index in range(2)]
+        monkeypatch.setenv('STACK_ENDPOINTS', json.dumps(endpoints))
+        monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw1')
+        for name in ('BASE_URL', 'API_BASE_URL', 'MONGO_URI', 'MONGO_DB'):
+            monkeypatch.setattr(config, name, getattr(config, name))
+        assert stack.export_for_worker() == endpoints[1]
+        assert config.BASE_URL == 'http://localhost:4001'
+        assert config.API_BASE_URL == 'http://localhost:4001/api'
+        assert config.MONGO_DB == 'idurar_perf_stack1'
+
+    def test_no_endpoints_leaves_config_alone(self, monkeypatch):
+        """Test that plain pytest runs keep the configured URLs"""
+        monkeypatch.delenv('STACK_ENDPOINTS', raising=False)
+        base_url = config.BASE_URL
+        assert stack.export_for_worker() is None
+        assert config.BASE_URL == base_url
+
+    def test_build_is_reused_until_sources_change(self, tmp_path, monkeypatch):
+        """Test that an up-to-date build is not rebuilt"""
+        (tmp_path / 'src').mkdir()
+        source = tmp_path / 'src' / 'main.jsx'
+        source.write_text('export default 1;')
+        (tmp_path / stack.BUILD_DIR).mkdir()
+        index = tmp_path / stack.BUILD_DIR / 'index.html'
+        index.write_text('<html></html>')
+        past = time.time() - 60
+        os.utime(source, (past, past))
+        monkeypatch.setattr(config, 'FRONTEND_DIR', str(tmp_path))
+        assert stack.build_frontend() is False
+        assert stack.newest_source(str(tmp_path)) == past
+
+    def test_startup_is_recorded_and_compared(self, tmp_path):
+        """Test that the history keeps every run and reports the previous median"""
+        path = str(tmp_path / 'stack_startup.jsonl')
+        assert stack.record_startup([FakeStack(0, 4.0)], path) == (4.0, None)
+        assert stack.record_startup([FakeStack(0, 6.0)], path) == (6.0, 4.0)
+        total, median = stack.record_startup([FakeStack(0, 3.0), FakeStack(1, 9.0)], path)
+        assert (total, median) == (9.0, None)
+        with open(path) as f:
+            assert len(f.readlines()) == 3
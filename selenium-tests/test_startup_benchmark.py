@@ -0,0 +1,61 @@
+"""
+Startup benchmark unit tests
+These tests time a stand-in server process instead of the backend
+"""
+import os
+import sys
+import textwrap
+
+from startup_benchmark import distribution, measure_start, record_history, summarize
+
+FAKE_SERVER = textwrap.dedent("""
+    import json, os, time
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    time.sleep(0.2)
+    listening = time.monotonic()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            ready = time.monotonic() - listening > 0.2
+            code = 503 if self.path == '/api/ready' and not ready else 200
+            body = json.dumps({'phases': {'models': 50, 'indexes': 400}}).encode()
+            self.send_response(code)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    HTTPServer(('localhost', int(os.environ['PORT'])), Handler).serve_forever()
+""")
+
+
+class TestStartupBenchmark:
+    """Test the restart timing of startup_benchmark.py"""
+
+    def test_measure_start_waits_for_ready(self, tmp_path):
+        """Test that listening and ready are timed separately and the process is stopped"""
+        script = tmp_path / 'server.py'
+        script.write_text(FAKE_SERVER)
+        run = measure_start(dict(os.environ), command=(sys.executable, str(script)),
+                            cwd=str(tmp_path), timeout=10)
+        assert 200 <= run['listening_ms'] < run['ready_ms']
+        assert run['ready_ms'] - run['listening_ms'] >= 150
+        assert run['phases'] == {'models': 50, 'indexes': 400}
+
+    def test_summary_and_history(self, tmp_path):
+        """Test the distributions and that only runs with the same options are compared"""
+        runs = [{'listening_ms': value, 'ready_ms': value * 2, 'phases': {'indexes': value}}
+                for value in range(100, 200, 5)]
+        summary = summarize(runs)
+        assert summary['ready_ms'] == {'min': 200, 'p50': 300, 'p95': 380, 'max': 390}
+        assert summary['phases_ms']['indexes']['p50'] == 150
+        assert distribution([None]) == {}
+
+        path = str(tmp_path / 'history.jsonl')
+        options = {'manifest': True, 'skip_setup': False}
+        assert record_history(summary, options, path) is None
+        assert record_history(summary, {'manifest': False, 'skip_setup': False}, path) is None
+        assert record_history(summary, options, path) == 300
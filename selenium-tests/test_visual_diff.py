@@ -0,0 +1,75 @@
+"""
+Visual regression engine unit tests
+These tests compare synthetic captures without a browser
+"""
+import os
+import time
+
+import numpy as np
+
+import visual_diff
+
+
+def page(height=1080, width=1920):
+    """Return a page-like capture: white body, dark sider, a few text bars"""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    image[:, :200] = (0, 21, 41)
+    for row in range(100, 1000, 60):
+        image[row:row + 12, 300:900] = 40
+    return image
+
+
+class TestVisualDiff:
+    """Test cases for masked, tolerant pixel and structural comparison"""
+
+    def test_identical_captures_pass(self):
+        """Test that a capture matches itself"""
+        result = visual_diff.compare(page(), page())
+        assert result['status'] == 'pass'
+        assert result['changed_ratio'] == 0 and result['ssim'] > 0.9999
+
+    def test_antialiasing_noise_is_tolerated(self):
+        """Test that small per-channel differences stay under the tolerance"""
+        noisy = page().astype(np.int16) + np.random.default_rng(1).integers(-6, 7, (1080, 1920, 3))
+        result = visual_diff.compare(np.clip(noisy, 0, 255).astype(np.uint8), page())
+        assert result['status'] == 'pass'
+
+    def test_layout_shift_fails(self):
+        """Test that moving a block of content is detected"""
+        shifted = page()
+        shifted[:, 300:] = page()[:, 280:-20]
+        result = visual_diff.compare(shifted, page())
+        assert result['status'] == 'fail'
+        assert result['changed_ratio'] > 0.001
+
+    def test_masked_region_is_ignored(self):
+        """Test that changes inside a mask do not count"""
+        changed = page()
+        changed[100:112, 300:900] = 200
+        assert visual_diff.compare(changed, page())['status'] == 'fail'
+        result = visual_diff.compare(changed, page(), rects=[(290, 90, 620, 30)])
+        assert result['status'] == 'pass'
+
+    def test_check_records_baseline_and_writes_heatmap(self, tmp_path):
+        """Test baselines per browser and viewport and heatmaps on failure"""
+        baselines, diffs = str(tmp_path / 'baselines'), str(tmp_path / 'diffs')
+        first = visual_diff.check('invoice', page(), 'chrome', baseline_dir=baselines,
+                                  diff_dir=diffs, update=False)
+        assert first['status'] == 'new'
+        assert first['viewport'].startswith('chrome-1920x1080')
+        assert os.path.exists(os.path.join(baselines, first['viewport'], 'invoice.png'))
+
+        broken = page()
+        broken[500:700, 300:1500] = (255, 0, 0)
+        second = visual_diff.check('invoice', broken, 'chrome', baseline_dir=baselines,
+                                   diff_dir=diffs, update=False)
+        assert second['status'] == 'fail'
+        assert os.path.exists(second['heatmap'])
+
+    def test_full_hd_comparison_speed(self):
+        """Test that one 1920x1080 comparison stays well under a second"""
+        actual, baseline = page(), page()
+        start = time.perf_counter()
+        for _ in range(10):
+            visual_diff.compare(actual, baseline)
+        assert (time.perf_counter() - start) / 10 < 0.5
@@ -0,0 +1,225 @@
+"""
+Visual regression engine
+
+Compares page screenshots with baselines stored per browser, viewport and
+browser profile (baselines/<browser>-<width>x<height>[-lean]/<name>.png). Screenshots are decoded into
+NumPy arrays; masked regions (dynamic values such as dates and dashboard
+counters) are excluded, then a tolerant per-pixel diff and an 8x8 block SSIM
+(on the capture with sub-tolerance differences removed) are computed in
+vectorized form. Failing comparisons write a diff heatmap to
+reports/visual/.
+
+Run: python visual_diff.py screenshots/visual --browser chrome
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+import config
+
+# CSS selectors of dynamic content masked out per page
+PAGE_MASKS = {
+    'dashboard': [
+        '.whiteBox .pad15',
+        '.whiteBox .pad20 .ant-progress',
+        '.whiteBox .pad20 .right',
+        '.ant-table-tbody',
+    ],
+    'invoice': ['.ant-table-tbody', '.ant-pagination'],
+    'customer': ['.ant-table-tbody', '.ant-pagination'],
+}
+
+SSIM_BLOCK = 8
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def decode(data):
+    """Decode PNG bytes (or a file path) into an RGB uint8 array"""
+    source = io.BytesIO(data) if isinstance(data, bytes) else data
+    with Image.open(source) as image:
+        return np.asarray(image.convert('RGB'))
+
+
+def viewport_key(browser, array):
+    """Return the baseline directory name for a browser, profile and capture size"""
+    height, width = array.shape[:2]
+    key = f"{browser}-{width}x{height}"
+    # lean captures have no images or web fonts, they get their own baselines
+    return key if config.BROWSER_PROFILE == 'full' else f"{key}-{config.BROWSER_PROFILE}"
+
+
+def mask_array(shape, rects):
+    """Return a boolean (H, W) array that is False inside the masked rectangles"""
+    valid = np.ones(shape[:2], dtype=bool)
+    for x, y, width, height in rects:
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        valid[y0:int(y + height), x0:int(x + width)] = False
+    return valid
+
+
+def pixel_diff(actual, baseline, valid, tolerance):
+    """Return (per-pixel max channel difference, share of valid pixels above tolerance)"""
+    delta = (np.maximum(actual, baseline) - np.minimum(actual, baseline)).max(axis=2)
+    delta[~valid] = 0
+    changed = np.count_nonzero(delta > tolerance)
+    return delta, changed / max(np.count_nonzero(valid), 1)
+
+
+def gray(image):
+    """Return the float32 luma of an RGB array"""
+    image = image.astype(np.float32)
+    return image[..., 0] * 0.299 + image[..., 1] * 0.587 + image[..., 2] * 0.114
+
+
+def block_ssim(actual, baseline, valid, block=SSIM_BLOCK):
+    """Return the SSIM of every fully unmasked block x block tile, NaN for masked tiles"""
+    height = actual.shape[0] // block * block
+    width = actual.shape[1] // block * block
+    shape = (height // block, block, width // block, block)
+
+    x = gray(actual[:height, :width]).reshape(shape)
+    y = gray(baseline[:height, :width]).reshape(shape)
+    mu_x = x.mean(axis=(1, 3))
+    mu_y = y.mean(axis=(1, 3))
+    var_x = x.var(axis=(1, 3))
+    var_y = y.var(axis=(1, 3))
+    cov = (x * y).mean(axis=(1, 3)) - mu_x * mu_y
+
+    ssim = ((2 * mu_x * mu_y + SSIM_C1) * (2 * cov + SSIM_C2)) / \
+           ((mu_x ** 2 + mu_y ** 2 + SSIM_C1) * (var_x + var_y + SSIM_C2))
+    covered = valid[:height, :width].reshape(shape).all(axis=(1, 3))
+    ssim[~covered] = np.nan
+    return ssim
+
+
+def write_heatmap(baseline, delta, valid, path):
+    """Write the dimmed baseline with changed pixels in red and masks in blue"""
+    image = (baseline.astype(np.float32) * 0.3).astype(np.uint8)
+    heat = np.clip(delta.astype(np.float32) * 4, 0, 255).astype(np.uint8)
+    image[..., 0] = np.maximum(image[..., 0], heat)
+    image[~valid, 2] = 160
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(image).save(path)
+
+
+def compare(actual, baseline, rects=(), tolerance=None, max_changed=None, min_ssim=None):
+    """Compare two RGB arrays and return the result dict"""
+    tolerance = config.VISUAL_TOLERANCE if tolerance is None else tolerance
+    max_changed = config.VISUAL_MAX_CHANGED if max_changed is None else max_changed
+    min_ssim = config.VISUAL_MIN_SSIM if min_ssim is None else min_ssim
+
+    if actual.shape != baseline.shape:
+        return {'status': 'fail', 'reason': f"size {actual.shape[:2]} != {baseline.shape[:2]}"}
+
+    valid = mask_array(actual.shape, rects)
+    delta, changed = pixel_diff(actual, baseline, valid, tolerance)
+    over = delta > tolerance
+    if over.any():
+        # differences under the tolerance are snapped to the baseline before the structural pass
+        tolerant = np.where(over[..., None], actual, baseline)
+        ssim = block_ssim(tolerant, baseline, valid)
+        mean_ssim = float(np.nanmean(ssim)) if np.isfinite(ssim).any() else 1.0
+        min_block = float(np.nanmin(ssim)) if np.isfinite(ssim).any() else 1.0
+    else:
+        # nothing above the tolerance: the tolerant capture is the baseline
+        mean_ssim = min_block = 1.0
+
+    failed = changed > max_changed or mean_ssim < min_ssim
+    return {
+        'status': 'fail' if failed else 'pass',
+        'changed_ratio': float(changed),
+        'ssim': mean_ssim,
+        'min_block_ssim': min_block,
+        'masked_ratio': float(1 - np.count_nonzero(valid) / valid.size),
+        '_delta': delta,
+        '_valid': valid,
+    }
+
+
+def check(name, actual, browser, rects=(), baseline_dir=None, diff_dir=None, update=None):
+    """Compare a capture with its baseline, recording the baseline when there is none"""
+    baseline_dir = baseline_dir or config.VISUAL_BASELINE_DIR
+    diff_dir = diff_dir or os.path.join(config.REPORT_DIR, 'visual')
+    update = config.VISUAL_UPDATE if update is None else update
+
+    key = viewport_key(browser, actual)
+    path = os.path.join(baseline_dir, key, f"{name}.png")
+    if update or not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.fromarray(actual).save(path)
+        return {'name': name, 'viewport': key, 'status': 'new', 'baseline': path}
+
+    baseline = decode(path)
+    result = compare(actual, baseline, rects)
+    delta, valid = result.pop('_delta', None), result.pop('_valid', None)
+    result.update(name=name, viewport=key, baseline=path)
+    if result['status'] == 'fail' and delta is not None:
+        result['heatmap'] = os.path.join(diff_dir, key, f"{name}_diff.png")
+        write_heatmap(baseline, delta, valid, result['heatmap'])
+    return result
+
+
+def compare_directory(actual_dir, browser, masks=None, workers=None):
+    """Check every PNG of a directory against the baselines, in parallel"""
+    masks = masks or {}
+    names = sorted(file[:-4] for file in os.listdir(actual_dir) if file.endswith('.png'))
+
+    def run(name):
+        actual = decode(os.path.join(actual_dir, f"{name}.png"))
+        return check(name, actual, browser, masks.get(name, ()))
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(run, names))
+
+
+def print_result(result):
+    """Print one comparison row"""
+    flag = {'pass': '✓', 'new': '+', 'fail': '⚠'}[result['status']]
+    if 'ssim' in result:
+        detail = f"changed {result['changed_ratio']:.4%} ssim {result['ssim']:.4f}"
+    else:
+        detail = result.get('reason', 'baseline recorded')
+    print(f"{flag} {result['viewport']:22} {result['name']:40} {detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('actual_dir', help='directory of <name>.png captures')
+    parser.add_argument('--browser', default=config.BROWSER)
+    parser.add_argument('--masks', help='JSON file of {name: [[x, y, width, height], ...]}')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', default=os.path.join(config.REPORT_DIR, 'visual_diff.json'))
+    args = parser.parse_args(argv)
+
+    masks = {}
+    if args.masks:
+        with open(args.masks) as f:
+            masks = json.load(f)
+
+    start = time.perf_counter()
+    results = compare_directory(args.actual_dir, args.browser, masks, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 100)
+    for result in results:
+        print_result(result)
+    failed = [result for result in results if result['status'] == 'fail']
+    print(f"\n{len(results)} captures compared in {elapsed:.2f}s, {len(failed)} failed")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'seconds': elapsed, 'results': results}, f, indent=2)
+    print(f"📊 Report: {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())